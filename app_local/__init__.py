@@ -20,12 +20,50 @@ from app_local.staff_category_routes import staff_category_routes
 from app_local.data_summary import data_summary_bp
 from app_local.project_summary import project_summary_bp
 from backend.connect_local import \
-    connect_local, initialize_database, close_connection, select_all_from_table
+    connect_local, initialize_database, close_connection, select_all_from_table, \
+    release_connections, get_pool_stats
+from backend.dimension_cache import get_dimension_cache_stats
+from backend.request_memo import open_request_memo, close_request_memo
+from backend.index_plan import ensure_indexes
+from backend.table_versions import ensure_table_versions
+from backend.summary_rollup import ensure_rollup
+from backend.display_cache import get_display_cache_stats
+from backend.write_queue import get_write_queue_stats
+from backend.request_metrics import start_request_metrics, finish_request_metrics, render_metrics, METRICS_CONTENT_TYPE
+from backend.query_trace import get_query_stats
+from app_local.conditional_get import compress_response
 
 conn = connect_local()
 
+
+def prepare_database():
+    """Bring an existing database up to date before serving it.
+
+    Databases created before the index plan pick up the missing indexes (never
+    changing data: duplicate keys are only reported, see backend.index_plan) and
+    the change counters the display cache is keyed on; a missing summary rollup
+    or rollup trigger is recreated and refilled. Run at startup through
+    `flask --app app_local prepare-db` (the Docker image does so before `flask
+    run`), not on import, so tools and tests importing the app leave the
+    database alone.
+    """
+    cursor, cnxn = conn.connect_to_db()
+    try:
+        ensure_indexes(cursor, cnxn)
+        ensure_table_versions(cursor, cnxn)
+        ensure_rollup(cursor, cnxn)
+    finally:
+        close_connection(cursor, cnxn)
+
+
 app = Flask(__name__)
-app.secret_key = os.urandom(24)
+# The session holds each user's dropdown selections (app_local/selection.py),
+# so its signing key must survive restarts and be the same in every worker
+app.secret_key = os.environ.get('FLASK_SECRET_KEY')
+if not app.secret_key:
+    app.logger.warning("FLASK_SECRET_KEY is not set: using a random key, so selections are lost on restart "
+                       "and not shared between workers (fine for development only)")
+    app.secret_key = os.urandom(24)
 app.config['UPLOAD_FOLDER'] = 'uploaded_data/'
 app.register_blueprint(upload_requests)
 app.register_blueprint(manual_upload)
@@ -43,6 +81,36 @@ app.register_blueprint(capex_forecast_routes)
 app.register_blueprint(staff_cost_routes)
 app.register_blueprint(staff_category_routes)
 
+# Latency, SQL statements and rows fetched per endpoint, served on /metrics
+app.before_request(start_request_metrics)
+
+
+@app.after_request
+def record_request_metrics(response):
+    finish_request_metrics(request.endpoint, request.method, response.status_code)
+    return response
+
+
+@app.teardown_request
+def record_failed_request_metrics(exc=None):
+    # only still open when the request raised past the error handlers
+    finish_request_metrics(request.endpoint, request.method, 500)
+
+
+@app.cli.command('prepare-db')
+def prepare_db_command():
+    """Create missing indexes and change counters in the local database."""
+    prepare_database()
+
+
+# Hand each request's pooled SQLite connection back once the request finishes
+app.teardown_appcontext(release_connections)
+# Display builders called several times while rendering one page are computed once
+app.before_request(open_request_memo)
+app.teardown_appcontext(close_request_memo)
+# Large JSON/HTML bodies are gzip-compressed for clients accepting it
+app.after_request(compress_response)
+
 
 # Jinja filter to render numbers with 1 decimal when possible
 def one_decimal(value):
@@ -100,6 +168,36 @@ def homepage():
                 pass
     return render_template("home.html")
 
+@app.route('/pool_stats', methods=['GET'])
+def pool_stats():
+    """Report connection pool counters (created/reused/in use/idle) for sizing."""
+    return get_pool_stats(), 200
+
+@app.route('/dimension_cache_stats', methods=['GET'])
+def dimension_cache_stats():
+    """Report reference-table cache hits/misses/invalidations."""
+    return get_dimension_cache_stats(), 200
+
+@app.route('/display_cache_stats', methods=['GET'])
+def display_cache_stats():
+    """Report display table cache hits/misses/evictions and memory use."""
+    return get_display_cache_stats(), 200
+
+@app.route('/write_queue_stats', methods=['GET'])
+def write_queue_stats():
+    """Report writer counters: writes, batches (group commits), largest batch, failures."""
+    return get_write_queue_stats(), 200
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Per-endpoint latency, SQL statement and row histograms and display builder timings (Prometheus text format)."""
+    return render_metrics(), 200, {'Content-Type': METRICS_CONTENT_TYPE}
+
+@app.route('/query_stats', methods=['GET'])
+def query_stats():
+    """Report SQL statement shapes by total time and the recent slow statements with their plans."""
+    return get_query_stats(request.args.get('limit', 50, type=int)), 200
+
 @app.route("/input_data")
 def input_page():
      return NotImplemented
@@ -110,4 +208,5 @@ def testpage():
     return render_template("pages/test.html")
 
 if __name__ == "__main__":
+    prepare_database()
     app.run(debug=True) # debug=True enables auto-reloading and debugging
\ No newline at end of file
@@ -1,6 +1,8 @@
 from flask import Blueprint, request, redirect, url_for
-from backend.connect_local import connect_local, select_all_from_table
+from backend.connect_local import connect_local
+from backend.dimension_cache import select_dimension
 from backend.create_display_table import get_departments_display, get_projects_display
+from backend.write_queue import execute_write
 
 capex_forecast_routes = Blueprint('capex_forecast_routes', __name__)
 
@@ -151,9 +153,9 @@ def change_capex_forecast():
         db = connect_local()
         cursor, cnxn = db.connect_to_db()
 
-        pos_df = select_all_from_table(cursor, cnxn, 'pos')
-        dept_df = select_all_from_table(cursor, cnxn, 'departments')
-        proj_df = select_all_from_table(cursor, cnxn, 'projects')
+        pos_df = select_dimension(cursor, cnxn, 'pos')
+        dept_df = select_dimension(cursor, cnxn, 'departments')
+        proj_df = select_dimension(cursor, cnxn, 'projects')
 
         po_map = dict(zip(pos_df['name'], pos_df['id'])) if 'name' in pos_df.columns and 'id' in pos_df.columns else {}
         dept_map = dict(zip(dept_df['name'], dept_df['id'])) if 'name' in dept_df.columns and 'id' in dept_df.columns else {}
@@ -218,8 +220,7 @@ def change_capex_forecast():
             base_sql += "\n   AND capex_description = ?"
             params.append(orig_description)
 
-        cursor.execute(base_sql, tuple(params))
-        cnxn.commit()
+        execute_write(base_sql, params)
         # On success, return to the CapEx Forecast page
         return redirect(url_for('modify_tables.modify_table_router', action='capex_forecast'))
     except Exception as e:
@@ -254,9 +255,9 @@ def delete_capex_forecast():
         db = connect_local()
         cursor, cnxn = db.connect_to_db()
 
-        pos_df = select_all_from_table(cursor, cnxn, 'pos')
-        dept_df = select_all_from_table(cursor, cnxn, 'departments')
-        proj_df = select_all_from_table(cursor, cnxn, 'projects')
+        pos_df = select_dimension(cursor, cnxn, 'pos')
+        dept_df = select_dimension(cursor, cnxn, 'departments')
+        proj_df = select_dimension(cursor, cnxn, 'projects')
 
         po_map = dict(zip(pos_df['name'], pos_df['id'])) if pos_df is not None and not pos_df.empty and 'name' in pos_df.columns and 'id' in pos_df.columns else {}
         dept_map = dict(zip(dept_df['name'], dept_df['id'])) if dept_df is not None and not dept_df.empty and 'name' in dept_df.columns and 'id' in dept_df.columns else {}
@@ -334,9 +335,9 @@ def change_capex_budget():
         db = connect_local()
         cursor, cnxn = db.connect_to_db()
 
-        pos_df = select_all_from_table(cursor, cnxn, 'pos')
-        dept_df = select_all_from_table(cursor, cnxn, 'departments')
-        proj_df = select_all_from_table(cursor, cnxn, 'projects')
+        pos_df = select_dimension(cursor, cnxn, 'pos')
+        dept_df = select_dimension(cursor, cnxn, 'departments')
+        proj_df = select_dimension(cursor, cnxn, 'projects')
 
         po_map = dict(zip(pos_df['name'], pos_df['id'])) if 'name' in pos_df.columns and 'id' in pos_df.columns else {}
         dept_map = dict(zip(dept_df['name'], dept_df['id'])) if 'name' in dept_df.columns and 'id' in dept_df.columns else {}
@@ -428,9 +429,9 @@ def delete_capex_budget():
         db = connect_local()
         cursor, cnxn = db.connect_to_db()
 
-        pos_df = select_all_from_table(cursor, cnxn, 'pos')
-        dept_df = select_all_from_table(cursor, cnxn, 'departments')
-        proj_df = select_all_from_table(cursor, cnxn, 'projects')
+        pos_df = select_dimension(cursor, cnxn, 'pos')
+        dept_df = select_dimension(cursor, cnxn, 'departments')
+        proj_df = select_dimension(cursor, cnxn, 'projects')
 
         po_map = dict(zip(pos_df['name'], pos_df['id'])) if pos_df is not None and not pos_df.empty and 'name' in pos_df.columns and 'id' in pos_df.columns else {}
         dept_map = dict(zip(dept_df['name'], dept_df['id'])) if dept_df is not None and not dept_df.empty and 'name' in dept_df.columns and 'id' in dept_df.columns else {}
@@ -0,0 +1,104 @@
+import gzip
+import hashlib
+import os
+from functools import wraps
+from flask import make_response, request, session
+from backend.connect_local import connect_local
+from backend.table_versions import table_versions
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is used without it
+    brotli = None
+
+# Conditional GET for the JSON listing endpoints. A response's ETag is derived
+# from the table_versions counters of the tables it is built from, the query
+# string and the session's dropdown selections, so a request revalidating an
+# unchanged listing is answered 304 before the view (and pandas) runs. The
+# counters are read before the view, so a write racing the request can only
+# cost one extra refetch. ETags are weak: the same ETag covers the compressed
+# and uncompressed bodies. _ETAG_SALT changes per process, so a restart (e.g.
+# a deploy changing a payload) never validates a body cached from older code.
+_ETAG_SALT = os.urandom(8).hex()
+
+# Responses of these types above COMPRESS_MIN_BYTES are gzip- (or brotli-)
+# compressed when the client accepts it; smaller ones are not worth the CPU.
+COMPRESS_MIN_BYTES = 1024
+COMPRESS_MIMETYPES = ('application/json', 'text/html')
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def _selections():
+    return sorted((key, repr(value)) for key, value in session.items() if key.startswith('selection_'))
+
+
+def versioned_etag(tables=None):
+    """ETag of the current request for the given source tables (all tracked tables when None).
+
+    Returns None when the database has no table_versions or a transaction is
+    open on the request's connection.
+    """
+    cursor, cnxn = connect_local().connect_to_db()
+    versions = table_versions(cursor, tables)
+    if versions is None or cnxn.in_transaction:
+        return None
+    parts = [_ETAG_SALT, request.endpoint, request.full_path, repr(_selections()), repr(sorted(versions.items()))]
+    return hashlib.sha1('\n'.join(parts).encode('utf-8')).hexdigest()
+
+
+def versioned_json(*tables):
+    """Answer GETs of the decorated view with 304 while `tables` are unchanged.
+
+    `tables` must list every table the view reads; none means all tracked
+    tables (the summary statistics read every fact table). Successful
+    responses carry the ETag and `Cache-Control: private, no-cache`, so the
+    browser revalidates each time and gets an empty 304 when nothing changed.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method != 'GET':
+                return view(*args, **kwargs)
+            etag = versioned_etag(tables or None)
+            if etag is not None and request.if_none_match.contains_weak(etag):
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if etag is None or response.status_code != 200:
+                    return response
+            response.set_etag(etag, weak=True)
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorator
+
+
+def _preferred_encoding():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br'] > 0:
+        return 'br'
+    if accepted['gzip'] > 0:
+        return 'gzip'
+    return None
+
+
+def compress_response(response):
+    """gzip/brotli-compress large JSON and HTML bodies; registered as an after_request handler."""
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or response.mimetype not in COMPRESS_MIMETYPES or 'Content-Encoding' in response.headers):
+        return response
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_BYTES:
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = _preferred_encoding()
+    if encoding == 'br':
+        response.set_data(brotli.compress(data, quality=BROTLI_QUALITY))
+    elif encoding == 'gzip':
+        response.set_data(gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0))
+    else:
+        return response
+    response.headers['Content-Encoding'] = encoding
+    return response
@@ -1,5 +1,6 @@
 from flask import Blueprint, request, redirect, url_for
 from backend.connect_local import connect_local, select_all_from_table
+from backend.dimension_cache import invalidate_dimensions
 
 department_routes = Blueprint('department_routes', __name__)
 
@@ -120,6 +121,7 @@ def change_department():
                 pass
 
         cnxn.commit()
+        invalidate_dimensions('departments')
     except Exception:
         # Swallow errors to keep redirect behavior consistent
         pass
@@ -1,6 +1,8 @@
 from flask import Blueprint, request, redirect, url_for
 import pandas as pd
 from backend.connect_local import connect_local, select_all_from_table
+from backend.dimension_cache import select_dimension
+from app_local.conditional_get import versioned_json
 
 io_routes = Blueprint('io_routes', __name__)
 
@@ -32,7 +34,7 @@ def get_io_details():
             except Exception:
                 row = ios_df[ios_df['IO_num'].astype(str) == str(q_io)].head(1)
         if (row is None or row.empty) and q_project is not None and 'project_id' in ios_df.columns:
-            proj_df = select_all_from_table(cursor, cnxn, 'projects')
+            proj_df = select_dimension(cursor, cnxn, 'projects')
             pmap = dict(zip(proj_df['name'], proj_df['id'])) if 'name' in proj_df.columns and 'id' in proj_df.columns else {}
             pid = pmap.get(q_project)
             if pid is not None:
@@ -46,7 +48,7 @@ def get_io_details():
         project_name = None
         try:
             if 'project_id' in ios_df.columns:
-                proj_df = select_all_from_table(cursor, cnxn, 'projects')
+                proj_df = select_dimension(cursor, cnxn, 'projects')
                 pmap2 = dict(zip(proj_df['id'], proj_df['name'])) if 'id' in proj_df.columns and 'name' in proj_df.columns else {}
                 project_name = pmap2.get(int(row['project_id']))
         except Exception:
@@ -69,7 +71,7 @@ def change_io():
         db = connect_local()
         cursor, cnxn = db.connect_to_db()
         ios_df = select_all_from_table(cursor, cnxn, 'ios')
-        proj_df = select_all_from_table(cursor, cnxn, 'projects')
+        proj_df = select_dimension(cursor, cnxn, 'projects')
 
         # Resolve target IO row id
         target_id = None
@@ -135,13 +137,14 @@ def change_io():
 
 
 @io_routes.route('/modify_io/list', methods=['GET'])
+@versioned_json('ios', 'projects')
 def list_ios():
     """Return a JSON list of IOs for the generic table."""
     try:
         db = connect_local()
         cursor, cnxn = db.connect_to_db()
         ios_df = select_all_from_table(cursor, cnxn, 'ios')
-        proj_df = select_all_from_table(cursor, cnxn, 'projects')
+        proj_df = select_dimension(cursor, cnxn, 'projects')
         name_map = {}
         if proj_df is not None and not proj_df.empty and 'id' in proj_df.columns:
             name_col = 'name' if 'name' in proj_df.columns else (proj_df.columns[0] if len(proj_df.columns)>0 else None)
@@ -2,7 +2,10 @@
 from flask import Flask, flash, render_template, request, redirect, url_for, Blueprint, jsonify
 from werkzeug.utils import secure_filename
 from backend.login import valid_login
-from backend.connect_local import connect_local, select_columns_from_table, select_all_from_table
+from backend.connect_local import connect_local, get_pool, select_columns_from_table, select_all_from_table
+from backend.dimension_cache import select_dimension
+from backend.rate_resolution import load_rate_table, resolve_rate, resolve_rates
+from backend.write_queue import run_write
 from app_local.select_data import transform_table
 
 from backend import \
@@ -10,16 +13,10 @@ from backend import \
     get_project_cateogory_display, get_hr_category_display
 from backend.upload_forecasts_nonpc import upload_nonpc_forecasts_df, upload_nonpc_forecasts_local_m
 import pandas as pd
+from app_local.selection import MANUAL_INPUT, selected, set_selection, posted_value
+from app_local.conditional_get import versioned_json
 
 manual_upload = Blueprint('manual_upload', __name__, template_folder='templates')
-# module-level selected PO for manual input page
-selected_po = None
-# module-level selected Department for manual input page
-selected_department = None
-# module-level selected Fiscal Year for manual input page
-selected_fiscal_year = None
-# module-level selected Project for manual input page
-selected_project = None
 input_types = [
         "forecast_nonpc",
         "forecast_pc" ,
@@ -69,8 +66,9 @@ titles = {
 def render_mannual_input():
     conn = connect_local()
     engine, cursor, cnxn = conn.connect_to_db(engine=True)
+    selected_po = selected(MANUAL_INPUT, 'po')
     # load POs first so we can resolve selected_po -> po_id
-    pos_df = select_all_from_table(cursor, cnxn, 'pos')
+    pos_df = select_dimension(cursor, cnxn, 'pos')
     if pos_df is None:
         po = []
     else:
@@ -106,7 +104,7 @@ def render_mannual_input():
     except Exception:
         selected_po_id = None
     # load departments with their po_id so the UI can filter departments by selected PO
-    depts_df = select_all_from_table(cursor, cnxn, 'departments')
+    depts_df = select_dimension(cursor, cnxn, 'departments')
     if depts_df is None:
         departments_all = []
         departments = []
@@ -201,7 +199,7 @@ def render_mannual_input():
     # Build initial projects list from the display helper and apply any module-level filters
     proj_df = get_projects_display()
 
-    human_resource_categories = select_all_from_table(cursor, cnxn, "human_resource_categories")['name']
+    human_resource_categories = select_dimension(cursor, cnxn, "human_resource_categories")['name']
     # Fetch forecast table contents to show below the Add button
     try:
         df_nonpc = select_all_from_table(cursor, cnxn, 'project_forecasts_nonpc')
@@ -269,7 +267,7 @@ def render_mannual_input():
 
     # 3. Get full list of HR categories (column names for pivot)
     try:
-        hr_cat_df = select_all_from_table(cursor, cnxn, 'human_resource_categories')
+        hr_cat_df = select_dimension(cursor, cnxn, 'human_resource_categories')
         if hr_cat_df is not None and 'name' in hr_cat_df.columns:
             hr_category_list = [str(v).strip() for v in hr_cat_df['name'].dropna().tolist() if str(v).strip()]
         else:
@@ -318,7 +316,7 @@ def render_mannual_input():
     base_cost_lookup = {}
     try:
         hr_cost_df = select_all_from_table(cursor, cnxn, 'human_resource_cost')
-        hr_cat_df_full = select_all_from_table(cursor, cnxn, 'human_resource_categories')
+        hr_cat_df_full = select_dimension(cursor, cnxn, 'human_resource_categories')
         if hr_cost_df is not None and hr_cat_df_full is not None and 'category_id' in hr_cost_df.columns and 'year' in hr_cost_df.columns:
             # Map ids -> names for category/PO/Department
             cat_id_to_name = {}
@@ -328,8 +326,8 @@ def render_mannual_input():
             except Exception:
                 cat_id_to_name = {}
             # POs and Departments for name resolution
-            pos_df2 = select_all_from_table(cursor, cnxn, 'pos')
-            depts_df2 = select_all_from_table(cursor, cnxn, 'departments')
+            pos_df2 = select_dimension(cursor, cnxn, 'pos')
+            depts_df2 = select_dimension(cursor, cnxn, 'departments')
             po_id_to_name = {}
             dept_id_to_name = {}
             try:
@@ -528,6 +526,7 @@ def render_mannual_input():
 
 
 @manual_upload.route('/api/hr_cost', methods=['GET'])
+@versioned_json('human_resource_categories', 'pos', 'departments', 'human_resource_cost')
 def api_hr_cost():
     """Return unit cost for a human resource category.
         Query params:
@@ -543,8 +542,8 @@ def api_hr_cost():
     """
     category = request.args.get('category')
     year = request.args.get('year')
-    po_name = request.args.get('po') or selected_po
-    dept_name = request.args.get('department') or selected_department
+    po_name = request.args.get('po') or selected(MANUAL_INPUT, 'po')
+    dept_name = request.args.get('department') or selected(MANUAL_INPUT, 'department')
     strict_raw = request.args.get('strict')
     strict_mode = False
     if isinstance(strict_raw, str):
@@ -585,36 +584,16 @@ def api_hr_cost():
             except Exception:
                 dept_id = None
 
-        def fetch(q, params):
+        # Strict: exact (po, department, category, year) match only; otherwise hierarchical fallback
+        cost = resolve_rate(cursor, po_id, dept_id, cat_id, y, strict=strict_mode)
+        if cost is None and not strict_mode:
+            # fallback where category stored as text
             try:
-                cursor.execute(q, params)
+                cursor.execute("SELECT cost FROM human_resource_cost WHERE category_id = ? AND year = ? ORDER BY id DESC LIMIT 1", (category, y))
                 rr = cursor.fetchone()
-                return rr[0] if rr else None
+                cost = rr[0] if rr else None
             except Exception:
-                return None
-
-        cost = None
-        if strict_mode:
-            # Strict: require exact match on po, department, category, year. If any id is missing, return None.
-            if all(v is not None for v in (po_id, dept_id, cat_id)):
-                cost = fetch(
-                    "SELECT cost FROM human_resource_cost WHERE po_id = ? AND department_id = ? AND category_id = ? AND year = ? LIMIT 1",
-                    (po_id, dept_id, cat_id, y)
-                )
-            # No other fallbacks in strict mode
-        else:
-            # Hierarchical fallbacks for backward compatibility
-            if cost is None and all(v is not None for v in (po_id, dept_id, cat_id)):
-                cost = fetch("SELECT cost FROM human_resource_cost WHERE po_id = ? AND department_id = ? AND category_id = ? AND year = ? LIMIT 1", (po_id, dept_id, cat_id, y))
-            if cost is None and all(v is not None for v in (dept_id, cat_id)):
-                cost = fetch("SELECT cost FROM human_resource_cost WHERE department_id = ? AND category_id = ? AND year = ? LIMIT 1", (dept_id, cat_id, y))
-            if cost is None and all(v is not None for v in (po_id, cat_id)):
-                cost = fetch("SELECT cost FROM human_resource_cost WHERE po_id = ? AND category_id = ? AND year = ? LIMIT 1", (po_id, cat_id, y))
-            if cost is None and cat_id is not None:
-                cost = fetch("SELECT cost FROM human_resource_cost WHERE category_id = ? AND year = ? LIMIT 1", (cat_id, y))
-            if cost is None:
-                # fallback where category stored as text
-                cost = fetch("SELECT cost FROM human_resource_cost WHERE category_id = ? AND year = ? LIMIT 1", (category, y))
+                cost = None
         return jsonify({'cost': cost}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -626,6 +605,7 @@ def api_hr_cost():
 
 
 @manual_upload.route('/manual_input/personnel_fte', methods=['GET'])
+@versioned_json('pos', 'departments', 'projects', 'project_categories', 'human_resource_categories', 'project_forecasts_pc')
 def manual_personnel_fte():
     """Return existing personnel forecast FTE values per human resource category for the composite key.
     Query params (all required):
@@ -679,7 +659,7 @@ def manual_personnel_fte():
         # Project resolution also constrained by department when available
         proj_id = None
         try:
-            proj_df = select_all_from_table(cursor, cnxn, 'projects')
+            proj_df = select_dimension(cursor, cnxn, 'projects')
             if proj_df is not None and not proj_df.empty and 'name' in proj_df.columns and 'id' in proj_df.columns:
                 mask = proj_df['name'].astype(str).str.strip().str.lower() == str(project_name).strip().lower()
                 if dept_id is not None and 'department_id' in proj_df.columns:
@@ -692,7 +672,7 @@ def manual_personnel_fte():
             proj_id = None
         pc_id = None
         try:
-            pc_df = select_all_from_table(cursor, cnxn, 'project_categories')
+            pc_df = select_dimension(cursor, cnxn, 'project_categories')
             if pc_df is not None and not pc_df.empty and 'category' in pc_df.columns and 'id' in pc_df.columns:
                 mask = pc_df['category'].astype(str).str.strip().str.lower() == str(project_category).strip().lower()
                 rows = pc_df[mask]
@@ -719,7 +699,7 @@ def manual_personnel_fte():
             )
             rows = cursor.fetchall() or []
             # Map category id -> name
-            cat_df = select_all_from_table(cursor, cnxn, 'human_resource_categories')
+            cat_df = select_dimension(cursor, cnxn, 'human_resource_categories')
             cat_name_map = {}
             if cat_df is not None and not cat_df.empty and 'id' in cat_df.columns:
                 name_col = 'name' if 'name' in cat_df.columns else None
@@ -742,59 +722,42 @@ def manual_personnel_fte():
 
 @manual_upload.route('/manual_input/po_selection', methods=['POST'])
 def manual_po_selection():
-    """Endpoint to receive PO selection from client for manual input page and update module-level selected_po."""
-    global selected_po
+    """Endpoint to receive PO selection from client for manual input page and store it in the user's session."""
     try:
-        if request.is_json:
-            payload = request.get_json()
-            val = payload.get('po')
-        else:
-            val = request.form.get('po')
-        selected_po = val
-        return {'status': 'ok', 'selected_po': selected_po}, 200
+        val = set_selection(MANUAL_INPUT, 'po', posted_value('po'))
+        return {'status': 'ok', 'selected_po': val}, 200
     except Exception as e:
         return {'status': 'error', 'message': str(e)}, 500
 
 
 @manual_upload.route('/manual_input/department_selection', methods=['POST'])
 def manual_department_selection():
-    """Endpoint to receive Department selection from client for manual input page and update module-level selected_department."""
-    global selected_department
+    """Endpoint to receive Department selection from client for manual input page and store it in the user's session."""
     try:
-        if request.is_json:
-            payload = request.get_json()
-            val = payload.get('department')
-        else:
-            val = request.form.get('department')
-        selected_department = val
-        return {'status': 'ok', 'selected_department': selected_department}, 200
+        val = set_selection(MANUAL_INPUT, 'department', posted_value('department'))
+        return {'status': 'ok', 'selected_department': val}, 200
     except Exception as e:
         return {'status': 'error', 'message': str(e)}, 500
 
 
 @manual_upload.route('/manual_input/fiscal_year_selection', methods=['POST'])
 def manual_fiscal_year_selection():
-    """Endpoint to receive Fiscal Year selection from client for manual input page and update module-level selected_fiscal_year."""
-    global selected_fiscal_year
+    """Endpoint to receive Fiscal Year selection from client for manual input page and store it in the user's session."""
     try:
-        if request.is_json:
-            payload = request.get_json()
-            val = payload.get('fiscal_year')
-        else:
-            val = request.form.get('fiscal_year')
-        selected_fiscal_year = val
-        return {'status': 'ok', 'selected_fiscal_year': selected_fiscal_year}, 200
+        val = set_selection(MANUAL_INPUT, 'fiscal_year', posted_value('fiscal_year'))
+        return {'status': 'ok', 'selected_fiscal_year': val}, 200
     except Exception as e:
         return {'status': 'error', 'message': str(e)}, 500
 
 
 @manual_upload.route('/manual_input/departments', methods=['GET'])
+@versioned_json('pos', 'departments')
 def manual_departments():
     """Return departments filtered by the provided PO name (query param 'po')
-    or by the current module-level selected_po if no query param is provided.
+    or by the PO selected in the user's session if no query param is provided.
     Response JSON: {"departments": [{id, name, po_id}, ...]}
     """
-    po_name = request.args.get('po') or selected_po
+    po_name = request.args.get('po') or selected(MANUAL_INPUT, 'po')
     # Hierarchy: if no PO selected, department options should be empty
     if not po_name or str(po_name).strip() == '' or str(po_name) == 'All':
         return jsonify({'departments': []}), 200
@@ -804,7 +767,7 @@ def manual_departments():
         cursor, cnxn = db.connect_to_db()
 
         # Load POs and resolve po_name -> po_id
-        pos_df = select_all_from_table(cursor, cnxn, 'pos')
+        pos_df = select_dimension(cursor, cnxn, 'pos')
         po_id = None
         if pos_df is not None and po_name:
             # Choose name column
@@ -819,7 +782,7 @@ def manual_departments():
                         po_id = None
 
         # Load departments
-        depts_df = select_all_from_table(cursor, cnxn, 'departments')
+        depts_df = select_dimension(cursor, cnxn, 'departments')
         result = []
         if depts_df is not None:
             df = depts_df
@@ -880,15 +843,16 @@ def manual_departments():
 
 
 @manual_upload.route('/manual_input/projects', methods=['GET'])
+@versioned_json('projects', 'departments', 'project_categories', 'pos')
 def manual_projects():
     """Return projects filtered by provided query params: po (name), department (name).
     Project list is NOT gated by fiscal_year (projects are independent of FY).
-    If a param is not provided, fall back to module-level selected_* variables.
+    If a param is not provided, fall back to the selections stored in the user's session.
     Response JSON: {'projects': [{'name': <str>} , ...]}
     """
     print("projects route")
-    po_name = request.args.get('po') or selected_po
-    dept_name = request.args.get('department') or selected_department
+    po_name = request.args.get('po') or selected(MANUAL_INPUT, 'po')
+    dept_name = request.args.get('department') or selected(MANUAL_INPUT, 'department')
     # fiscal year is intentionally ignored for project listing
     try:
         proj_df = get_projects_display()
@@ -936,6 +900,7 @@ def manual_projects():
 
 
 @manual_upload.route('/manual_input/hr_categories', methods=['GET'])
+@versioned_json('human_resource_categories', 'pos')
 def manual_hr_categories():
     """Return ALL human resource categories without filtering by PO.
     Response JSON: {"human_resource_categories": [<str>, ...]}
@@ -994,26 +959,21 @@ def manual_hr_categories():
 
 @manual_upload.route('/manual_input/project_selection', methods=['POST'])
 def manual_project_selection():
-    """Receive Project selection from client for manual input page and update module-level selected_project."""
-    global selected_project
+    """Receive Project selection from client for manual input page and store it in the user's session."""
     try:
-        if request.is_json:
-            payload = request.get_json()
-            val = payload.get('project')
-        else:
-            val = request.form.get('project')
-        selected_project = val
-        return {'status': 'ok', 'selected_project': selected_project}, 200
+        val = set_selection(MANUAL_INPUT, 'project', posted_value('project'))
+        return {'status': 'ok', 'selected_project': val}, 200
     except Exception as e:
         return {'status': 'error', 'message': str(e)}, 500
 
 
 @manual_upload.route('/manual_input/project_categories', methods=['GET'])
+@versioned_json('projects', 'project_categories')
 def manual_project_categories():
-    """Return project categories filtered by provided query param 'project' or by module-level selected_project.
+    """Return project categories filtered by provided query param 'project' or by the project selected in the user's session.
     Response JSON: {'project_categories': [<str>, ...]}
     """
-    proj_name = request.args.get('project') or selected_project
+    proj_name = request.args.get('project') or selected(MANUAL_INPUT, 'project')
     # If no project selected, return empty list
     if not proj_name or str(proj_name).strip() == '' or str(proj_name) == 'All':
         return jsonify({'project_categories': []}), 200
@@ -1058,13 +1018,14 @@ def manual_project_categories():
 
 
 @manual_upload.route('/manual_input/ios', methods=['GET'])
+@versioned_json('ios', 'projects')
 def manual_ios():
     """Return IO numbers for the provided project name (query param 'project') or for the
-    current module-level selected_project. Response JSON: { 'ios': [ '1000123', ... ] }
+    project selected in the user's session. Response JSON: { 'ios': [ '1000123', ... ] }
     If project is missing or no IOs found, returns an empty list. This endpoint is used to
     auto-populate the read-only IO field in the upload/modify forecast forms.
     """
-    project_name = request.args.get('project') or selected_project
+    project_name = request.args.get('project') or selected(MANUAL_INPUT, 'project')
     ios = []
     if not project_name or str(project_name).strip() == '' or str(project_name) == 'All':
         return jsonify({'ios': ios}), 200
@@ -1072,7 +1033,7 @@ def manual_ios():
         db = connect_local()
         cursor, cnxn = db.connect_to_db()
         # resolve project id
-        proj_df = select_all_from_table(cursor, cnxn, 'projects')
+        proj_df = select_dimension(cursor, cnxn, 'projects')
         proj_id = None
         if proj_df is not None:
             try:
@@ -1133,8 +1094,27 @@ def manual_change_forecast():
     - Update project_forecasts_pc.human_resource_fte when Human_resource_FTE is provided
     Matching keys for forecasts include fiscal_year, but project resolution uses only Project Name and Department (no fiscal_year).
     For personnel, also match Human_resource_category.
+
+    The change is applied on the database writer (backend.write_queue), so
+    concurrent edits are serialized instead of failing on the write lock.
     """
-    form = request.form
+    try:
+        total_personnel_cost = run_write(_change_forecast, request.form.to_dict())
+    except Exception as e:
+        flash(f"Forecast change failed: {e}", 'error')
+        return redirect(url_for('manual_upload.render_mannual_input'))
+    # Flash a summary of personnel cost change for visibility (optional)
+    try:
+        flash(f"Personnel cost (calculated): {total_personnel_cost:.2f}", 'info')
+    except Exception:
+        pass
+
+    # Redirect back to manual input page so the tables refresh
+    return redirect(url_for('manual_upload.render_mannual_input'))
+
+
+def _change_forecast(cursor, cnxn, form):
+    """Write half of manual_change_forecast; returns the calculated personnel cost."""
     po_name = form.get('PO')
     dept_name = form.get('Department')
     fiscal_year = form.get('fiscal_year')
@@ -1146,22 +1126,17 @@ def manual_change_forecast():
     fte = form.get('Human_resource_FTE')
     nonpc = form.get('Non_personnel_cost')
 
-    # Obtain engine-aware connection so we can reuse it for potential inserts without nested connections
-    conn = connect_local()
-    engine, cursor, cnxn = conn.connect_to_db(engine=True)
-    # Acquire a write lock early to prevent SQLITE_BUSY during mixed UPDATE + INSERT cycles
-    try:
-        cursor.execute("BEGIN IMMEDIATE")
-    except Exception:
-        pass
+    # The writer already holds the write lock for the batch; the engine is only
+    # needed by the DataFrame fallback below
+    engine = get_pool().engine()
 
     # Resolve IDs
-    pos_df = select_all_from_table(cursor, cnxn, 'pos')
-    depts_df = select_all_from_table(cursor, cnxn, 'departments')
-    projs_df = select_all_from_table(cursor, cnxn, 'projects')
-    pcats_df = select_all_from_table(cursor, cnxn, 'project_categories')
+    pos_df = select_dimension(cursor, cnxn, 'pos')
+    depts_df = select_dimension(cursor, cnxn, 'departments')
+    projs_df = select_dimension(cursor, cnxn, 'projects')
+    pcats_df = select_dimension(cursor, cnxn, 'project_categories')
     # IOs removed from matching keys
-    hrc_df = select_all_from_table(cursor, cnxn, 'human_resource_categories')
+    hrc_df = select_dimension(cursor, cnxn, 'human_resource_categories')
 
     po_id = None
     if pos_df is not None and 'name' in pos_df.columns and 'id' in pos_df.columns:
@@ -1261,27 +1236,30 @@ def manual_change_forecast():
 
     # Multi-category personnel updates: support forward (FTE->cost) and reverse (cost->FTE)
     total_personnel_cost = 0.0
-    def hierarchical_unit_cost(cat_name_local):
-        if not cat_name_local or fy_val is None:
-            return None
+    # Strict exact-match unit rates (po_id, dept_id, cat_id, fy) for every submitted category, resolved in one pass
+    unit_rates = {}
+    cat_names = [form.get('cat__' + key.split('__', 1)[1]) for key in form.keys()
+                 if key.startswith('fte__') or key.startswith('cost__')]
+    cat_names = sorted({c for c in cat_names if c})
+    if cat_names and fy_val is not None and all(v is not None for v in (po_id, dept_id)):
         try:
-            cursor.execute("SELECT id FROM human_resource_categories WHERE name = ?", (cat_name_local,))
-            rr = cursor.fetchone(); cat_id_lookup = rr[0] if rr else None
-        except Exception:
-            cat_id_lookup = None
-        def fetch(q, params):
-            try:
-                cursor.execute(q, params)
-                fr = cursor.fetchone(); return fr[0] if fr else None
-            except Exception:
-                return None
-        # Strict exact-match only: require po_id, dept_id, cat_id and fy
-        if all(v is not None for v in (po_id, dept_id, cat_id_lookup, fy_val)):
-            return fetch(
-                "SELECT cost FROM human_resource_cost WHERE po_id = ? AND department_id = ? AND category_id = ? AND year = ? LIMIT 1",
-                (int(po_id), int(dept_id), int(cat_id_lookup), int(fy_val))
+            cursor.execute(
+                f"SELECT name, id FROM human_resource_categories WHERE name IN ({','.join('?' * len(cat_names))})",
+                cat_names
             )
-        return None
+            cat_ids = dict(cursor.fetchall())
+            keys = pd.DataFrame({
+                'po_id': po_id, 'department_id': dept_id, 'year': fy_val,
+                'category_id': [cat_ids.get(c) for c in cat_names],
+            }, index=cat_names)
+            rates = load_rate_table(cursor, category_ids=keys['category_id'], years=[fy_val])
+            resolved = resolve_rates(keys, rates, strict=True)
+            unit_rates = {c: float(r) for c, r in resolved.items() if not pd.isna(r)}
+        except Exception:
+            unit_rates = {}
+
+    def hierarchical_unit_cost(cat_name_local):
+        return unit_rates.get(cat_name_local)
     # Collect personnel rows (id-based) that need insertion (those not updated) for fast path
     missing_pc_rows = []  # legacy name with display columns
     missing_pc_rows_fast = []  # id-based rows for direct insert
@@ -1387,49 +1365,59 @@ def manual_change_forecast():
         except Exception:
             # Fallback to DataFrame path only if fast path fails entirely
             try:
-                import pandas as pd
                 from backend.upload_forecasts_pc import upload_pc_forecasts_local_m as _upload_pc
                 df_missing = pd.DataFrame(missing_pc_rows)
                 _upload_pc(df_missing, engine=engine, cursor=cursor, cnxn=cnxn, begin_immediate=False)
             except Exception:
                 pass
 
-    try:
-        cnxn.commit()
-    except Exception:
-        pass
-    # Flash a summary of personnel cost change for visibility (optional)
-    try:
-        flash(f"Personnel cost (calculated): {total_personnel_cost:.2f}", 'info')
-    except Exception:
-        pass
-
-    # Redirect back to manual input page so the tables refresh
-    return redirect(url_for('manual_upload.render_mannual_input'))
+    # Committed by the writer together with the rest of its batch
+    return total_personnel_cost
 
 
 @manual_upload.route("/upload_forecast", methods=['POST'])
 def upload_forecast_merged():
     form = request.form
-    results = []
-    po_name = form.get("PO")
-    dept_name = form.get("Department")
-    project_category = form.get("Project_Category")
-    project_name = form.get("Project_Name")
-    fiscal_year = form.get("fiscal_year")
     # Validate minimal key presence
-    if not all([po_name, dept_name, project_category, project_name, fiscal_year]):
+    if not all(form.get(k) for k in ("PO", "Department", "Project_Category", "Project_Name", "fiscal_year")):
         try: flash('Missing required key fields.', 'warning')
         except Exception: pass
         return redirect(url_for('manual_upload.render_mannual_input'))
 
-    # Open single connection/transaction (fast path)
-    conn = connect_local()
-    engine, cursor, cnxn = conn.connect_to_db(engine=True)
+    # One write on the database writer: resolution and inserts share its transaction
+    try:
+        results = run_write(_upload_forecast, form.to_dict())
+    except Exception as e:
+        try: flash(f'Forecast upload failed: {e}', 'danger')
+        except Exception: pass
+        return redirect(url_for('manual_upload.render_mannual_input'))
+
+    if results is None:
+        try: flash('Failed to resolve identifiers for upload.', 'danger')
+        except Exception: pass
+        return redirect(url_for('manual_upload.render_mannual_input'))
+
+    if not results:
+        try: flash('No forecast data provided. Please fill at least one forecast field.', 'warning')
+        except Exception: pass
+        return redirect(url_for('manual_upload.render_mannual_input'))
+
     try:
-        cursor.execute("BEGIN IMMEDIATE")
+        for msg in results:
+            flash(msg, 'success')
     except Exception:
         pass
+    return redirect(url_for('manual_upload.render_mannual_input'))
+
+
+def _upload_forecast(cursor, cnxn, form):
+    """Write half of upload_forecast_merged; returns the result messages (None when the keys do not resolve)."""
+    results = []
+    po_name = form.get("PO")
+    dept_name = form.get("Department")
+    project_category = form.get("Project_Category")
+    project_name = form.get("Project_Name")
+    fiscal_year = form.get("fiscal_year")
 
     # Resolve IDs once
     def resolve_id(table, name_value, name_cols=('name','Name','Department','Project','project','Project Name')):
@@ -1458,7 +1446,7 @@ def upload_forecast_merged():
     # project requires department constraint
     proj_id = None
     try:
-        proj_df = select_all_from_table(cursor, cnxn, 'projects')
+        proj_df = select_dimension(cursor, cnxn, 'projects')
         if proj_df is not None and not proj_df.empty and 'name' in proj_df.columns and 'id' in proj_df.columns:
             mask = proj_df['name'].astype(str).str.strip().str.lower() == str(project_name).strip().lower()
             if dept_id is not None and 'department_id' in proj_df.columns:
@@ -1470,7 +1458,7 @@ def upload_forecast_merged():
         proj_id = None
     pc_id = None
     try:
-        pc_df = select_all_from_table(cursor, cnxn, 'project_categories')
+        pc_df = select_dimension(cursor, cnxn, 'project_categories')
         if pc_df is not None and not pc_df.empty and 'category' in pc_df.columns and 'id' in pc_df.columns:
             mask = pc_df['category'].astype(str).str.strip().str.lower() == str(project_category).strip().lower()
             r = pc_df[mask]
@@ -1484,13 +1472,7 @@ def upload_forecast_merged():
         fy_val = None
 
     if None in (po_id, dept_id, proj_id, pc_id, fy_val):
-        try: flash('Failed to resolve identifiers for upload.', 'danger')
-        except Exception: pass
-        try: cnxn.rollback()
-        except Exception: pass
-        try: cursor.close(); cnxn.close()
-        except Exception: pass
-        return redirect(url_for('manual_upload.render_mannual_input'))
+        return None
 
     # Fast Non-Personnel insert
     nonpc_val_raw = form.get("Non_personnel_cost")
@@ -1500,36 +1482,25 @@ def upload_forecast_merged():
         except Exception:
             nonpc_val = None
         if nonpc_val is not None:
-            # Create index (idempotent) then insert if not exists
-            try:
-                cursor.execute("CREATE INDEX IF NOT EXISTS idx_project_forecasts_nonpc_key ON project_forecasts_nonpc (PO_id, department_id, project_id, project_category_id, fiscal_year)")
-            except Exception:
-                pass
+            # Insert unless the key exists (UQ_project_forecasts_nonpc_key)
             try:
                 cursor.execute(
-                    "SELECT 1 FROM project_forecasts_nonpc WHERE PO_id=? AND department_id=? AND project_id=? AND project_category_id=? AND fiscal_year=? LIMIT 1",
-                    (po_id, dept_id, proj_id, pc_id, fy_val)
+                    "INSERT INTO project_forecasts_nonpc (PO_id, department_id, project_id, project_category_id, fiscal_year, non_personnel_expense) VALUES (?,?,?,?,?,?) "
+                    "ON CONFLICT (PO_id, department_id, project_id, project_category_id, fiscal_year) DO NOTHING",
+                    (po_id, dept_id, proj_id, pc_id, fy_val, nonpc_val)
                 )
-                exists = cursor.fetchone() is not None
-            except Exception:
-                exists = False
-            if exists:
-                results.append('Non-personnel forecast already exists.')
-            else:
-                try:
-                    cursor.execute(
-                        "INSERT INTO project_forecasts_nonpc (PO_id, department_id, project_id, project_category_id, fiscal_year, non_personnel_expense) VALUES (?,?,?,?,?,?)",
-                        (po_id, dept_id, proj_id, pc_id, fy_val, nonpc_val)
-                    )
+                if cursor.rowcount:
                     results.append('Non-personnel forecast uploaded successfully.')
-                except Exception as e:
-                    results.append(f'Non-personnel upload failed: {e}')
+                else:
+                    results.append('Non-personnel forecast already exists.')
+            except Exception as e:
+                results.append(f'Non-personnel upload failed: {e}')
 
     # Fast Personnel inserts
     # Build HR category name -> id map once
     hr_cat_map = {}
     try:
-        hrc_df = select_all_from_table(cursor, cnxn, 'human_resource_categories')
+        hrc_df = select_dimension(cursor, cnxn, 'human_resource_categories')
         if hrc_df is not None and not hrc_df.empty and 'id' in hrc_df.columns:
             name_col = 'name' if 'name' in hrc_df.columns else None
             if name_col:
@@ -1575,23 +1546,8 @@ def upload_forecast_merged():
         except Exception as e:
             results.append(f"Personnel upload failed: {e}")
 
-    # Commit & close
-    try: cnxn.commit()
-    except Exception: pass
-    try: cursor.close(); cnxn.close()
-    except Exception: pass
-
-    if not results:
-        try: flash('No forecast data provided. Please fill at least one forecast field.', 'warning')
-        except Exception: pass
-        return redirect(url_for('manual_upload.render_mannual_input'))
-
-    try:
-        for msg in results:
-            flash(msg, 'success')
-    except Exception:
-        pass
-    return redirect(url_for('manual_upload.render_mannual_input'))
+    # Committed by the writer together with the rest of its batch
+    return results
 
 
 @manual_upload.route('/manual_input/delete_forecast', methods=['POST'])
@@ -1636,10 +1592,10 @@ def manual_delete_forecast():
         cursor, cnxn = conn.connect_to_db()
 
         # Resolve IDs robustly
-        pos_df = select_all_from_table(cursor, cnxn, 'pos')
-        depts_df = select_all_from_table(cursor, cnxn, 'departments')
-        projs_df = select_all_from_table(cursor, cnxn, 'projects')
-        pcats_df = select_all_from_table(cursor, cnxn, 'project_categories')
+        pos_df = select_dimension(cursor, cnxn, 'pos')
+        depts_df = select_dimension(cursor, cnxn, 'departments')
+        projs_df = select_dimension(cursor, cnxn, 'projects')
+        pcats_df = select_dimension(cursor, cnxn, 'project_categories')
 
         po_id = None
         if pos_df is not None:
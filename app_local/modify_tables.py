@@ -1,6 +1,7 @@
 
 from flask import Flask, render_template, Blueprint, request, redirect, url_for
 from backend.modify_table_local import add_entry
+from backend.dimension_cache import invalidate_dimensions
 from backend import upload_budgets_local, upload_budgets_local_m
 import pandas as pd
 import os
@@ -76,12 +77,6 @@ def standardize_columns_order(columns, table_name=None):
 
 modify_tables = Blueprint('modify_tables', __name__, template_folder='templates')
 
-# module-level selected PO for modify forms (capex and others)
-selected_po = None
-selected_department = None
-selected_cap_year = None
-selected_project = None
-
 # Map route to table and form fields
 modify_table_config = {
     'modify_department': {
@@ -717,6 +712,7 @@ def modify_table_router(action):
                     conn = connect_local()
                     engine, _cursor, _cnxn = conn.connect_to_db(engine=True)
                     to_insert.to_sql(table_name, con=engine, if_exists='append', index=False)
+                    invalidate_dimensions(table_name)
 
                 # Also handle optional IO creation in the same submit (merged add flow)
                 # New behavior: Insert only if IO_num doesn't already exist globally; allow multiple IOs per project
@@ -1,5 +1,6 @@
 from flask import Blueprint, request, redirect, url_for
 from backend.connect_local import connect_local
+from backend.dimension_cache import invalidate_dimensions
 
 po_routes = Blueprint('po_routes', __name__)
 
@@ -57,6 +58,7 @@ def change_po():
         else:
             cursor.execute("UPDATE pos SET name = ? WHERE name = ?", (str(new_name), str(existing_name or '')))
         cnxn.commit()
+        invalidate_dimensions('pos')
     except Exception:
         pass
 
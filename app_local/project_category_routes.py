@@ -1,5 +1,6 @@
 from flask import Blueprint, request, redirect, url_for
 from backend.connect_local import connect_local
+from backend.dimension_cache import invalidate_dimensions
 
 project_category_routes = Blueprint('project_category_routes', __name__)
 
@@ -45,6 +46,7 @@ def change_porject_category():
             return redirect(url_for('modify_tables.modify_table_router', action='modify_porject_category'))
 
         cnxn.commit()
+        invalidate_dimensions('project_categories')
     except Exception:
         pass
 
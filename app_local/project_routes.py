@@ -1,8 +1,10 @@
 from flask import Blueprint, request, redirect, url_for
 import pandas as pd
 from backend.connect_local import connect_local, select_all_from_table
+from backend.dimension_cache import invalidate_dimensions
 from backend.create_display_table import get_departments_display, get_projects_display
 from app_local.modify_tables import standardize_columns_order
+from app_local.conditional_get import versioned_json
 
 project_routes = Blueprint('project_routes', __name__)
 
@@ -190,6 +192,7 @@ def change_project():
             params.append(pid_val)
             cursor.execute(q, tuple(params))
             cnxn.commit()
+            invalidate_dimensions('projects')
 
         # Cascade department (and implied PO) change to dependent tables if department actually changed
         if dept_changed:
@@ -439,6 +442,7 @@ def modify_project_department_update():
 
 
 @project_routes.route('/modify_project/list', methods=['GET'])
+@versioned_json('projects', 'ios', 'departments', 'project_categories', 'pos')
 def list_projects():
     """Return a JSON list of projects for the generic table."""
     try:
@@ -680,6 +684,7 @@ def delete_project():
             cnxn.commit()
         except Exception:
             pass
+        invalidate_dimensions('projects')
         return {'status': 'ok'}, 200
     except Exception as e:
         return {'status': 'error', 'message': str(e)}, 500
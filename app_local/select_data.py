@@ -1,12 +1,51 @@
 
+import pandas as pd
 from flask import Flask, flash, render_template, request, redirect, url_for, Blueprint
-from backend.connect_local import connect_local, select_all_from_table
+from backend.connect_local import connect_local, select_page_from_table, count_rows, table_columns
+from backend.dimension_cache import DIMENSION_TABLES, get_dimension, select_dimension
 from backend.display_names import DISPLAY_NAMES
+from backend.rate_resolution import load_rate_table, resolve_rates
 
 
 select_data = Blueprint('select_data', __name__, template_folder='templates')
 
 
+def _dimension_ids(df, id_col, name_col, table, cursor, cnxn):
+    """Return the `table` ids of df's rows from `id_col`, or from the names in `name_col`."""
+    if id_col in df.columns:
+        return df[id_col]
+    if name_col in df.columns:
+        return df[name_col].map(get_dimension(table, cursor, cnxn).name_to_id)
+    return None
+
+
+def _add_personnel_cost(df, cursor, cnxn):
+    """Add 'Personnel Cost' to a project_forecasts_pc frame; NaN where no rate applies.
+
+    The callers have already replaced PO_id / department_id by names, so those are
+    mapped back to ids through the dimension cache. Only the rates of the frame's
+    staff categories and years are read.
+    """
+    fte_col = next((c for c in ('Work Hours(FTE)', 'human_resource_fte') if c in df.columns), None)
+    fy_col = next((c for c in ('fiscal_year', 'Fiscal Year') if c in df.columns), None)
+    category_ids = _dimension_ids(df, 'human_resource_category_id', 'Staff Category',
+                                  'human_resource_categories', cursor, cnxn)
+    if fte_col is None or fy_col is None or category_ids is None:
+        return df
+    keys = pd.DataFrame({'category_id': category_ids, 'year': pd.to_numeric(df[fy_col], errors='coerce')}, index=df.index)
+    for key_col, id_col, name_col, table in (('po_id', 'PO_id', 'PO', 'POs'),
+                                             ('department_id', 'department_id', 'Department', 'departments')):
+        ids = _dimension_ids(df, id_col, name_col, table, cursor, cnxn)
+        if ids is not None:
+            keys[key_col] = ids
+    rates = load_rate_table(cursor, category_ids=keys['category_id'].dropna().unique(),
+                            years=keys['year'].dropna().unique())
+    if rates.empty:
+        return df
+    df['Personnel Cost'] = resolve_rates(keys, rates) * pd.to_numeric(df[fte_col], errors='coerce').fillna(0.0)
+    return df
+
+
 def transform_table(df, table_name, cursor, cnxn):
     """Apply table-specific joins, renames and reorder columns according to UI rules.
 
@@ -28,7 +67,7 @@ def transform_table(df, table_name, cursor, cnxn):
     try:
         # projects: category_id -> Project Category
         if table_name == 'projects' and 'category_id' in df.columns:
-            ref_df = select_all_from_table(cursor, cnxn, 'project_categories')
+            ref_df = select_dimension(cursor, cnxn, 'project_categories')
             ref_dict = dict(zip(ref_df['id'], ref_df['category']))
             df['Project Category'] = df['category_id'].map(ref_dict)
             if 'category_id' in df.columns:
@@ -87,73 +126,21 @@ def transform_table(df, table_name, cursor, cnxn):
                 df = df.rename(columns={'personnel_expense': 'Personnel Expense'})
 
             if 'human_resource_category_id' in df.columns:
-                ref_df = select_all_from_table(cursor, cnxn, 'human_resource_categories')
+                ref_df = select_dimension(cursor, cnxn, 'human_resource_categories')
                 # expect ref_df has 'id' and 'name'
                 ref_dict = dict(zip(ref_df['id'], ref_df['name']))
                 df['Staff Category'] = df['human_resource_category_id'].map(ref_dict)
-                # drop the id column to prefer friendly name display
-                df = df.drop(columns=['human_resource_category_id'])
 
-            # Compute Personnel Cost by looking up hourly/unit cost from human_resource_cost
-            # We need mapping from Staff Category name -> id to query human_resource_cost table
+            # Personnel Cost = unit rate * FTE, resolved by backend.rate_resolution with the
+            # same (po, dept, cat, year) fallback as the display tables and manual edits
             try:
-                # build name->id map from human_resource_categories
-                hr_ref = select_all_from_table(cursor, cnxn, 'human_resource_categories')
-                name_to_id = dict(zip(hr_ref['name'], hr_ref['id'])) if 'name' in hr_ref.columns and 'id' in hr_ref.columns else {}
-                # load human_resource_cost table once and pivot for fast lookup
-                hr_cost_df = select_all_from_table(cursor, cnxn, 'human_resource_cost')
-                # ensure expected columns exist
-                if not hr_cost_df.empty and 'category_id' in hr_cost_df.columns and 'year' in hr_cost_df.columns and 'cost' in hr_cost_df.columns:
-                    # create a lookup dict keyed by (category_id, year)
-                    hr_cost_df_local = hr_cost_df[['category_id', 'year', 'cost']].copy()
-                    # force types for reliable lookup
-                    try:
-                        hr_cost_df_local['year'] = hr_cost_df_local['year'].astype(int)
-                    except Exception:
-                        pass
-                    cost_lookup = {(int(r['category_id']), int(r['year'])): float(r['cost']) for _, r in hr_cost_df_local.iterrows() if r['category_id'] is not None}
-
-                    # Determine which column holds work-hours (FTE) after renames
-                    fte_col = None
-                    if 'Work Hours(FTE)' in df.columns:
-                        fte_col = 'Work Hours(FTE)'
-                    elif 'human_resource_fte' in df.columns:
-                        fte_col = 'human_resource_fte'
-
-                    # Determine fiscal year column after transform
-                    fy_col = 'Fiscal Year' if 'Fiscal Year' in df.columns else ('fiscal_year' if 'fiscal_year' in df.columns else None)
-
-                    personnel_costs = []
-                    for _, row in df.iterrows():
-                        try:
-                            # map Staff Category name back to id
-                            staff_name = row.get('Staff Category') if 'Staff Category' in row.index else None
-                            cat_id = name_to_id.get(staff_name) if staff_name is not None else None
-                            fy = int(row.get(fy_col)) if fy_col and row.get(fy_col) not in (None, '') else None
-                            # get work hours
-                            wh = row.get(fte_col) if fte_col else None
-                            # coerce work hours to float
-                            try:
-                                wh = float(wh) if wh not in (None, '') else 0.0
-                            except Exception:
-                                wh = 0.0
-                            if cat_id is None or fy is None:
-                                personnel_costs.append(None)
-                                continue
-                            key = (int(cat_id), int(fy))
-                            hourly = cost_lookup.get(key)
-                            if hourly is None:
-                                personnel_costs.append(None)
-                            else:
-                                personnel_costs.append(hourly * wh)
-                        except Exception:
-                            personnel_costs.append(None)
-
-                    # attach the new column
-                    df['Personnel Cost'] = personnel_costs
+                df = _add_personnel_cost(df, cursor, cnxn)
             except Exception:
                 # non-fatal: if cost lookup fails, continue without Personnel Cost
                 pass
+            if 'human_resource_category_id' in df.columns:
+                # drop the id column to prefer friendly name display
+                df = df.drop(columns=['human_resource_category_id'])
             # If the DataFrame itself has a 'name' column (ambiguous), prefer Staff Category label
             if 'name' in df.columns:
                 if 'Staff Category' in df.columns:
@@ -164,9 +151,8 @@ def transform_table(df, table_name, cursor, cnxn):
         # expenses: map co_object_id -> CO Object Name, drop cost_element_id, rename co_element_name
         if table_name == 'expenses':
             if 'co_object_id' in df.columns:
-                ref_df = select_all_from_table(cursor, cnxn, 'co_object_names')
-                # expect ref_df has 'id' and 'name'
-                ref_dict = dict(zip(ref_df['id'], ref_df['name']))
+                # read only the CO objects on this page
+                ref_dict = names_for_ids(df['co_object_id'], 'co_object_names', 'id', 'name', cursor, cnxn)
                 df['CO Object Name'] = df['co_object_id'].map(ref_dict)
                 df = df.drop(columns=['co_object_id'])
             if 'cost_element_id' in df.columns:
@@ -192,7 +178,7 @@ def transform_table(df, table_name, cursor, cnxn):
         # human_resource_cost: map category_id -> Staff Category (name) and rename year
         if table_name == 'human_resource_cost':
             if 'category_id' in df.columns:
-                ref_df = select_all_from_table(cursor, cnxn, 'human_resource_categories')
+                ref_df = select_dimension(cursor, cnxn, 'human_resource_categories')
                 ref_dict = dict(zip(ref_df['id'], ref_df['name'])) if 'id' in ref_df.columns and 'name' in ref_df.columns else {}
                 df['Staff Category'] = df['category_id'].map(ref_dict)
                 # drop the numeric id column to prefer friendly name display
@@ -320,6 +306,66 @@ def transform_table(df, table_name, cursor, cnxn):
     return df
 
 
+# Id columns replaced by the referenced name on the /select page:
+# id column -> (reference table, id column, name column, display column)
+ID_NAME_MAP = {
+    'department_id': ('departments', 'id', 'name', 'Department'),
+    'po_id': ('POs', 'id', 'name', 'PO'),
+    'PO_id': ('POs', 'id', 'name', 'PO'),
+    'project_id': ('projects', 'id', 'name', 'Project'),
+    'io_id': ('IOs', 'id', 'IO_num', 'IO'),
+    'project_category_id': ('project_categories', 'id', 'category', 'Project Category'),
+}
+
+
+def names_for_ids(ids, ref_table, ref_id, ref_name, cursor, cnxn):
+    """Return {id: name} for the ids in `ids`: the cached dimension, or a read of only those rows."""
+    if ref_table.lower() in DIMENSION_TABLES:
+        return get_dimension(ref_table, cursor, cnxn).id_to_name
+    ids = [int(v) for v in ids.dropna().unique()]
+    if not ids:
+        return {}
+    cursor.execute(
+        f"SELECT {ref_id}, {ref_name} FROM {ref_table} WHERE {ref_id} IN ({','.join('?' * len(ids))})", ids)
+    return dict(cursor.fetchall())
+
+
+def resolve_id_names(df, cursor, cnxn):
+    """Replace the id columns of ID_NAME_MAP with names, looking up only the ids present in `df`."""
+    for id_col, (ref_table, ref_id, ref_name, new_col_name) in ID_NAME_MAP.items():
+        if id_col not in df.columns:
+            continue
+        df[new_col_name] = df[id_col].map(names_for_ids(df[id_col], ref_table, ref_id, ref_name, cursor, cnxn))
+    # Prefer to show names instead of IDs in columns
+    return df.drop(columns=[col for col in ID_NAME_MAP if col in df.columns])
+
+
+def load_table_page(cursor, cnxn, table_name, page, per_page, sort=None, descending=False, after=None):
+    """Return (df, page, total_pages) for one page of `table_name`, transformed for display.
+
+    Paging, sorting and COUNT(*) run in SQL; names are resolved and transform_table
+    is applied to the page rows only. `sort` must be a column of the table.
+    """
+    total_rows = count_rows(cursor, table_name)
+    total_pages = max(1, (total_rows + per_page - 1) // per_page)
+    page = min(max(page, 1), total_pages)
+    df = select_page_from_table(
+        cursor, cnxn, table_name, per_page, offset=(page - 1) * per_page,
+        order_by=sort, descending=descending, after=after
+    )
+    df = resolve_id_names(df, cursor, cnxn)
+    # Apply table-specific transforms (joins, renames, reorder)
+    df = transform_table(df, table_name, cursor, cnxn)
+    return df, page, total_pages
+
+
+def _int_arg(args, name, default=None):
+    try:
+        return int(args.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
 @select_data.route('/select', methods=['GET', 'POST'])
 def select():
     conn = connect_local()
@@ -348,88 +394,29 @@ def select():
         'capex_forecasts', 'capex_budgets', 'capex_expenses'
     ]
 
+    # POST comes from the table/chart forms, GET allows page navigation via query string
+    args = request.form if request.method == 'POST' else request.args
+    selected_option = args.get('table_name')
     if request.method == 'POST':
-        table_name = request.form.get('table_name')
-        selected_option = table_name
         x_col = request.form.get('x_col')
         y_col = request.form.get('y_col')
         plot_type = request.form.get('plot_type')
-        # For pagination, get page from form if present
-        try:
-            page = int(request.form.get('page', 1))
-        except Exception:
-            page = 1
-
-        if selected_option:
-            cursor, cnxn = conn.connect_to_db()
-            df = select_all_from_table(cursor, cnxn, selected_option)
-            # Replace IDs with names for department_id, PO_id, project_id if present
-            id_name_map = {
-                'department_id': ('departments', 'id', 'name', 'Department'),
-                'po_id': ('POs', 'id', 'name', 'PO'),
-                'PO_id': ('POs', 'id', 'name', 'PO'),
-                'project_id': ('projects', 'id', 'name', 'Project'),
-                'io_id': ('IOs', 'id', 'IO_num', 'IO'),
-                'project_category_id': ('project_categories', 'id', 'category', 'Project Category'),
-            }
-            for id_col, (ref_table, ref_id, ref_name, new_col_name) in id_name_map.items():
-                if id_col in df.columns:
-                    ref_df = select_all_from_table(cursor, cnxn, ref_table)
-                    ref_dict = dict(zip(ref_df[ref_id], ref_df[ref_name]))
-                    df[new_col_name] = df[id_col].map(ref_dict)
-            # Prefer to show names instead of IDs in columns
-            drop_cols = [col for col in ['department_id', 'po_id', 'PO_id', 'project_id', 'io_id', 'project_category_id'] if col in df.columns]
-            df = df.drop(columns=drop_cols)
-            # Apply table-specific transforms (joins, renames, reorder)
-            df = transform_table(df, selected_option, cursor, cnxn)
-            columns = df.columns.tolist()
-            # Pagination
-            total_rows = len(df)
-            total_pages = max(1, (total_rows + per_page - 1) // per_page)
-            if page < 1:
-                page = 1
-            if page > total_pages:
-                page = total_pages
-            start = (page - 1) * per_page
-            end = start + per_page
-            data = df.iloc[start:end].values.tolist()
-    elif request.method == 'GET':
-        # For GET, allow page navigation via query string
-        selected_option = request.args.get('table_name')
-        try:
-            page = int(request.args.get('page', 1))
-        except Exception:
-            page = 1
-        if selected_option:
-            cursor, cnxn = conn.connect_to_db()
-            df = select_all_from_table(cursor, cnxn, selected_option)
-            id_name_map = {
-                'department_id': ('departments', 'id', 'name', 'Department'),
-                'po_id': ('POs', 'id', 'name', 'PO'),
-                'PO_id': ('POs', 'id', 'name', 'PO'),
-                'project_id': ('projects', 'id', 'name', 'Project'),
-                'io_id': ('IOs', 'id', 'IO_num', 'IO'),
-                'project_category_id': ('project_categories', 'id', 'category', 'Project Category'),
-            }
-            for id_col, (ref_table, ref_id, ref_name, new_col_name) in id_name_map.items():
-                if id_col in df.columns:
-                    ref_df = select_all_from_table(cursor, cnxn, ref_table)
-                    ref_dict = dict(zip(ref_df[ref_id], ref_df[ref_name]))
-                    df[new_col_name] = df[id_col].map(ref_dict)
-            drop_cols = [col for col in ['department_id', 'po_id', 'PO_id', 'project_id', 'io_id', 'project_category_id'] if col in df.columns]
-            df = df.drop(columns=drop_cols)
-            # Apply table-specific transforms (joins, renames, reorder)
-            df = transform_table(df, selected_option, cursor, cnxn)
+    page = _int_arg(args, 'page', 1)
+
+    if selected_option:
+        cursor, cnxn = conn.connect_to_db()
+        table_cols = table_columns(cursor, selected_option)
+        if table_cols:
+            sort = args.get('sort')
+            if sort not in table_cols:
+                sort = None
+            descending = str(args.get('order', '')).lower() == 'desc'
+            df, page, total_pages = load_table_page(
+                cursor, cnxn, selected_option, page, per_page,
+                sort=sort, descending=descending, after=_int_arg(args, 'after')
+            )
             columns = df.columns.tolist()
-            total_rows = len(df)
-            total_pages = max(1, (total_rows + per_page - 1) // per_page)
-            if page < 1:
-                page = 1
-            if page > total_pages:
-                page = total_pages
-            start = (page - 1) * per_page
-            end = start + per_page
-            data = df.iloc[start:end].values.tolist()
+            data = df.values.tolist()
 
     return render_template(
         'pages/select.html',
@@ -0,0 +1,40 @@
+from flask import request, session
+
+# Dropdown selections (PO, department, fiscal year, project) live in the
+# user's session, one namespace per page family, so concurrent users no
+# longer overwrite each other's filters.
+SUMMARY = 'summary'            # /data_summary and /project_summary
+MANUAL_INPUT = 'manual_input'  # /manual_input
+
+
+def get_selection(page):
+    """All selections stored for `page` in the current session."""
+    return dict(session.get(f'selection_{page}', {}))
+
+
+def selected(page, name):
+    """One stored selection (None when never chosen)."""
+    return session.get(f'selection_{page}', {}).get(name)
+
+
+def set_selection(page, name, value):
+    selection = get_selection(page)
+    selection[name] = value
+    session[f'selection_{page}'] = selection
+    return value
+
+
+def posted_value(*fields):
+    """First non-empty of `fields` from the JSON body or form of a selection POST."""
+    payload = request.get_json() if request.is_json else request.form
+    for field in fields:
+        value = payload.get(field)
+        if value:
+            return value
+    return payload.get(fields[0])
+
+
+def request_filters(page, names):
+    """{name: value} taking each filter from the query string, else from the session."""
+    stored = session.get(f'selection_{page}', {})
+    return {name: request.args.get(name, stored.get(name)) for name in names}
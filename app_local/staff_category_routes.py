@@ -1,5 +1,6 @@
 from flask import Blueprint, request, redirect, url_for
 from backend.connect_local import connect_local
+from backend.dimension_cache import invalidate_dimensions
 
 staff_category_routes = Blueprint('staff_category_routes', __name__)
 
@@ -72,6 +73,7 @@ def change_staff_category():
         try:
             cursor.execute("UPDATE human_resource_categories SET name = ? WHERE id = ?", (str(new_name), int(resolved_cat_id)))
             cnxn.commit()
+            invalidate_dimensions('human_resource_categories')
         except Exception:
             pass
     except Exception:
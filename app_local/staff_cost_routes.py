@@ -1,5 +1,7 @@
-from flask import Blueprint, request, redirect, url_for
-from backend.connect_local import connect_local, select_all_from_table
+from flask import Blueprint, flash, request, redirect, url_for
+from backend.connect_local import connect_local
+from backend.dimension_cache import select_dimension
+from backend.write_queue import execute_write
 
 staff_cost_routes = Blueprint('staff_cost_routes', __name__)
 
@@ -25,9 +27,9 @@ def change_staff_cost():
         cursor, cnxn = db.connect_to_db()
 
         # Maps for key resolution
-        pos_df = select_all_from_table(cursor, cnxn, 'pos')
-        dept_df = select_all_from_table(cursor, cnxn, 'departments')
-        hr_df = select_all_from_table(cursor, cnxn, 'human_resource_categories')
+        pos_df = select_dimension(cursor, cnxn, 'pos')
+        dept_df = select_dimension(cursor, cnxn, 'departments')
+        hr_df = select_dimension(cursor, cnxn, 'human_resource_categories')
         po_map = dict(zip(pos_df['name'], pos_df['id'])) if 'name' in pos_df.columns and 'id' in pos_df.columns else {}
         dept_map = dict(zip(dept_df['name'], dept_df['id'])) if 'name' in dept_df.columns and 'id' in dept_df.columns else {}
         cat_map = dict(zip(hr_df['name'], hr_df['id'])) if 'name' in hr_df.columns and 'id' in hr_df.columns else {}
@@ -48,8 +50,8 @@ def change_staff_cost():
         if None in (po_id, department_id, category_id, year_val, cost_val):
             return redirect(url_for('modify_tables.modify_table_router', action='modify_staff_cost'))
 
-        # Only update cost
-        cursor.execute(
+        # Only update cost (through the database writer)
+        execute_write(
             """
             UPDATE human_resource_cost
                SET cost = ?
@@ -66,9 +68,8 @@ def change_staff_cost():
                 int(year_val),
             )
         )
-        cnxn.commit()
-    except Exception:
-        pass
+    except Exception as e:
+        flash(f"Staff cost update failed: {e}", 'error')
 
     return redirect(url_for('modify_tables.modify_table_router', action='modify_staff_cost'))
 
@@ -97,9 +98,9 @@ def delete_staff_cost():
         # Connect and map names to IDs
         db = connect_local()
         cursor, cnxn = db.connect_to_db()
-        pos_df = select_all_from_table(cursor, cnxn, 'pos')
-        dept_df = select_all_from_table(cursor, cnxn, 'departments')
-        hr_df = select_all_from_table(cursor, cnxn, 'human_resource_categories')
+        pos_df = select_dimension(cursor, cnxn, 'pos')
+        dept_df = select_dimension(cursor, cnxn, 'departments')
+        hr_df = select_dimension(cursor, cnxn, 'human_resource_categories')
 
         po_map = dict(zip(pos_df['name'], pos_df['id'])) if pos_df is not None and not pos_df.empty and 'name' in pos_df.columns and 'id' in pos_df.columns else {}
         dept_map = dict(zip(dept_df['name'], dept_df['id'])) if dept_df is not None and not dept_df.empty and 'name' in dept_df.columns and 'id' in dept_df.columns else {}
@@ -143,7 +144,7 @@ def staff_cost_categories_update():
     try:
         db = connect_local()
         cursor, cnxn = db.connect_to_db()
-        cats_df = select_all_from_table(cursor, cnxn, 'human_resource_categories')
+        cats_df = select_dimension(cursor, cnxn, 'human_resource_categories')
         if cats_df is None or cats_df.empty:
             return {'categories': []}, 200
         if 'name' in cats_df.columns:
@@ -1,36 +1,154 @@
 from flask import Flask, flash, render_template, request, redirect, url_for, Blueprint
 from werkzeug.utils import secure_filename
-from backend.connect_local import connect_local
 import pandas as pd
 import os
+import tempfile
 from backend import (
-    upload_expenses_local, upload_nonpc_forecasts_local,
+    upload_expenses_local, upload_expenses_stream, upload_nonpc_forecasts_local,
     upload_pc_forecasts_local, upload_budgets_local, upload_fundings_local,
     upload_capex_forecasts_local, upload_capex_budget_local, upload_capex_expense_local,
-    check_if_all_tables_empty, check_missing_attribute, check_input_integrity
+    check_if_all_tables_empty, check_missing_attribute, check_input_integrity, missing_attribute_rows
 )
+from backend.upload_jobs import upload_job_error, submit_upload_job, get_upload_job, list_upload_jobs
 from backend.display_names import DISPLAY_NAMES
 
 upload_requests = Blueprint('upload_requests', __name__, template_folder='templates')
-conn = connect_local()
+
+# Uploader per upload option
+options_map = {
+    'project_forecasts_nonpc': upload_nonpc_forecasts_local,
+    'project_forecasts_pc': upload_pc_forecasts_local,
+    'budgets': upload_budgets_local,
+    'fundings': upload_fundings_local,
+    'expenses': upload_expenses_local,
+    'capex_forecasts': upload_capex_forecasts_local,
+    'capex_budgets': upload_capex_budget_local,
+    'capex_expenses': upload_capex_expense_local
+}
+
+
+def _missing_value_error(chunk, column):
+    return upload_job_error(
+        f"Missing value in {column}. Please upload related forecasts first.",
+        missing_attribute_rows(chunk, column)
+    )
+
+
+def _prepare_capex_expenses(df):
+    """Clean and coerce a CapEx expense upload before validation/upload."""
+    # Drop optional Date column if present; uploader derives expense_date from fiscal_year
+    if 'Date' in df.columns:
+        try:
+            df = df.drop(columns=['Date'])
+        except Exception:
+            pass
+    # Ensure required columns exist
+    required_cols = ['PO', 'Department', 'fiscal_year', 'Project Name', 'capex_description', 'Project number', 'Expense']
+    missing = [c for c in required_cols if c not in df.columns]
+    if missing:
+        raise upload_job_error(f"Missing required column(s) for CapEx Expenses: {', '.join(missing)}")
+    # Coerce to expected dtypes (best-effort)
+    try:
+        df['PO'] = df['PO'].astype(str)
+    except Exception:
+        pass
+    for c in ['fiscal_year', 'Project number']:
+        if c in df.columns:
+            try:
+                df[c] = pd.to_numeric(df[c], errors='coerce').astype('Int64')
+            except Exception:
+                pass
+    if 'Expense' in df.columns:
+        try:
+            df['Expense'] = pd.to_numeric(df['Expense'], errors='coerce')
+        except Exception:
+            pass
+    return df
+
+
+def run_upload_job(job, selected_option, path, filename):
+    """Parse, validate and insert one uploaded file (runs on the upload job worker)."""
+    try:
+        if selected_option == 'expenses':
+            # SAP expense extracts can be hundreds of MB: stream them chunk by chunk
+            # (validation, de-duplication and id resolution happen per chunk)
+            rejected = {}
+
+            def validate(chunk):
+                missing, column = check_missing_attribute(chunk, selected_option, 'local')
+                if missing:
+                    rejected['error'] = _missing_value_error(chunk, column)
+                return missing, column
+
+            summary = upload_expenses_stream(
+                path, validate=validate,
+                progress=lambda r: job.update(rows_parsed=r['rows_read'], rows_resolved=r['rows_resolved'],
+                                              rows_inserted=r['rows_inserted'])
+            )
+            if summary['missing_column']:
+                # Rolled back: nothing from the earlier chunks stays inserted
+                job.update(rows_parsed=summary['rows_read'], rows_inserted=0)
+                raise rejected['error']
+            message = f'File {filename} uploaded successfully!'
+            if summary['duplicates'] > 0:
+                message += f" Removed {summary['duplicates']} duplicate expense rows before upload."
+            return message
+
+        df = pd.read_csv(path)
+        # Normalize column names (trim whitespace) before any validations
+        try:
+            df.columns = [str(c).strip() for c in df.columns]
+        except Exception:
+            pass
+        job.update(rows_parsed=len(df))
+        # Special handling for CapEx Expenses uploads: clean and coerce types before validation/upload
+        if selected_option == 'capex_expenses':
+            df = _prepare_capex_expenses(df)
+        # status = check_input_integrity(df, selected_option)
+        # if status:
+        #     return f"Data mismatch "
+        status, column = check_missing_attribute(df, selected_option, 'local')
+        if status:
+            # Unresolved references abort the upload before anything is written
+            raise _missing_value_error(df, column)
+        job.update(rows_resolved=len(df))
+        # Perform upload
+        if selected_option == 'capex_expenses':
+            # Use local CapEx expense uploader; append without clearing existing data
+            inserted = upload_capex_expense_local(df, clear=False)
+        elif options_map.get(selected_option):
+            inserted = options_map[selected_option](df)
+        else:
+            raise upload_job_error(f'File type {selected_option} invalid.')
+        job.update(rows_inserted=inserted if isinstance(inserted, int) else len(df))
+        return f'File {filename} uploaded successfully!'
+    except upload_job_error:
+        raise
+    except Exception as e:
+        raise upload_job_error(f'Cannot upload {selected_option}. Please check input type. ({e})')
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _wants_json():
+    return request.args.get('format') == 'json' or request.accept_mimetypes.best == 'application/json'
+
 
 @upload_requests.route("/file_upload", methods=['GET', 'POST'])
 def workstation_page():
-    engine, cursor, cnxn = conn.connect_to_db(engine=True)
+    """Upload form. A POST stores the file and queues it as a background upload job.
+
+    The response comes back at once: JSON clients (Accept: application/json or
+    ?format=json) get {'job_id', 'status_url'} with 202, the form is redirected
+    back here and polls /file_upload/jobs/<id> for progress.
+    """
     # Limit upload options to operational expense uploads only as requested
     options = [
         'expenses', 'capex_expenses'
     ]
-    options_map = {
-        'project_forecasts_nonpc': upload_nonpc_forecasts_local,
-        'project_forecasts_pc': upload_pc_forecasts_local,
-        'budgets': upload_budgets_local,
-        'fundings': upload_fundings_local,
-        'expenses': upload_expenses_local,
-        'capex_forecasts': upload_capex_forecasts_local,
-        'capex_budgets': upload_capex_budget_local,
-        'capex_expenses': upload_capex_expense_local
-    }
     selected_option = None
     if request.method == 'POST':
         selected_option = request.form.get('my_dropdown')
@@ -46,87 +164,44 @@ def workstation_page():
             if db_is_empty and selected_option != "project_forecasts_nonpc":
                 flash('Database is empty. Upload non-personnel forecasts first.', 'warning')
                 return redirect(url_for('upload_requests.workstation_page'))
-           
-            
+            if selected_option not in options_map:
+                flash(f'File type {selected_option} invalid.', 'error')
+                return redirect(url_for('upload_requests.workstation_page'))
+
             filename = secure_filename(file.filename) # Secure the filename
-            df = pd.read_csv(file)
-            # Normalize column names (trim whitespace) before any validations
+            # The request's stream is gone once we return: spool the file for the worker
+            fd, path = tempfile.mkstemp(prefix='upload_', suffix='.csv')
+            with os.fdopen(fd, 'wb') as out:
+                file.save(out)
             try:
-                df.columns = [str(c).strip() for c in df.columns]
+                job_id = submit_upload_job(selected_option, filename, run_upload_job, selected_option, path, filename)
             except Exception:
-                pass
-            # Special handling for CapEx Expenses uploads: clean and coerce types before validation/upload
-            if selected_option == 'capex_expenses':
-                # Drop optional Date column if present; uploader derives expense_date from fiscal_year
-                if 'Date' in df.columns:
-                    try:
-                        df = df.drop(columns=['Date'])
-                    except Exception:
-                        pass
-                # Ensure required columns exist
-                required_cols = ['PO', 'Department', 'fiscal_year', 'Project Name', 'capex_description', 'Project number', 'Expense']
-                missing = [c for c in required_cols if c not in df.columns]
-                if missing:
-                    flash(f"Missing required column(s) for CapEx Expenses: {', '.join(missing)}", 'error')
-                    return redirect(url_for('upload_requests.workstation_page'))
-                # Coerce to expected dtypes (best-effort)
-                try:
-                    df['PO'] = df['PO'].astype(str)
-                except Exception:
-                    pass
-                for c in ['fiscal_year', 'Project number']:
-                    if c in df.columns:
-                        try:
-                            df[c] = pd.to_numeric(df[c], errors='coerce').astype('Int64')
-                        except Exception:
-                            pass
-                if 'Expense' in df.columns:
-                    try:
-                        df['Expense'] = pd.to_numeric(df['Expense'], errors='coerce')
-                    except Exception:
-                        pass
-            # status = check_input_integrity(df, selected_option)
-            # if status:
-            #     return f"Data mismatch "
-            status, column = check_missing_attribute(df, selected_option, 'local')
-            if status:
-                flash(f"Missing value in {column}. Please upload related forecasts first.", 'warning')
-                return redirect(url_for('upload_requests.workstation_page'))
-            # Remove duplicate rows for expenses uploads before handing to uploader
-            if selected_option == 'expenses':
-                try:
-                    preferred_keys = ['Department', 'fiscal_year', 'from_period', 'Order', 'Cost element']
-                    subset_keys = [c for c in preferred_keys if c in df.columns]
-                    before = len(df)
-                    if subset_keys:
-                        df = df.drop_duplicates(subset=subset_keys, keep='first')
-                    else:
-                        df = df.drop_duplicates(keep='first')
-                    removed = before - len(df)
-                    if removed > 0:
-                        flash(f'Removed {removed} duplicate expense rows before upload.', 'warning')
-                except Exception:
-                    # Non-fatal: proceed without dedup if anything goes wrong
-                    pass
-            
-
-            # Perform upload
-            try:
-                if selected_option == 'capex_expenses':
-                    # Use local CapEx expense uploader; append without clearing existing data
-                    upload_capex_expense_local(df, clear=False)
-                else:
-                    if options_map.get(selected_option):
-                        options_map[selected_option](df)
-                    else:
-                        flash(f'File type {selected_option} invalid.', 'error')
-                        return redirect(url_for('upload_requests.workstation_page'))
-                flash(f'File {filename} uploaded successfully!', 'success')
-            except Exception as e:
-                flash(f'Cannot upload {selected_option}. Please check input type.', 'error')
-            return redirect(url_for('upload_requests.workstation_page'))
-            
-    return render_template("pages/file_upload.html", options=options, selected_option=selected_option, display_names=DISPLAY_NAMES)
+                # No job owns the spooled file: remove it here
+                os.remove(path)
+                raise
+            status_url = url_for('upload_requests.upload_job_status', job_id=job_id)
+            if _wants_json():
+                return {'job_id': job_id, 'status_url': status_url}, 202
+            flash(f'File {filename} queued as upload job {job_id}.', 'success')
+            return redirect(url_for('upload_requests.workstation_page', job=job_id))
+
+    return render_template("pages/file_upload.html", options=options, selected_option=selected_option,
+                           display_names=DISPLAY_NAMES, job_id=request.args.get('job', type=int))
+
+
+@upload_requests.route('/file_upload/jobs/<int:job_id>', methods=['GET'])
+def upload_job_status(job_id):
+    """Status of one upload job: status, rows_parsed/resolved/inserted, message and error_rows."""
+    job = get_upload_job(job_id)
+    if job is None:
+        return {'error': f'Unknown upload job {job_id}'}, 404
+    return job, 200
+
+
+@upload_requests.route('/file_upload/jobs', methods=['GET'])
+def upload_jobs_list():
+    """Most recent upload jobs (?limit=, default 20)."""
+    return {'jobs': list_upload_jobs(request.args.get('limit', 20, type=int))}, 200
 
 @upload_requests.route('/upload', methods=['POST'])
 def upload_file():
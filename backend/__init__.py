@@ -1,12 +1,103 @@
-# Organized imports for backend package
-from .upload_expenses import *
-from .upload_forecasts_nonpc import *
-from .upload_forecasts_pc import *
-from .upload_budgets import *
-from .upload_capex_forecast import *
-from .upload_capex_budgets import *
-from .upload_capex_expenses import *
-from .database_util import *
-from .table_values import *
-from .upload_hr import *
-from .create_display_table import *
\ No newline at end of file
+# Organized imports for backend package.
+#
+# The package namespace is resolved lazily (PEP 562): `from backend import
+# get_pc_display` imports backend.create_display_table on first use only, so
+# importing any backend module (or the SQLite app) no longer loads every
+# uploader, pyodbc and SQLAlchemy up front. A name exported by several
+# submodules resolves to the last one, as the former star imports did. Once
+# imported, a submodule is bound under its own name, so upload_budgets and
+# upload_expenses (functions named like their module) are imported from their
+# modules.
+import importlib
+
+# Submodules whose public names make up the package namespace, in the order
+# they used to be star-imported
+_SUBMODULES = [
+    'upload_expenses',
+    'upload_forecasts_nonpc',
+    'upload_forecasts_pc',
+    'upload_budgets',
+    'upload_capex_forecast',
+    'upload_capex_budgets',
+    'upload_capex_expenses',
+    'database_util',
+    'table_values',
+    'upload_hr',
+    'create_display_table',
+]
+
+# Names defined by each submodule; anything else they import (helpers of
+# merge_insert, connect_pyodbc, pd, ...) is still found, by importing the
+# submodules until one has it.
+_EXPORTS = {
+    'upload_expenses': [
+        'clear_expenses_table', 'select_expense_from_database', 'upload_expenses', 'upload_expenses_local',
+        'upload_expenses_df', 'prepare_expense_chunk', 'upload_expenses_stream',
+    ],
+    'upload_forecasts_nonpc': [
+        'upload_nonpc_forecasts', 'upload_nonpc_forecasts_local', 'upload_nonpc_forecasts_local_m',
+        'upload_nonpc_forecasts_df', 'upload_nonpc_forecasts_df2',
+    ],
+    'upload_forecasts_pc': [
+        'upload_pc_forecasts', 'upload_pc_forecasts_local', 'upload_pc_forecasts_local_m',
+        'fast_insert_pc_forecasts', 'upload_pc_forecasts_df',
+    ],
+    'upload_budgets': [
+        'upload_budgets', 'upload_budgets_local', 'upload_budgets_local_m', 'upload_budgets_df',
+        'upload_fundings', 'upload_fundings_local', 'upload_fundings_df',
+    ],
+    'upload_capex_forecast': [
+        'upload_capex_forecasts', 'upload_capex_forecasts_df', 'upload_capex_forecast_m', 'upload_capex_forecasts_local',
+    ],
+    'upload_capex_budgets': [
+        'upload_capex_budget', 'upload_capex_budget_df', 'upload_capex_budget_local', 'upload_capex_budgets_local_m',
+    ],
+    'upload_capex_expenses': [
+        'upload_capex_expense', 'upload_capex_expense_local', 'upload_capex_expense_df',
+    ],
+    'database_util': [
+        'check_input_integrity', 'check_if_all_tables_empty', 'get_columns_types', 'clear_table',
+        'check_missing_attribute', 'missing_attribute_rows',
+    ],
+    'table_values': [
+        'tables_to_consider', 'table_column_dict', 'table_unique_keys', 'table_dtypes',
+    ],
+    'upload_hr': [
+        'upload_human_resource',
+    ],
+    'create_display_table': [
+        'get_departments_display', 'get_forecasts_display', 'get_pc_display', 'get_projects_display',
+        'get_nonpc_display', 'get_budget_display_table', 'create_funding_display', 'get_project_cateogory_display',
+        'get_IO_display_table', 'get_hr_category_display', 'get_expenses_display', 'get_capex_expenses_display',
+        'create_capex_forecast_display', 'create_capex_budgets_dispaly',
+    ],
+}
+_LOCATIONS = {name: module for module in _SUBMODULES for name in _EXPORTS[module]}
+
+__all__ = list(_LOCATIONS)
+
+# Helpers the star imports used to pick up from a submodule that no longer
+# imports them; kept resolving to the same function
+_LOCATIONS['select_all_from_table'] = 'connect_local'
+_MISSING = object()
+
+
+def __getattr__(name):
+    if name.startswith('_'):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if name in _LOCATIONS:
+        value = getattr(importlib.import_module(f"{__name__}.{_LOCATIONS[name]}"), name)
+    else:
+        for module in reversed(_SUBMODULES):
+            value = getattr(importlib.import_module(f"{__name__}.{module}"), name, _MISSING)
+            if value is not _MISSING:
+                break
+        else:
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LOCATIONS))
+
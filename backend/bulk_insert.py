@@ -0,0 +1,220 @@
+from itertools import islice
+import numpy as np
+import pandas as pd
+from backend.table_values import table_unique_keys, table_dtypes
+
+# Rows per executemany call / transaction. Large enough that per-statement
+# overhead disappears, small enough that one batch never holds the write lock
+# (and the WAL) for long. Override per call or with set_batch_size().
+DEFAULT_BATCH_SIZE = 10000
+
+
+def set_batch_size(batch_size):
+    """Change the default batch size used by bulk_insert from now on."""
+    global DEFAULT_BATCH_SIZE
+    DEFAULT_BATCH_SIZE = int(batch_size)
+
+
+def _column_values(series):
+    """Return `series` as a list of plain Python values (None for missing), by dtype."""
+    kind = series.dtype.kind if isinstance(series.dtype, np.dtype) else 'O'
+    if kind in 'iu':
+        return series.tolist()
+    if kind == 'b':
+        return series.astype(int).tolist()
+    if kind == 'f':
+        values = series.to_numpy(dtype='float64')
+        out = values.tolist()
+        if np.isnan(values).any():
+            out = [None if v != v else v for v in out]
+        return out
+    if kind == 'M':
+        # Same text layout SQLAlchemy uses for DateTime columns on SQLite
+        text = series.dt.strftime('%Y-%m-%d %H:%M:%S.%f')
+        return text.where(series.notna(), None).tolist()
+    # object / extension dtypes: unwrap numpy scalars and map NA markers to None
+    return [_python_value(v) for v in series.astype(object).tolist()]
+
+
+def _python_value(value):
+    if value is None or value is pd.NA or value is pd.NaT:
+        return None
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and value != value:
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.strftime('%Y-%m-%d %H:%M:%S.%f')
+    return value
+
+
+def dataframe_rows(df, columns=None):
+    """Iterate `df` as typed tuples ready for executemany (columns converted once, not per row)."""
+    columns = list(df.columns) if columns is None else list(columns)
+    return zip(*(_column_values(df[c]) for c in columns))
+
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _execute_batches(cursor, cnxn, query, rows, batch_size, commit, counted):
+    batch_size = int(batch_size or DEFAULT_BATCH_SIZE)
+    rows = iter(rows)
+    written = 0
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        cursor.executemany(query, batch)
+        # rows skipped by DO NOTHING are not counted; trigger writes never are
+        written += cursor.rowcount if counted else len(batch)
+        if commit:
+            cnxn.commit()
+    return written
+
+
+def bulk_insert_rows(cursor, cnxn, table_name, columns, rows, batch_size=None, commit=True, on_conflict=None):
+    """INSERT `rows` (iterable of tuples ordered like `columns`) with executemany.
+
+    Each batch of `batch_size` rows is one executemany call and, when `commit`
+    is True, one transaction. With commit=False the caller owns the transaction
+    (e.g. after BEGIN IMMEDIATE) and nothing is committed here.
+    `on_conflict` is an optional upsert clause (see conflict_clause) appended to
+    the INSERT. Returns the number of rows inserted (or updated by the upsert).
+    """
+    column_list = ", ".join(_quote(c) for c in columns)
+    placeholders = ", ".join("?" * len(columns))
+    query = f"INSERT INTO {_quote(table_name)} ({column_list}) VALUES ({placeholders})"
+    if on_conflict:
+        query += " " + on_conflict
+    return _execute_batches(cursor, cnxn, query, rows, batch_size, commit, on_conflict is not None)
+
+
+def bulk_insert(cursor, cnxn, table_name, df, columns=None, batch_size=None, commit=True):
+    """Append the rows of DataFrame `df` to `table_name`; replaces DataFrame.to_sql(..., if_exists='append').
+
+    Values go through the caller's DBAPI connection (so an open transaction and
+    the rollup triggers see them) as typed tuples in batches of `batch_size`.
+    Returns the number of rows inserted.
+    """
+    if df is None or df.empty:
+        return 0
+    columns = list(df.columns) if columns is None else list(columns)
+    return bulk_insert_rows(cursor, cnxn, table_name, columns, dataframe_rows(df, columns), batch_size, commit)
+
+
+_unique_keys_by_name = {name.lower(): keys for name, keys in table_unique_keys.items()}
+_dtypes_by_name = {name.lower(): dtypes for name, dtypes in table_dtypes.items()}
+
+
+def unique_key(table_name):
+    """Natural key columns of `table_name` (any case, like SQLite), or None when it has none."""
+    return _unique_keys_by_name.get(str(table_name).lower())
+
+
+def measure_columns(table_name):
+    """Non-key REAL columns of `table_name`, summed over rows that share its natural key."""
+    keys = unique_key(table_name) or []
+    dtypes = _dtypes_by_name.get(str(table_name).lower(), {})
+    return [c for c, dtype in dtypes.items() if dtype == 'float64' and c not in keys]
+
+
+def _collapse_repeats(df, keys, measures, update):
+    """One row per natural key of `df`, with `measures` summed over the repeats.
+
+    The other columns come from the last row (update=True) or the first one,
+    the way the database settles a clash. Rows with a NULL key part never
+    conflict and are kept as they are.
+    """
+    repeated = df.duplicated(subset=keys, keep=False) & df[keys].notna().all(axis=1)
+    if not repeated.any():
+        return df
+    df = df.reset_index(drop=True)
+    repeated = repeated.reset_index(drop=True)
+    rows = df[repeated]
+    kept = rows.drop_duplicates(subset=keys, keep='last' if update else 'first')
+    df = df[~repeated | df.index.isin(kept.index)].copy()
+    measures = [m for m in measures if m in df.columns]
+    if measures:
+        values = rows[measures].apply(pd.to_numeric, errors='coerce')
+        totals = values.groupby([rows[k] for k in keys], sort=False).transform('sum', min_count=1)
+        df.loc[kept.index, measures] = totals.loc[kept.index]
+    return df
+
+
+def conflict_clause(keys, columns, update=True):
+    """ON CONFLICT clause for an INSERT of `columns` into a table unique on `keys`.
+
+    update=True overwrites the non-key columns with the incoming values;
+    update=False (or nothing but keys to write) keeps the existing row.
+    """
+    target = ", ".join(_quote(k) for k in keys)
+    values = [c for c in columns if c not in keys]
+    if not update or not values:
+        return f"ON CONFLICT ({target}) DO NOTHING"
+    assignments = ", ".join(f"{_quote(c)} = excluded.{_quote(c)}" for c in values)
+    return f"ON CONFLICT ({target}) DO UPDATE SET {assignments}"
+
+
+def has_unique_index(cursor, table_name, keys):
+    """True when `table_name` has a UNIQUE index on exactly `keys` (the ON CONFLICT target)."""
+    cursor.execute(f"PRAGMA index_list({_quote(table_name)})")
+    # (seq, name, unique, origin, partial); a partial index is no conflict target
+    indexes = [row[1] for row in cursor.fetchall() if row[2] and not row[4]]
+    wanted = sorted(k.lower() for k in keys)
+    for name in indexes:
+        cursor.execute(f"PRAGMA index_info({_quote(name)})")
+        if sorted(str(row[2]).lower() for row in cursor.fetchall()) == wanted:
+            return True
+    return False
+
+
+def _insert_missing_keys(cursor, cnxn, table_name, keys, columns, df, batch_size, commit):
+    """INSERT the rows of `df` whose key is not in `table_name` yet, probing with NOT EXISTS."""
+    if any(k not in columns for k in keys):
+        # a key part left NULL never matches an existing row
+        return bulk_insert_rows(cursor, cnxn, table_name, columns, dataframe_rows(df, columns), batch_size, commit)
+    column_list = ", ".join(_quote(c) for c in columns)
+    placeholders = ", ".join("?" * len(columns))
+    # '=' like a UNIQUE index: a NULL key part never matches
+    match = " AND ".join(f"{_quote(k)} = ?" for k in keys)
+    query = (f"INSERT INTO {_quote(table_name)} ({column_list}) SELECT {placeholders} "
+             f"WHERE NOT EXISTS (SELECT 1 FROM {_quote(table_name)} WHERE {match})")
+    rows = (row + tuple(row[columns.index(k)] for k in keys) for row in dataframe_rows(df, columns))
+    return _execute_batches(cursor, cnxn, query, rows, batch_size, commit, True)
+
+
+def bulk_upsert(cursor, cnxn, table_name, df, update=True, columns=None, batch_size=None, commit=True):
+    """Insert the rows of `df`, resolving clashes on the table's natural key in SQL.
+
+    The key comes from table_unique_keys (see unique_key). With update=True an existing row takes
+    the incoming values (INSERT ... ON CONFLICT DO UPDATE); with update=False
+    only new keys are inserted (ON CONFLICT DO NOTHING). Either way the cost is
+    one index probe per uploaded row, independent of the table size. Rows of
+    the upload repeating a key are merged first, their REAL measures summed
+    (see measure_columns), as the display tables summed the rows the former
+    append uploads stored.
+    On a database whose table still lacks its UQ_ index (duplicates written
+    before the index existed keep ensure_indexes from building it, see
+    backend.index_plan) there is no conflict target: update=True appends the
+    merged rows, as uploads did before the index, and update=False inserts the
+    keys not present yet.
+    Returns the number of rows inserted or updated. Raises ValueError for a
+    table without a natural key (use bulk_insert for those).
+    """
+    keys = unique_key(table_name)
+    if keys is None:
+        raise ValueError(f"{table_name} has no natural key in table_unique_keys; use bulk_insert")
+    if df is None or df.empty:
+        return 0
+    columns = list(df.columns) if columns is None else list(columns)
+    # Settle repeats inside the upload here: a conflicting INSERT would drop
+    # their measures and still burn an AUTOINCREMENT id
+    df = _collapse_repeats(df, keys, measure_columns(table_name), update)
+    if not has_unique_index(cursor, table_name, keys):
+        if update:
+            return bulk_insert_rows(cursor, cnxn, table_name, columns, dataframe_rows(df, columns), batch_size, commit)
+        return _insert_missing_keys(cursor, cnxn, table_name, keys, columns, df, batch_size, commit)
+    clause = conflict_clause(keys, columns, update)
+    return bulk_insert_rows(cursor, cnxn, table_name, columns, dataframe_rows(df, columns), batch_size, commit, clause)
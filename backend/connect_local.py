@@ -1,19 +1,319 @@
+import os
 import sqlite3
-import pyodbc
-from sqlalchemy import create_engine
+import threading
+from operator import itemgetter
+import numpy as np
 import pandas as pd
+from backend.summary_rollup import create_rollup
+from backend.table_versions import create_table_versions
+from backend.request_metrics import count_statement
+from backend.query_trace import traced_sqlite_cursor
+from backend.table_values import table_dtypes
 
 # Dictionary mapping table names to a list of column names
 
+# The local database; LOCAL_DB_PATH points the app (or the test suite) at another file
+DEFAULT_DB_PATH = os.environ.get('LOCAL_DB_PATH', 'my_local_database.db')
+
+# Process-wide connection pools, keyed by absolute database path
+_pools = {}
+_pools_lock = threading.Lock()
+DEFAULT_POOL_SIZE = 8
+
+# PRAGMAs applied to every new connection (pooled sqlite3 and the shared engine).
+# WAL lets the summary pages keep reading while an upload holds BEGIN IMMEDIATE;
+# synchronous=NORMAL is durable enough under WAL and avoids an fsync per commit.
+# Override per database with connect_local(db_path, pragmas={...}) or globally
+# with set_pragma_profile(); a value of None skips that PRAGMA.
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -65536,          # negative = KiB, i.e. 64 MB page cache
+    'mmap_size': 268435456,        # 256 MB memory-mapped reads
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000,          # ms to wait on a locked database before SQLITE_BUSY
+    'wal_autocheckpoint': 1000,    # pages; SQLite runs a PASSIVE checkpoint after commits
+    'journal_size_limit': 67108864,  # truncate the -wal file back to 64 MB after checkpoints
+}
+
+# Checkpoint policy: autocheckpoint handles steady-state traffic. When a
+# connection is handed back to the pool and the -wal file has grown past this
+# many bytes (a long forecast upload), run an extra PASSIVE checkpoint. PASSIVE
+# never waits on readers, so summary pages are not blocked by it.
+WAL_CHECKPOINT_BYTES = 32 * 1024 * 1024
+
+
+def set_pragma_profile(**overrides):
+    """Update the default PRAGMA profile for connections created from now on."""
+    DEFAULT_PRAGMAS.update(overrides)
+
+
+def apply_pragmas(raw_conn, pragmas):
+    """Run PRAGMA statements on a DBAPI sqlite3 connection; unknown/failed ones are skipped."""
+    cursor = raw_conn.cursor()
+    try:
+        for name, value in pragmas.items():
+            if value is None:
+                continue
+            try:
+                cursor.execute(f"PRAGMA {name}={value}")
+                cursor.fetchall()
+            except Exception:
+                continue
+    finally:
+        cursor.close()
+
+
+class pooled_connection:
+    """Proxy around a pooled sqlite3 connection.
+
+    Everything is delegated to the underlying connection except close(), which
+    hands the connection back to its pool instead of closing the file handle.
+    Callers can therefore keep using the usual close_connection(cursor, cnxn).
+
+    While the write queue runs a write inside a group commit (`savepoint` set),
+    commit() is left to the writer, which commits the whole batch at once, and
+    rollback() only undoes that write. executescript() is refused then: it
+    commits before running the script, which would end the savepoint.
+    """
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+        self._checkouts = 0
+        self.savepoint = None
+
+    def commit(self):
+        if self.savepoint is None:
+            self._raw.commit()
+
+    def cursor(self):
+        # timed per statement shape and counted for the request metrics
+        cursor = self._raw.cursor(traced_sqlite_cursor)
+        cursor.owner = self
+        return cursor
+
+    def execute(self, *args, **kwargs):
+        return self.cursor().execute(*args, **kwargs)
+
+    def executemany(self, *args, **kwargs):
+        return self.cursor().executemany(*args, **kwargs)
+
+    def executescript(self, script):
+        return self.cursor().executescript(script)
+
+    def rollback(self):
+        if self.savepoint is None:
+            self._raw.rollback()
+        else:
+            self._raw.execute(f"ROLLBACK TO SAVEPOINT {self.savepoint}")
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def __enter__(self):
+        self._raw.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._raw.__exit__(*exc)
+
+    def close(self):
+        self._pool.checkin(self)
+
+
+class connection_pool:
+    """Thread-local pool of sqlite3 connections plus one shared SQLAlchemy engine.
+
+    Each thread is bound to a single connection for as long as it holds it, so
+    nested helpers inside one request share a connection (and its transaction)
+    instead of opening new ones. release() returns the thread's connection to
+    the idle list; the Flask app calls it on teardown of every request.
+    """
+
+    def __init__(self, db_path, max_idle=DEFAULT_POOL_SIZE, pragmas=None):
+        self.db_path = db_path
+        self.max_idle = max_idle
+        self.pragmas = pragmas
+        self._idle = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._engine = None
+        self._stats = {
+            'created': 0,
+            'reused': 0,
+            'checkouts': 0,
+            'releases': 0,
+            'discarded': 0,
+            'in_use': 0,
+            'peak_in_use': 0,
+            'checkpoints': 0,
+        }
+
+    def _pragmas(self):
+        return dict(DEFAULT_PRAGMAS, **(self.pragmas or {}))
+
+    def _new_connection(self):
+        raw = sqlite3.connect(self.db_path, check_same_thread=False)
+        apply_pragmas(raw, self._pragmas())
+        return pooled_connection(self, raw)
+
+    def wal_size(self):
+        try:
+            return os.path.getsize(self.db_path + '-wal')
+        except OSError:
+            return 0
+
+    def checkpoint(self, mode='PASSIVE', raw=None):
+        """Run PRAGMA wal_checkpoint(mode); returns (busy, log_pages, checkpointed_pages)."""
+        own = raw is None
+        if own:
+            raw = sqlite3.connect(self.db_path, check_same_thread=False)
+        try:
+            row = raw.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+            with self._lock:
+                self._stats['checkpoints'] += 1
+            return row
+        except Exception:
+            return None
+        finally:
+            if own:
+                raw.close()
+
+    def connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            with self._lock:
+                if self._idle:
+                    conn = self._idle.pop()
+                    self._stats['reused'] += 1
+                else:
+                    conn = None
+                    self._stats['created'] += 1
+                self._stats['in_use'] += 1
+                self._stats['peak_in_use'] = max(self._stats['peak_in_use'], self._stats['in_use'])
+            if conn is None:
+                conn = self._new_connection()
+            self._local.conn = conn
+        conn._checkouts += 1
+        with self._lock:
+            self._stats['checkouts'] += 1
+        return conn
+
+    def checkin(self, conn):
+        """Called by pooled_connection.close(); releases once the last holder closes."""
+        if getattr(self._local, 'conn', None) is not conn or conn.savepoint is not None:
+            return
+        conn._checkouts -= 1
+        if conn._checkouts <= 0:
+            self.release()
+
+    def release(self):
+        """Return the current thread's connection to the pool, discarding uncommitted work."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+        self._local.conn = None
+        conn._checkouts = 0
+        try:
+            if conn._raw.in_transaction:
+                conn._raw.rollback()
+            keep = True
+        except Exception:
+            keep = False
+        if keep and self.wal_size() > WAL_CHECKPOINT_BYTES:
+            self.checkpoint('PASSIVE', raw=conn._raw)
+        with self._lock:
+            self._stats['releases'] += 1
+            self._stats['in_use'] -= 1
+            if keep and len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+            self._stats['discarded'] += 1
+        try:
+            conn._raw.close()
+        except Exception:
+            pass
+
+    def engine(self):
+        if self._engine is None:
+            with self._lock:
+                if self._engine is None:
+                    from sqlalchemy import create_engine, event  # only the to_sql/read_sql paths need it
+                    engine = create_engine(f'sqlite:///{self.db_path}')
+                    pragmas = self._pragmas()
+                    event.listen(engine, 'connect', lambda dbapi_conn, record: apply_pragmas(dbapi_conn, pragmas))
+                    event.listen(engine, 'before_cursor_execute', count_statement)
+                    self._engine = engine
+        return self._engine
+
+    def stats(self):
+        with self._lock:
+            out = dict(self._stats)
+            out['idle'] = len(self._idle)
+        out['db_path'] = self.db_path
+        out['max_idle'] = self.max_idle
+        out['wal_bytes'] = self.wal_size()
+        if self._engine is not None:
+            try:
+                out['engine_pool'] = self._engine.pool.status()
+            except Exception:
+                out['engine_pool'] = None
+        return out
+
+    def dispose(self):
+        """Close every idle connection and the shared engine (e.g. before deleting the file)."""
+        self.release()
+        with self._lock:
+            idle, self._idle = self._idle, []
+            engine, self._engine = self._engine, None
+        for conn in idle:
+            try:
+                conn._raw.close()
+            except Exception:
+                pass
+        if engine is not None:
+            engine.dispose()
+        # Fold the WAL back into the main file once nothing is using it
+        self.checkpoint('TRUNCATE')
+
+
+def get_pool(db_path=DEFAULT_DB_PATH, pragmas=None):
+    key = os.path.abspath(db_path)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = connection_pool(db_path, pragmas=pragmas)
+                _pools[key] = pool
+    return pool
+
+
+def release_connections(exc=None):
+    """Release every pool's connection held by the current thread.
+
+    Registered as a Flask teardown handler so each request hands its connection back.
+    """
+    for pool in list(_pools.values()):
+        pool.release()
+
+
+def get_pool_stats():
+    return {path: pool.stats() for path, pool in _pools.items()}
+
+
 class connect_local:
-    def __init__(self, db_path = "my_local_database.db"):
+    def __init__(self, db_path = DEFAULT_DB_PATH, pragmas=None):
         self.df_path = db_path
+        self.pragmas = pragmas
     
     def connect_to_db(self, engine=False):
-        cnxn = sqlite3.connect(self.df_path)
+        pool = get_pool(self.df_path, self.pragmas)
+        cnxn = pool.connect()
         cursor = cnxn.cursor()
         if engine:
-            engine_obj = create_engine(f'sqlite:///{ self.df_path}')
+            engine_obj = pool.engine()
             return engine_obj, cursor, cnxn
         else:
             return cursor, cnxn
@@ -22,16 +322,96 @@ def select_all_from_table(cursor, cnxn, table_name):
     select_query = f"SELECT * FROM {table_name}"
     # print(select_query)
     cursor.execute(select_query)
-    print(cursor)
     rows = cursor.fetchall()
     columns = [column[0] for column in cursor.description]
     df = pd.DataFrame.from_records(rows, columns=columns)
     return df
 
+_dtypes_by_name = {name.lower(): dtypes for name, dtypes in table_dtypes.items()}
+
+def select_typed(cursor, table_name, columns=None):
+    """Read `columns` of `table_name` (every declared column when None) typed by table_dtypes.
+
+    Only the named columns are fetched, and each one is built straight into its
+    declared dtype; columns without a declared dtype are object.
+    """
+    dtypes = _dtypes_by_name.get(str(table_name).lower(), {})
+    if columns is None:
+        columns = list(dtypes) or table_columns(cursor, table_name)
+    cursor.execute(f"SELECT {', '.join(map(_quote_identifier, columns))} FROM {_quote_identifier(table_name)}")
+    return typed_frame(cursor.fetchall(), columns, dtypes)
+
+def typed_frame(rows, columns, dtypes):
+    """DataFrame of fetched `rows`, built one column at a time in its dtype from `dtypes`.
+
+    Values that do not fit a numeric dtype become missing, as with
+    pd.to_numeric(errors='coerce'); an Int64 column holding fractions stays float64.
+    """
+    return pd.DataFrame({column: _typed_array(list(map(itemgetter(i), rows)), dtypes.get(column, 'object'))
+                         for i, column in enumerate(columns)}, columns=columns)
+
+def _typed_array(values, dtype):
+    if dtype == 'float64':
+        try:
+            return np.array(values, dtype='float64')
+        except (TypeError, ValueError):
+            return pd.to_numeric(np.array(values, dtype=object), errors='coerce').astype('float64')
+    if dtype == 'Int64':
+        floats = _typed_array(values, 'float64')
+        missing = np.isnan(floats)
+        whole = np.where(missing, 0.0, floats)
+        if not (whole == np.trunc(whole)).all():
+            return floats
+        if (np.abs(whole) < 2 ** 53).all():  # exact in float64
+            return pd.arrays.IntegerArray(whole.astype('int64'), missing)
+        try:
+            return pd.array(values, dtype='Int64')
+        except (TypeError, ValueError):
+            return floats
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+def table_columns(cursor, table_name):
+    """Column names of `table_name` (empty list when the table does not exist)."""
+    cursor.execute(f"PRAGMA table_info({_quote_identifier(table_name)})")
+    return [row[1] for row in cursor.fetchall()]
+
+def count_rows(cursor, table_name):
+    cursor.execute(f"SELECT COUNT(*) FROM {_quote_identifier(table_name)}")
+    return cursor.fetchone()[0]
+
+def select_page_from_table(cursor, cnxn, table_name, limit, offset=0, order_by=None, descending=False, after=None):
+    """Read one page of `table_name` with LIMIT/OFFSET.
+
+    Rows are ordered by rowid (insertion order, i.e. what SELECT * returns) unless
+    `order_by` names a column; rowid breaks ties so pages never overlap. Passing
+    `after` (the last rowid of the previous page) switches to a keyset seek on rowid,
+    which does not degrade with the page number; it is ignored when sorting by a column.
+    """
+    table = _quote_identifier(table_name)
+    direction = "DESC" if descending else "ASC"
+    params = []
+    where = ""
+    if order_by:
+        order = f"{_quote_identifier(order_by)} {direction}, rowid {direction}"
+    else:
+        order = f"rowid {direction}"
+        if after is not None:
+            where = f" WHERE rowid {'<' if descending else '>'} ?"
+            params.append(int(after))
+            offset = 0
+    cursor.execute(f"SELECT * FROM {table}{where} ORDER BY {order} LIMIT ? OFFSET ?", params + [int(limit), int(offset)])
+    rows = cursor.fetchall()
+    columns = [column[0] for column in cursor.description]
+    return pd.DataFrame.from_records(rows, columns=columns)
+
+def _quote_identifier(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
 def select_columns_from_table(cursor, table_name, columns):
     columns_string = ",".join(columns)
     select_query = f"SELECT {columns_string} FROM {table_name}"
-    print(select_query)
     cursor.execute(select_query)
     rows = cursor.fetchall()
     columns = [column[0] for column in cursor.description]
@@ -39,20 +419,29 @@ def select_columns_from_table(cursor, table_name, columns):
     # close_connection(cursor, cnxn)
     return df
 
+def _invalidate_dimensions(*tables):
+    # Imported lazily: backend.dimension_cache depends on this module
+    from backend.dimension_cache import invalidate_dimensions
+    invalidate_dimensions(*tables)
+
 def clear_table(cursor, cnxn, table_name):
-    drop_query = f"DELETE FROM {table_name};"
-    cursor.executescript(drop_query)
+    # execute, not executescript: that commits first and would end the write
+    # queue's savepoint (or an upload job's transaction)
+    cursor.execute(f"DELETE FROM {_quote_identifier(table_name)}")
     cnxn.commit()
+    _invalidate_dimensions(table_name)
     # close_connection(cursor, cnxn)
 
 def clear_table_by_year(cursor, cnxn, table_name, year):
-    drop_query = f"DELETE FROM {table_name} WHERE fiscal_year = {year};"
-    drop_query2 = f"DELETE FROM {table_name} WHERE cap_year = {year};"
+    table = _quote_identifier(table_name)
+    year = int(year)
     try:
-        cursor.executescript(drop_query)
-    except:
-        cursor.executescript(drop_query2)
+        cursor.execute(f"DELETE FROM {table} WHERE fiscal_year = ?", (year,))
+    except sqlite3.OperationalError:
+        # capex tables without fiscal_year
+        cursor.execute(f"DELETE FROM {table} WHERE cap_year = ?", (year,))
     cnxn.commit()
+    _invalidate_dimensions(table_name)
     # close_connection(cursor, cnxn)
 
 
@@ -60,6 +449,8 @@ def initialize_database(cursor,cnxn, initial_values=False):
     drop_all_tables(cursor, cnxn)
     create_tables(cursor, cnxn)
     alter_tables(cursor, cnxn)
+    create_rollup(cursor, cnxn)
+    create_table_versions(cursor, cnxn)
     if initial_values:
         insert_testing_data(cursor, cnxn)
     
@@ -86,6 +477,7 @@ def insert_testing_data(cursor, cnxn):
         query = f.read()
     cursor.executescript(query)
     cnxn.commit()
+    _invalidate_dimensions()
 
 def drop_all_tables(cursor, cnxn):
     # drop_query = "sql\\drop_tables.sql"
@@ -94,6 +486,7 @@ def drop_all_tables(cursor, cnxn):
         drop_query = f.read()
     cursor.executescript(drop_query)
     cnxn.commit()
+    _invalidate_dimensions()
 
 def close_connection(cursor, cnxn):
     cursor.close()
@@ -1,7 +1,6 @@
 import pandas as pd
-import pyodbc
 import os
-from sqlalchemy import create_engine
+from backend.query_trace import traced_cursor
 # Load the CSV file into a pandas DataFrame
 
 def connect_to_sql(engine=False):
@@ -12,11 +11,15 @@ def connect_to_sql(engine=False):
         'UID=admin-111;' \
         'PWD=passwordA!'
     )
+    # pyodbc and the mssql dialect load here, so the SQLite-only app never imports them
+    import pyodbc
     cnxn = pyodbc.connect(
         connection_string
     )
-    cursor = cnxn.cursor()
+    # statements are timed per shape and slow ones logged (SQL Server plans are not fetched)
+    cursor = traced_cursor(cnxn.cursor())
     if engine:
+        from sqlalchemy import create_engine
         engine = create_engine(f"mssql+pyodbc:///?odbc_connect={connection_string}")
         return engine, cursor, cnxn
     else:
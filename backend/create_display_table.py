@@ -1,19 +1,25 @@
-from backend.connect_local import connect_local, select_all_from_table
+from backend.connect_local import connect_local, select_typed, typed_frame
+from backend.dimension_cache import select_dimension
+from backend.rate_resolution import load_rate_table, resolve_rates
+from backend.request_memo import request_memoized
+from backend.display_cache import display_cached
 import pandas as pd
 
+@request_memoized
+@display_cached('departments', 'pos')
 def get_departments_display():
 	"""Return a DataFrame for display of departments joined with POs.
 
 	Behavior:
-	- Reads `departments` and `pos` from the local database using select_all_from_table
+	- Reads `departments` and `pos` through select_dimension (the dimension cache, reloaded when their table_versions counters change)
 	- Attempts a LEFT JOIN of departments -> pos on departments.category_id == pos.id
 	  If departments does not have `category_id`, falls back to departments.po_id == pos.id
 	- Returns a DataFrame with columns department_name and po_name (id columns dropped)
 	"""
 	conn = connect_local()
 	cursor, cnxn = conn.connect_to_db()
-	depts = select_all_from_table(cursor, cnxn, 'departments')
-	pos = select_all_from_table(cursor, cnxn, 'pos')
+	depts = select_dimension(cursor, cnxn, 'departments')
+	pos = select_dimension(cursor, cnxn, 'pos')
 
 	# if pos missing, return department names with po_name as None
 	if pos is None or pos.empty:
@@ -31,6 +37,8 @@ def get_departments_display():
 	return merged.reset_index(drop=True)
 
 
+@request_memoized
+@display_cached('projects', 'departments', 'project_categories')
 def get_forecasts_display():
 	"""Return a DataFrame with projects joined to departments and project_categories.
 
@@ -43,9 +51,9 @@ def get_forecasts_display():
 	conn = connect_local()
 	cursor, cnxn = conn.connect_to_db()
 
-	proj_df = select_all_from_table(cursor, cnxn, 'projects')
-	dept_df = select_all_from_table(cursor, cnxn, 'departments')
-	cat_df = select_all_from_table(cursor, cnxn, 'project_categories')
+	proj_df = select_dimension(cursor, cnxn, 'projects')
+	dept_df = select_dimension(cursor, cnxn, 'departments')
+	cat_df = select_dimension(cursor, cnxn, 'project_categories')
 
 	# If projects missing return empty
 	if proj_df is None or proj_df.empty:
@@ -121,229 +129,72 @@ def get_forecasts_display():
 	return out.reset_index(drop=True)
 
 
+# Personnel forecast display: names are joined inside SQLite, the id columns needed for
+# rate resolution ride along and are dropped once backend.rate_resolution has run.
+PC_DISPLAY_QUERY = """
+SELECT
+	f.id AS "id",
+	f.fiscal_year AS "Fiscal Year",
+	po.name AS "PO Name",
+	d.name AS "Department Name",
+	p.name AS "Project",
+	pc.category AS "Project Category",
+	hc.name AS "Staff Category",
+	f.human_resource_fte AS "Work Hours(FTE)",
+	f.PO_id AS po_id,
+	f.department_id AS department_id,
+	hc.id AS category_id,
+	f.fiscal_year AS year
+FROM project_forecasts_pc f
+LEFT JOIN pos po ON po.id = f.PO_id
+LEFT JOIN departments d ON d.id = f.department_id
+LEFT JOIN projects p ON p.id = f.project_id
+LEFT JOIN project_categories pc ON pc.id = f.project_category_id
+LEFT JOIN human_resource_categories hc ON hc.id = f.human_resource_category_id
+ORDER BY f.id
+"""
+PC_DISPLAY_KEY_COLUMNS = ['po_id', 'department_id', 'category_id', 'year']
+PC_DISPLAY_DTYPES = {
+	'id': 'Int64', 'Fiscal Year': 'Int64', 'Work Hours(FTE)': 'float64',
+	'po_id': 'Int64', 'department_id': 'Int64', 'category_id': 'Int64', 'year': 'Int64',
+}
+
+
+@request_memoized
+@display_cached('project_forecasts_pc', 'pos', 'departments', 'projects', 'project_categories', 'human_resource_categories', 'human_resource_cost')
 def get_pc_display():
 	"""Return a DataFrame for display of project_forecasts_pc.
 
 	Behavior:
-	- Reads `project_forecasts_pc` and reference tables (projects, departments, POs, IOs, human_resource_categories, human_resource_cost)
-	- Renames human_resource_fte -> 'Work Hours(FTE)', personnel_expense -> 'Personnel Expense'
-	- Maps human_resource_category_id to 'Staff Category' (friendly name) and drops the id column
-	- Computes 'Personnel Cost' by looking up unit cost in human_resource_cost (keyed by (category_id, year)) and multiplying by FTE
-	- Maps other id columns (project_id, department_id, PO_id, io_id) to friendly names when present
-	- Reorders columns to place Fiscal Year, IO, Project, Project Category, Staff Category near the front
-	- Handles missing reference tables or columns gracefully
+	- Runs PC_DISPLAY_QUERY, which joins project_forecasts_pc to POs, departments, projects,
+	  project_categories and human_resource_categories inside SQLite
+	- Resolves every row's unit rate at once with backend.rate_resolution.resolve_rates
+	  (hierarchical fallback (po, dept, cat, year) -> (dept, cat, year) -> (po, cat, year) -> (cat, year))
+	- Columns: id, Fiscal Year, PO Name, Department Name, Project, Project Category,
+	  Staff Category, Work Hours(FTE), Personnel Cost (= unit rate * FTE, NaN when no rate applies)
+	- 'Personnel Cost' is omitted when human_resource_cost is empty, and an empty forecast
+	  table is returned with its raw columns
 	"""
 	conn = connect_local()
 	cursor, cnxn = conn.connect_to_db()
 
-	df = select_all_from_table(cursor, cnxn, 'project_forecasts_pc')
-	if df is None or df.empty:
-		return pd.DataFrame() if df is None else df
-
-	# Renames
-	if 'human_resource_fte' in df.columns:
-		df = df.rename(columns={'human_resource_fte': 'Work Hours(FTE)'})
-	if 'personnel_expense' in df.columns:
-		df = df.rename(columns={'personnel_expense': 'Personnel Expense'})
-
-	# Map human_resource_category_id -> Staff Category name
-	if 'human_resource_category_id' in df.columns:
-		try:
-			hr_ref = select_all_from_table(cursor, cnxn, 'human_resource_categories')
-			if hr_ref is None or hr_ref.empty or 'id' not in hr_ref.columns or 'name' not in hr_ref.columns:
-				df['Staff Category'] = None
-			else:
-				ref_dict = dict(zip(hr_ref['id'], hr_ref['name']))
-				df['Staff Category'] = df['human_resource_category_id'].map(ref_dict)
-				# drop the id column to prefer friendly name display
-				try:
-					df = df.drop(columns=['human_resource_category_id'])
-				except Exception:
-					pass
-		except Exception:
-			df['Staff Category'] = None
-
-	# Compute Personnel Cost using human_resource_cost table if possible
-	try:
-		hr_cost_df = select_all_from_table(cursor, cnxn, 'human_resource_cost')
-		if hr_cost_df is not None and not hr_cost_df.empty and 'category_id' in hr_cost_df.columns and 'year' in hr_cost_df.columns and 'cost' in hr_cost_df.columns:
-			# Prefer more specific matches first: (po_id, department_id, category_id, year), falling back to less specific keys
-			# Build several lookup dicts with decreasing specificity
-			hr_local = hr_cost_df.copy()
-			# Coerce to ints where possible
-			for col in ['po_id', 'department_id', 'category_id', 'year']:
-				if col in hr_local.columns:
-					try:
-						hr_local[col] = pd.to_numeric(hr_local[col], errors='coerce').astype('Int64')
-					except Exception:
-						pass
-
-			cost_pod_dept_cat_year = {}
-			cost_dept_cat_year = {}
-			cost_po_cat_year = {}
-			cost_cat_year = {}
-			for _, r in hr_local.iterrows():
-				try:
-					cat = int(r['category_id']) if pd.notna(r['category_id']) else None
-					yr = int(r['year']) if pd.notna(r['year']) else None
-					if cat is None or yr is None:
-						continue
-					costv = float(r['cost']) if r['cost'] is not None else None
-					po = int(r['po_id']) if 'po_id' in hr_local.columns and pd.notna(r['po_id']) else None
-					dept = int(r['department_id']) if 'department_id' in hr_local.columns and pd.notna(r['department_id']) else None
-					if po is not None and dept is not None:
-						cost_pod_dept_cat_year[(po, dept, cat, yr)] = costv
-					if dept is not None:
-						cost_dept_cat_year[(dept, cat, yr)] = costv
-					if po is not None:
-						cost_po_cat_year[(po, cat, yr)] = costv
-					cost_cat_year[(cat, yr)] = costv
-				except Exception:
-					continue
-
-			# Determine columns
-			fte_col = 'Work Hours(FTE)' if 'Work Hours(FTE)' in df.columns else ('human_resource_fte' if 'human_resource_fte' in df.columns else None)
-			fy_col = 'Fiscal Year' if 'Fiscal Year' in df.columns else ('fiscal_year' if 'fiscal_year' in df.columns else None)
-
-			personnel_costs = []
-			# Build name->id map for staff categories if needed
-			name_to_id = {}
-			try:
-				if 'Staff Category' in df.columns:
-					hr_ref = select_all_from_table(cursor, cnxn, 'human_resource_categories')
-					if hr_ref is not None and not hr_ref.empty and 'name' in hr_ref.columns and 'id' in hr_ref.columns:
-						name_to_id = dict(zip(hr_ref['name'], hr_ref['id']))
-			except Exception:
-				name_to_id = {}
-
-			for _, row in df.iterrows():
-				try:
-					staff_name = row.get('Staff Category') if 'Staff Category' in row.index else None
-					cat_id = name_to_id.get(staff_name) if staff_name is not None else None
-					fy = int(row.get(fy_col)) if fy_col and row.get(fy_col) not in (None, '') else None
-					wh = row.get(fte_col) if fte_col else None
-					try:
-						wh = float(wh) if wh not in (None, '') else 0.0
-					except Exception:
-						wh = 0.0
-					if cat_id is None or fy is None:
-						personnel_costs.append(None)
-						continue
-					# Try hierarchical lookup: most specific -> least specific
-					po_val = None
-					dept_val = None
-					try:
-						po_val = int(row.get('PO_id')) if 'PO_id' in df.columns and row.get('PO_id') not in (None, '') else None
-					except Exception:
-						po_val = None
-					try:
-						dept_val = int(row.get('department_id')) if 'department_id' in df.columns and row.get('department_id') not in (None, '') else None
-					except Exception:
-						dept_val = None
-
-					hourly = None
-					if po_val is not None and dept_val is not None:
-						hourly = cost_pod_dept_cat_year.get((po_val, dept_val, int(cat_id), int(fy)))
-					if hourly is None and dept_val is not None:
-						hourly = cost_dept_cat_year.get((dept_val, int(cat_id), int(fy)))
-					if hourly is None and po_val is not None:
-						hourly = cost_po_cat_year.get((po_val, int(cat_id), int(fy)))
-					if hourly is None:
-						hourly = cost_cat_year.get((int(cat_id), int(fy)))
-					if hourly is None:
-						personnel_costs.append(None)
-					else:
-						personnel_costs.append(hourly * wh)
-				except Exception:
-					personnel_costs.append(None)
-
-			df['Personnel Cost'] = personnel_costs
-	except Exception:
-		# non-fatal
-		pass
-
-	# Map other id columns to friendly names (project, department, PO, IO, project_category)
-	id_name_map = {
-		'project_id': ('projects', 'id', 'name', 'Project'),
-		'department_id': ('departments', 'id', 'name', 'Department Name'),
-		'PO_id': ('pos', 'id', 'name', 'PO Name'),
-		'io_id': ('IOs', 'id', 'IO_num', 'IO'),
-		'project_category_id': ('project_categories', 'id', 'category', 'Project Category'),
-	}
-	for id_col, (ref_table, ref_id, ref_name, new_col_name) in id_name_map.items():
-		if id_col in df.columns:
-			try:
-				ref_df = select_all_from_table(cursor, cnxn, ref_table)
-				if ref_df is None or ref_df.empty or ref_id not in ref_df.columns or ref_name not in ref_df.columns:
-					df[new_col_name] = None
-				else:
-					ref_dict = dict(zip(ref_df[ref_id], ref_df[ref_name]))
-					df[new_col_name] = df[id_col].map(ref_dict)
-			except Exception:
-				df[new_col_name] = None
-
-	# Drop raw id columns where appropriate
-	drop_cols = [c for c in ['human_resource_category_id', 'project_id', 'department_id', 'PO_id', 'io_id', 'project_category_id'] if c in df.columns]
-	if drop_cols:
-		try:
-			df = df.drop(columns=drop_cols)
-		except Exception:
-			pass
-
-	# Global renames
-	if 'fiscal_year' in df.columns:
-		df = df.rename(columns={'fiscal_year': 'Fiscal Year'})
-	if 'cap_year' in df.columns:
-		df = df.rename(columns={'cap_year': 'Capital Year'})
-
-	# Reorder to place Fiscal Year then IO/Project/Project Category/Staff Category front
-	current_cols = list(df.columns)
-	new_order = []
-	# prefer fiscal year
-	fy = 'Fiscal Year' if 'Fiscal Year' in current_cols else ('fiscal_year' if 'fiscal_year' in current_cols else None)
-	if fy:
-		# append up to and including fiscal year
-		for c in current_cols:
-			new_order.append(c)
-			if c == fy:
-				break
-
-		# Ensure PO and Department are preserved before inserted block
-		po_col = next((c for c in ['PO', 'PO_id', 'PO Name'] if c in current_cols), None)
-		dept_col = next((c for c in ['Department Name', 'Department', 'department'] if c in current_cols), None)
-		if po_col and po_col not in new_order:
-			new_order.append(po_col)
-		if dept_col and dept_col not in new_order:
-			new_order.append(dept_col)
-
-		io_col = next((c for c in ['IO', 'IO number'] if c in current_cols), None)
-		if io_col and io_col not in new_order:
-			new_order.append(io_col)
-		if 'Project' in current_cols and 'Project' not in new_order:
-			new_order.append('Project')
-		if 'Project Category' in current_cols and 'Project Category' not in new_order:
-			new_order.append('Project Category')
-		if 'Staff Category' in current_cols and 'Staff Category' not in new_order:
-			new_order.append('Staff Category')
-	else:
-		if 'id' in current_cols:
-			new_order.append('id')
-
-	# Append the rest preserving order
-	for c in current_cols:
-		if c not in new_order:
-			new_order.append(c)
+	cursor.execute(PC_DISPLAY_QUERY)
+	rows = cursor.fetchall()
+	columns = [column[0] for column in cursor.description]
+	if not rows:
+		return select_typed(cursor, 'project_forecasts_pc')
+	df = typed_frame(rows, columns, PC_DISPLAY_DTYPES)
 
-	try:
-		new_order = [c for c in new_order if c in df.columns]
-		if new_order and new_order != current_cols:
-			df = df.loc[:, new_order]
-	except Exception:
-		pass
+	cursor.execute("SELECT 1 FROM human_resource_cost LIMIT 1")
+	if cursor.fetchone() is not None:
+		unit_rate = resolve_rates(df, load_rate_table(cursor))
+		df['Personnel Cost'] = unit_rate * df['Work Hours(FTE)']
 
-	return df.reset_index(drop=True)
+	return df.drop(columns=PC_DISPLAY_KEY_COLUMNS).reset_index(drop=True)
 
 
+@request_memoized
+@display_cached('projects', 'departments', 'project_categories', 'pos')
 def get_projects_display():
 	"""Return a DataFrame of projects joined with department and project category.
 
@@ -356,9 +207,9 @@ def get_projects_display():
 	conn = connect_local()
 	cursor, cnxn = conn.connect_to_db()
 
-	proj_df = select_all_from_table(cursor, cnxn, 'projects')
-	dept_df = select_all_from_table(cursor, cnxn, 'departments')
-	cat_df = select_all_from_table(cursor, cnxn, 'project_categories')
+	proj_df = select_dimension(cursor, cnxn, 'projects')
+	dept_df = select_dimension(cursor, cnxn, 'departments')
+	cat_df = select_dimension(cursor, cnxn, 'project_categories')
 
 	# If projects missing or empty return empty DataFrame
 	if proj_df is None or proj_df.empty:
@@ -410,7 +261,7 @@ def get_projects_display():
 		cat_right = None
 
 	# POs -> po_name (join via po_id on projects or via departments.po_id if projects lacks po_id)
-	pos_df = select_all_from_table(cursor, cnxn, 'pos')
+	pos_df = select_dimension(cursor, cnxn, 'pos')
 	if pos_df is not None and not pos_df.empty and 'id' in pos_df.columns:
 		pos_name_col = 'name' if 'name' in pos_df.columns else pos_df.columns[0]
 		pos_right = pos_df.rename(columns={pos_name_col: 'po_name'})[['id', 'po_name']].copy()
@@ -512,6 +363,8 @@ def get_projects_display():
 	return out.reset_index(drop=True)
 
 
+@request_memoized
+@display_cached('project_forecasts_nonpc', 'projects', 'departments', 'pos')
 def get_nonpc_display():
 	"""Return a DataFrame for project_forecasts_nonpc joined with PO, Department and Project.
 
@@ -524,11 +377,11 @@ def get_nonpc_display():
 	conn = connect_local()
 	cursor, cnxn = conn.connect_to_db()
 
-	df = select_all_from_table(cursor, cnxn, 'project_forecasts_nonpc')
+	df = select_typed(cursor, 'project_forecasts_nonpc', ['PO_id', 'department_id', 'project_id', 'fiscal_year', 'non_personnel_expense'])
 	if df is None or df.empty:
 		return pd.DataFrame()
 
-	left = df.copy()
+	left = df
 
 	# detect candidate id columns on forecast table
 	proj_id_col = next((c for c in ('project_id', 'proj_id', 'projects_id', 'project') if c in left.columns), None)
@@ -537,16 +390,16 @@ def get_nonpc_display():
 	fiscal_col = next((c for c in ('fiscal_year', 'Fiscal Year', 'fy', 'year') if c in left.columns), None)
 
 	# load reference tables
-	proj_df = select_all_from_table(cursor, cnxn, 'projects')
-	dept_df = select_all_from_table(cursor, cnxn, 'departments')
-	pos_df = select_all_from_table(cursor, cnxn, 'pos')
+	proj_df = select_dimension(cursor, cnxn, 'projects')
+	dept_df = select_dimension(cursor, cnxn, 'departments')
+	pos_df = select_dimension(cursor, cnxn, 'pos')
 
 	merged = left
 
 	# join projects -> provide project_name
 	if proj_df is not None and not proj_df.empty and proj_id_col is not None:
 		try:
-			merged['_proj_key'] = pd.to_numeric(merged[proj_id_col], errors='coerce')
+			merged['_proj_key'] = merged[proj_id_col]
 			right = proj_df.copy()
 			right['_proj_key'] = pd.to_numeric(right['id'], errors='coerce')
 			merged = pd.merge(merged, right, how='left', left_on='_proj_key', right_on='_proj_key', suffixes=('','_proj'))
@@ -565,7 +418,7 @@ def get_nonpc_display():
 	# join departments -> provide department_name
 	if dept_df is not None and not dept_df.empty and dept_id_col is not None:
 		try:
-			merged['_dept_key'] = pd.to_numeric(merged[dept_id_col], errors='coerce')
+			merged['_dept_key'] = merged[dept_id_col]
 			right_dept = dept_df.copy()
 			right_dept['_dept_key'] = pd.to_numeric(right_dept['id'], errors='coerce')
 			merged = pd.merge(merged, right_dept, how='left', left_on='_dept_key', right_on='_dept_key', suffixes=('','_dept'))
@@ -583,7 +436,7 @@ def get_nonpc_display():
 	# join POs -> provide po_name (direct join from po_id if present)
 	if pos_df is not None and not pos_df.empty and po_id_col is not None:
 		try:
-			merged['_po_key'] = pd.to_numeric(merged[po_id_col], errors='coerce')
+			merged['_po_key'] = merged[po_id_col]
 			right_po = pos_df.copy()
 			right_po['_po_key'] = pd.to_numeric(right_po['id'], errors='coerce')
 			merged = pd.merge(merged, right_po, how='left', left_on='_po_key', right_on='_po_key', suffixes=('','_po'))
@@ -642,14 +495,7 @@ def get_nonpc_display():
 	nonpc_candidates = ['non_personnel_expense', 'Non-personnel Expense', 'Non-personnel cost', 'non_personnel_cost', 'amount', 'expense', 'nonpersonnel_expense']
 	nonpc_col = next((c for c in nonpc_candidates if c in merged.columns), None)
 	if nonpc_col:
-		try:
-			out['non_personnel_expense'] = merged[nonpc_col].where(pd.notna(merged[nonpc_col]), 0.0).astype(float)
-		except Exception:
-			# fallback: coerce via to_numeric
-			try:
-				out['non_personnel_expense'] = pd.to_numeric(merged[nonpc_col], errors='coerce').fillna(0.0)
-			except Exception:
-				out['non_personnel_expense'] = 0.0
+		out['non_personnel_expense'] = merged[nonpc_col].fillna(0.0)
 	else:
 		out['non_personnel_expense'] = 0.0
 
@@ -660,11 +506,13 @@ def get_nonpc_display():
 	return out.reset_index(drop=True)
 
 
+@request_memoized
+@display_cached('budgets', 'pos', 'departments')
 def get_budget_display_table():
 	"""Return a grouped DataFrame for budgets joined with PO and Department.
 
 	Behavior:
-	- Reads `budgets`, `pos`, and `departments` from the local database using select_all_from_table
+	- Reads the used `budgets` columns with select_typed, and `pos` and `departments`
 	- Joins budgets.po_id -> pos.id and budgets.department_id -> departments.id when possible
 	- Groups by po_name, department_name, and fiscal_year and computes:
 	    - personnel_budget: sum of human_resource_expense (or close variants)
@@ -676,15 +524,15 @@ def get_budget_display_table():
 	conn = connect_local()
 	cursor, cnxn = conn.connect_to_db()
 
-	budgets = select_all_from_table(cursor, cnxn, 'budgets')
-	pos = select_all_from_table(cursor, cnxn, 'pos')
-	departments = select_all_from_table(cursor, cnxn, 'departments')
+	budgets = select_typed(cursor, 'budgets', ['po_id', 'department_id', 'fiscal_year', 'human_resource_expense', 'non_personnel_expense'])
+	pos = select_dimension(cursor, cnxn, 'pos')
+	departments = select_dimension(cursor, cnxn, 'departments')
 
 	# If budgets missing return empty DataFrame
 	if budgets is None or budgets.empty:
 		return pd.DataFrame()
 
-	left = budgets.copy()
+	left = budgets
 
 	# detect fiscal year column
 	fiscal_col = next((c for c in ('fiscal_year', 'Fiscal Year', 'fy', 'year') if c in left.columns), None)
@@ -708,20 +556,20 @@ def get_budget_display_table():
 		left['personnel_tmp'] = 0.0
 		personnel_col = 'personnel_tmp'
 	else:
-		left[personnel_col] = pd.to_numeric(left[personnel_col], errors='coerce').fillna(0.0)
+		left[personnel_col] = left[personnel_col].fillna(0.0)
 
 	if nonpersonnel_col is None:
 		left['nonpersonnel_tmp'] = 0.0
 		nonpersonnel_col = 'nonpersonnel_tmp'
 	else:
-		left[nonpersonnel_col] = pd.to_numeric(left[nonpersonnel_col], errors='coerce').fillna(0.0)
+		left[nonpersonnel_col] = left[nonpersonnel_col].fillna(0.0)
 
 	merged = left.copy()
 
 	# Join POs -> provide po_name
 	if pos is not None and not pos.empty and po_id_col is not None:
 		try:
-			merged['_po_key'] = pd.to_numeric(merged[po_id_col], errors='coerce')
+			merged['_po_key'] = merged[po_id_col]
 			right_po = pos.copy()
 			right_po['_po_key'] = pd.to_numeric(right_po['id'], errors='coerce')
 			merged = pd.merge(merged, right_po, how='left', left_on='_po_key', right_on='_po_key', suffixes=('','_po'))
@@ -739,7 +587,7 @@ def get_budget_display_table():
 	# Join Departments -> provide department_name
 	if departments is not None and not departments.empty and dept_id_col is not None:
 		try:
-			merged['_dept_key'] = pd.to_numeric(merged[dept_id_col], errors='coerce')
+			merged['_dept_key'] = merged[dept_id_col]
 			right_dept = departments.copy()
 			right_dept['_dept_key'] = pd.to_numeric(right_dept['id'], errors='coerce')
 			merged = pd.merge(merged, right_dept, how='left', left_on='_dept_key', right_on='_dept_key', suffixes=('','_dept'))
@@ -804,6 +652,8 @@ def get_budget_display_table():
 
 	return agg_df.loc[:, out_cols].reset_index(drop=True)
 
+@request_memoized
+@display_cached('fundings', 'pos', 'departments')
 def create_funding_display():
 	"""Return a grouped DataFrame for fundings joined with PO and Department.
 
@@ -818,15 +668,15 @@ def create_funding_display():
 	conn = connect_local()
 	cursor, cnxn = conn.connect_to_db()
 
-	fundings = select_all_from_table(cursor, cnxn, 'fundings')
-	pos = select_all_from_table(cursor, cnxn, 'pos')
-	departments = select_all_from_table(cursor, cnxn, 'departments')
+	fundings = select_typed(cursor, 'fundings', ['po_id', 'department_id', 'fiscal_year', 'funding'])
+	pos = select_dimension(cursor, cnxn, 'pos')
+	departments = select_dimension(cursor, cnxn, 'departments')
 
 	# If fundings missing return empty DataFrame
 	if fundings is None or fundings.empty:
 		return pd.DataFrame(columns=['po_name', 'department_name', 'fiscal_year', 'funding'])
 
-	left = fundings.copy()
+	left = fundings
 
 	# detect fiscal year column
 	fiscal_col = next((c for c in ('fiscal_year', 'Fiscal Year', 'fy', 'year') if c in left.columns), None)
@@ -845,17 +695,14 @@ def create_funding_display():
 		left['funding'] = 0.0
 		funding_col = 'funding'
 	else:
-		try:
-			left[funding_col] = pd.to_numeric(left[funding_col], errors='coerce').fillna(0.0)
-		except Exception:
-			pass
+		left[funding_col] = left[funding_col].fillna(0.0)
 
 	merged = left.copy()
 
 	# Join POs -> provide po_name
 	if pos is not None and not pos.empty and po_id_col is not None:
 		try:
-			merged['_po_key'] = pd.to_numeric(merged[po_id_col], errors='coerce')
+			merged['_po_key'] = merged[po_id_col]
 			right_po = pos.copy()
 			right_po['_po_key'] = pd.to_numeric(right_po['id'], errors='coerce')
 			merged = pd.merge(merged, right_po, how='left', left_on='_po_key', right_on='_po_key', suffixes=('', '_po'))
@@ -873,7 +720,7 @@ def create_funding_display():
 	# Join Departments -> provide department_name
 	if departments is not None and not departments.empty and dept_id_col is not None:
 		try:
-			merged['_dept_key'] = pd.to_numeric(merged[dept_id_col], errors='coerce')
+			merged['_dept_key'] = merged[dept_id_col]
 			right_dept = departments.copy()
 			right_dept['_dept_key'] = pd.to_numeric(right_dept['id'], errors='coerce')
 			merged = pd.merge(merged, right_dept, how='left', left_on='_dept_key', right_on='_dept_key', suffixes=('', '_dept'))
@@ -940,6 +787,8 @@ def create_funding_display():
 
 	return agg_df.loc[:, out_cols].reset_index(drop=True)
 
+@request_memoized
+@display_cached('projects', 'project_categories')
 def get_project_cateogory_display():
 	"""Return a DataFrame of projects with their project category.
 
@@ -952,8 +801,8 @@ def get_project_cateogory_display():
 	conn = connect_local()
 	cursor, cnxn = conn.connect_to_db()
 
-	proj_df = select_all_from_table(cursor, cnxn, 'projects')
-	cat_df = select_all_from_table(cursor, cnxn, 'project_categories')
+	proj_df = select_dimension(cursor, cnxn, 'projects')
+	cat_df = select_dimension(cursor, cnxn, 'project_categories')
 
 	# If projects missing or empty return empty DataFrame
 	if proj_df is None or proj_df.empty:
@@ -1035,19 +884,21 @@ def get_project_cateogory_display():
 		out['category'] = None
 		return out.reset_index(drop=True)
 
+@request_memoized
+@display_cached('ios', 'projects')
 def get_IO_display_table():
 	"""Return a DataFrame with IO numbers and their associated project name.
 
 	Behavior:
-	- Reads `IOs` and `projects` using select_all_from_table
+	- Reads `IOs` (IO_num, project_id) with select_typed and `projects`
 	- LEFT JOIN io_table.project_id -> project_table.id
 	- Returns a DataFrame with exactly two columns: 'IO' (from IO_num) and 'project_name'
 	- Handles missing tables/columns gracefully (fills missing project_name with None)
 	"""
 	conn = connect_local()
 	cursor, cnxn = conn.connect_to_db()
-	io_table = select_all_from_table(cursor, cnxn, "IOs")
-	project_table = select_all_from_table(cursor, cnxn, "projects")
+	io_table = select_typed(cursor, "IOs", ['IO_num', 'project_id'])
+	project_table = select_dimension(cursor, cnxn, "projects")
 
 	# If IO table missing or empty, return empty DataFrame
 	if io_table is None or io_table.empty:
@@ -1073,12 +924,12 @@ def get_IO_display_table():
 	proj_name_col = 'name' if 'name' in project_table.columns else ('Project' if 'Project' in project_table.columns else project_table.columns[0])
 
 	# Perform left join, attempting numeric coercion first then fallback to string join
-	left = io_table.copy()
+	left = io_table
 	right = project_table.copy()
 	merged = None
 	if proj_id_col is not None and 'id' in right.columns:
 		try:
-			left['_proj_key'] = pd.to_numeric(left[proj_id_col], errors='coerce')
+			left['_proj_key'] = left[proj_id_col]
 			right['_proj_key'] = pd.to_numeric(right['id'], errors='coerce')
 			merged = pd.merge(left, right, how='left', left_on='_proj_key', right_on='_proj_key', suffixes=('','_proj'))
 		except Exception:
@@ -1116,14 +967,16 @@ def get_IO_display_table():
 
 
 
+@request_memoized
+@display_cached('human_resource_categories', 'pos')
 def get_hr_category_display():
 	"""Return a DataFrame of human resource categories joined with PO names.
 	"""
 	conn = connect_local()
 	cursor, cnxn = conn.connect_to_db()
 
-	hr_df = select_all_from_table(cursor, cnxn, 'human_resource_categories')
-	pos_df = select_all_from_table(cursor, cnxn, 'pos')
+	hr_df = select_dimension(cursor, cnxn, 'human_resource_categories')
+	pos_df = select_dimension(cursor, cnxn, 'pos')
 
 	# If hr categories missing return empty DataFrame with desired column names
 	if hr_df is None or hr_df.empty:
@@ -1196,6 +1049,8 @@ def get_hr_category_display():
 	return out.reset_index(drop=True)
 
 
+@request_memoized
+@display_cached('expenses', 'departments', 'cost_elements', 'ios', 'projects', 'pos')
 def get_expenses_display():
 	"""Return operating expenses with BU name.
 
@@ -1218,18 +1073,18 @@ def get_expenses_display():
 	conn = connect_local()
 	cursor, cnxn = conn.connect_to_db()
 
-	exp = select_all_from_table(cursor, cnxn, 'expenses')
-	dept = select_all_from_table(cursor, cnxn, 'departments')
-	cost_elements = select_all_from_table(cursor, cnxn, 'cost_elements')
-	ios = select_all_from_table(cursor, cnxn, 'IOs')
-	projects = select_all_from_table(cursor, cnxn, 'projects')
-	pos = select_all_from_table(cursor, cnxn, 'pos')  # needed to map department -> PO Name
+	exp = select_typed(cursor, 'expenses', ['id', 'department_id', 'fiscal_year', 'io_id', 'cost_element_id', 'expense_value', 'name'])
+	dept = select_dimension(cursor, cnxn, 'departments')
+	cost_elements = select_typed(cursor, 'cost_elements', ['id', 'co_id'])
+	ios = select_typed(cursor, 'IOs', ['id', 'project_id'])
+	projects = select_dimension(cursor, cnxn, 'projects')
+	pos = select_dimension(cursor, cnxn, 'pos')  # needed to map department -> PO Name
 
 	# Empty fallback
 	if exp is None or exp.empty:
 		return pd.DataFrame(columns=['id', 'BU Name', 'expense', 'Name', 'cost_element', 'project_name', 'fiscal_year'])
 
-	work = exp.copy()
+	work = exp
 
 	# Map department_id -> departments.name
 	if dept is not None and not dept.empty and 'id' in dept.columns:
@@ -1362,6 +1217,8 @@ def get_expenses_display():
 	return work.loc[:, final_cols].reset_index(drop=True)
 
 
+@request_memoized
+@display_cached('capex_expenses', 'pos', 'departments', 'projects')
 def get_capex_expenses_display():
 	"""Return CapEx expenses joined to PO, BU, and Project.
 
@@ -1383,15 +1240,15 @@ def get_capex_expenses_display():
 	conn = connect_local()
 	cursor, cnxn = conn.connect_to_db()
 
-	cap = select_all_from_table(cursor, cnxn, 'capex_expenses')
-	pos = select_all_from_table(cursor, cnxn, 'pos')
-	dept = select_all_from_table(cursor, cnxn, 'departments')
-	proj = select_all_from_table(cursor, cnxn, 'projects')
+	cap = select_typed(cursor, 'capex_expenses', ['id', 'po_id', 'department_id', 'cap_year', 'project_id', 'expense', 'expense_date'])
+	pos = select_dimension(cursor, cnxn, 'pos')
+	dept = select_dimension(cursor, cnxn, 'departments')
+	proj = select_dimension(cursor, cnxn, 'projects')
 
 	if cap is None or cap.empty:
 		return pd.DataFrame(columns=['id', 'PO name', 'BU name', 'project name', 'expense', 'expense date', 'fiscal_year'])
 
-	work = cap.copy()
+	work = cap
 
 	# id
 	if 'id' not in work.columns:
@@ -1461,6 +1318,8 @@ def get_capex_expenses_display():
 	return work.loc[:, ['id', 'PO name', 'BU name', 'project name', 'expense', 'expense date', 'fiscal_year']].reset_index(drop=True)
 
 
+@request_memoized
+@display_cached('capex_forecasts', 'pos', 'departments', 'projects')
 def create_capex_forecast_display():
 	"""Return CapEx forecasts joined to PO, BU, and Project.
 
@@ -1482,16 +1341,16 @@ def create_capex_forecast_display():
 	conn = connect_local()
 	cursor, cnxn = conn.connect_to_db()
 
-	capf = select_all_from_table(cursor, cnxn, 'capex_forecasts')
-	pos = select_all_from_table(cursor, cnxn, 'pos')
-	dept = select_all_from_table(cursor, cnxn, 'departments')
-	proj = select_all_from_table(cursor, cnxn, 'projects')
+	capf = select_typed(cursor, 'capex_forecasts', ['id', 'po_id', 'department_id', 'cap_year', 'project_id', 'capex_forecast'])
+	pos = select_dimension(cursor, cnxn, 'pos')
+	dept = select_dimension(cursor, cnxn, 'departments')
+	proj = select_dimension(cursor, cnxn, 'projects')
 
 	# If missing return empty with expected columns
 	if capf is None or capf.empty:
 		return pd.DataFrame(columns=['id', 'po_name', 'department_name', 'project_name', 'fiscal_year', 'capex_forecast'])
 
-	work = capf.copy()
+	work = capf
 
 	# id
 	if 'id' not in work.columns:
@@ -1557,6 +1416,8 @@ def create_capex_forecast_display():
 	return work.loc[:, ['id', 'po_name', 'department_name', 'project_name', 'fiscal_year', 'capex_forecast']].reset_index(drop=True)
 
 
+@request_memoized
+@display_cached('capex_budgets', 'pos', 'departments', 'projects')
 def create_capex_budgets_dispaly():
 	"""Return CapEx budgets joined to PO, BU, and Project.
 
@@ -1575,15 +1436,15 @@ def create_capex_budgets_dispaly():
 	conn = connect_local()
 	cursor, cnxn = conn.connect_to_db()
 
-	caps = select_all_from_table(cursor, cnxn, 'capex_budgets')
-	pos = select_all_from_table(cursor, cnxn, 'pos')
-	dept = select_all_from_table(cursor, cnxn, 'departments')
-	proj = select_all_from_table(cursor, cnxn, 'projects')
+	caps = select_typed(cursor, 'capex_budgets', ['po_id', 'department_id', 'cap_year', 'project_id', 'budget'])
+	pos = select_dimension(cursor, cnxn, 'pos')
+	dept = select_dimension(cursor, cnxn, 'departments')
+	proj = select_dimension(cursor, cnxn, 'projects')
 
 	if caps is None or caps.empty:
 		return pd.DataFrame(columns=['po_name', 'department_name', 'project_name', 'fiscal_year', 'budget'])
 
-	work = caps.copy()
+	work = caps
 
 	# PO
 	if pos is not None and not pos.empty and 'id' in pos.columns:
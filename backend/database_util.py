@@ -1,7 +1,9 @@
+import numpy as np
 import pandas as pd
 import sqlite3
-from backend import close_connection, connect_to_sql, select_all_from_table
+from backend.connect_pyodbc import close_connection, connect_to_sql, select_all_from_table
 import backend.connect_local as cl
+from backend.dimension_cache import invalidate_dimensions
 
 tables_allow_empty = ['project_forecasts_nonpc', 'capex_forecasts']
 # Columns in incoming CSVs we validate against reference tables
@@ -77,9 +79,22 @@ def clear_table(cursor, cnxn, table_name, conn_type):
         cursor.execute(drop_query)
         cnxn.commit()
     else:
-        drop_query = f"DELETE FROM {table_name};"
-        cursor.executescript(drop_query)
+        cursor.execute(f'DELETE FROM "{table_name}"')
         cnxn.commit()
+        invalidate_dimensions(table_name)
+
+# Offending rows reported per failed upload (see missing_attribute_rows)
+MISSING_ROWS_LIMIT = 50
+
+
+def _normalize_name(x):
+    """Normalizer for reference-name checks: string, strip, lower."""
+    try:
+        s = str(x)
+    except Exception:
+        s = ''
+    return s.strip().lower()
+
 
 def check_missing_attribute(df_upload, table_name, type):
     """Validate that key text columns in the upload exist in reference tables.
@@ -106,13 +121,7 @@ def check_missing_attribute(df_upload, table_name, type):
     if not columns_check:
         return False, None
 
-    # Normalizer: string, strip, lower
-    def norm(x):
-        try:
-            s = str(x)
-        except Exception:
-            s = ''
-        return s.strip().lower()
+    norm = _normalize_name
 
     for column in columns_check:
         table = column_name_to_table.get(column)
@@ -151,3 +160,27 @@ def check_missing_attribute(df_upload, table_name, type):
 
     return False, None
 
+
+def missing_attribute_rows(df_upload, column, limit=MISSING_ROWS_LIMIT):
+    """Rows of `df_upload` whose `column` value is unknown to its reference table.
+
+    Same comparison as check_missing_attribute. Returns up to `limit` dicts
+    {'line', 'column', 'value'}; `line` is the CSV line number (header = line 1,
+    assuming the default RangeIndex, which chunked reads keep across chunks).
+    """
+    table = column_name_to_table.get(column)
+    if table is None or column not in df_upload.columns:
+        return []
+    cursor, cnxn = cl.connect_local().connect_to_db()
+    ref_df = select_all_from_table(cursor, cnxn, table)
+    ref_name_col = 'name' if 'name' in ref_df.columns else (ref_df.columns[0] if len(ref_df.columns) > 0 else None)
+    known = set(ref_df[ref_name_col].dropna().map(_normalize_name)) if ref_name_col is not None else set()
+    rows = []
+    for index, raw in df_upload[column].items():
+        if raw is None or (isinstance(raw, float) and pd.isna(raw)) or _normalize_name(raw) in known:
+            continue
+        line = index + 2 if isinstance(index, (int, np.integer)) else None
+        rows.append({'line': line, 'column': column, 'value': str(raw)})
+        if len(rows) >= limit:
+            break
+    return rows
@@ -0,0 +1,168 @@
+import threading
+from contextlib import contextmanager
+from backend.connect_local import connect_local, select_all_from_table
+from backend.request_memo import request_cached, clear_request_memo
+from backend.table_versions import table_versions
+
+# Reference (dimension) tables and the column holding their display name.
+DIMENSION_TABLES = {
+    'pos': 'name',
+    'departments': 'name',
+    'projects': 'name',
+    'project_categories': 'category',
+    'human_resource_categories': 'name',
+}
+
+
+class dimension_entry:
+    """Cached snapshot of one dimension table plus its id <-> name lookups."""
+
+    def __init__(self, table, frame):
+        self.table = table
+        self.frame = frame
+        name_col = DIMENSION_TABLES[table]
+        ids = list(frame['id']) if 'id' in frame.columns else []
+        names = list(frame[name_col]) if name_col in frame.columns else [None] * len(ids)
+        # Same last-wins semantics as the dict(zip(...)) maps this replaces
+        self.name_to_id = dict(zip(names, ids))
+        self.id_to_name = dict(zip(ids, names))
+        self.lower_name_to_id = {str(n).strip().lower(): i for n, i in zip(names, ids) if n is not None}
+
+    def id_for(self, name):
+        """Exact name lookup with a case/whitespace-insensitive fallback."""
+        if name is None:
+            return None
+        found = self.name_to_id.get(name)
+        if found is None:
+            found = self.lower_name_to_id.get(str(name).strip().lower())
+        return found
+
+
+class dimension_cache:
+    """In-process cache of the reference tables, checked against table_versions.
+
+    Each entry remembers the table_versions counter of its table and is served
+    only while that counter is unchanged, so writes made by another worker
+    process are picked up on the next lookup. Write paths in this process also
+    call invalidate() after committing (see deferred_invalidations for writes
+    inside an outer transaction), which covers databases without the counters.
+    A generation counter per table keeps a load that raced with such a write
+    from re-populating the cache with the pre-write snapshot.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}  # table -> (version, dimension_entry)
+        self._generations = {}
+        self._stats = {'hits': 0, 'misses': 0, 'stale': 0, 'invalidations': 0}
+
+    def get(self, table, cursor=None, cnxn=None):
+        table = _normalize(table)
+        if cursor is None:
+            cursor, cnxn = connect_local().connect_to_db()
+        versions = table_versions(cursor, [table])
+        version = versions[table] if versions is not None else None
+        with self._lock:
+            cached = self._entries.get(table)
+            generation = self._generations.get(table, 0)
+            if cached is not None and cached[0] == version:
+                self._stats['hits'] += 1
+                return cached[1]
+            self._stats['misses'] += 1
+            if cached is not None:
+                self._stats['stale'] += 1
+                del self._entries[table]
+        entry = dimension_entry(table, select_all_from_table(cursor, cnxn, table))
+        # A connection inside an open transaction may be reading a snapshot that a
+        # concurrent commit is about to supersede; serve it but do not cache it.
+        if getattr(cnxn, 'in_transaction', False):
+            return entry
+        with self._lock:
+            if self._generations.get(table, 0) == generation:
+                self._entries[table] = (version, entry)
+        return entry
+
+    def invalidate(self, *tables):
+        """Drop the named tables (all dimension tables when none given)."""
+        names = [_normalize(t) for t in tables] or list(DIMENSION_TABLES)
+        with self._lock:
+            for table in names:
+                if table not in DIMENSION_TABLES:
+                    continue
+                self._entries.pop(table, None)
+                self._generations[table] = self._generations.get(table, 0) + 1
+                self._stats['invalidations'] += 1
+
+    def stats(self):
+        with self._lock:
+            out = dict(self._stats)
+            lookups = out['hits'] + out['misses']
+            out['hit_ratio'] = round(out['hits'] / lookups, 4) if lookups else None
+            out['cached_tables'] = sorted(self._entries)
+            return out
+
+
+def _normalize(table):
+    return str(table).strip().lower()
+
+
+_cache = dimension_cache()
+
+
+def get_dimension(table, cursor=None, cnxn=None):
+    """Return the cached dimension_entry for `table` (loading it on a miss).
+
+    Within a request the entry is pinned, so every builder rendering one page
+    sees the same snapshot even if another thread invalidates the cache meanwhile.
+    """
+    return request_cached(('dimension', _normalize(table)), lambda: _cache.get(table, cursor, cnxn))
+
+
+def select_dimension(cursor, cnxn, table):
+    """Drop-in for select_all_from_table on dimension tables; returns a private copy."""
+    if _normalize(table) not in DIMENSION_TABLES:
+        return select_all_from_table(cursor, cnxn, table)
+    return get_dimension(table, cursor, cnxn).frame.copy()
+
+
+_deferred = threading.local()
+
+
+def invalidate_dimensions(*tables):
+    """Write-through hook: call after committing changes to any dimension table.
+
+    Inside deferred_invalidations() the call is held until the block ends.
+    """
+    pending = getattr(_deferred, 'calls', None)
+    if pending is not None:
+        pending.append(tables)
+        return
+    _cache.invalidate(*tables)
+    # also covers writes that bypassed the pooled connection (e.g. the engine)
+    clear_request_memo()
+
+
+@contextmanager
+def deferred_invalidations():
+    """Hold this thread's invalidate_dimensions() calls until the block ends.
+
+    The write queue and run_transaction wrap their outer transaction in this:
+    cnxn.commit() is a no-op inside them, so a write invalidating "after its
+    commit" would otherwise do so before the real COMMIT, and a concurrent
+    reader could cache the old snapshot again in between. Nested blocks are
+    replayed by the outermost one.
+    """
+    if getattr(_deferred, 'calls', None) is not None:
+        yield
+        return
+    _deferred.calls = []
+    try:
+        yield
+    finally:
+        calls, _deferred.calls = _deferred.calls, None
+        for tables in calls:
+            invalidate_dimensions(*tables)
+
+
+def get_dimension_cache_stats():
+    return _cache.stats()
@@ -0,0 +1,144 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+import pandas as pd
+from backend.connect_local import connect_local
+from backend.table_versions import table_versions
+from backend.request_metrics import observe_builder
+
+# Upper bound on the memory held by cached display tables; least recently used
+# entries are evicted past it. Change with set_display_cache_limit().
+DISPLAY_CACHE_MAX_BYTES = 128 * 1024 * 1024
+
+
+def _size_of(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    return sys.getsizeof(value)
+
+
+class display_cache:
+    """LRU cache of display builder outputs keyed by builder and source table versions.
+
+    An entry is served only while the table_versions counters of the tables it
+    was built from are unchanged, so no write path has to invalidate it.
+    """
+
+    def __init__(self, max_bytes=DISPLAY_CACHE_MAX_BYTES):
+        self.max_bytes = int(max_bytes)
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (versions, value, size)
+        self._bytes = 0
+        self._stats = {'hits': 0, 'misses': 0, 'stale': 0, 'evictions': 0}
+
+    def lookup(self, key, versions):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == versions:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return entry[1]
+            self._stats['misses'] += 1
+            if entry is not None:
+                self._stats['stale'] += 1
+                self._drop(key)
+            return None
+
+    def store(self, key, versions, value):
+        size = _size_of(value)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (versions, value, size)
+            self._bytes += size
+            self._evict()
+
+    def _drop(self, key):
+        self._bytes -= self._entries.pop(key)[2]
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and self._entries:
+            self._drop(next(iter(self._entries)))
+            self._stats['evictions'] += 1
+
+    def set_limit(self, max_bytes):
+        with self._lock:
+            self.max_bytes = int(max_bytes)
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            out = dict(self._stats)
+            lookups = out['hits'] + out['misses']
+            out['hit_ratio'] = round(out['hits'] / lookups, 4) if lookups else None
+            out['entries'] = len(self._entries)
+            out['bytes'] = self._bytes
+            out['max_bytes'] = self.max_bytes
+            out['cached'] = [key[0] for key in self._entries]
+            return out
+
+
+_cache = display_cache()
+
+
+def _cached_call(func, tables, args, kwargs):
+    """(value, 'hit' | 'miss' | 'bypass') for func(*args, **kwargs) through the cache."""
+    key = (func.__qualname__, args, tuple(sorted(kwargs.items())))
+    try:
+        hash(key)
+    except TypeError:
+        return func(*args, **kwargs), 'bypass'
+    cursor, cnxn = connect_local().connect_to_db()
+    versions = table_versions(cursor, tables)
+    if versions is None:
+        return func(*args, **kwargs), 'bypass'
+    versions = tuple(versions.values())
+    value = _cache.lookup(key, versions)
+    if value is not None:
+        return value, 'hit'
+    value = func(*args, **kwargs)
+    if not cnxn.in_transaction:
+        _cache.store(key, versions, value)
+    return value, 'miss'
+
+
+def display_cached(*tables):
+    """Serve the decorated builder from the display cache until one of `tables` changes.
+
+    `tables` must list every table the builder reads. Results computed inside an
+    open transaction are returned but not cached (they may still be rolled back).
+    Callers always receive their own copy. Every call is timed into the
+    display_builder_duration_seconds metric (backend.request_metrics).
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            value, cache = _cached_call(func, tables, args, kwargs)
+            value = value.copy() if hasattr(value, 'copy') else value
+            observe_builder(func.__name__, time.perf_counter() - started, cache)
+            return value
+        return wrapper
+    return decorator
+
+
+def set_display_cache_limit(max_bytes):
+    """Change the memory cap (bytes), evicting least recently used entries as needed."""
+    _cache.set_limit(max_bytes)
+
+
+def clear_display_cache():
+    _cache.clear()
+
+
+def get_display_cache_stats():
+    return _cache.stats()
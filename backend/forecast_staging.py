@@ -0,0 +1,200 @@
+import pandas as pd
+import backend.connect_local as cl
+from backend.bulk_insert import bulk_insert_rows, conflict_clause, dataframe_rows
+from backend.dimension_cache import invalidate_dimensions
+from backend.table_values import table_unique_keys
+
+# Rows per read_csv chunk when staging a file
+STAGING_CHUNK_SIZE = 50000
+STAGING_TABLE = "forecast_staging"
+
+# Upload column -> staging column, per forecast table
+STAGING_COLUMNS = {
+    "project_forecasts_nonpc": {
+        "PO": "po",
+        "Department": "department",
+        "Project Category": "project_category",
+        "Project Name": "project_name",
+        "fiscal_year": "fiscal_year",
+        "Non-personnel cost": "value",
+    },
+    "project_forecasts_pc": {
+        "PO": "po",
+        "Department": "department",
+        "Project Category": "project_category",
+        "Project Name": "project_name",
+        "fiscal_year": "fiscal_year",
+        "Human resource category": "hr_category",
+        "Human resource FTE": "value",
+    },
+}
+# Measure column written from staging.value
+VALUE_COLUMNS = {
+    "project_forecasts_nonpc": "non_personnel_expense",
+    "project_forecasts_pc": "human_resource_fte",
+}
+# An upload holds one row per (PO, project, department, year[, category]); first row wins
+STAGING_DEDUPE = {
+    "project_forecasts_nonpc": ["po", "project_name", "department", "fiscal_year"],
+    "project_forecasts_pc": ["po", "project_name", "department", "fiscal_year", "hr_category"],
+}
+
+CREATE_STAGING = f"""
+CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} (
+    po TEXT,
+    department TEXT,
+    project_category TEXT,
+    project_name TEXT,
+    fiscal_year INTEGER,
+    hr_category TEXT,
+    value REAL
+)
+"""
+
+# Dimension rows for names first seen in the upload, in file order; projects are
+# keyed per department. Existing names are filtered out up front rather than left to ON CONFLICT, which would
+# still consume an AUTOINCREMENT id per row.
+RESOLVE_DIMENSIONS = [
+    ("POs", f"""
+        INSERT INTO POs (name)
+        SELECT po FROM {STAGING_TABLE} s
+         WHERE po IS NOT NULL AND NOT EXISTS (SELECT 1 FROM POs WHERE name = s.po)
+         GROUP BY po ORDER BY MIN(s.rowid)
+    """),
+    ("departments", f"""
+        INSERT INTO departments (name, po_id)
+        SELECT s.department, p.id FROM {STAGING_TABLE} s
+          LEFT JOIN POs p ON p.name = s.po
+         WHERE s.rowid IN (SELECT MIN(rowid) FROM {STAGING_TABLE} WHERE department IS NOT NULL GROUP BY department)
+           AND NOT EXISTS (SELECT 1 FROM departments WHERE name = s.department)
+         ORDER BY s.rowid
+    """),
+    ("project_categories", f"""
+        INSERT INTO project_categories (category)
+        SELECT project_category FROM {STAGING_TABLE} s
+         WHERE project_category IS NOT NULL
+           AND NOT EXISTS (SELECT 1 FROM project_categories WHERE category = s.project_category)
+         GROUP BY project_category ORDER BY MIN(s.rowid)
+    """),
+    ("projects", f"""
+        INSERT INTO projects (name, category_id, department_id)
+        SELECT s.project_name, c.id, d.id FROM {STAGING_TABLE} s
+          LEFT JOIN project_categories c ON c.category = s.project_category
+          LEFT JOIN departments d ON d.name = s.department
+         WHERE s.rowid IN (SELECT MIN(rowid) FROM {STAGING_TABLE} WHERE project_name IS NOT NULL
+                            GROUP BY project_name, department)
+           AND NOT EXISTS (SELECT 1 FROM projects WHERE name = s.project_name AND department_id IS d.id)
+         ORDER BY s.rowid
+    """),
+    ("human_resource_categories", f"""
+        INSERT INTO human_resource_categories (name)
+        SELECT hr_category FROM {STAGING_TABLE} s
+         WHERE hr_category IS NOT NULL
+           AND NOT EXISTS (SELECT 1 FROM human_resource_categories WHERE name = s.hr_category)
+         GROUP BY hr_category ORDER BY MIN(s.rowid)
+    """),
+]
+
+
+def _staging_frame(df, table_name):
+    """Rename/cast the upload columns this table needs; other columns (IO, Personnel cost) are ignored."""
+    mapping = STAGING_COLUMNS[table_name]
+    missing = [c for c in mapping if c not in df.columns]
+    if missing:
+        raise KeyError(f"Missing column(s) for {table_name}: {', '.join(missing)}")
+    out = df[list(mapping)].rename(columns=mapping)
+    for col in ['po', 'department', 'project_category', 'project_name', 'hr_category']:
+        if col in out.columns:
+            # same text as the pandas path (astype(str)) but missing stays NULL
+            out[col] = out[col].astype(str).where(out[col].notna(), None)
+    return out
+
+
+def stage_forecasts(cursor, cnxn, source, table_name, chunksize=None):
+    """Bulk-load an upload (DataFrame, path or file object) into the staging table.
+
+    Files are read in chunks, so only one chunk is in memory at a time.
+    Returns the number of staged rows.
+    """
+    cursor.execute(CREATE_STAGING)
+    cursor.execute(f"DELETE FROM {STAGING_TABLE}")
+    if isinstance(source, pd.DataFrame):
+        chunks = [source]
+    else:
+        chunks = pd.read_csv(source, chunksize=chunksize or STAGING_CHUNK_SIZE)
+    staged = 0
+    for chunk in chunks:
+        chunk.columns = [str(c).strip() for c in chunk.columns]
+        rows = _staging_frame(chunk, table_name)
+        staged += bulk_insert_rows(cursor, cnxn, STAGING_TABLE, list(rows.columns),
+                                   dataframe_rows(rows), commit=False)
+    return staged
+
+
+def load_staged_forecasts(cursor, table_name, replace_years=True):
+    """Resolve dimensions and write the staged rows into `table_name`; returns rows written."""
+    dedupe = ", ".join(STAGING_DEDUPE[table_name])
+    cursor.execute(
+        f"DELETE FROM {STAGING_TABLE} WHERE rowid NOT IN (SELECT MIN(rowid) FROM {STAGING_TABLE} GROUP BY {dedupe})"
+    )
+    for dimension, query in RESOLVE_DIMENSIONS:
+        if dimension == "human_resource_categories" and table_name != "project_forecasts_pc":
+            continue
+        cursor.execute(query)
+
+    if replace_years:
+        cursor.execute(
+            f"DELETE FROM {table_name} WHERE fiscal_year IN (SELECT DISTINCT fiscal_year FROM {STAGING_TABLE})"
+        )
+
+    columns = ["PO_id", "department_id", "project_category_id", "project_id", "fiscal_year"]
+    select = ["po.id", "d.id", "p.category_id", "p.id", "s.fiscal_year"]
+    joins = [
+        "LEFT JOIN POs po ON po.name = s.po",
+        "LEFT JOIN departments d ON d.name = s.department",
+        # project names repeat across departments (UQ_projects_key is (name, department_id))
+        "LEFT JOIN projects p ON p.name = s.project_name AND p.department_id IS d.id",
+    ]
+    if table_name == "project_forecasts_pc":
+        columns.append("human_resource_category_id")
+        select.append("h.id")
+        joins.append("LEFT JOIN human_resource_categories h ON h.name = s.hr_category")
+    columns.append(VALUE_COLUMNS[table_name])
+    select.append("s.value")
+    # WHERE true keeps SQLite from reading ON CONFLICT as a join constraint
+    cursor.execute(
+        f"INSERT INTO {table_name} ({', '.join(columns)}) "
+        f"SELECT {', '.join(select)} FROM {STAGING_TABLE} s {' '.join(joins)} "
+        f"WHERE true ORDER BY s.rowid "
+        + conflict_clause(table_unique_keys[table_name], columns)
+    )
+    return cursor.rowcount
+
+
+def upload_forecasts_staged(source, table_name, replace_years=True, chunksize=None):
+    """Upload non-personnel or personnel forecasts through a staging table.
+
+    - source: DataFrame, CSV path or file object in the upload layout
+    - replace_years: delete the table's rows for the fiscal years in the upload
+      first (what the clear-by-year uploaders did); otherwise rows upsert on the
+      natural key
+
+    Staging, dimension creation (set-based INSERT ... SELECT) and the final
+    joined INSERT ... SELECT run in one transaction on one connection, so the
+    upload is applied completely or not at all. Returns the rows written.
+    """
+    conn = cl.connect_local()
+    cursor, cnxn = conn.connect_to_db()
+    try:
+        if not cnxn.in_transaction:
+            cursor.execute("BEGIN IMMEDIATE")
+        stage_forecasts(cursor, cnxn, source, table_name, chunksize)
+        written = load_staged_forecasts(cursor, table_name, replace_years)
+        cursor.execute(f"DROP TABLE IF EXISTS {STAGING_TABLE}")
+        cnxn.commit()
+    except Exception:
+        cnxn.rollback()
+        cursor.execute(f"DROP TABLE IF EXISTS {STAGING_TABLE}")
+        raise
+    invalidate_dimensions('pos', 'departments', 'project_categories', 'projects', 'human_resource_categories')
+    return written
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 import random
 from pathlib import Path
@@ -279,6 +280,188 @@ def save_departments(path=None):
     return df
 
 
+# Volumes produced by generate_tables() (scale=1). synthetic_dataset multiplies
+# the row counts and projects by `scale`; POs and departments grow with
+# sqrt(scale) since organizations add projects far faster than departments.
+BASE_VOLUME = {
+    'pos': 5,
+    'departments': 15,
+    'projects': 75,
+    'years': 4,
+    'project_forecasts_nonpc': 50,
+    'budgets': 50,
+    'fundings': 50,
+    'expenses': 100,
+    'capex_forecasts': 50,
+    'capex_budgets': 50,
+    'capex_expenses': 100,
+}
+FIRST_FISCAL_YEAR = 2022
+
+
+def _distinct_keys(rng, sizes, count):
+    """`count` distinct index tuples drawn from the product of `sizes` (capped by its size)."""
+    total = int(np.prod(sizes))
+    count = min(int(count), total)
+    flat = rng.choice(total, size=count, replace=False)
+    return np.unravel_index(flat, sizes)
+
+
+def _names(prefix, count):
+    width = max(2, len(str(count)))
+    return np.array([f'{prefix}{i:0{width}d}' for i in range(1, count + 1)], dtype=object)
+
+
+def synthetic_dataset(scale=1, pos=None, departments=None, projects=None, years=None, rows=None, seed=0):
+    """Build a consistent synthetic dataset in the upload formats, vectorized.
+
+    - scale: multiplier over BASE_VOLUME; pos/departments/projects/years override
+      the dimension sizes and rows ({table: count}) the row counts.
+    - Every project belongs to one department (and so one PO) and one category,
+      and rows never collide on the uploaders' unique keys: budgets are capped by
+      the (department, year) key space, forecast-like tables by (project, year).
+      Tables other than the forecasts only use projects that have a forecast.
+
+    Returns {name: DataFrame} with the upload tables (same columns as the CSVs in
+    processed_data, project_forecasts_pc without 'Personnel cost'), plus
+    'departments' (Department, PO), 'ios' (IO, Project Name) and 'staff_cost'
+    (Human resource category, year, cost) for the reference tables.
+    """
+    rng = np.random.default_rng(seed)
+    growth = float(np.sqrt(scale))
+    n_pos = pos or max(1, round(BASE_VOLUME['pos'] * growth))
+    n_depts = departments or max(n_pos, round(BASE_VOLUME['departments'] * growth))
+    n_projects = projects or max(1, round(BASE_VOLUME['projects'] * scale))
+    n_years = years or BASE_VOLUME['years']
+    counts = {table: max(1, round(BASE_VOLUME[table] * scale)) for table in BASE_VOLUME
+              if table not in ('pos', 'departments', 'projects', 'years')}
+    counts.update(rows or {})
+
+    po_names = np.array([str(4500100000 + i) for i in range(n_pos)], dtype=object)
+    dept_names = _names('DEPT_', n_depts)
+    project_names = _names('PRJ_', n_projects)
+    fiscal_years = np.arange(FIRST_FISCAL_YEAR, FIRST_FISCAL_YEAR + n_years)
+    # Departments split evenly across POs in contiguous chunks, as dept_to_po_map
+    dept_po = np.arange(n_depts) * n_pos // n_depts
+    project_dept = rng.integers(n_depts, size=n_projects)
+    project_category = np.array(project_categories, dtype=object)[rng.integers(len(project_categories), size=n_projects)]
+    project_io = 2000000000 + np.arange(n_projects)
+
+    def by_project(idx):
+        dept = project_dept[idx]
+        return {'PO': po_names[dept_po[dept]], 'Department': dept_names[dept]}
+
+    def amounts(low, high, count):
+        return rng.uniform(low, high, size=count).round(2)
+
+    def labels(prefix, high, count):
+        return np.char.add(prefix, rng.integers(1, high + 1, size=count).astype(str)).astype(object)
+
+    # Personnel and non-personnel forecasts share their (project, year) keys
+    project_idx, year_idx = _distinct_keys(rng, (n_projects, n_years), counts['project_forecasts_nonpc'])
+    forecast_keys = pd.DataFrame({
+        **by_project(project_idx),
+        'IO': project_io[project_idx],
+        'Project Category': project_category[project_idx],
+        'Project Name': project_names[project_idx],
+        'fiscal_year': fiscal_years[year_idx],
+    })
+    nonpc = forecast_keys[['PO', 'IO', 'Department', 'Project Category', 'Project Name', 'fiscal_year']].copy()
+    nonpc['Non-personnel cost'] = amounts(1000, 10000, len(nonpc))
+    # The other tables refer to projects the forecasts created (uploads drop unknown ones)
+    forecasted = np.unique(project_idx)
+
+    def forecasted_keys(table):
+        idx, year = _distinct_keys(rng, (len(forecasted), n_years), counts[table])
+        return forecasted[idx], year
+    hr = np.array(human_resource_categories, dtype=object)
+    pc = nonpc.drop(columns=['Non-personnel cost']).loc[nonpc.index.repeat(len(hr))].reset_index(drop=True)
+    pc['Human resource category'] = np.tile(hr, len(nonpc))
+    pc['Human resource FTE'] = amounts(1.0, 10.0, len(pc))
+
+    dept_idx, year_idx = _distinct_keys(rng, (n_depts, n_years), counts['budgets'])
+    budgets = pd.DataFrame({
+        'PO': po_names[dept_po[dept_idx]],
+        'Department': dept_names[dept_idx],
+        'fiscal_year': fiscal_years[year_idx],
+        'Human Resources Budget': amounts(50000, 200000, len(dept_idx)),
+        'Non-Human Resources Budget': amounts(20000, 100000, len(dept_idx)),
+    })
+
+    project_idx, year_idx = forecasted_keys('fundings')
+    fundings = pd.DataFrame({
+        **by_project(project_idx),
+        'fiscal_year': fiscal_years[year_idx],
+        'funding': amounts(10000, 50000, len(project_idx)),
+        'funding_from': labels('Source ', 10, len(project_idx)),
+        'funding_for': project_names[project_idx],
+    })
+
+    # Distinct on the expense de-duplication key (department, year, period, order, cost element)
+    project_idx, year_idx, period_idx, element_idx = _distinct_keys(
+        rng, (len(forecasted), n_years, 12, len(cost_elements)), counts['expenses'])
+    project_idx = forecasted[project_idx]
+    expenses = pd.DataFrame({
+        'Department': dept_names[project_dept[project_idx]],
+        'fiscal_year': fiscal_years[year_idx],
+        'from_period': period_idx + 1,
+        'Order': project_io[project_idx],
+        'CO object name': labels('Project ', 100, len(project_idx)),
+        'Cost element': cost_elements['Cost Element'].to_numpy()[element_idx],
+        'Cost element name': cost_elements['Cost element name'].to_numpy()[element_idx],
+        'Val.in rep.cur': amounts(1000, 10000, len(project_idx)),
+        'Name': labels('Expense ', 1000, len(project_idx)),
+    })
+
+    project_idx, year_idx = forecasted_keys('capex_forecasts')
+    capex_forecasts = pd.DataFrame({
+        **by_project(project_idx),
+        'cap_year': fiscal_years[year_idx],
+        'Project name': project_names[project_idx],
+        'capex_description': labels('Capex ', 100, len(project_idx)),
+        'Forecast': amounts(1000, 10000, len(project_idx)),
+        'cost_center': np.array(cost_centers, dtype=object)[rng.integers(len(cost_centers), size=len(project_idx))],
+    })
+
+    project_idx, year_idx = forecasted_keys('capex_budgets')
+    capex_budgets = pd.DataFrame({
+        **by_project(project_idx),
+        'fiscal_year': fiscal_years[year_idx],
+        'for_project': project_names[project_idx],
+        'capex_description': labels('Capex ', 100, len(project_idx)),
+        'budget': amounts(5000, 50000, len(project_idx)),
+    })
+
+    project_idx = forecasted[rng.integers(len(forecasted), size=counts['capex_expenses'])]
+    capex_expenses = pd.DataFrame({
+        **by_project(project_idx),
+        'fiscal_year': fiscal_years[rng.integers(n_years, size=len(project_idx))],
+        'Project Name': project_names[project_idx],
+        'capex_description': labels('Capex ', 100, len(project_idx)),
+        'Project number': rng.integers(100000, 1000000, size=len(project_idx)),
+        'Expense': amounts(1000, 10000, len(project_idx)),
+    })
+
+    staff_cost = pd.DataFrame({
+        'Human resource category': np.repeat(hr, n_years),
+        'year': np.tile(fiscal_years, len(hr)),
+    })
+    staff_cost['cost'] = amounts(20, 120, len(staff_cost))
+
+    return {
+        'departments': pd.DataFrame({'Department': dept_names, 'PO': po_names[dept_po]}),
+        'ios': pd.DataFrame({'IO': project_io[forecasted], 'Project Name': project_names[forecasted]}),
+        'staff_cost': staff_cost,
+        'project_forecasts_nonpc': nonpc,
+        'project_forecasts_pc': pc,
+        'budgets': budgets,
+        'fundings': fundings,
+        'expenses': expenses,
+        'capex_forecasts': capex_forecasts,
+        'capex_budgets': capex_budgets,
+        'capex_expenses': capex_expenses,
+    }
+
 if __name__ == "__main__":
     generate_tables()
     # budgets, fundings = generate_random_budgets(50, save=True)
@@ -0,0 +1,236 @@
+import logging
+import re
+import sqlite3
+import sys
+from backend.table_values import table_unique_keys
+from backend.bulk_insert import measure_columns
+
+INDEX_SCHEMA = "sql/create_tables_local.sql"
+
+logger = logging.getLogger(__name__)
+
+# Indexes replaced by the current plan: plain indexes on natural keys that the
+# UQ_ indexes replaced, and the former name-only key of projects (project
+# names repeat across departments)
+SUPERSEDED_INDEXES = [
+    'idx_project_forecasts_nonpc_key', 'idx_project_forecasts_pc_key', 'idx_budgets_key',
+    'idx_fundings_key', 'idx_capex_forecasts_key', 'idx_capex_budgets_key', 'UQ_projects_name',
+]
+
+# Columns pointing at each dimension table; repointed when duplicate
+# dimension rows are merged by collapse_duplicates.
+DIMENSION_REFERENCES = {
+    'POs': [
+        ('departments', 'po_id'), ('human_resource_cost', 'po_id'), ('project_forecasts_nonpc', 'PO_id'),
+        ('project_forecasts_pc', 'PO_id'), ('budgets', 'po_id'), ('fundings', 'po_id'),
+        ('capex_forecasts', 'po_id'), ('capex_budgets', 'po_id'), ('capex_expenses', 'po_id'),
+    ],
+    'departments': [
+        ('projects', 'department_id'), ('human_resource_cost', 'department_id'),
+        ('project_forecasts_nonpc', 'department_id'), ('project_forecasts_pc', 'department_id'),
+        ('budgets', 'department_id'), ('fundings', 'department_id'), ('expenses', 'department_id'),
+        ('capex_forecasts', 'department_id'), ('capex_budgets', 'department_id'), ('capex_expenses', 'department_id'),
+    ],
+    'project_categories': [
+        ('projects', 'category_id'), ('project_forecasts_nonpc', 'project_category_id'),
+        ('project_forecasts_pc', 'project_category_id'),
+    ],
+    'projects': [
+        ('IOs', 'project_id'), ('project_forecasts_nonpc', 'project_id'), ('project_forecasts_pc', 'project_id'),
+        ('capex_forecasts', 'project_id'), ('capex_budgets', 'project_id'), ('capex_expenses', 'project_id'),
+    ],
+    'IOs': [('expenses', 'io_id'), ('IO_CE_connection', 'IO_id')],
+    'human_resource_categories': [
+        ('human_resource_cost', 'category_id'), ('project_forecasts_pc', 'human_resource_category_id'),
+    ],
+    'co_object_names': [('expenses', 'co_object_id')],
+}
+
+# Hot statements of the edit/delete routes and the index each must use.
+# Parameters are bound as NULL; EXPLAIN QUERY PLAN only needs the shape.
+HOT_STATEMENTS = {
+    'manual_change_forecast nonpc': (
+        "UPDATE project_forecasts_nonpc SET non_personnel_expense = ? "
+        "WHERE PO_id = ? AND department_id = ? AND project_id = ? AND project_category_id = ? AND fiscal_year = ?",
+        'UQ_project_forecasts_nonpc_key'),
+    'manual_change_forecast pc': (
+        "UPDATE project_forecasts_pc SET human_resource_fte = ? "
+        "WHERE PO_id = ? AND department_id = ? AND project_id = ? AND project_category_id = ? AND fiscal_year = ? "
+        "AND human_resource_category_id = ?",
+        'UQ_project_forecasts_pc_key'),
+    'delete forecast nonpc': (
+        "DELETE FROM project_forecasts_nonpc "
+        "WHERE PO_id = ? AND department_id = ? AND project_id = ? AND project_category_id = ? AND fiscal_year = ?",
+        'UQ_project_forecasts_nonpc_key'),
+    'change_capex_forecast': (
+        "UPDATE capex_forecasts SET capex_forecast = ?, cost_center = ? "
+        "WHERE po_id = ? AND department_id = ? AND project_id = ? AND cap_year = ? AND capex_description = ?",
+        'UQ_capex_forecasts_key'),
+    'change_capex_budget': (
+        "UPDATE capex_budgets SET budget = ? WHERE po_id = ? AND department_id = ? AND project_id = ? AND cap_year = ?",
+        'UQ_capex_budgets_key'),
+    'change_budget': (
+        "UPDATE budgets SET human_resource_expense = ?, non_personnel_expense = ? "
+        "WHERE po_id = ? AND department_id = ? AND fiscal_year = ?",
+        'UQ_budgets_key'),
+    'change_funding': (
+        "UPDATE fundings SET funding = ? WHERE po_id = ? AND department_id = ? AND fiscal_year = ?",
+        'UQ_fundings_key'),
+    'change_staff_cost': (
+        "UPDATE human_resource_cost SET cost = ? WHERE po_id = ? AND department_id = ? AND category_id = ? AND year = ?",
+        'idx_human_resource_cost_key'),
+    'clear_table_by_year budgets': (
+        "DELETE FROM budgets WHERE fiscal_year = ?", 'idx_budgets_fiscal_year'),
+    'clear_table_by_year capex_expenses': (
+        "DELETE FROM capex_expenses WHERE cap_year = ?", 'idx_capex_expenses_cap_year'),
+    'delete project expenses': (
+        "DELETE FROM expenses WHERE io_id IN (SELECT id FROM IOs WHERE project_id = ?)", 'idx_expenses_io_id'),
+    'delete project IOs': (
+        "DELETE FROM IOs WHERE project_id = ?", 'idx_IOs_project_id'),
+    'delete project forecasts pc': (
+        "DELETE FROM project_forecasts_pc WHERE project_id = ?", 'idx_project_forecasts_pc_project_id'),
+    'delete project forecasts nonpc': (
+        "DELETE FROM project_forecasts_nonpc WHERE project_id = ?", 'idx_project_forecasts_nonpc_project_id'),
+    'delete project capex forecasts': (
+        "DELETE FROM capex_forecasts WHERE project_id = ?", 'idx_capex_forecasts_project_id'),
+    'delete project capex budgets': (
+        "DELETE FROM capex_budgets WHERE project_id = ?", 'idx_capex_budgets_project_id'),
+    'delete project capex expenses': (
+        "DELETE FROM capex_expenses WHERE project_id = ?", 'idx_capex_expenses_project_id'),
+}
+
+
+def index_statements():
+    """CREATE [UNIQUE] INDEX statements of the index plan declared in the schema file."""
+    with open(INDEX_SCHEMA, 'r') as f:
+        return re.findall(r"^CREATE (?:UNIQUE )?INDEX IF NOT EXISTS .*?;", f.read(), flags=re.MULTILINE)
+
+
+def collapse_duplicates(cursor, table_name):
+    """Merge rows repeating the natural key of `table_name`; returns the number of rows removed.
+
+    Dimension rows keep the lowest id (the one name lookups already resolve to)
+    and references to the removed ids are repointed to it. Fact rows keep the
+    latest row with its measures summed over the duplicates, which is what the
+    display tables showed for them (they aggregate with groupby-sum).
+    Part of the opt-in migration (migrate_duplicates), never run on startup.
+    """
+    keys = ", ".join(table_unique_keys[table_name])
+    references = DIMENSION_REFERENCES.get(table_name)
+    keep = "MIN(id)" if references is not None else "MAX(id)"
+    cursor.execute(
+        f"CREATE TEMP TABLE _duplicate_ids AS "
+        f"SELECT t.id AS old_id, k.keep_id FROM {table_name} t "
+        f"JOIN (SELECT {keys}, {keep} AS keep_id FROM {table_name} GROUP BY {keys} HAVING COUNT(*) > 1) k "
+        f"USING ({keys}) WHERE t.id != k.keep_id"
+    )
+    for ref_table, column in references or []:
+        cursor.execute(
+            f"UPDATE {ref_table} SET {column} = (SELECT keep_id FROM _duplicate_ids WHERE old_id = {column}) "
+            f"WHERE {column} IN (SELECT old_id FROM _duplicate_ids)"
+        )
+    measures = [] if references is not None else measure_columns(table_name)
+    if measures:
+        totals = ", ".join(
+            f"{m} = (SELECT SUM(d.{m}) FROM {table_name} d "
+            f"WHERE d.id = {table_name}.id OR d.id IN (SELECT old_id FROM _duplicate_ids WHERE keep_id = {table_name}.id))"
+            for m in measures
+        )
+        cursor.execute(f"UPDATE {table_name} SET {totals} WHERE id IN (SELECT keep_id FROM _duplicate_ids)")
+    cursor.execute(f"DELETE FROM {table_name} WHERE id IN (SELECT old_id FROM _duplicate_ids)")
+    removed = cursor.rowcount
+    cursor.execute("DROP TABLE _duplicate_ids")
+    return removed
+
+
+def _planned_indexes():
+    """(table, statement) of the index plan, dimensions first (in DIMENSION_REFERENCES order).
+
+    Merging dimensions repoints fact rows, which may in turn duplicate a fact key.
+    """
+    order = list(DIMENSION_REFERENCES)
+    statements = [(re.search(r" ON (\w+)", s).group(1), s) for s in index_statements()]
+    statements.sort(key=lambda item: order.index(item[0]) if item[0] in order else len(order))
+    return statements
+
+
+def ensure_indexes(cursor, cnxn):
+    """Create any index of the plan missing from an existing database (idempotent).
+
+    Never changes data: a unique index that cannot be built because the table
+    holds duplicates of its natural key (rows written before the UQ_ indexes
+    existed) is left out with a warning; until migrate_duplicates has been run,
+    uploads into that table append instead of upserting (see
+    bulk_insert.bulk_upsert). Returns the tables left out.
+    """
+    for name in SUPERSEDED_INDEXES:
+        cursor.execute(f"DROP INDEX IF EXISTS {name}")
+    skipped = []
+    for table_name, statement in _planned_indexes():
+        try:
+            cursor.execute(statement)
+        except sqlite3.IntegrityError:
+            skipped.append(table_name)
+            logger.warning(
+                "%s holds duplicate (%s) rows; its unique index was not created and uploads into it append "
+                "instead of upserting. "
+                "Run `python -m backend.index_plan --collapse-duplicates` to merge them (measures are summed).",
+                table_name, ", ".join(table_unique_keys.get(table_name, [])))
+    cnxn.commit()
+    return skipped
+
+
+def migrate_duplicates(cursor, cnxn):
+    """Opt-in migration: merge duplicate natural keys (see collapse_duplicates), then build the unique indexes.
+
+    Returns {table: rows removed} for the tables that had duplicates.
+    """
+    removed = {}
+    planned = _planned_indexes()
+    # Rebuilt below: merging a dimension repoints fact rows, which must not
+    # trip a fact key index built before
+    unique = [re.search(r"UNIQUE INDEX IF NOT EXISTS (\w+)", s) for _, s in planned]
+    for name in SUPERSEDED_INDEXES + [match.group(1) for match in unique if match]:
+        cursor.execute(f"DROP INDEX IF EXISTS {name}")
+    for table_name, statement in planned:
+        try:
+            cursor.execute(statement)
+        except sqlite3.IntegrityError:
+            removed[table_name] = collapse_duplicates(cursor, table_name)
+            cursor.execute(statement)
+    cnxn.commit()
+    return removed
+
+
+def explain_query_plan(cursor, query):
+    """Return the EXPLAIN QUERY PLAN detail lines of `query`."""
+    cursor.execute(f"EXPLAIN QUERY PLAN {query}", [None] * query.count('?'))
+    return [row[-1] for row in cursor.fetchall()]
+
+
+def check_index_plan(cursor):
+    """EXPLAIN every hot statement and report those not using their index.
+
+    Returns {statement name: plan lines} for the offenders; empty when the
+    plan is in place.
+    """
+    missing = {}
+    for name, (query, index) in HOT_STATEMENTS.items():
+        plan = explain_query_plan(cursor, query)
+        if not any(f"INDEX {index} " in line or line.endswith(f"INDEX {index}") for line in plan):
+            missing[name] = plan
+    return missing
+
+
+if __name__ == "__main__":
+    from backend.connect_local import connect_local, close_connection
+    cursor, cnxn = connect_local().connect_to_db()
+    if '--collapse-duplicates' in sys.argv[1:]:
+        for table_name, count in migrate_duplicates(cursor, cnxn).items():
+            print(f"{table_name}: merged {count} duplicate rows")
+    ensure_indexes(cursor, cnxn)
+    for name, (query, index) in HOT_STATEMENTS.items():
+        print(f"{name}: " + " | ".join(explain_query_plan(cursor, query)))
+    missing = check_index_plan(cursor)
+    print("index plan OK" if not missing else f"not using the planned index: {', '.join(missing)}")
+    close_connection(cursor, cnxn)
@@ -1,4 +1,6 @@
 import pandas as pd
+from backend.bulk_insert import bulk_upsert
+from backend.dimension_cache import invalidate_dimensions
 
 def join_tables(left, right, left_col, right_col, drops, rename_dic):
     """
@@ -29,7 +31,7 @@ def merge_dataframes(cloud, local, columns, merge_on, departments=False):
     Return rows from `local` that are not exact duplicates of any row in `cloud`.
 
     This merges `local` with `cloud` using the full set of target `columns` and
-    keeps only rows that do not have an exact match in `cloud`.
+    keeps only rows that do not have an exact match in `cloud`, each once.
     """
     # Normalize column names on the incoming local DataFrame
     local.columns = columns
@@ -42,14 +44,14 @@ def merge_dataframes(cloud, local, columns, merge_on, departments=False):
 
     # Merge on all columns and use the indicator to find left-only rows
     merged = pd.merge(local, cloud_subset[columns], on=columns, how='left', indicator=True)
-    upload = merged[merged['_merge'] == 'left_only'].drop(columns=['_merge']).reset_index(drop=True)
+    upload = merged[merged['_merge'] == 'left_only'].drop(columns=['_merge']).drop_duplicates().reset_index(drop=True)
     return upload
 
 # Not used, need to check if is used
 def merge_cost_elements(cloud, local, columns, merge_on):
-    # Deduplication intentionally left to caller; preserve incoming rows as-is
+    # One row per new code: repeats would violate UQ_name_id (co_id, name)
     local.columns = columns
-    upload = local[~local[merge_on].isin(cloud[merge_on])]
+    upload = local[~local[merge_on].isin(cloud[merge_on])].drop_duplicates(subset=[merge_on])
     return upload
 
 def merge_departments(cloud, local):
@@ -59,16 +61,5 @@ def merge_departments(cloud, local):
     return upload
 
 def insert_into_departments(cursor, cnxn, dataframe):
-    insert_query = \
-    """
-    INSERT INTO departments (
-    name
-    )
-    VALUES (
-        ?
-    );
-    """
-    for i, row in dataframe.iterrows():
-        values = (row['name'])
-        cursor.execute(insert_query, values)
-        cnxn.commit()
+    bulk_upsert(cursor, cnxn, 'departments', dataframe, update=False, columns=['name'])
+    invalidate_dimensions('departments')
@@ -1,10 +1,11 @@
 
 import pandas as pd
 import sqlite3
-from sqlalchemy import create_engine
 from backend.connect_local import connect_local, close_connection
 from backend.connect_pyodbc import select_all_from_table
-from backend import merge_dataframes, merge_departments, join_tables
+from backend.merge_insert import merge_dataframes, join_tables
+from backend.dimension_cache import invalidate_dimensions
+from backend.bulk_insert import bulk_insert, bulk_upsert, unique_key
 
 
 # Generalized function to add/merge entries into a table, based on the logic from upload_forecasts_nonpc.py
@@ -23,10 +24,8 @@ def add_entry(df_upload, table_name, merge_columns, merge_on):
     conn_obj = connect_local()
     engine, cursor, cnxn = conn_obj.connect_to_db(engine=True)
 
-    # 1. Get current table contents
-    cur_table = select_all_from_table(cursor, cnxn, table_name)
     print(table_name)
-    # 2. Prepare local data for upload
+    # 1. Prepare local data for upload
     local_data = df_upload
     if table_name == 'projects':
         merged_project_category = select_all_from_table(cursor, cnxn, "project_categories")
@@ -131,28 +130,27 @@ def add_entry(df_upload, table_name, merge_columns, merge_on):
         )
         
         local_data = local_data[['po_id', 'department_id',  'project_id', 'cap_year','capex_description', 'approved_budget']]
-    # 3. Merge new data with current table
-    # if table_name == 'departments':
-    #     upload_df = merge_departments(cur_table, local_data)
-    # else:
-    if table_name == 'departments':
-        upload_df = merge_departments(cur_table, local_data)
+    # 2. Upload new data: tables with a natural key skip existing keys in SQL
+    # (ON CONFLICT DO NOTHING); others are merged against the current table
+    if unique_key(table_name):
+        local_data.columns = ['name', 'po_id'] if table_name == 'departments' else merge_columns
+        bulk_upsert(cursor, cnxn, table_name, local_data, update=False)
     else:
         print(merge_on)
+        cur_table = select_all_from_table(cursor, cnxn, table_name)
         upload_df = merge_dataframes(cur_table, local_data, merge_columns, merge_on)
-    # 4. Upload new/merged data to the table
-    upload_df.to_sql(table_name, con=engine, if_exists='append', index=False)
+        bulk_insert(cursor, cnxn, table_name, upload_df)
+    invalidate_dimensions(table_name)
 
-    # 5. Return the merged table for confirmation
+    # 3. Return the merged table for confirmation
     return select_all_from_table(cursor, cnxn, table_name)
 
 
 def add_entry_to_department(df_upload):
     conn_obj = connect_local()
     engine, cursor, cnxn = conn_obj.connect_to_db(engine=True)
-    cur_departments = select_all_from_table(cursor, cnxn, "departments")
-    department_local = df_upload[['Department']]
-    department_upload = merge_departments(cur_departments, department_local)
-
-    return department_upload.to_sql("departments", con=engine, if_exists='append', index=False)
+    department_local = df_upload[['Department']].rename(columns={'Department': 'name'})
+    res = bulk_upsert(cursor, cnxn, "departments", department_local, update=False)
+    invalidate_dimensions('departments')
+    return res
     
@@ -0,0 +1,300 @@
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from backend.request_metrics import count_statement, count_rows
+
+# Statement tracing for both backends: every execute is timed and folded into
+# per-shape totals (the SQL with literals, parameter lists and whitespace
+# normalized), and a statement slower than SLOW_QUERY_MS (execute plus the
+# fetches that follow it) is logged once, with its EXPLAIN QUERY PLAN on SQLite.
+# Served as JSON on /query_stats. Iterating a cursor row by row counts rows but
+# is not timed.
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 100))
+SLOW_QUERY_HISTORY = 50    # most recent slow statements kept for /query_stats
+MAX_STATEMENT_SHAPES = 1000  # further shapes are folded into OTHER_SHAPE
+MAX_SHAPE_LENGTH = 400
+OTHER_SHAPE = '<other>'
+EXPLAINABLE = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+logger = logging.getLogger(__name__)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_COMMENT = re.compile(r"--[^\n]*")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])")
+_SPACE = re.compile(r"\s+")
+_VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+@lru_cache(maxsize=2048)
+def normalize_sql(sql):
+    """Statement shape: literals become ?, `IN (?, ?, ...)` lists collapse to (?...), comments and whitespace go."""
+    shape = _STRING.sub('?', str(sql))
+    shape = _COMMENT.sub(' ', shape)
+    shape = _NUMBER.sub('?', shape)
+    shape = _SPACE.sub(' ', shape).strip()
+    shape = _VALUE_LIST.sub('(?...)', shape)
+    if len(shape) > MAX_SHAPE_LENGTH:
+        shape = shape[:MAX_SHAPE_LENGTH] + '...'
+    return shape
+
+
+class statement_log:
+    """Per-shape call counts and latencies, plus the most recent slow statements."""
+
+    def __init__(self, max_shapes=MAX_STATEMENT_SHAPES):
+        self.max_shapes = max_shapes
+        self._lock = threading.Lock()
+        self._shapes = {}  # shape -> [calls, total seconds, max seconds, rows]
+        self._slow = deque(maxlen=SLOW_QUERY_HISTORY)
+
+    def _entry(self, shape):
+        entry = self._shapes.get(shape)
+        if entry is None:
+            if len(self._shapes) >= self.max_shapes:
+                shape = OTHER_SHAPE
+                entry = self._shapes.get(shape)
+            if entry is None:
+                entry = self._shapes[shape] = [0, 0.0, 0.0, 0]
+        return entry
+
+    def executed(self, shape, seconds):
+        with self._lock:
+            entry = self._entry(shape)
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+    def fetched(self, shape, seconds, rows):
+        with self._lock:
+            entry = self._entry(shape)
+            entry[1] += seconds
+            entry[3] += rows
+
+    def slow(self, record):
+        with self._lock:
+            self._slow.append(record)
+
+    def stats(self, limit=50):
+        with self._lock:
+            shapes = [(shape, list(entry)) for shape, entry in self._shapes.items()]
+            slow = list(self._slow)
+        shapes.sort(key=lambda item: -item[1][1])
+        return {
+            'slow_query_ms': SLOW_QUERY_MS,
+            'shapes': len(shapes),
+            'statements': [{
+                'sql': shape,
+                'calls': calls,
+                'total_ms': round(total * 1000, 3),
+                'mean_ms': round(total * 1000 / calls, 3) if calls else None,
+                'max_ms': round(longest * 1000, 3),
+                'rows': rows,
+            } for shape, (calls, total, longest, rows) in shapes[:limit]],
+            'slow': slow[::-1],
+        }
+
+    def reset(self):
+        with self._lock:
+            self._shapes.clear()
+            self._slow.clear()
+
+
+_log = statement_log()
+
+
+def explain_sqlite(connection, sql, params):
+    """EXPLAIN QUERY PLAN lines of `sql` (None when it cannot be explained)."""
+    if params is None or not str(sql).lstrip().upper().startswith(EXPLAINABLE):
+        return None
+    try:
+        rows = connection.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    except Exception:
+        return None
+    return [row[-1] for row in rows]
+
+
+class statement_tracer:
+    """Times the statements of one cursor; shared by the SQLite and pyodbc cursors.
+
+    `explain(sql, params)` returns the plan logged with slow statements (None
+    when the backend has none to offer).
+    """
+
+    def __init__(self, explain=None):
+        self.explain = explain
+        self._current = None  # [shape, sql, params, seconds so far, logged]
+
+    def executed(self, sql, params, seconds):
+        shape = normalize_sql(sql)
+        _log.executed(shape, seconds)
+        self._current = [shape, sql, params, seconds, False]
+        self._check_slow()
+
+    def fetched(self, rows, seconds):
+        current = self._current
+        if current is None:
+            return
+        current[3] += seconds
+        _log.fetched(current[0], seconds, rows)
+        self._check_slow()
+
+    def _check_slow(self):
+        shape, sql, params, seconds, logged = self._current
+        if logged or seconds * 1000 < SLOW_QUERY_MS:
+            return
+        self._current[4] = True
+        plan = self.explain(sql, params) if self.explain is not None else None
+        _log.slow({
+            'at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'ms': round(seconds * 1000, 3),
+            'sql': shape,
+            'plan': plan,
+        })
+        logger.warning("slow query (%.1f ms): %s%s", seconds * 1000, shape,
+                       ''.join(f"\n    {line}" for line in plan or []))
+
+
+class traced_sqlite_cursor(sqlite3.Cursor):
+    """sqlite3 cursor of the pooled connections: traced, and counted for the request metrics.
+
+    executemany()/executescript() are timed as one statement and not
+    explained. Tracing per execute call rather than per executed row (a
+    sqlite trace callback) keeps bulk uploads fast. `owner` is the
+    pooled_connection handing out the cursor; executescript() raises while
+    it has a savepoint set (sqlite3 commits before running a script).
+    """
+
+    owner = None
+
+    def __init__(self, connection):
+        super().__init__(connection)
+        self._tracer = statement_tracer(self._explain)
+
+    def _explain(self, sql, params):
+        return explain_sqlite(self.connection, sql, params)
+
+    def execute(self, sql, parameters=()):
+        count_statement()
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._tracer.executed(sql, parameters, time.perf_counter() - started)
+
+    def executemany(self, sql, seq_of_parameters):
+        count_statement()
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._tracer.executed(sql, None, time.perf_counter() - started)
+
+    def executescript(self, script):
+        if self.owner is not None and self.owner.savepoint is not None:
+            raise sqlite3.ProgrammingError(
+                f"executescript() would commit and end savepoint {self.owner.savepoint}; use execute()")
+        count_statement()
+        started = time.perf_counter()
+        try:
+            return super().executescript(script)
+        finally:
+            self._tracer.executed(script, None, time.perf_counter() - started)
+
+    def _fetch(self, method, *args):
+        started = time.perf_counter()
+        rows = method(*args)
+        count = len(rows) if isinstance(rows, list) else int(rows is not None)
+        count_rows(count)
+        self._tracer.fetched(count, time.perf_counter() - started)
+        return rows
+
+    def fetchone(self):
+        return self._fetch(super().fetchone)
+
+    def fetchmany(self, *args):
+        return self._fetch(super().fetchmany, *args)
+
+    def fetchall(self):
+        return self._fetch(super().fetchall)
+
+    def __next__(self):
+        row = super().__next__()
+        count_rows(1)
+        return row
+
+
+class traced_cursor:
+    """Traced proxy around a DB-API cursor that cannot be subclassed (pyodbc).
+
+    Everything not traced is delegated to the wrapped cursor; execute returns
+    the proxy so chained cursor.execute(...).fetchall() keeps being traced.
+    """
+
+    def __init__(self, cursor, explain=None):
+        self._cursor = cursor
+        self._tracer = statement_tracer(explain)
+
+    def execute(self, sql, *params):
+        count_statement()
+        started = time.perf_counter()
+        try:
+            self._cursor.execute(sql, *params)
+        finally:
+            self._tracer.executed(sql, params, time.perf_counter() - started)
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        count_statement()
+        started = time.perf_counter()
+        try:
+            self._cursor.executemany(sql, seq_of_parameters)
+        finally:
+            self._tracer.executed(sql, None, time.perf_counter() - started)
+        return self
+
+    def _fetch(self, method, *args):
+        started = time.perf_counter()
+        rows = method(*args)
+        count = len(rows) if isinstance(rows, list) else int(rows is not None)
+        count_rows(count)
+        self._tracer.fetched(count, time.perf_counter() - started)
+        return rows
+
+    def fetchone(self):
+        return self._fetch(self._cursor.fetchone)
+
+    def fetchmany(self, *args):
+        return self._fetch(self._cursor.fetchmany, *args)
+
+    def fetchall(self):
+        return self._fetch(self._cursor.fetchall)
+
+    def fetchval(self):
+        return self._fetch(self._cursor.fetchval)
+
+    def __iter__(self):
+        for row in self._cursor:
+            count_rows(1)
+            yield row
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def set_slow_query_threshold(ms):
+    global SLOW_QUERY_MS
+    SLOW_QUERY_MS = float(ms)
+
+
+def get_query_stats(limit=50):
+    """Statement shapes by total time (calls, total/mean/max ms, rows) and the recent slow statements."""
+    return _log.stats(limit)
+
+
+def reset_query_stats():
+    _log.reset()
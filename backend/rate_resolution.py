@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+from backend.connect_local import typed_frame
+from backend.table_values import table_dtypes
+
+# Hierarchical staff-rate fallback, most specific first.
+RATE_LEVELS = [
+	('po_id', 'department_id', 'category_id', 'year'),
+	('department_id', 'category_id', 'year'),
+	('po_id', 'category_id', 'year'),
+	('category_id', 'year'),
+]
+RATE_KEYS = list(RATE_LEVELS[0])
+
+
+def _as_int(series):
+	"""Coerce a key column to nullable Int64 (non-numeric values become <NA>)."""
+	return pd.to_numeric(series, errors='coerce').astype('Int64')
+
+
+def load_rate_table(cursor, category_ids=None, years=None):
+	"""Read human_resource_cost into a DataFrame keyed for rate resolution.
+
+	Optionally restricts the read to the given category ids / years so single lookups
+	do not pull the whole table. Rows without a category, year or cost are dropped and
+	the remaining rows are ordered by id, so 'last' means most recently inserted.
+	"""
+	query = "SELECT id, po_id, department_id, category_id, year, cost FROM human_resource_cost"
+	clauses, params = [], []
+	for col, values in (('category_id', category_ids), ('year', years)):
+		if values is not None:
+			values = [int(v) for v in values if v is not None and not pd.isna(v)]
+			if not values:
+				return typed_frame([], ['id'] + RATE_KEYS + ['cost'], table_dtypes['human_resource_cost'])
+			clauses.append(f"{col} IN ({','.join('?' * len(values))})")
+			params.extend(values)
+	if clauses:
+		query += " WHERE " + " AND ".join(clauses)
+	cursor.execute(query + " ORDER BY id", params)
+	rates = typed_frame(cursor.fetchall(), ['id'] + RATE_KEYS + ['cost'], table_dtypes['human_resource_cost'])
+	return rates.dropna(subset=['category_id', 'year', 'cost']).reset_index(drop=True)
+
+
+def build_rate_levels(rates):
+	"""Return one de-duplicated lookup frame per fallback level (latest row per key wins)."""
+	levels = []
+	for level in RATE_LEVELS:
+		cols = list(level)
+		frame = rates.dropna(subset=cols)[cols + ['cost']]
+		frame = frame.drop_duplicates(subset=cols, keep='last').rename(columns={'cost': '_rate'})
+		levels.append((cols, frame))
+	return levels
+
+
+def resolve_rates(keys, rates=None, cursor=None, strict=False, po_col='po_id',
+		department_col='department_id', category_col='category_id', year_col='year'):
+	"""Resolve the unit staff rate for every row of `keys` in a few vectorized merges.
+
+	- keys: DataFrame holding the po / department / category / year id columns (names configurable)
+	- rates: output of load_rate_table; read through `cursor` when omitted
+	- strict: only the exact (po, department, category, year) level is consulted
+	Returns a float Series aligned with keys.index (NaN where no rate applies).
+	"""
+	if rates is None:
+		rates = load_rate_table(cursor)
+	work = pd.DataFrame({
+		'po_id': _as_int(keys[po_col]) if po_col in keys else pd.Series(pd.NA, index=keys.index, dtype='Int64'),
+		'department_id': _as_int(keys[department_col]) if department_col in keys else pd.Series(pd.NA, index=keys.index, dtype='Int64'),
+		'category_id': _as_int(keys[category_col]),
+		'year': _as_int(keys[year_col]),
+	}).reset_index(drop=True)
+	result = np.full(len(work), np.nan)
+	if rates.empty or work.empty:
+		return pd.Series(result, index=keys.index, dtype='float64')
+
+	levels = build_rate_levels(rates)
+	if strict:
+		levels = levels[:1]
+	for cols, frame in levels:
+		pending = np.isnan(result) & work[cols].notna().all(axis=1).to_numpy()
+		if not pending.any():
+			continue
+		matched = work.loc[pending, cols].merge(frame, on=cols, how='left')
+		result[pending] = matched['_rate'].to_numpy(dtype='float64', na_value=np.nan)
+	return pd.Series(result, index=keys.index, dtype='float64')
+
+
+def resolve_rate(cursor, po_id, department_id, category_id, year, strict=False):
+	"""Resolve a single unit rate through resolve_rates; returns a float or None."""
+	if category_id is None or year is None:
+		return None
+	rates = load_rate_table(cursor, category_ids=[category_id], years=[year])
+	keys = pd.DataFrame([{'po_id': po_id, 'department_id': department_id, 'category_id': category_id, 'year': year}])
+	rate = resolve_rates(keys, rates, strict=strict).iloc[0]
+	return None if pd.isna(rate) else float(rate)
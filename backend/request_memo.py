@@ -0,0 +1,71 @@
+import threading
+from functools import wraps
+from backend.connect_local import connect_local
+
+# Per-thread memo of display builder results and the dimension snapshots they
+# read. A scope is opened at the start of
+# each request and dropped on teardown (see app_local/__init__.py); outside a
+# scope (scripts, tests) builders run uncached.
+_local = threading.local()
+
+
+def open_request_memo():
+    """Start an empty memo for the current thread's request."""
+    _local.memo = {}
+
+
+def close_request_memo(exc=None):
+    """Drop the current thread's memo; registered as a Flask teardown handler."""
+    _local.memo = None
+
+
+def clear_request_memo():
+    """Forget everything memoized so far in the current request (keeps the scope open)."""
+    memo = getattr(_local, 'memo', None)
+    if memo:
+        memo.clear()
+
+
+def _write_version():
+    # Every builder in a request shares the thread's pooled connection, so its
+    # total_changes moves whenever the request itself has written something.
+    cursor, cnxn = connect_local().connect_to_db()
+    return cnxn.total_changes
+
+
+def _copy(value):
+    return value.copy() if hasattr(value, 'copy') else value
+
+
+def request_cached(key, compute):
+    """Return the request's memoized value for `key`, calling `compute()` on a miss.
+
+    Without an open memo this is just compute(). A hit is only served while the
+    request has not written to the database since the value was computed.
+    """
+    memo = getattr(_local, 'memo', None)
+    if memo is None:
+        return compute()
+    version = _write_version()
+    hit = memo.get(key)
+    if hit is not None and hit[0] == version:
+        return hit[1]
+    value = compute()
+    memo[key] = (version, value)
+    return value
+
+
+def request_memoized(func):
+    """Compute `func(*args)` at most once per request (see request_cached).
+
+    Each caller gets its own copy, so mutating a returned DataFrame is safe.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        key = (func.__module__, func.__qualname__, args, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            return func(*args, **kwargs)
+        return _copy(request_cached(key, lambda: func(*args, **kwargs)))
+    return wrapper
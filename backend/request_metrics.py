@@ -0,0 +1,195 @@
+import cProfile
+import os
+import pstats
+import re
+import threading
+import time
+from bisect import bisect_left
+
+# Per-request instrumentation: latency, SQL statements and rows fetched per
+# endpoint, and time spent in the display builders, rendered in the Prometheus
+# text format by render_metrics() (served on /metrics). Statements and rows are
+# counted by the traced cursors of backend.query_trace (and by an event on the
+# shared engine), so nothing has to be threaded through the call sites. Work the request hands to
+# another thread (the write queue, upload jobs) is not attributed to it.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000)
+ROW_BUCKETS = (10, 100, 1000, 10000, 100000, 1000000)
+
+# Opt-in cProfile dumps: with PROFILE_DIR set every request is profiled and the
+# ones slower than PROFILE_SLOW_MS are written there (<time>_<endpoint>_<ms>ms.prof
+# plus a .txt of the top functions). cProfile can only run once per process, so
+# requests overlapping a profiled one are not profiled.
+PROFILE_DIR = os.environ.get('PROFILE_DIR')
+PROFILE_SLOW_MS = float(os.environ.get('PROFILE_SLOW_MS', 500))
+PROFILE_TOP_FUNCTIONS = 40
+
+METRICS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class histogram:
+    """Cumulative-bucket histogram per label set, in the Prometheus sense."""
+
+    def __init__(self, name, help, label_names, buckets):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {labels: (list(counts), total, n) for labels, (counts, total, n) in self._series.items()}
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, n) in sorted(self.snapshot().items()):
+            pairs = [f'{k}="{_escape(v)}"' for k, v in zip(self.label_names, labels)]
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                le = 'le="' + (bound if bound == '+Inf' else f'{bound:g}') + '"'
+                lines.append(f"{self.name}_bucket{{{','.join(pairs + [le])}}} {cumulative}")
+            selector = '{' + ','.join(pairs) + '}' if pairs else ''
+            lines.append(f"{self.name}_sum{selector} {total:.6g}")
+            lines.append(f"{self.name}_count{selector} {n}")
+        return lines
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+REQUEST_SECONDS = histogram('http_request_duration_seconds', 'Request latency by endpoint.',
+                            ('endpoint', 'method', 'status'), LATENCY_BUCKETS)
+REQUEST_STATEMENTS = histogram('http_request_sql_statements', 'SQL statements executed per request.',
+                               ('endpoint',), STATEMENT_BUCKETS)
+REQUEST_ROWS = histogram('http_request_sql_rows_fetched', 'Rows fetched from SQLite per request.',
+                         ('endpoint',), ROW_BUCKETS)
+BUILDER_SECONDS = histogram('display_builder_duration_seconds',
+                            'Time in display builders; cache is hit, miss or bypass (not cacheable).',
+                            ('builder', 'cache'), LATENCY_BUCKETS)
+METRICS = [REQUEST_SECONDS, REQUEST_STATEMENTS, REQUEST_ROWS, BUILDER_SECONDS]
+
+_local = threading.local()
+_profile_lock = threading.Lock()
+
+
+class request_record:
+    """Counters of the request running on the current thread."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.rows = 0
+        self.builders = {}
+        self.profiler = None
+
+
+def count_statement(*args):
+    """Count one statement for the current request (also a SQLAlchemy before_cursor_execute listener)."""
+    record = getattr(_local, 'request', None)
+    if record is not None:
+        record.statements += 1
+
+
+def count_rows(rows):
+    record = getattr(_local, 'request', None)
+    if record is not None:
+        record.rows += rows
+
+
+def observe_builder(name, seconds, cache):
+    """Record one display builder call (cache: 'hit', 'miss' or 'bypass')."""
+    BUILDER_SECONDS.observe((name, cache), seconds)
+    record = getattr(_local, 'request', None)
+    if record is not None:
+        record.builders[name] = record.builders.get(name, 0.0) + seconds
+
+
+def set_profiling(directory, slow_ms=None):
+    """Enable (a directory) or disable (None) the slow request cProfile dumps."""
+    global PROFILE_DIR, PROFILE_SLOW_MS
+    PROFILE_DIR = directory
+    if slow_ms is not None:
+        PROFILE_SLOW_MS = float(slow_ms)
+
+
+def start_request_metrics():
+    """Open the current thread's request record; registered as a Flask before_request handler."""
+    record = _local.request = request_record()
+    if PROFILE_DIR and _profile_lock.acquire(blocking=False):
+        record.profiler = cProfile.Profile()
+        try:
+            record.profiler.enable()
+        except ValueError:  # another profiler (e.g. a debugger) is active
+            record.profiler = None
+            _profile_lock.release()
+    return None
+
+
+def finish_request_metrics(endpoint, method, status):
+    """Close the current request record and fold it into the metrics.
+
+    Returns the record (None when no request was open, e.g. a second call for
+    the same request).
+    """
+    record = getattr(_local, 'request', None)
+    if record is None:
+        return None
+    _local.request = None
+    elapsed = time.perf_counter() - record.started
+    if record.profiler is not None:
+        record.profiler.disable()
+        _profile_lock.release()
+        if elapsed * 1000 >= PROFILE_SLOW_MS:
+            _dump_profile(record, endpoint, elapsed)
+    endpoint = endpoint or 'unmatched'
+    REQUEST_SECONDS.observe((endpoint, method, str(status)), elapsed)
+    REQUEST_STATEMENTS.observe((endpoint,), record.statements)
+    REQUEST_ROWS.observe((endpoint,), record.rows)
+    return record
+
+
+def _dump_profile(record, endpoint, elapsed):
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        name = re.sub(r'[^A-Za-z0-9_.-]+', '_', endpoint or 'unmatched')
+        path = os.path.join(PROFILE_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}_{name}_{elapsed * 1000:.0f}ms")
+        record.profiler.dump_stats(path + '.prof')
+        with open(path + '.txt', 'w') as out:
+            out.write(f"{endpoint}: {elapsed * 1000:.1f} ms, {record.statements} SQL statements, "
+                      f"{record.rows} rows fetched\n")
+            for builder, seconds in sorted(record.builders.items(), key=lambda item: -item[1]):
+                out.write(f"  {builder}: {seconds * 1000:.1f} ms\n")
+            out.write("\n")
+            pstats.Stats(record.profiler, stream=out).sort_stats('cumulative').print_stats(PROFILE_TOP_FUNCTIONS)
+    except OSError:
+        pass
+
+
+def render_metrics():
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+def reset_metrics():
+    for metric in METRICS:
+        metric.reset()
@@ -0,0 +1,88 @@
+import pandas as pd
+from backend.connect_local import connect_local
+from backend.dimension_cache import get_dimension, select_dimension
+from backend.request_memo import request_memoized
+from backend.display_cache import display_cached
+
+# Typed frames behind the summary pages' dropdowns. Column names are fixed here
+# once (no per-call column discovery) and every key is a nullable integer id, so
+# filtering is an isin() on ids instead of string-cast comparisons of names.
+DEPARTMENT_COLUMNS = ['department_id', 'department_name', 'po_id', 'po_name']
+PROJECT_COLUMNS = ['project_id', 'project_name', 'department_id', 'po_id']
+
+
+def is_selected(value):
+    return value not in (None, '', 'All')
+
+
+def ids_for_name(table, name, cursor=None, cnxn=None):
+    """Ids whose display name equals `name` (string comparison, like the display filters)."""
+    entry = get_dimension(table, cursor, cnxn)
+    return [int(i) for i, n in entry.id_to_name.items() if str(n) == str(name)]
+
+
+def _ids(series):
+    return pd.to_numeric(series, errors='coerce').astype('Int64')
+
+
+@request_memoized
+@display_cached('departments', 'pos')
+def summary_departments():
+    """Departments with their PO: department_id, department_name, po_id, po_name (table order)."""
+    cursor, cnxn = connect_local().connect_to_db()
+    depts = select_dimension(cursor, cnxn, 'departments')
+    pos = get_dimension('pos', cursor, cnxn)
+    out = pd.DataFrame({
+        'department_id': _ids(depts['id']),
+        'department_name': depts['name'],
+        'po_id': _ids(depts['po_id']) if 'po_id' in depts.columns else pd.Series(pd.NA, index=depts.index, dtype='Int64'),
+    })
+    out['po_name'] = out['po_id'].map(pos.id_to_name)
+    return out[DEPARTMENT_COLUMNS].reset_index(drop=True)
+
+
+@request_memoized
+@display_cached('projects', 'departments')
+def summary_projects():
+    """Projects with the department and PO (through the department) they belong to."""
+    cursor, cnxn = connect_local().connect_to_db()
+    projects = select_dimension(cursor, cnxn, 'projects')
+    out = pd.DataFrame({
+        'project_id': _ids(projects['id']),
+        'project_name': projects['name'],
+        'department_id': _ids(projects['department_id']),
+    })
+    departments = summary_departments()
+    out['po_id'] = out['department_id'].map(dict(zip(departments['department_id'], departments['po_id']))).astype('Int64')
+    return out[PROJECT_COLUMNS].reset_index(drop=True)
+
+
+def po_options(cursor=None, cnxn=None):
+    """[{'id', 'name'}] for the PO dropdown."""
+    entry = get_dimension('pos', cursor, cnxn)
+    return [{'id': int(i) if pd.notna(i) else None, 'name': n} for i, n in entry.id_to_name.items()]
+
+
+def department_options(po=None, cursor=None, cnxn=None):
+    """[{'id', 'name', 'po_name'}] for the department dropdown, restricted to `po` when selected."""
+    frame = summary_departments()
+    if is_selected(po):
+        frame = frame[frame['po_id'].isin(ids_for_name('pos', po, cursor, cnxn))]
+    return [{'id': int(i), 'name': n, 'po_name': p if pd.notna(p) else None}
+            for i, n, p in zip(frame['department_id'], frame['department_name'], frame['po_name'])]
+
+
+def project_options(po=None, department=None, cursor=None, cnxn=None):
+    """[{'name'}] of distinct project names under the selected PO and department."""
+    frame = summary_projects()
+    if is_selected(po):
+        frame = frame[frame['po_id'].isin(ids_for_name('pos', po, cursor, cnxn))]
+    if is_selected(department):
+        frame = frame[frame['department_id'].isin(ids_for_name('departments', department, cursor, cnxn))]
+    return [{'name': name} for name in frame['project_name'].dropna().unique()]
+
+
+def departments_of_pos(po_ids):
+    """Department ids whose po_id is one of `po_ids` (expenses carry no PO of their own)."""
+    frame = summary_departments()
+    return [int(d) for d in frame.loc[frame['po_id'].isin(list(po_ids)), 'department_id']]
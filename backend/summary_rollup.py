@@ -0,0 +1,53 @@
+import re
+
+ROLLUP_SCHEMA = "sql/rollup_tables_local.sql"
+ROLLUP_REBUILD = "sql/rebuild_rollup_local.sql"
+ROLLUP_TABLES = ('summary_rollup', 'summary_rollup_fte')
+
+
+def _read(path):
+    with open(path, 'r') as f:
+        return f.read()
+
+
+_expected = None
+
+
+def _expected_objects():
+    """Names of the rollup tables and maintenance triggers declared in the schema file."""
+    global _expected
+    if _expected is None:
+        triggers = re.findall(r"CREATE TRIGGER IF NOT EXISTS (\w+)", _read(ROLLUP_SCHEMA))
+        _expected = set(ROLLUP_TABLES) | set(triggers)
+    return _expected
+
+
+def create_rollup(cursor, cnxn):
+    """Create the rollup tables/triggers and fill them from the base tables."""
+    cursor.executescript(_read(ROLLUP_SCHEMA))
+    rebuild_rollup(cursor, cnxn)
+
+
+def rebuild_rollup(cursor, cnxn):
+    """Recompute summary_rollup / summary_rollup_fte from scratch in one transaction."""
+    cursor.executescript("BEGIN;\n" + _read(ROLLUP_REBUILD) + "\nCOMMIT;")
+    cnxn.commit()
+
+
+def ensure_rollup(cursor, cnxn):
+    """Make sure the rollup and every trigger maintaining it exist.
+
+    A database created before the rollup, or one whose fact tables were rebuilt by
+    alter_tables (dropping their triggers), is repaired and recomputed here.
+    Returns True when a rebuild was needed.
+    """
+    expected = _expected_objects()
+    cursor.execute(
+        f"SELECT name FROM sqlite_master WHERE name IN ({','.join('?' * len(expected))})",
+        sorted(expected)
+    )
+    present = {row[0] for row in cursor.fetchall()}
+    if present >= expected:
+        return False
+    create_rollup(cursor, cnxn)
+    return True
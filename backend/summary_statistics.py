@@ -0,0 +1,176 @@
+import pandas as pd
+from backend.connect_local import connect_local
+from backend.rate_resolution import load_rate_table, resolve_rates
+from backend.display_cache import display_cache
+from backend.table_versions import table_versions
+from backend.summary_frames import is_selected, ids_for_name, departments_of_pos
+
+# Memory cap of the per-filter statistics cache (results are small dicts)
+STATISTICS_CACHE_MAX_BYTES = 4 * 1024 * 1024
+
+# Cost elements whose code starts with this prefix are personnel expenses
+# (the rollup triggers in sql/rollup_tables_local.sql apply the same rule).
+PERSONNEL_COST_ELEMENT_PREFIX = '94'
+
+# summary_rollup columns totalled by compute_statistics, by how the PO filter applies
+PO_TOTALS = ['non_personnel_forecast', 'personnel_budget', 'non_personnel_budget', 'funding',
+             'capex_forecast', 'capex_budget', 'capex_expense']
+EXPENSE_TOTALS = ['actual_expense', 'personnel_expense']
+
+
+class statistics_filter:
+    """Selected PO / department / fiscal year / project resolved once to id sets for SQL filtering."""
+
+    def __init__(self, cursor, cnxn, po=None, department=None, fiscal_year=None, project=None):
+        self.po_ids = ids_for_name('pos', po, cursor, cnxn) if is_selected(po) else None
+        self.dept_ids = ids_for_name('departments', department, cursor, cnxn) if is_selected(department) else None
+        self.project_ids = ids_for_name('projects', project, cursor, cnxn) if is_selected(project) else None
+        self.po_dept_ids = departments_of_pos(self.po_ids) if self.po_ids is not None else None
+        self.fiscal_year = None
+        self.empty = False
+        if is_selected(fiscal_year):
+            try:
+                self.fiscal_year = int(str(fiscal_year).strip())
+                # the display filters compare text, so '2025.0' or ' 2025' never matched
+                self.empty = str(self.fiscal_year) != str(fiscal_year)
+            except ValueError:
+                self.empty = True
+
+    def po_condition(self, alias, po_via_department, params):
+        """SQL condition for the PO selection (None when no PO is selected)."""
+        if self.po_ids is None:
+            return None
+        col, ids = ('department_id', self.po_dept_ids) if po_via_department else ('po_id', self.po_ids)
+        return _in_clause(f"{alias}.{col}", ids, params)
+
+    def where(self, alias, po_via_department=False, po=True):
+        """Return (sql, params) restricting rollup rows `alias` to the selection.
+
+        po=False leaves the PO selection out (see compute_statistics).
+        """
+        clauses, params = [], []
+        if po and self.po_ids is not None:
+            clauses.append(self.po_condition(alias, po_via_department, params))
+        if self.dept_ids is not None:
+            clauses.append(_in_clause(f"{alias}.department_id", self.dept_ids, params))
+        if self.project_ids is not None:
+            clauses.append(_in_clause(f"{alias}.project_id", self.project_ids, params))
+        if self.fiscal_year is not None:
+            clauses.append(f"{alias}.fiscal_year = ?")
+            params.append(self.fiscal_year)
+        if self.empty:
+            clauses.append("0")
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def _in_clause(column, ids, params):
+    if not ids:
+        return "0"
+    params.extend(ids)
+    return f"{column} IN ({','.join('?' * len(ids))})"
+
+
+def _scalar(cursor, query, params):
+    cursor.execute(query, params)
+    row = cursor.fetchone()
+    return [float(v) if v is not None else 0.0 for v in row] if row else [0.0]
+
+
+def personnel_forecast_total(cursor, flt):
+    """Sum of unit rate * FTE over the selection, priced per rollup group."""
+    where, params = flt.where('r')
+    cursor.execute(
+        "SELECT NULLIF(r.po_id, 0), NULLIF(r.department_id, 0), r.category_id, r.fiscal_year, SUM(r.fte) "
+        "FROM summary_rollup_fte r "
+        "JOIN human_resource_categories hc ON hc.id = r.category_id"
+        + where + (" AND " if where else " WHERE ") + "r.fiscal_year != 0 "
+        "GROUP BY r.po_id, r.department_id, r.category_id, r.fiscal_year",
+        params
+    )
+    groups = pd.DataFrame.from_records(cursor.fetchall(), columns=['po_id', 'department_id', 'category_id', 'year', 'fte'])
+    if groups.empty:
+        return 0.0
+    rates = load_rate_table(cursor, category_ids=groups['category_id'].unique(), years=groups['year'].unique())
+    cost = resolve_rates(groups, rates) * pd.to_numeric(groups['fte'], errors='coerce')
+    return float(cost.sum())
+
+
+def compute_statistics(po=None, department=None, fiscal_year=None, project=None, cursor=None, cnxn=None):
+    """Aggregate forecast, budget, funding, expense and capex totals for the selection.
+
+    Figures are read from the summary_rollup tables (one row per PO x department x
+    fiscal year x project, kept current by triggers), so the cost is independent of
+    the size of the fact tables. Budgets and fundings carry no project and drop out
+    when a project is selected. Keys and rounding match /data_summary/get_statistics.
+    """
+    if cursor is None:
+        cursor, cnxn = connect_local().connect_to_db()
+    flt = statistics_filter(cursor, cnxn, po, department, fiscal_year, project)
+
+    # One pass over the rollup for every total. Expenses are stored without a
+    # PO, so the PO selection goes through their department: both forms of the
+    # PO condition are evaluated per row and pick the columns they apply to.
+    params = []
+    by_po = flt.po_condition('r', False, params) or "1"
+    by_department = flt.po_condition('r', True, params) or "1"
+    where, where_params = flt.where('r', po=False)
+    (non_personnel_forecast, personnel_budget, non_personnel_budget, funding,
+     capex_forecast, capex_budget, capex_expense, actual_expense, personnel_expense) = _scalar(
+        cursor,
+        "SELECT " + ", ".join(f"TOTAL(CASE WHEN s.by_po THEN s.{c} END)" for c in PO_TOTALS) + ", "
+        + ", ".join(f"TOTAL(CASE WHEN s.by_department THEN s.{c} END)" for c in EXPENSE_TOTALS)
+        + f" FROM (SELECT r.*, ({by_po}) AS by_po, ({by_department}) AS by_department FROM summary_rollup r{where}) s",
+        params + where_params
+    )
+    personnel_forecast = personnel_forecast_total(cursor, flt)
+
+    total_forecast = non_personnel_forecast + personnel_forecast
+    budget = personnel_budget + non_personnel_budget
+    return {
+        'non_personnel_forecast': round(non_personnel_forecast, 2),
+        'personnel_forecast': round(personnel_forecast, 2),
+        'total_forecast': round(total_forecast, 2),
+        'personnel budget': round(personnel_budget, 2),
+        'non personnel budget': round(non_personnel_budget, 2),
+        'budget': round(budget, 2),
+        'funding': round(funding, 2),
+        'total_budget and funding': round(budget + funding, 2),
+        'Total Expense': round(actual_expense, 2),
+        'Personnel Expense': round(personnel_expense, 2),
+        'Non-personnel Expense': round(max(0.0, actual_expense - personnel_expense), 2),
+        'capex_forecast': round(capex_forecast, 2),
+        'capex_budget': round(capex_budget, 2),
+        'capex_expense': round(capex_expense, 2),
+    }
+
+
+_statistics_cache = display_cache(max_bytes=STATISTICS_CACHE_MAX_BYTES)
+
+
+def cached_statistics(po=None, department=None, fiscal_year=None, project=None, cursor=None, cnxn=None):
+    """compute_statistics served from a cache keyed by the filters and the table versions.
+
+    Any committed write to a tracked table (which is what moves the rollup)
+    changes the versions, so an entry is never served after its data changed.
+    Each caller gets its own dict.
+    """
+    if cursor is None:
+        cursor, cnxn = connect_local().connect_to_db()
+    versions = table_versions(cursor)
+    if versions is None or cnxn.in_transaction:
+        return compute_statistics(po, department, fiscal_year, project, cursor=cursor, cnxn=cnxn)
+    key = tuple(None if v is None else str(v) for v in (po, department, fiscal_year, project))
+    versions = tuple(versions.values())
+    result = _statistics_cache.lookup(key, versions)
+    if result is None:
+        result = compute_statistics(po, department, fiscal_year, project, cursor=cursor, cnxn=cnxn)
+        _statistics_cache.store(key, versions, result)
+    return dict(result)
+
+
+def clear_statistics_cache():
+    _statistics_cache.clear()
+
+
+def get_statistics_cache_stats():
+    return _statistics_cache.stats()
@@ -35,3 +35,77 @@ table_column_dict = {
         "project_number", "expense", "expense_date"
     ]
 }
+
+# Natural key of each table (UNIQUE index in sql/create_tables_local.sql); the
+# conflict target of bulk_upsert. NULLs never conflict, as in any UNIQUE index.
+table_unique_keys = {
+    "POs": ["name"],
+    "departments": ["name"],
+    "project_categories": ["category"],
+    "projects": ["name", "department_id"],
+    "IOs": ["IO_num", "project_id"],
+    "human_resource_categories": ["name"],
+    "co_object_names": ["name"],
+    "cost_elements": ["co_id", "name"],
+    "project_forecasts_nonpc": [
+        "PO_id", "department_id", "project_id", "project_category_id", "fiscal_year"
+    ],
+    "project_forecasts_pc": [
+        "PO_id", "department_id", "project_id", "project_category_id", "fiscal_year", "human_resource_category_id"
+    ],
+    "budgets": ["po_id", "department_id", "fiscal_year"],
+    "fundings": ["po_id", "department_id", "fiscal_year", "funding_from", "funding_for"],
+    "capex_forecasts": ["po_id", "department_id", "project_id", "cap_year"],
+    "capex_budgets": ["po_id", "department_id", "project_id", "cap_year"],
+}
+
+# Column dtypes of the tables read by the display builders, after the column
+# types in sql/create_tables_local.sql: INTEGER -> nullable Int64, REAL ->
+# float64, TEXT -> object. connect_local.select_typed builds frames straight into
+# these types.
+table_dtypes = {
+    "cost_elements": {
+        "id": "Int64", "co_id": "Int64", "name": "object"
+    },
+    "IOs": {
+        "id": "Int64", "IO_num": "Int64", "project_id": "Int64"
+    },
+    "human_resource_cost": {
+        "id": "Int64", "category_id": "Int64", "year": "Int64", "po_id": "Int64", "department_id": "Int64",
+        "cost": "float64"
+    },
+    "project_forecasts_nonpc": {
+        "id": "Int64", "PO_id": "Int64", "department_id": "Int64", "project_category_id": "Int64",
+        "project_id": "Int64", "fiscal_year": "Int64", "non_personnel_expense": "float64"
+    },
+    "project_forecasts_pc": {
+        "id": "Int64", "PO_id": "Int64", "department_id": "Int64", "project_category_id": "Int64",
+        "project_id": "Int64", "fiscal_year": "Int64", "human_resource_category_id": "Int64",
+        "human_resource_fte": "float64"
+    },
+    "budgets": {
+        "id": "Int64", "po_id": "Int64", "department_id": "Int64", "fiscal_year": "Int64",
+        "human_resource_expense": "float64", "non_personnel_expense": "float64"
+    },
+    "fundings": {
+        "id": "Int64", "po_id": "Int64", "department_id": "Int64", "fiscal_year": "Int64",
+        "funding": "float64", "funding_from": "object", "funding_for": "object"
+    },
+    "expenses": {
+        "id": "Int64", "co_object_id": "Int64", "department_id": "Int64", "fiscal_year": "Int64",
+        "from_period": "Int64", "io_id": "Int64", "cost_element_id": "Int64", "co_element_name": "object",
+        "expense_value": "float64", "name": "object"
+    },
+    "capex_forecasts": {
+        "id": "Int64", "po_id": "Int64", "department_id": "Int64", "cap_year": "Int64", "project_id": "Int64",
+        "capex_description": "object", "capex_forecast": "float64", "cost_center": "object"
+    },
+    "capex_budgets": {
+        "id": "Int64", "po_id": "Int64", "department_id": "Int64", "cap_year": "Int64", "project_id": "Int64",
+        "capex_description": "object", "budget": "float64"
+    },
+    "capex_expenses": {
+        "id": "Int64", "po_id": "Int64", "department_id": "Int64", "cap_year": "Int64", "project_id": "Int64",
+        "capex_description": "object", "project_number": "Int64", "expense": "float64", "expense_date": "object"
+    },
+}
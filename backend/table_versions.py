@@ -0,0 +1,80 @@
+# Per-table change counters. Every INSERT/UPDATE/DELETE on a tracked table bumps
+# its row in table_versions through a trigger, so any writer (uploaders, modify
+# routes, the SQLAlchemy engine, another process) is seen. Readers compare the
+# counters to decide whether something derived from a table is still current.
+#
+# table_versions is not part of drop_tables.sql: counters only ever grow, also
+# across a database reset, so a cached value can never match a later version.
+
+# Base tables (lower case, as SQLite resolves names case-insensitively)
+TRACKED_TABLES = [
+    'pos', 'departments', 'project_categories', 'projects', 'ios', 'io_ce_connection',
+    'human_resource_categories', 'human_resource_cost', 'co_object_names', 'cost_elements',
+    'project_forecasts_nonpc', 'project_forecasts_pc', 'budgets', 'fundings', 'expenses',
+    'capex_forecasts', 'capex_budgets', 'capex_expenses',
+]
+
+CREATE_VERSIONS = """
+CREATE TABLE IF NOT EXISTS table_versions(
+    table_name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+)
+"""
+_EVENTS = {'ai': 'INSERT', 'au': 'UPDATE', 'ad': 'DELETE'}
+
+
+def _trigger_name(table, suffix):
+    return f"trg_version_{table}_{suffix}"
+
+
+def version_statements():
+    """DDL for the counter table and the triggers bumping it."""
+    statements = [CREATE_VERSIONS]
+    for table in TRACKED_TABLES:
+        for suffix, event in _EVENTS.items():
+            statements.append(
+                f"CREATE TRIGGER IF NOT EXISTS {_trigger_name(table, suffix)} AFTER {event} ON {table} "
+                f"BEGIN UPDATE table_versions SET version = version + 1 WHERE table_name = '{table}'; END"
+            )
+    return statements
+
+
+def create_table_versions(cursor, cnxn):
+    """Create the counters/triggers and bump every counter.
+
+    The bump covers tables that were dropped and recreated (initialize_database,
+    alter_tables), which fires no trigger.
+    """
+    for statement in version_statements():
+        cursor.execute(statement)
+    cursor.executemany("INSERT OR IGNORE INTO table_versions (table_name) VALUES (?)", [(t,) for t in TRACKED_TABLES])
+    cursor.execute("UPDATE table_versions SET version = version + 1")
+    cnxn.commit()
+
+
+def ensure_table_versions(cursor, cnxn):
+    """Create the counters/triggers when any is missing; returns True when it had to."""
+    expected = {_trigger_name(t, s) for t in TRACKED_TABLES for s in _EVENTS} | {'table_versions'}
+    cursor.execute(
+        f"SELECT name FROM sqlite_master WHERE name IN ({','.join('?' * len(expected))})", sorted(expected)
+    )
+    if {row[0] for row in cursor.fetchall()} >= expected:
+        return False
+    create_table_versions(cursor, cnxn)
+    return True
+
+
+def table_versions(cursor, tables=None):
+    """Current counters as {table: version} (all tracked tables when `tables` is None).
+
+    Returns None on a database without table_versions.
+    """
+    names = [str(t).lower() for t in (tables or TRACKED_TABLES)]
+    try:
+        cursor.execute(
+            f"SELECT table_name, version FROM table_versions WHERE table_name IN ({','.join('?' * len(names))})", names
+        )
+    except Exception:
+        return None
+    found = dict(cursor.fetchall())
+    return {name: found.get(name, 0) for name in names}
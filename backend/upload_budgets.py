@@ -2,8 +2,7 @@ import pandas as pd
 from backend.connect_pyodbc import connect_to_sql, close_connection, clear_table, select_all_from_table
 from backend.merge_insert import *
 import backend.connect_local as cl
-from backend.connect_local import select_columns_from_table
-from backend.table_values import table_column_dict
+from backend.bulk_insert import bulk_insert, bulk_upsert
 
 def upload_budgets(file_path, replace=True):
     df_upload = pd.read_csv(file_path)
@@ -18,19 +17,14 @@ def upload_budgets_local(df_upload):
     #     cl.clear_table_by_year(cursor, cnxn, "budgets", year)
     df_upload = upload_budgets_df(df_upload, engine, cursor, cnxn, 'local')
     # upload_budgets_df(df_upload, engine, cursor, cnxn, 'local')
-    df_upload.to_sql("budgets", con=engine, if_exists='append', index=False)
+    bulk_upsert(cursor, cnxn, "budgets", df_upload)
 
 def upload_budgets_local_m(df_upload):
     conn = cl.connect_local()
     engine, cursor, cnxn = conn.connect_to_db(engine=True)
-    existing_values = select_columns_from_table(cursor, "budgets", table_column_dict["budgets"])
     df_fin = upload_budgets_df(df_upload, engine, cursor, cnxn, 'local')
-    
-    shared_columns = [col for col in df_fin.columns if col in existing_values.columns and col != 'non_personnel_expense' and col != 'human_resource_expense']
-    merged = df_fin.merge(existing_values[shared_columns], on=shared_columns, how='left', indicator=True)
-    df_filtered = merged[merged['_merge'] == 'left_only'].drop(columns=['_merge'])
-    # print(df_filtered)
-    df_filtered.to_sql("budgets", con=engine, if_exists='append', index=False)
+    # existing (po, department, year) keys keep their values
+    bulk_upsert(cursor, cnxn, "budgets", df_fin, update=False)
 
 def upload_budgets_df(df_upload, engine, cursor, cnxn, type, replace=True):
     df_upload['PO'] = df_upload['PO'].astype(str)
@@ -88,7 +82,10 @@ def upload_fundings_df(df_upload, engine, cursor, cnxn, type, replace=True):
         {'id': 'po_id'}
     )
 
-    df_upload.to_sql("fundings", con=engine, if_exists='append', index=False)
+    if type == 'local':
+        bulk_upsert(cursor, cnxn, "fundings", df_upload)
+    else:
+        bulk_insert(cursor, cnxn, "fundings", df_upload)
 
 
 if __name__ == '__main__':
@@ -3,8 +3,7 @@ import pandas as pd
 from backend.connect_pyodbc import connect_to_sql, close_connection, select_all_from_table, clear_table
 from backend.merge_insert import *
 import backend.connect_local as cl
-from backend.connect_local import select_columns_from_table
-from backend.table_values import table_column_dict
+from backend.bulk_insert import bulk_upsert
 
 def upload_capex_budget(path, clear=True):
     df_upload = pd.read_csv(path)
@@ -96,20 +95,14 @@ def upload_capex_budget_local(df_upload, clear=True):
     for year in years:
         cl.clear_table_by_year(cursor, cnxn, "capex_budgets", year)
     df_upload = upload_capex_budget_df(df_upload, engine, cursor, cnxn, 'local')
-    df_upload.to_sql('capex_budgets', con=engine, if_exists='append', index=False)
+    bulk_upsert(cursor, cnxn, "capex_budgets", df_upload)
 
 def upload_capex_budgets_local_m(df_upload):
     conn = cl.connect_local()
     engine, cursor, cnxn = conn.connect_to_db(engine=True)
-    existing_values = select_columns_from_table(cursor, "capex_budgets", table_column_dict["capex_budgets"])
     df_fin = upload_capex_budget_df(df_upload, engine, cursor, cnxn, 'local')
-    
-    shared_columns = [col for col in df_fin.columns if col in existing_values.columns and col != 'budget']
-    merged = df_fin.merge(existing_values[shared_columns], on=shared_columns, how='left', indicator=True)
-    df_filtered = merged[merged['_merge'] == 'left_only'].drop(columns=['_merge'])
-    
-    # print(df_filtered)
-    df_filtered.to_sql("capex_budgets", con=engine, if_exists='append', index=False)
+    # existing (po, department, project, year) keys keep their values
+    bulk_upsert(cursor, cnxn, "capex_budgets", df_fin, update=False)
 
 
 if __name__ == '__main__':
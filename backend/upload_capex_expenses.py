@@ -3,6 +3,7 @@ import pandas as pd
 from backend.connect_pyodbc import connect_to_sql, clear_table, close_connection, select_all_from_table
 from backend.merge_insert import join_tables
 import backend.connect_local as cl
+from backend.bulk_insert import bulk_insert
 
 def upload_capex_expense(path: str, clear=True):
     df_upload = pd.read_csv(path)
@@ -108,7 +109,7 @@ def upload_capex_expense_df(df_upload, engine, cursor, cnxn, type, clear=True):
         pass
 
     # Insert
-    df_upload.to_sql('capex_expenses', con=engine, if_exists='append', index=False)
+    bulk_insert(cursor, cnxn, "capex_expenses", df_upload)
 
 
 if __name__ == '__main__':
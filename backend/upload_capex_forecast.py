@@ -3,8 +3,7 @@ import pandas as pd
 from backend.connect_pyodbc import connect_to_sql, close_connection, select_all_from_table, clear_table
 from backend.merge_insert import *
 import backend.connect_local as cl
-from backend.connect_local import select_columns_from_table
-from backend.table_values import table_column_dict
+from backend.bulk_insert import bulk_upsert
 
 def upload_capex_forecasts(path):
     df_upload = pd.read_csv(path)
@@ -83,14 +82,9 @@ def upload_capex_forecasts_df(df_upload, engine, cursor, cnxn, type):
 def upload_capex_forecast_m(df_upload):
     conn = cl.connect_local()
     engine, cursor, cnxn = conn.connect_to_db(engine=True)
-    existing_values = select_columns_from_table(cursor, "capex_forecasts", table_column_dict["capex_forecasts"])
     df_fin = upload_capex_forecasts_df(df_upload, engine, cursor, cnxn, 'local')
-    
-    shared_columns = [col for col in df_fin.columns if col in existing_values.columns and col != 'capex_forecast']
-    merged = df_fin.merge(existing_values[shared_columns], on=shared_columns, how='left', indicator=True)
-    df_filtered = merged[merged['_merge'] == 'left_only'].drop(columns=['_merge'])
-    # print(df_filtered)
-    df_filtered.to_sql("capex_forecasts", con=engine, if_exists='append', index=False)
+    # existing (po, department, project, year) keys keep their values
+    bulk_upsert(cursor, cnxn, "capex_forecasts", df_fin, update=False)
 
 
 def upload_capex_forecasts_local(df_upload):
@@ -103,7 +97,7 @@ def upload_capex_forecasts_local(df_upload):
     for year in years:
         cl.clear_table_by_year(cursor, cnxn, "capex_forecasts", year)
     df_upload = upload_capex_forecasts_df(df_upload, engine, cursor, cnxn, 'local')
-    df_upload.to_sql("capex_forecasts", con=engine, if_exists='append', index=False)
+    bulk_upsert(cursor, cnxn, "capex_forecasts", df_upload)
 
 if __name__ == "__main__":
     path = "processed_data/forecasts/capex_forecasts_.csv"
@@ -1,7 +1,12 @@
+import os
+import sqlite3
+import tempfile
 import pandas as pd
 from backend.connect_pyodbc import connect_to_sql, close_connection, clear_table, select_all_from_table
 from backend.merge_insert import *
 import backend.connect_local as cl
+from backend.dimension_cache import get_dimension
+from backend.bulk_insert import bulk_insert
 
 
 def clear_expenses_table():
@@ -41,7 +46,7 @@ def upload_expenses_local(df_upload):
     engine, cursor, cnxn = conn.connect_to_db(engine=True)
     df_upload = upload_expenses_df(df_upload, engine, cursor, cnxn)
     print(df_upload)
-    df_upload.to_sql("expenses", con=engine, if_exists='append', index=False)
+    bulk_insert(cursor, cnxn, "expenses", df_upload)
 
 def upload_expenses_df(file, engine, cursor, cnxn):
     df_upload = file
@@ -52,14 +57,14 @@ def upload_expenses_df(file, engine, cursor, cnxn):
     co_object_names_local = df_upload[['CO object name']]
     co_object_names_columns = ['name']
     co_object_names_upload = merge_dataframes(cur_co_object, co_object_names_local, co_object_names_columns, 'name')
-    co_object_names_upload.to_sql("co_object_names", con=engine, if_exists='append', index=False)
+    bulk_insert(cursor, cnxn, "co_object_names", co_object_names_upload)
     co_object_names_merged = select_all_from_table(cursor, cnxn, "co_object_names")
 
     cur_cost_elements = select_all_from_table(cursor, cnxn, "cost_elements")
     cost_elements_local = df_upload[['Cost element', 'Cost element name']]
     cost_elements_columns = ['co_id', 'name']
     cost_elements_upload = merge_cost_elements(cur_cost_elements, cost_elements_local, cost_elements_columns, 'co_id')
-    cost_elements_upload.to_sql("cost_elements", con=engine, if_exists='append', index=False)
+    bulk_insert(cursor, cnxn, "cost_elements", cost_elements_upload)
     cost_elements_merged = select_all_from_table(cursor, cnxn, "cost_elements")
 
     departments = select_all_from_table(cursor, cnxn, "departments")
@@ -90,6 +95,176 @@ def upload_expenses_df(file, engine, cursor, cnxn):
     return df_upload
 
 
+# Rows per chunk for streaming uploads; memory use scales with this, not the file size.
+EXPENSE_CHUNK_SIZE = 50000
+# Columns identifying a duplicate expense line in an upload (first occurrence wins).
+EXPENSE_DEDUPE_KEYS = ['Department', 'fiscal_year', 'from_period', 'Order', 'Cost element']
+# Ids an expense row must have resolved to count as rows_resolved
+EXPENSE_REFERENCE_IDS = ['department_id', 'cost_element_id', 'co_object_id', 'io_id']
+EXPENSE_COLUMN_RENAMES = {
+    "Val.in rep.cur": "expense_value",
+    "Cost element name": "co_element_name",
+    "Name": "name",
+}
+
+
+class _upload_key_set:
+    """Keys already seen in the current upload, kept in a scratch SQLite file instead of memory."""
+
+    def __init__(self):
+        handle, self.path = tempfile.mkstemp(suffix='.db')
+        os.close(handle)
+        self.db = sqlite3.connect(self.path)
+        self.db.execute("PRAGMA journal_mode=OFF")
+        self.db.execute("PRAGMA synchronous=OFF")
+        self.db.execute("CREATE TABLE seen (h INTEGER PRIMARY KEY)")
+        self.db.execute("CREATE TABLE batch (pos INTEGER, h INTEGER)")
+
+    def first_seen(self, hashes):
+        """Boolean mask: True where the hash was not seen before (in earlier chunks or earlier in this one)."""
+        self.db.execute("DELETE FROM batch")
+        self.db.executemany("INSERT INTO batch VALUES (?, ?)", enumerate(hashes))
+        earlier = {h for (h,) in self.db.execute("SELECT DISTINCT s.h FROM batch b JOIN seen s ON s.h = b.h")}
+        self.db.execute("INSERT OR IGNORE INTO seen SELECT h FROM batch")
+        keep = []
+        for h in hashes:
+            keep.append(h not in earlier)
+            earlier.add(h)
+        return keep
+
+    def close(self):
+        self.db.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def _row_hashes(chunk, columns):
+    """Stable 64-bit hash per row of `columns`, independent of the dtype pandas inferred for the chunk."""
+    keys = pd.DataFrame(index=chunk.index)
+    for col in columns:
+        values = chunk[col]
+        if values.dtype.kind == 'f' and (values.dropna() % 1 == 0).all():
+            values = values.astype('Int64')  # 3.0 in a chunk with gaps must match 3 elsewhere
+        keys[col] = values.astype(str).where(values.notna(), '')
+    hashed = pd.util.hash_pandas_object(keys, index=False)
+    return hashed.to_numpy().view('int64').tolist()
+
+
+class _expense_reference_maps:
+    """Name/code -> id maps for the dimensions an expense line points at.
+
+    Loaded once per upload; cost elements and CO objects first seen in the file
+    are inserted (once per distinct value) and added to the maps as chunks arrive.
+    """
+
+    def __init__(self, cursor, cnxn):
+        self.cursor = cursor
+        self.departments = dict(get_dimension('departments', cursor, cnxn).name_to_id)
+        cursor.execute("SELECT IO_num, id FROM IOs ORDER BY id")
+        self.ios = dict(cursor.fetchall())
+        cursor.execute("SELECT co_id, id FROM cost_elements ORDER BY id DESC")
+        self.cost_elements = dict(cursor.fetchall())  # lowest id per code wins
+        cursor.execute("SELECT name, id FROM co_object_names ORDER BY id DESC")
+        self.co_objects = dict(cursor.fetchall())
+
+    def add_cost_elements(self, codes, names):
+        new = {}
+        for code, name in zip(codes, names):
+            if code not in self.cost_elements and code not in new:
+                new[code] = name
+        for code, name in new.items():
+            self.cursor.execute("INSERT INTO cost_elements (co_id, name) VALUES (?, ?)", (code, name))
+            self.cost_elements[code] = self.cursor.lastrowid
+        return len(new)
+
+    def add_co_objects(self, names):
+        new = [n for n in dict.fromkeys(names) if n is not None and n not in self.co_objects]
+        for name in new:
+            self.cursor.execute("INSERT INTO co_object_names (name) VALUES (?)", (name,))
+            self.co_objects[name] = self.cursor.lastrowid
+        return len(new)
+
+
+def resolved_rows(rows):
+    """Number of prepared expense rows whose EXPENSE_REFERENCE_IDS all resolved."""
+    return int(rows[EXPENSE_REFERENCE_IDS].notna().all(axis=1).sum())
+
+
+def prepare_expense_chunk(chunk, maps):
+    """Resolve one chunk of raw expense lines to expenses rows (same columns as upload_expenses_df)."""
+    chunk['Cost element'] = chunk['Cost element'].astype(int)
+    chunk['Order'] = chunk['Order'].astype(int)
+    co_objects = [None if pd.isna(v) else v for v in chunk['CO object name'].tolist()]
+    maps.add_co_objects(co_objects)
+    maps.add_cost_elements(chunk['Cost element'].tolist(), chunk['Cost element name'].tolist())
+
+    out = chunk.drop(columns=['Department', 'Order', 'Cost element', 'CO object name'])
+    out = out.rename(columns=EXPENSE_COLUMN_RENAMES)
+    out['department_id'] = chunk['Department'].map(maps.departments)
+    out['cost_element_id'] = chunk['Cost element'].map(maps.cost_elements)
+    out['co_object_id'] = chunk['CO object name'].map(maps.co_objects)
+    out['io_id'] = chunk['Order'].map(maps.ios)
+    return out
+
+
+def upload_expenses_stream(source, chunksize=None, validate=None, dedupe=True, progress=None):
+    """Stream a (possibly very large) expense CSV into the local database chunk by chunk.
+
+    - source: path or file object accepted by pandas.read_csv
+    - validate: optional callable(chunk) -> (missing: bool, column); a missing
+      reference aborts the upload
+    - dedupe: drop repeated EXPENSE_DEDUPE_KEYS lines across the whole file,
+      keeping the first (the keys seen so far live in a scratch file, not memory)
+    - progress: optional callable(result) invoked after every chunk with the
+      running counts (used by the background upload jobs)
+
+    Only one chunk is held at a time. All chunks are written in one transaction,
+    so a failure part way leaves the database unchanged.
+    Returns a dict with rows_read, rows_resolved (rows that got all of
+    EXPENSE_REFERENCE_IDS), rows_inserted, duplicates, chunks and
+    missing_column (set when validate rejected a chunk).
+    """
+    conn = cl.connect_local()
+    cursor, cnxn = conn.connect_to_db()
+    result = {'rows_read': 0, 'rows_resolved': 0, 'rows_inserted': 0, 'duplicates': 0, 'chunks': 0, 'missing_column': None}
+    maps = _expense_reference_maps(cursor, cnxn)
+    seen = _upload_key_set() if dedupe else None
+    try:
+        if not cnxn.in_transaction:
+            cursor.execute("BEGIN IMMEDIATE")
+        for chunk in pd.read_csv(source, chunksize=chunksize or EXPENSE_CHUNK_SIZE):
+            chunk.columns = [str(c).strip() for c in chunk.columns]
+            result['chunks'] += 1
+            result['rows_read'] += len(chunk)
+            if validate is not None:
+                missing, column = validate(chunk)
+                if missing:
+                    result['missing_column'] = column
+                    cnxn.rollback()
+                    return result
+            if seen is not None:
+                keys = [c for c in EXPENSE_DEDUPE_KEYS if c in chunk.columns] or list(chunk.columns)
+                keep = seen.first_seen(_row_hashes(chunk, keys))
+                result['duplicates'] += keep.count(False)
+                chunk = chunk[keep]
+            if not chunk.empty:
+                rows = prepare_expense_chunk(chunk, maps)
+                result['rows_resolved'] += resolved_rows(rows)
+                result['rows_inserted'] += bulk_insert(cursor, cnxn, "expenses", rows, commit=False)
+            if progress is not None:
+                progress(result)
+        cnxn.commit()
+    except Exception:
+        cnxn.rollback()
+        raise
+    finally:
+        if seen is not None:
+            seen.close()
+    return result
+
+
 if __name__ == "__main__":
     file_path = "processed_data/expenses/expenses_.csv"
     upload_expenses(file_path)
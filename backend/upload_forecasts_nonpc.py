@@ -4,8 +4,9 @@ import pandas as pd
 from backend.connect_pyodbc import connect_to_sql, close_connection, select_all_from_table, clear_table
 from backend.merge_insert import *
 import backend.connect_local as cl
-from backend.table_values import table_column_dict, tables_to_consider
-from backend.connect_local import select_columns_from_table
+from backend.table_values import tables_to_consider
+from backend.bulk_insert import bulk_upsert
+from backend.forecast_staging import upload_forecasts_staged
 
 def upload_nonpc_forecasts(file_path: str):
     df_upload = pd.read_csv(file_path)
@@ -18,25 +19,19 @@ def upload_nonpc_forecasts(file_path: pd.DataFrame):
     upload_nonpc_forecasts_df(file_path, engine, cursor, cnxn, 'server')
 
 def upload_nonpc_forecasts_local(df_upload):
-    """SQLite version clearing per year then uploading (IO removed)."""
-    conn = cl.connect_local()
-    engine, cursor, cnxn = conn.connect_to_db(engine=True)
-    years = df_upload['fiscal_year'].unique().tolist()
-    for year in years:
-        cl.clear_table_by_year(cursor, cnxn, "project_forecasts_nonpc", year)
-    df_fin = upload_nonpc_forecasts_df2(df_upload, engine, cursor, cnxn, 'local')
-    return df_fin.to_sql("project_forecasts_nonpc", con=engine, if_exists='append', index=False)
-    
+    """SQLite version replacing the uploaded fiscal years (IO removed).
+
+    Runs through the staging-table pipeline: one transaction, set-based
+    dimension creation and a single joined INSERT ... SELECT.
+    """
+    return upload_forecasts_staged(df_upload, "project_forecasts_nonpc")
+
 def upload_nonpc_forecasts_local_m(df_upload):
-    """Merge-friendly upload without IO key; de-duplicate against existing values excluding non_personnel_expense."""
+    """Merge-friendly upload without IO key; rows whose key already exists are left untouched (ON CONFLICT DO NOTHING)."""
     conn = cl.connect_local()
     engine, cursor, cnxn = conn.connect_to_db(engine=True)
     df_fin = upload_nonpc_forecasts_df2(df_upload, engine, cursor, cnxn, 'local')
-    existing_values = select_columns_from_table(cursor, "project_forecasts_nonpc", table_column_dict["project_forecasts_nonpc"])
-    shared_columns = [col for col in df_fin.columns if col in existing_values.columns and col != 'non_personnel_expense']
-    merged = df_fin.merge(existing_values[shared_columns], on=shared_columns, how='left', indicator=True)
-    df_filtered = merged[merged['_merge'] == 'left_only'].drop(columns=['_merge'])
-    return df_filtered.to_sql("project_forecasts_nonpc", con=engine, if_exists='append', index=False)
+    return bulk_upsert(cursor, cnxn, "project_forecasts_nonpc", df_fin, update=False)
     
 def upload_nonpc_forecasts_df(df_upload, engine, cursor, cnxn, type):
     """Prepare non-personnel forecast rows (IO removed)."""
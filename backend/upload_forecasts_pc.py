@@ -3,8 +3,9 @@ import pandas as pd
 from backend.connect_pyodbc import connect_to_sql, close_connection, select_all_from_table, clear_table
 from backend.merge_insert import *
 import backend.connect_local as cl
-from backend.connect_local import select_columns_from_table
-from backend.table_values import table_column_dict
+from backend.table_values import table_unique_keys
+from backend.bulk_insert import bulk_upsert, conflict_clause
+from backend.forecast_staging import upload_forecasts_staged
 
 # not done
 def upload_pc_forecasts(file_path: str):
@@ -16,15 +17,8 @@ def upload_pc_forecasts(file_path: str):
 
 
 def upload_pc_forecasts_local(df_upload):
-    conn = cl.connect_local()
-    engine, cursor, cnxn = conn.connect_to_db(engine=True)
-    # cl.clear_table(cursor, cnxn, "project_forecasts_pc")
-    years = df_upload['fiscal_year'].unique().tolist()
-    for year in years:
-        cl.clear_table_by_year(cursor, cnxn, "project_forecasts_pc", year)
-    
-    df_fin = upload_pc_forecasts_df(df_upload, engine, cursor, cnxn, 'local')
-    return df_fin.to_sql("project_forecasts_pc", con=engine, if_exists='append', index=False)
+    """SQLite version replacing the uploaded fiscal years, via the staging-table pipeline."""
+    return upload_forecasts_staged(df_upload, "project_forecasts_pc")
 
 
 def upload_pc_forecasts_local_m(df_upload, engine=None, cursor=None, cnxn=None, begin_immediate=True):
@@ -65,29 +59,14 @@ def upload_pc_forecasts_local_m(df_upload, engine=None, cursor=None, cnxn=None,
     # Build fully merged DataFrame with id columns
     df_fin = upload_pc_forecasts_df(df_upload, engine, cursor, cnxn, 'local')
 
-    # Fetch existing values for dedupe (avoid multiplicative joins; only compare stable columns)
-    existing_values = select_columns_from_table(cursor, "project_forecasts_pc", table_column_dict["project_forecasts_pc"])
-    if existing_values is None:
-        # Table empty -> all rows are new
-        df_filtered = df_fin
-    else:
-        shared_columns = [col for col in df_fin.columns if col in existing_values.columns and col != 'personnel_expense']
-        try:
-            merged = df_fin.merge(existing_values[shared_columns], on=shared_columns, how='left', indicator=True)
-            df_filtered = merged[merged['_merge'] == 'left_only'].drop(columns=['_merge'])
-        except Exception:
-            # If merge fails (schema drift), fall back to inserting all rows to avoid silent data loss
-            df_filtered = df_fin
-
-    # Insert only new rows
-    rows_to_insert = len(df_filtered.index)
-    if rows_to_insert > 0:
-        # pandas to_sql returns None; we rely on count we computed
-        try:
-            df_filtered.to_sql("project_forecasts_pc", con=engine, if_exists='append', index=False)
-        except Exception:
-            # On failure, zero rows considered inserted
-            rows_to_insert = 0
+    # Insert only new rows: keys already present are skipped by the unique index
+    # (ON CONFLICT DO NOTHING), so the cost does not grow with the table.
+    # Same connection (and transaction) as the BEGIN IMMEDIATE above.
+    try:
+        rows_to_insert = bulk_upsert(cursor, cnxn, "project_forecasts_pc", df_fin, update=False, commit=False)
+    except Exception:
+        # On failure, zero rows considered inserted
+        rows_to_insert = 0
     # Commit if we created the connection or explicitly started transaction here
     if created_connection:
         try:
@@ -107,50 +86,34 @@ def fast_insert_pc_forecasts(rows, cursor, cnxn, create_index=True):
     Each row dict must contain keys:
       PO_id, department_id, project_id, project_category_id, fiscal_year, human_resource_category_id, human_resource_fte
 
-    This avoids the heavy DataFrame merge & full-table scan by performing targeted existence
-    checks with a composite index (created if requested). Suitable for manual single-project
-    multi-category updates.
+    Rows whose key already exists are skipped by the UQ_project_forecasts_pc_key
+    unique index (ON CONFLICT DO NOTHING) instead of a DataFrame merge or a
+    per-row existence query. Suitable for manual single-project multi-category
+    updates. `create_index` is kept for compatibility; the index ships with the schema.
     """
     if not rows:
         return 0
-    try:
-        if create_index:
-            # Create composite index to accelerate existence lookups (idempotent)
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_project_forecasts_pc_key ON project_forecasts_pc (PO_id, department_id, project_id, project_category_id, fiscal_year, human_resource_category_id)"
-            )
-    except Exception:
-        # Non-fatal if index creation fails
-        pass
     inserted = 0
-    select_sql = ("SELECT 1 FROM project_forecasts_pc WHERE PO_id=? AND department_id=? AND project_id=? "
-                  "AND project_category_id=? AND fiscal_year=? AND human_resource_category_id=? LIMIT 1")
+    columns = ['PO_id', 'department_id', 'project_id', 'project_category_id', 'fiscal_year',
+               'human_resource_category_id', 'human_resource_fte']
     insert_sql = ("INSERT INTO project_forecasts_pc (PO_id, department_id, project_id, project_category_id, fiscal_year, human_resource_category_id, human_resource_fte) "
-                  "VALUES (?,?,?,?,?,?,?)")
+                  "VALUES (?,?,?,?,?,?,?) " + conflict_clause(table_unique_keys['project_forecasts_pc'], columns, update=False))
     for r in rows:
         try:
-            params_select = (
+            params_key = (
                 int(r['PO_id']), int(r['department_id']), int(r['project_id']), int(r['project_category_id']), int(r['fiscal_year']), int(r['human_resource_category_id'])
             )
         except Exception:
             # Skip malformed row
             continue
-        try:
-            cursor.execute(select_sql, params_select)
-            exists = cursor.fetchone() is not None
-        except Exception:
-            # If existence check fails, attempt blind insert to avoid data loss
-            exists = False
-        if exists:
-            continue
         fte_val = r.get('human_resource_fte')
         try:
             fte_num = float(fte_val) if fte_val not in (None, '') else None
         except Exception:
             fte_num = None
         try:
-            cursor.execute(insert_sql, params_select + (fte_num,))
-            inserted += 1
+            cursor.execute(insert_sql, params_key + (fte_num,))
+            inserted += cursor.rowcount
         except Exception:
             # Skip on failure; continue remaining rows
             continue
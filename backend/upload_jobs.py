@@ -0,0 +1,185 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from backend.connect_local import DEFAULT_DB_PATH, connect_local, release_connections
+from backend.write_queue import get_write_queue, run_transaction
+
+# Uploads run in the background so the POST returns at once. One worker: every
+# upload is one transaction holding SQLite's write lock, so more workers would
+# only wait on the lock instead of here. Jobs run on their own connection, not
+# on the database writer (backend.write_queue), so edits queued meanwhile time
+# out with an error rather than waiting for the whole upload.
+UPLOAD_JOB_WORKERS = 1
+# Job rows live in a database of their own: a running upload holds the local
+# database's write lock, so submitting or recording a job there would wait for it
+JOBS_DB_PATH = os.environ.get('UPLOAD_JOBS_DB_PATH', os.path.splitext(DEFAULT_DB_PATH)[0] + '_jobs.db')
+
+CREATE_JOB_TABLE = """
+CREATE TABLE IF NOT EXISTS upload_jobs(
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    filename TEXT,
+    status TEXT NOT NULL DEFAULT 'queued',
+    rows_parsed INTEGER NOT NULL DEFAULT 0,
+    rows_resolved INTEGER NOT NULL DEFAULT 0,
+    rows_inserted INTEGER NOT NULL DEFAULT 0,
+    message TEXT,
+    error_rows TEXT,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    started_at TEXT,
+    finished_at TEXT
+)
+"""
+JOB_COLUMNS = ['id', 'kind', 'filename', 'status', 'rows_parsed', 'rows_resolved', 'rows_inserted',
+               'message', 'error_rows', 'created_at', 'started_at', 'finished_at']
+FINISHED = ('succeeded', 'failed')
+COUNTERS = ('rows_parsed', 'rows_resolved', 'rows_inserted')
+
+
+class upload_job_error(Exception):
+    """Upload rejected; `rows` lists the offending rows ({'line', 'column', 'value'})."""
+
+    def __init__(self, message, rows=None):
+        super().__init__(message)
+        self.rows = rows or []
+
+
+class upload_job:
+    """Live state of a running job, handed to the job function.
+
+    Counters are kept in memory while the job runs (the upload's own write
+    transaction holds the database lock) and written to upload_jobs when the
+    job finishes.
+    """
+
+    def __init__(self, job_id):
+        self.id = job_id
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(COUNTERS, 0)
+
+    def update(self, **counters):
+        with self._lock:
+            for name, value in counters.items():
+                if name in self._counters and value is not None:
+                    self._counters[name] = int(value)
+
+    def counters(self):
+        with self._lock:
+            return dict(self._counters)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+_live = {}  # job id -> upload_job, for jobs of this process not finished yet
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=UPLOAD_JOB_WORKERS, thread_name_prefix='upload-job')
+        return _executor
+
+
+def ensure_job_table(cursor, cnxn):
+    cursor.execute(CREATE_JOB_TABLE)
+    cnxn.commit()
+
+
+def _update_job(cursor, cnxn, job_id, fields):
+    assignments = ", ".join(f"{name} = ?" for name in fields)
+    cursor.execute(f"UPDATE upload_jobs SET {assignments} WHERE id = ?", [*fields.values(), job_id])
+
+
+def _record(job_id, **fields):
+    get_write_queue(JOBS_DB_PATH).run(_update_job, job_id, fields)
+
+
+def _call_job(cursor, cnxn, func, job, args):
+    return func(job, *args)
+
+
+def _run(job, func, args):
+    fields = {}
+    try:
+        _record(job.id, status='running', started_at=time.strftime('%Y-%m-%d %H:%M:%S'))
+        # One transaction on the job's own connection: rolled back as a whole
+        # when it fails
+        message = run_transaction(_call_job, func, job, args)
+        fields = {'status': 'succeeded', 'message': message}
+    except upload_job_error as e:
+        fields = {'status': 'failed', 'message': str(e), 'error_rows': json.dumps(e.rows, default=str)}
+    except Exception as e:
+        fields = {'status': 'failed', 'message': f"{type(e).__name__}: {e}"}
+    finally:
+        fields.update(job.counters(), finished_at=time.strftime('%Y-%m-%d %H:%M:%S'))
+        try:
+            _record(job.id, **fields)
+        finally:
+            release_connections()
+            _live.pop(job.id, None)
+
+
+def _insert_job(cursor, cnxn, kind, filename):
+    ensure_job_table(cursor, cnxn)
+    cursor.execute("INSERT INTO upload_jobs (kind, filename) VALUES (?, ?)", (kind, filename))
+    return cursor.lastrowid
+
+
+def submit_upload_job(kind, filename, func, *args):
+    """Queue `func(job, *args)` and return the new job id immediately.
+
+    `func` returns an optional success message and reports progress through
+    job.update(rows_parsed=..., rows_resolved=..., rows_inserted=...). Raising
+    upload_job_error marks the job failed with the offending rows attached.
+    """
+    job_id = get_write_queue(JOBS_DB_PATH).run(_insert_job, kind, filename)
+    job = upload_job(job_id)
+    _live[job_id] = job
+    _get_executor().submit(_run, job, func, args)
+    return job_id
+
+
+def _job_dict(row):
+    job = dict(zip(JOB_COLUMNS, row))
+    job['error_rows'] = json.loads(job['error_rows']) if job['error_rows'] else []
+    live = _live.get(job['id'])
+    if live is not None and job['status'] not in FINISHED:
+        job.update(live.counters())
+    job['finished'] = job['status'] in FINISHED
+    return job
+
+
+def get_upload_job(job_id, cursor=None):
+    """Status, row counters and error rows of one job (None when unknown)."""
+    if cursor is None:
+        cursor, cnxn = connect_local(JOBS_DB_PATH).connect_to_db()
+    try:
+        cursor.execute(f"SELECT {', '.join(JOB_COLUMNS)} FROM upload_jobs WHERE id = ?", (job_id,))
+    except Exception:
+        return None
+    row = cursor.fetchone()
+    return _job_dict(row) if row else None
+
+
+def list_upload_jobs(limit=20, cursor=None):
+    """Most recent jobs first."""
+    if cursor is None:
+        cursor, cnxn = connect_local(JOBS_DB_PATH).connect_to_db()
+    try:
+        cursor.execute(f"SELECT {', '.join(JOB_COLUMNS)} FROM upload_jobs ORDER BY id DESC LIMIT ?", (int(limit),))
+    except Exception:
+        return []
+    return [_job_dict(row) for row in cursor.fetchall()]
+
+
+def wait_for_upload_job(job_id, timeout=60, interval=0.05):
+    """Block until the job has finished (scripts and tests); returns its final state."""
+    deadline = time.time() + timeout
+    while True:
+        job = get_upload_job(job_id)
+        if job is None or job['finished'] or time.time() > deadline:
+            return job
+        time.sleep(interval)
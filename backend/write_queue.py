@@ -0,0 +1,242 @@
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from backend.connect_local import DEFAULT_DB_PATH, connect_local, release_connections
+from backend.dimension_cache import deferred_invalidations
+
+# Writes are funnelled through one writer thread per database, which drains
+# whatever is queued (up to WRITE_BATCH_MAX writes) into a single
+# BEGIN IMMEDIATE ... COMMIT. Requests no longer race each other for SQLite's
+# write lock, and one commit covers the whole batch. Writes arriving while a
+# batch commits form the next one, so by default the writer does not wait for
+# more (WRITE_BATCH_LINGER seconds); a linger only pays off with
+# synchronous=FULL, where every commit is an fsync.
+WRITE_BATCH_MAX = 64
+WRITE_BATCH_LINGER = 0.0
+# Other processes can still hold the lock past busy_timeout; retry BEGIN this often
+WRITE_BUSY_RETRIES = 3
+# Seconds run()/run_write() wait for a queued write to start before giving up
+# with write_timeout (e.g. while an upload job holds the database lock)
+WRITE_TIMEOUT = 30.0
+
+
+class write_timeout(sqlite3.OperationalError):
+    """A queued write did not start within its timeout; it was withdrawn and never runs."""
+
+
+class write_queue:
+    """Single writer for one SQLite database, with group commits.
+
+    Each queued write is a callable func(cursor, cnxn, *args, **kwargs) run on
+    the writer thread's connection inside its own SAVEPOINT: a write that
+    raises is rolled back alone and its exception is handed to its caller,
+    the rest of the batch still commits. cnxn.commit() inside a write is a
+    no-op (the batch is committed once all its writes ran).
+    """
+
+    def __init__(self, db_path=DEFAULT_DB_PATH, max_batch=WRITE_BATCH_MAX, linger=WRITE_BATCH_LINGER):
+        self.db_path = db_path
+        self.max_batch = max_batch
+        self.linger = linger
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stats = {'writes': 0, 'failed': 0, 'batches': 0, 'largest_batch': 0, 'busy_retries': 0,
+                       'failed_batches': 0, 'timeouts': 0}
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name='sqlite-writer', daemon=True)
+                self._thread.start()
+
+    def submit(self, func, *args, **kwargs):
+        """Queue a write; returns a concurrent.futures.Future with its result."""
+        future = Future()
+        if threading.current_thread() is self._thread:
+            # A write that queues another write: run it in place, it is already in the batch
+            cursor, cnxn = connect_local(self.db_path).connect_to_db()
+            try:
+                future.set_result(func(cursor, cnxn, *args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        self._start()
+        self._queue.put((future, func, args, kwargs))
+        return future
+
+    def run(self, func, *args, timeout=WRITE_TIMEOUT, **kwargs):
+        """Queue a write and wait for it to be committed; returns its result or raises its error.
+
+        A write still queued after `timeout` seconds is withdrawn and raises
+        write_timeout; one already running is waited for, its outcome is final.
+        timeout=None waits indefinitely.
+        """
+        future = self.submit(func, *args, **kwargs)
+        try:
+            return future.result(timeout)
+        except FutureTimeout:
+            if future.cancel():
+                with self._lock:
+                    self._stats['timeouts'] += 1
+                raise write_timeout(f"database busy: write not started within {timeout:g} s") from None
+            return future.result()
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.linger
+        while len(batch) < self.max_batch:
+            try:
+                remaining = deadline - time.monotonic()
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self._commit_batch(batch)
+            finally:
+                # Hands the connection back (rolling back anything left open)
+                release_connections()
+
+    def _begin(self, cursor):
+        for attempt in range(WRITE_BUSY_RETRIES + 1):
+            try:
+                cursor.execute("BEGIN IMMEDIATE")
+                return
+            except sqlite3.OperationalError as e:
+                if 'locked' not in str(e) and 'busy' not in str(e) or attempt == WRITE_BUSY_RETRIES:
+                    raise
+                with self._lock:
+                    self._stats['busy_retries'] += 1
+                time.sleep(0.05 * (attempt + 1))
+
+    def _commit_batch(self, batch):
+        batch = [item for item in batch if item[0].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        cursor, cnxn = connect_local(self.db_path).connect_to_db()
+        done = []
+        try:
+            # the writes' cache invalidations run after the real COMMIT below
+            with deferred_invalidations():
+                if cnxn.in_transaction:
+                    cnxn.rollback()
+                self._begin(cursor)
+                for i, (future, func, args, kwargs) in enumerate(batch):
+                    savepoint = f"write_{i}"
+                    cursor.execute(f"SAVEPOINT {savepoint}")
+                    cnxn.savepoint = savepoint
+                    try:
+                        result, error = func(cursor, cnxn, *args, **kwargs), None
+                    except Exception as e:
+                        result, error = None, e
+                        cursor.execute(f"ROLLBACK TO SAVEPOINT {savepoint}")
+                    finally:
+                        cnxn.savepoint = None
+                    cursor.execute(f"RELEASE SAVEPOINT {savepoint}")
+                    done.append((future, result, error))
+                cnxn.commit()
+        except Exception as e:
+            # The batch as a whole failed (lock never acquired, COMMIT failed,
+            # transaction aborted): none of it is written, every caller hears so
+            cnxn.savepoint = None
+            try:
+                cnxn.rollback()
+            except Exception:
+                pass
+            with self._lock:
+                self._stats['failed_batches'] += 1
+                self._stats['failed'] += len(batch)
+            for future, *_ in batch:
+                future.set_exception(e)
+            return
+        with self._lock:
+            self._stats['batches'] += 1
+            self._stats['writes'] += len(done)
+            self._stats['failed'] += sum(1 for _, _, error in done if error is not None)
+            self._stats['largest_batch'] = max(self._stats['largest_batch'], len(done))
+        for future, result, error in done:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def stats(self):
+        with self._lock:
+            out = dict(self._stats)
+        out['pending'] = self._queue.qsize()
+        out['db_path'] = self.db_path
+        return out
+
+
+_queues = {}
+_queues_lock = threading.Lock()
+
+
+def get_write_queue(db_path=DEFAULT_DB_PATH):
+    with _queues_lock:
+        writer = _queues.get(db_path)
+        if writer is None:
+            writer = _queues[db_path] = write_queue(db_path)
+        return writer
+
+
+def run_write(func, *args, **kwargs):
+    """Run func(cursor, cnxn, *args, **kwargs) on the local database's writer and wait for the commit.
+
+    Raises write_timeout when the write could not start within WRITE_TIMEOUT
+    seconds (pass timeout=... to change).
+    """
+    return get_write_queue().run(func, *args, **kwargs)
+
+
+def submit_write(func, *args, **kwargs):
+    return get_write_queue().submit(func, *args, **kwargs)
+
+
+def _execute(cursor, cnxn, sql, params):
+    cursor.execute(sql, params)
+    return cursor.rowcount
+
+
+def execute_write(sql, params=(), timeout=WRITE_TIMEOUT):
+    """Run one write statement through the writer; returns its rowcount."""
+    return run_write(_execute, sql, tuple(params), timeout=timeout)
+
+
+def run_transaction(func, *args, db_path=DEFAULT_DB_PATH, **kwargs):
+    """Run func(cursor, cnxn, *args, **kwargs) in one transaction on the calling thread's own connection.
+
+    For long writes (upload jobs) that must not occupy the writer: the queued
+    writes wait on SQLite's lock meanwhile and time out instead of queueing
+    behind it. As inside the writer, cnxn.commit() is deferred to the end (and
+    so are invalidate_dimensions() calls) and cnxn.rollback() undoes the work
+    done so far; an exception rolls back all.
+    """
+    cursor, cnxn = connect_local(db_path).connect_to_db()
+    if cnxn.in_transaction:
+        cnxn.rollback()
+    with deferred_invalidations():
+        get_write_queue(db_path)._begin(cursor)
+        cursor.execute("SAVEPOINT transaction_0")
+        cnxn.savepoint = "transaction_0"
+        try:
+            result = func(cursor, cnxn, *args, **kwargs)
+            cnxn.savepoint = None
+            cursor.execute("RELEASE SAVEPOINT transaction_0")
+            cnxn.commit()
+            return result
+        except BaseException:
+            cnxn.savepoint = None
+            cnxn.rollback()
+            raise
+
+
+def get_write_queue_stats():
+    return {path: writer.stats() for path, writer in _queues.items()}
@@ -0,0 +1,370 @@
+"""Benchmark the uploaders, display builders and summary endpoints on synthetic data.
+
+    python benchmark.py                          # scales 10, 100 and 1000
+    python benchmark.py --scales 1 10 --repeat 5
+    python benchmark.py --compare benchmarks/results_20261018-101500.json
+    python benchmark.py --imports-only           # cold import times only
+
+Each scale is generated with backend.generate_data.synthetic_dataset and loaded
+into a fresh database in a scratch working directory (the database and the sql/
+scripts are opened relative to the working directory), so neither
+my_local_database.db nor a database named by LOCAL_DB_PATH is touched. Results are written as JSON (benchmarks/results_<time>.json by
+default), together with the cold import time of the package entry points, each
+measured in a fresh interpreter. --compare reports the timings whose median got slower than --threshold
+times the given earlier run and exits with status 1 when there are any.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# The backend reads LOCAL_DB_PATH once, on import, and every uploader, builder
+# and the app open that database. Point it at the scratch database in the
+# working directory main() switches to before importing any of them: a
+# LOCAL_DB_PATH set for the app (often an absolute path) must never be the
+# database dropped and rebuilt here.
+DB_NAME = 'my_local_database.db'
+os.environ['LOCAL_DB_PATH'] = DB_NAME
+
+from backend.connect_local import connect_local, initialize_database, release_connections, count_rows
+from backend.generate_data import synthetic_dataset
+from backend.dimension_cache import invalidate_dimensions
+from backend.display_cache import clear_display_cache
+from backend.summary_statistics import compute_statistics, clear_statistics_cache
+from backend.upload_forecasts_nonpc import upload_nonpc_forecasts_local
+from backend.upload_forecasts_pc import upload_pc_forecasts_local
+from backend.upload_expenses import upload_expenses_stream
+from backend.upload_budgets import upload_budgets_local, upload_fundings_local
+from backend.upload_capex_forecast import upload_capex_forecasts_local
+from backend.upload_capex_budgets import upload_capex_budget_local
+from backend.upload_capex_expenses import upload_capex_expense_local
+from backend.create_display_table import (
+    get_departments_display, get_forecasts_display, get_pc_display, get_projects_display,
+    get_nonpc_display, get_budget_display_table, create_funding_display, get_project_cateogory_display,
+    get_IO_display_table, get_hr_category_display, get_expenses_display, get_capex_expenses_display,
+    create_capex_forecast_display, create_capex_budgets_dispaly
+)
+
+ROOT = Path(__file__).resolve().parent
+DEFAULT_SCALES = [10, 100, 1000]
+
+# Uploaders in dependency order (forecasts create the projects the rest refer to)
+UPLOADERS = [
+    ('project_forecasts_nonpc', upload_nonpc_forecasts_local),
+    ('project_forecasts_pc', upload_pc_forecasts_local),
+    ('budgets', upload_budgets_local),
+    ('fundings', upload_fundings_local),
+    ('expenses', None),  # streamed from a CSV, like the upload job does
+    ('capex_forecasts', upload_capex_forecasts_local),
+    ('capex_budgets', upload_capex_budget_local),
+    ('capex_expenses', lambda df: upload_capex_expense_local(df, clear=False)),
+]
+BUILDERS = [
+    get_departments_display, get_forecasts_display, get_pc_display, get_projects_display,
+    get_nonpc_display, get_budget_display_table, create_funding_display, get_project_cateogory_display,
+    get_IO_display_table, get_hr_category_display, get_expenses_display, get_capex_expenses_display,
+    create_capex_forecast_display, create_capex_budgets_dispaly
+]
+PAGED_TABLES = ['project_forecasts_pc', 'project_forecasts_nonpc', 'expenses', 'capex_expenses']
+PER_PAGE = 50  # /select page size
+LISTING_URLS = ['/modify_project/list', '/modify_io/list', '/data_summary/get_statistics']
+COUNTED_TABLES = ['pos', 'departments', 'projects', 'ios'] + [name for name, _ in UPLOADERS]
+IMPORT_TARGETS = ['backend', 'backend.connect_local', 'backend.create_display_table', 'app_local']
+HEAVY_MODULES = ['pyodbc', 'sqlalchemy', 'plotly', 'backend.generate_data']  # reported when an import pulls them in
+IMPORT_PROBE = (
+    "import json, sys, time\n"
+    "start = time.perf_counter()\n"
+    "import {module}\n"
+    "print(json.dumps([(time.perf_counter() - start) * 1000, [m for m in {heavy!r} if m in sys.modules]]))\n"
+)
+
+
+def timed(func, repeat=1, setup=None):
+    """Run func() `repeat` times (setup() untimed before each run); returns the timings in ms."""
+    runs = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        runs.append((time.perf_counter() - start) * 1000)
+    return summarize(runs)
+
+
+def summarize(runs):
+    return {
+        'runs': len(runs),
+        'first_ms': round(runs[0], 3),
+        'min_ms': round(min(runs), 3),
+        'median_ms': round(statistics.median(runs), 3),
+        'max_ms': round(max(runs), 3),
+    }
+
+
+def record(results, name, func, repeat=1, setup=None):
+    try:
+        results[name] = timed(func, repeat, setup)
+    except Exception as e:
+        results[name] = {'error': f"{type(e).__name__}: {e}"}
+        print(f"  {name}: {results[name]['error']}")
+
+
+def clear_caches():
+    clear_display_cache()
+    clear_statistics_cache()
+    invalidate_dimensions()
+
+
+def seed_reference_tables(cursor, cnxn, data):
+    """POs, departments (with their PO), staff categories and rates the uploads do not create."""
+    departments = data['departments']
+    cursor.executemany("INSERT INTO pos (name) VALUES (?)", [(po,) for po in departments['PO'].unique()])
+    cursor.executemany(
+        "INSERT INTO departments (name, po_id) SELECT ?, id FROM pos WHERE name = ?",
+        departments[['Department', 'PO']].itertuples(index=False, name=None)
+    )
+    staff_cost = data['staff_cost']
+    cursor.executemany("INSERT INTO human_resource_categories (name) VALUES (?)",
+                       [(c,) for c in staff_cost['Human resource category'].unique()])
+    cursor.executemany(
+        "INSERT INTO human_resource_cost (category_id, year, cost) "
+        "SELECT id, ?, ? FROM human_resource_categories WHERE name = ?",
+        [(int(y), float(c), n) for n, y, c in staff_cost.itertuples(index=False, name=None)]
+    )
+    cnxn.commit()
+    invalidate_dimensions()
+
+
+def seed_ios(cursor, cnxn, data):
+    """IO numbers of the projects the forecasts created (expenses resolve their Order through them)."""
+    cursor.executemany(
+        "INSERT INTO ios (IO_num, project_id) SELECT ?, id FROM projects WHERE name = ?",
+        [(int(io), name) for io, name in data['ios'].itertuples(index=False, name=None)]
+    )
+    cnxn.commit()
+    invalidate_dimensions('ios')
+
+
+def benchmark_uploads(data, workdir, db_path):
+    results = {}
+    for table, upload in UPLOADERS:
+        if table == 'expenses':
+            cursor, cnxn = connect_local(db_path).connect_to_db()
+            seed_ios(cursor, cnxn, data)
+            path = os.path.join(workdir, 'expenses.csv')
+            data['expenses'].to_csv(path, index=False)
+            record(results, f'upload/{table}', lambda: upload_expenses_stream(path))
+        else:
+            # uploaders modify the frame they are given
+            record(results, f'upload/{table}', lambda: upload(data[table].copy()))
+    return results
+
+
+def benchmark_builders(repeat):
+    results = {}
+    for builder in BUILDERS:
+        # cold: rebuilt from the database every run; warm: served from the display cache
+        record(results, f'display/{builder.__name__}/cold', builder, repeat, setup=clear_display_cache)
+        record(results, f'display/{builder.__name__}/warm', builder, repeat)
+    return results
+
+
+def benchmark_routes(client, cursor, data, repeat):
+    results = {}
+
+    def get(url):
+        def call():
+            response = client.get(url)
+            if response.status_code != 200:
+                raise RuntimeError(f"GET {url} returned {response.status_code}")
+        return call
+
+    for table in PAGED_TABLES:
+        pages = max(1, -(-count_rows(cursor, table) // PER_PAGE))
+        for label, page in (('first', 1), ('middle', (pages + 1) // 2), ('last', pages)):
+            record(results, f'select/{table}/{label}_page', get(f'/select?table_name={table}&page={page}'), repeat)
+
+    projects = data['project_forecasts_nonpc']
+    po, department, year, project = projects.iloc[0][['PO', 'Department', 'fiscal_year', 'Project Name']]
+    filters = {
+        'all': {},
+        'po': {'po': po},
+        'department': {'po': po, 'department': department},
+        'fiscal_year': {'fiscal_year': str(year)},
+        'project': {'po': po, 'department': department, 'fiscal_year': str(year), 'project': project},
+    }
+    for label, values in filters.items():
+        # the statistics computation itself, then the endpoint (first call computes, later ones hit its cache)
+        record(results, f'statistics/compute/{label}', lambda: compute_statistics(**values, cursor=cursor), repeat)
+        query = '&'.join(f'{k}={v}' for k, v in values.items())
+        clear_statistics_cache()
+        record(results, f'get_statistics/{label}', get(f'/data_summary/get_statistics?{query}'), repeat)
+    clear_statistics_cache()
+    record(results, 'project_summary/get_statistics',
+           get(f"/project_summary/get_statistics?{'&'.join(f'{k}={v}' for k, v in filters['project'].items())}"), repeat)
+    record(results, 'project_summary/page', get('/project_summary'), repeat, setup=clear_caches)
+    record(results, 'data_summary/page', get('/data_summary'), repeat, setup=clear_caches)
+
+    # JSON listings built from scratch, then revalidated with their ETag (answered 304)
+    for url in LISTING_URLS:
+        record(results, url.lstrip('/'), get(url), repeat, setup=clear_caches)
+        etag = client.get(url).headers.get('ETag')
+
+        def revalidate(url=url, etag=etag):
+            response = client.get(url, headers={'If-None-Match': etag})
+            if response.status_code != 304:
+                raise RuntimeError(f"GET {url} with its ETag returned {response.status_code}")
+        record(results, f"{url.lstrip('/')}/not_modified", revalidate, repeat)
+    return results
+
+
+def benchmark_imports(repeat):
+    """Cold import of IMPORT_TARGETS, each run in a fresh interpreter started in the working directory."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(ROOT), os.environ.get('PYTHONPATH')])))
+    results = {}
+    for module in IMPORT_TARGETS:
+        name = f'import/{module}'
+        runs = []
+        for _ in range(repeat):
+            probe = IMPORT_PROBE.format(module=module, heavy=HEAVY_MODULES)
+            proc = subprocess.run([sys.executable, '-c', probe], env=env, capture_output=True, text=True)
+            if proc.returncode:
+                results[name] = {'error': (proc.stderr.strip().splitlines() or ['failed'])[-1]}
+                print(f"  {name}: {results[name]['error']}")
+                break
+            ms, heavy = json.loads(proc.stdout.strip().splitlines()[-1])
+            runs.append(ms)
+        else:
+            results[name] = dict(summarize(runs), heavy_modules=heavy)
+    return results
+
+
+def run_scale(scale, client, workdir, db_path, repeat, seed):
+    print(f"scale {scale:g}x")
+    start = time.perf_counter()
+    data = synthetic_dataset(scale, seed=seed)
+    generated_ms = (time.perf_counter() - start) * 1000
+    cursor, cnxn = connect_local(db_path).connect_to_db()
+    initialize_database(cursor, cnxn, initial_values=False)
+    clear_caches()
+    seed_reference_tables(cursor, cnxn, data)
+
+    timings = {'generate/synthetic_dataset': {'runs': 1, 'first_ms': round(generated_ms, 3)}}
+    timings.update(benchmark_uploads(data, workdir, db_path))
+    cursor, cnxn = connect_local(db_path).connect_to_db()
+    timings.update(benchmark_builders(repeat))
+    timings.update(benchmark_routes(client, cursor, data, repeat))
+    rows = {table: count_rows(cursor, table) for table in COUNTED_TABLES}
+    release_connections()
+    return {
+        'rows': rows,
+        'generated_rows': {name: len(frame) for name, frame in data.items()},
+        'timings': timings,
+    }
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'sqlite': sqlite3.sqlite_version,
+        'git_commit': commit or None,
+    }
+
+
+def compare(current, baseline, threshold):
+    """Timings slower than `threshold` x their baseline median, as printable lines."""
+    sections = [('', current.get('imports', {}), baseline.get('imports', {}))]
+    for scale, result in current['scales'].items():
+        sections.append((f"{scale}x ", result['timings'], baseline.get('scales', {}).get(scale, {}).get('timings', {})))
+    slower = []
+    for label, timings, before in sections:
+        for name, timing in timings.items():
+            old, new = before.get(name, {}).get('median_ms'), timing.get('median_ms')
+            if old and new and new > old * threshold:
+                slower.append(f"{label}{name}: {old:.1f} -> {new:.1f} ms ({new / old:.2f}x)")
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', type=float, nargs='+', default=DEFAULT_SCALES,
+                        help='multiples of the generate_tables() volume')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per builder/endpoint timing')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', help='result file (default benchmarks/results_<time>.json)')
+    parser.add_argument('--workdir', help='scratch directory for the database (default: a temporary one)')
+    parser.add_argument('--compare', help='earlier result file to check for regressions')
+    parser.add_argument('--threshold', type=float, default=1.25, help='slowdown reported by --compare')
+    parser.add_argument('--imports-only', action='store_true', help='only time the cold imports')
+    args = parser.parse_args(argv)
+
+    out = Path(args.out or ROOT / 'benchmarks' / f"results_{time.strftime('%Y%m%d-%H%M%S')}.json").resolve()
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix='benchmark_')).resolve()
+    workdir.mkdir(parents=True, exist_ok=True)
+    shutil.copytree(ROOT / 'sql', workdir / 'sql', dirs_exist_ok=True)
+    db_path = str(workdir / DB_NAME)
+    previous = os.getcwd()
+    os.chdir(workdir)
+    try:
+        cursor, cnxn = connect_local(db_path).connect_to_db()
+        initialize_database(cursor, cnxn, initial_values=False)
+        from app_local import app  # serves LOCAL_DB_PATH, i.e. db_path
+        client = app.test_client()
+        results = {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'environment': environment(),
+            'settings': {'repeat': args.repeat, 'seed': args.seed, 'per_page': PER_PAGE},
+            'imports': benchmark_imports(args.repeat),
+            'scales': {},
+        }
+        for scale in [] if args.imports_only else args.scales:
+            label = f'{scale:g}'
+            results['scales'][label] = run_scale(scale, client, str(workdir), db_path, args.repeat, args.seed)
+    finally:
+        release_connections()
+        os.chdir(previous)
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(results, indent=2))
+    print(f"results written to {out}")
+    print("\nimports")
+    for name, timing in results['imports'].items():
+        heavy = ', '.join(timing.get('heavy_modules', []))
+        print(f"  {name:<55} {timing.get('median_ms', timing.get('error'))}{'  (loads ' + heavy + ')' if heavy else ''}")
+    for label, result in results['scales'].items():
+        print(f"\nscale {label}x")
+        for name, timing in result['timings'].items():
+            print(f"  {name:<55} {timing.get('median_ms', timing.get('first_ms', timing.get('error')))}")
+
+    if args.compare:
+        slower = compare(results, json.loads(Path(args.compare).read_text()), args.threshold)
+        print(f"\n{len(slower)} timing(s) slower than {args.threshold}x {args.compare}")
+        for line in slower:
+            print(f"  {line}")
+        return 1 if slower else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
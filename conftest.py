@@ -0,0 +1,11 @@
+import os
+import shutil
+import tempfile
+
+# Run the suite against a copy of the tracked database: importing the app and
+# the tests' writes then never modify my_local_database.db (the backend reads
+# LOCAL_DB_PATH when backend.connect_local is first imported, i.e. after this).
+_here = os.path.dirname(os.path.abspath(__file__))
+_scratch = os.path.join(tempfile.mkdtemp(), "my_local_database.db")
+shutil.copyfile(os.path.join(_here, "my_local_database.db"), _scratch)
+os.environ.setdefault("LOCAL_DB_PATH", _scratch)
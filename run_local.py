@@ -28,19 +28,6 @@ capex_expense_path = "processed_data/expenses/capex_expenses_.csv"
 hr_path = "processed_data/info/personnel_categories.csv"
 department_path = 'processed_data/info/departments.csv'
 
-df_nonpc = pd.read_csv(filepath_nonpc)
-df_pc = pd.read_csv(filepath_pc)
-df_pc = df_pc.drop(['Personnel cost'],axis=1)
-df_expense = pd.read_csv(file_path_expenses)
-df_budgets = pd.read_csv(budget_path)
-df_funding = pd.read_csv(funding_path)
-df_departments = pd.read_csv(department_path)
-
-df_capex_forecast = pd.read_csv(capex_forecast_path)
-df_capex_budget = pd.read_csv(capex_budgets_path)
-df_capex_expense = pd.read_csv(capex_expense_path)
-df_hr = pd.read_csv(hr_path)
-
 
 def generate_staff_cost(df_pc, df_hr, out_path='processed_data/info/staff_cost_.csv', seed=2):
     """Generate staff cost table from df_pc and df_hr.
@@ -176,62 +163,78 @@ def generate_staff_cost(df_pc, df_hr, out_path='processed_data/info/staff_cost_.
     return result
 
 
-# connect to local DB
-connect_obj = connect_local()
-
-engine, cursor, cnxn = connect_obj.connect_to_db(engine=True)
-# drop_all_tables(cursor, cnxn)
-initialize_database(cursor, cnxn, initial_values=False)
-
-# df_test = pd.read_csv("df_test.csv")
-
-# res = select_columns_from_table(cursor, "project_forecasts_nonpc", ['fiscal_year', 'department_id', 'project_id','project_category_id', 'io_id', 'po_id'])
-# print(res)
-
-# df_po = df_nonpc[['PO']]
-
-df_io = df_nonpc[['IO', 'Project Name']]
-# df_department = df_nonpc[['Department']]
-df_project_category = df_nonpc[['Project Category']]
-df_projects = df_nonpc[['Project Name', 'Project Category', 'Department']]
+def main():
+    """Seed ./my_local_database.db from the processed_data CSVs."""
+    df_nonpc = pd.read_csv(filepath_nonpc)
+    df_pc = pd.read_csv(filepath_pc)
+    df_pc = df_pc.drop(['Personnel cost'],axis=1)
+    df_expense = pd.read_csv(file_path_expenses)
+    df_budgets = pd.read_csv(budget_path)
+    df_funding = pd.read_csv(funding_path)
+    df_departments = pd.read_csv(department_path)
+
+    df_capex_forecast = pd.read_csv(capex_forecast_path)
+    df_capex_budget = pd.read_csv(capex_budgets_path)
+    df_capex_expense = pd.read_csv(capex_expense_path)
+    df_hr = pd.read_csv(hr_path)
+
+    # connect to local DB
+    connect_obj = connect_local()
+
+    cursor, cnxn = connect_obj.connect_to_db()
+    # drop_all_tables(cursor, cnxn)
+    initialize_database(cursor, cnxn, initial_values=False)
+
+    # df_test = pd.read_csv("df_test.csv")
+
+    # res = select_columns_from_table(cursor, "project_forecasts_nonpc", ['fiscal_year', 'department_id', 'project_id','project_category_id', 'io_id', 'po_id'])
+    # print(res)
+
+    # df_po = df_nonpc[['PO']]
+
+    df_io = df_nonpc[['IO', 'Project Name']]
+    # df_department = df_nonpc[['Department']]
+    df_project_category = df_nonpc[['Project Category']]
+    df_projects = df_nonpc[['Project Name', 'Project Category', 'Department']]
+
+    # df_po.to_csv('processed_data/info/po_.csv', index= False)
+    df_po = pd.read_csv('processed_data/info/po_.csv')
+    # df_department = df_department.drop_duplicates()
+    # df_department.to_csv('processed_data/info/departments_.csv', index= False)
+    # df_department = pd.read_csv('processed_data/info/departments_.csv')
+    po_row = add_entry(df_po, "pos", ['name'], 'name')
+    department_row = add_entry(df_departments, 'departments',['name', 'po_id'], 'po_id')
+    category_row = add_entry(df_project_category, "project_categories", ['category'], 'category')
+    projects_row = add_entry(df_projects, "projects", ['name', 'category_id', 'department_id'], 'name')
+    add_entry(df_hr, "human_resource_categories", ['name'], 'name')
+    # Now generate staff cost CSV (after human_resource_categories inserted) and insert into DB
+    try:
+        staff_cost_df = generate_staff_cost(df_pc, df_hr)
+        print('Generated staff_cost_df rows:', len(staff_cost_df))
+        if staff_cost_df is not None and not staff_cost_df.empty:
+            # add_entry expects merge columns and a merge_on key; use category_id, year, cost
+            add_entry(staff_cost_df, 'human_resource_cost', ['category_id', 'year', 'cost'], 'category_id')
+    except Exception as e:
+        print('Failed to generate/insert staff_cost_df into human_resource_cost:', e)
+    add_entry(df_io, "ios", ['IO_num', 'project_id'], 'IO_num')
 
-# df_po.to_csv('processed_data/info/po_.csv', index= False)
-df_po = pd.read_csv('processed_data/info/po_.csv')
-# df_department = df_department.drop_duplicates()
-# df_department.to_csv('processed_data/info/departments_.csv', index= False)
-# df_department = pd.read_csv('processed_data/info/departments_.csv')
-po_row = add_entry(df_po, "pos", ['name'], 'name')
-department_row = add_entry(df_departments, 'departments',['name', 'po_id'], 'po_id')
-category_row = add_entry(df_project_category, "project_categories", ['category'], 'category')
-projects_row = add_entry(df_projects, "projects", ['name', 'category_id', 'department_id'], 'name')
-add_entry(df_hr, "human_resource_categories", ['name'], 'name')
-# Now generate staff cost CSV (after human_resource_categories inserted) and insert into DB
-try:
-    staff_cost_df = generate_staff_cost(df_pc, df_hr)
-    print('Generated staff_cost_df rows:', len(staff_cost_df))
-    if staff_cost_df is not None and not staff_cost_df.empty:
-        # add_entry expects merge columns and a merge_on key; use category_id, year, cost
-        add_entry(staff_cost_df, 'human_resource_cost', ['category_id', 'year', 'cost'], 'category_id')
-except Exception as e:
-    print('Failed to generate/insert staff_cost_df into human_resource_cost:', e)
-add_entry(df_io, "ios", ['IO_num', 'project_id'], 'IO_num')
 
+    upload_nonpc_forecasts_local(df_nonpc)
+    upload_pc_forecasts_local(df_pc)
 
-upload_nonpc_forecasts_local(df_nonpc)
-upload_pc_forecasts_local(df_pc)
+    # cnxn.commit()
 
-# cnxn.commit()
+    upload_expenses_local(df_expense)
+    upload_budgets_local(df_budgets)
 
-upload_expenses_local(df_expense)
-upload_budgets_local(df_budgets)
+    upload_fundings_local(df_funding)
+    upload_capex_forecasts_local(df_capex_forecast)
 
-upload_fundings_local(df_funding)
-upload_capex_forecasts_local(df_capex_forecast)
+    upload_capex_budget_local(df_capex_budget)
+    upload_capex_expense_local(df_capex_expense)
 
-upload_capex_budget_local(df_capex_budget)
-upload_capex_expense_local(df_capex_expense)
 
-def temp_get_all_table_columns():
+def temp_get_all_table_columns(cursor):
     cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
     tables = cursor.fetchall()
 
@@ -245,3 +248,7 @@ def temp_get_all_table_columns():
         for col_info in columns:
             # col_info structure: (cid, name, type, notnull, dflt_value, pk)
             print(f"  Column Name: {col_info[1]}, Type: {col_info[2]}")
+
+
+if __name__ == '__main__':
+    main()
@@ -197,4 +197,41 @@ CREATE TABLE capex_expenses(
     FOREIGN KEY (po_id) REFERENCES pos(id),
     FOREIGN KEY (project_id) REFERENCES projects(id),
     FOREIGN KEY (department_id) REFERENCES departments(id)
-);
\ No newline at end of file
+);
+
+---- Indexes
+-- Natural keys: unique, so uploads resolve clashes with INSERT ... ON CONFLICT,
+-- and the manual edit/delete routes find their row with one index probe
+CREATE UNIQUE INDEX IF NOT EXISTS UQ_project_forecasts_nonpc_key ON project_forecasts_nonpc (PO_id, department_id, project_id, project_category_id, fiscal_year);
+CREATE UNIQUE INDEX IF NOT EXISTS UQ_project_forecasts_pc_key ON project_forecasts_pc (PO_id, department_id, project_id, project_category_id, fiscal_year, human_resource_category_id);
+CREATE UNIQUE INDEX IF NOT EXISTS UQ_budgets_key ON budgets (po_id, department_id, fiscal_year);
+CREATE UNIQUE INDEX IF NOT EXISTS UQ_fundings_key ON fundings (po_id, department_id, fiscal_year, funding_from, funding_for);
+CREATE UNIQUE INDEX IF NOT EXISTS UQ_capex_forecasts_key ON capex_forecasts (po_id, department_id, project_id, cap_year);
+CREATE UNIQUE INDEX IF NOT EXISTS UQ_capex_budgets_key ON capex_budgets (po_id, department_id, project_id, cap_year);
+CREATE UNIQUE INDEX IF NOT EXISTS UQ_POs_name ON POs (name);
+CREATE UNIQUE INDEX IF NOT EXISTS UQ_departments_name ON departments (name);
+CREATE UNIQUE INDEX IF NOT EXISTS UQ_project_categories_category ON project_categories (category);
+CREATE UNIQUE INDEX IF NOT EXISTS UQ_projects_key ON projects (name, department_id);
+CREATE UNIQUE INDEX IF NOT EXISTS UQ_IOs_key ON IOs (IO_num, project_id);
+CREATE UNIQUE INDEX IF NOT EXISTS UQ_human_resource_categories_name ON human_resource_categories (name);
+CREATE UNIQUE INDEX IF NOT EXISTS UQ_co_object_names_name ON co_object_names (name);
+CREATE INDEX IF NOT EXISTS idx_human_resource_cost_key ON human_resource_cost (po_id, department_id, category_id, year);
+-- Year filters (clear_table_by_year, year selections)
+CREATE INDEX IF NOT EXISTS idx_project_forecasts_nonpc_fiscal_year ON project_forecasts_nonpc (fiscal_year);
+CREATE INDEX IF NOT EXISTS idx_project_forecasts_pc_fiscal_year ON project_forecasts_pc (fiscal_year);
+CREATE INDEX IF NOT EXISTS idx_budgets_fiscal_year ON budgets (fiscal_year);
+CREATE INDEX IF NOT EXISTS idx_fundings_fiscal_year ON fundings (fiscal_year);
+CREATE INDEX IF NOT EXISTS idx_expenses_fiscal_year ON expenses (fiscal_year);
+CREATE INDEX IF NOT EXISTS idx_capex_forecasts_cap_year ON capex_forecasts (cap_year);
+CREATE INDEX IF NOT EXISTS idx_capex_budgets_cap_year ON capex_budgets (cap_year);
+CREATE INDEX IF NOT EXISTS idx_capex_expenses_cap_year ON capex_expenses (cap_year);
+-- Foreign keys followed when a project is edited or deleted
+CREATE INDEX IF NOT EXISTS idx_IOs_project_id ON IOs (project_id);
+CREATE INDEX IF NOT EXISTS idx_IO_CE_connection_IO_id ON IO_CE_connection (IO_id);
+CREATE INDEX IF NOT EXISTS idx_expenses_io_id ON expenses (io_id);
+CREATE INDEX IF NOT EXISTS idx_expenses_cost_element_id ON expenses (cost_element_id);
+CREATE INDEX IF NOT EXISTS idx_project_forecasts_nonpc_project_id ON project_forecasts_nonpc (project_id);
+CREATE INDEX IF NOT EXISTS idx_project_forecasts_pc_project_id ON project_forecasts_pc (project_id);
+CREATE INDEX IF NOT EXISTS idx_capex_forecasts_project_id ON capex_forecasts (project_id);
+CREATE INDEX IF NOT EXISTS idx_capex_budgets_project_id ON capex_budgets (project_id);
+CREATE INDEX IF NOT EXISTS idx_capex_expenses_project_id ON capex_expenses (project_id);
@@ -21,3 +21,6 @@ drop table if exists co_object_names;
 drop table if exists departments;
 drop table if exists POs;
 
+
+drop table if exists summary_rollup;
+drop table if exists summary_rollup_fte;
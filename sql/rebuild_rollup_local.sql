@@ -0,0 +1,52 @@
+-- Recompute summary_rollup / summary_rollup_fte from the base tables (used on first use and after
+-- schema rebuilds that dropped the maintenance triggers).
+DELETE FROM summary_rollup;
+DELETE FROM summary_rollup_fte;
+
+INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, non_personnel_forecast)
+SELECT IFNULL(t.PO_id, 0), IFNULL(t.department_id, 0), IFNULL(t.fiscal_year, 0), IFNULL(t.project_id, 0), SUM(IFNULL(t.non_personnel_expense, 0))
+FROM project_forecasts_nonpc t WHERE true
+GROUP BY 1, 2, 3, 4
+ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET non_personnel_forecast = non_personnel_forecast + excluded.non_personnel_forecast;
+
+INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, personnel_budget, non_personnel_budget)
+SELECT IFNULL(t.po_id, 0), IFNULL(t.department_id, 0), IFNULL(t.fiscal_year, 0), 0, SUM(IFNULL(t.human_resource_expense, 0)), SUM(IFNULL(t.non_personnel_expense, 0))
+FROM budgets t WHERE true
+GROUP BY 1, 2, 3, 4
+ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET personnel_budget = personnel_budget + excluded.personnel_budget, non_personnel_budget = non_personnel_budget + excluded.non_personnel_budget;
+
+INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, funding)
+SELECT IFNULL(t.po_id, 0), IFNULL(t.department_id, 0), IFNULL(t.fiscal_year, 0), 0, SUM(IFNULL(t.funding, 0))
+FROM fundings t WHERE true
+GROUP BY 1, 2, 3, 4
+ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET funding = funding + excluded.funding;
+
+INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, actual_expense, personnel_expense)
+SELECT 0, IFNULL(t.department_id, 0), IFNULL(t.fiscal_year, 0), IFNULL((SELECT project_id FROM IOs WHERE id = t.io_id), 0), SUM(IFNULL(t.expense_value, 0)), SUM(CASE WHEN CAST((SELECT co_id FROM cost_elements WHERE id = t.cost_element_id) AS TEXT) LIKE '94%' THEN IFNULL(t.expense_value, 0) ELSE 0 END)
+FROM expenses t WHERE true
+GROUP BY 1, 2, 3, 4
+ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET actual_expense = actual_expense + excluded.actual_expense, personnel_expense = personnel_expense + excluded.personnel_expense;
+
+INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, capex_forecast)
+SELECT IFNULL(t.po_id, 0), IFNULL(t.department_id, 0), IFNULL(t.cap_year, 0), IFNULL(t.project_id, 0), SUM(IFNULL(t.capex_forecast, 0))
+FROM capex_forecasts t WHERE true
+GROUP BY 1, 2, 3, 4
+ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET capex_forecast = capex_forecast + excluded.capex_forecast;
+
+INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, capex_budget)
+SELECT IFNULL(t.po_id, 0), IFNULL(t.department_id, 0), IFNULL(t.cap_year, 0), IFNULL(t.project_id, 0), SUM(IFNULL(t.budget, 0))
+FROM capex_budgets t WHERE true
+GROUP BY 1, 2, 3, 4
+ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET capex_budget = capex_budget + excluded.capex_budget;
+
+INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, capex_expense)
+SELECT IFNULL(t.po_id, 0), IFNULL(t.department_id, 0), IFNULL(t.cap_year, 0), IFNULL(t.project_id, 0), SUM(IFNULL(t.expense, 0))
+FROM capex_expenses t WHERE true
+GROUP BY 1, 2, 3, 4
+ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET capex_expense = capex_expense + excluded.capex_expense;
+
+INSERT INTO summary_rollup_fte (po_id, department_id, fiscal_year, project_id, category_id, fte)
+SELECT IFNULL(t.PO_id, 0), IFNULL(t.department_id, 0), IFNULL(t.fiscal_year, 0), IFNULL(t.project_id, 0), IFNULL(t.human_resource_category_id, 0), SUM(IFNULL(t.human_resource_fte, 0))
+FROM project_forecasts_pc t WHERE true
+GROUP BY 1, 2, 3, 4, 5
+ON CONFLICT(po_id, department_id, fiscal_year, project_id, category_id) DO UPDATE SET fte = fte + excluded.fte;
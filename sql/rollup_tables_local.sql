@@ -0,0 +1,303 @@
+-- Pre-aggregated totals for data_summary / project_summary.
+-- summary_rollup holds one row per (po_id, department_id, fiscal_year, project_id); 0 stands for
+-- a missing key. Expenses carry no PO (it is derived from departments.po_id when querying) and
+-- take their project from IOs. Personnel forecasts are kept as FTE per staff category in
+-- summary_rollup_fte and priced with human_resource_cost when read, so rate edits need no upkeep.
+-- The triggers below keep both tables current for every writer (uploaders, modify routes, manual input).
+
+CREATE TABLE IF NOT EXISTS summary_rollup(
+    po_id INTEGER NOT NULL DEFAULT 0,
+    department_id INTEGER NOT NULL DEFAULT 0,
+    fiscal_year INTEGER NOT NULL DEFAULT 0,
+    project_id INTEGER NOT NULL DEFAULT 0,
+    non_personnel_forecast REAL NOT NULL DEFAULT 0,
+    personnel_budget REAL NOT NULL DEFAULT 0,
+    non_personnel_budget REAL NOT NULL DEFAULT 0,
+    funding REAL NOT NULL DEFAULT 0,
+    actual_expense REAL NOT NULL DEFAULT 0,
+    personnel_expense REAL NOT NULL DEFAULT 0,
+    capex_forecast REAL NOT NULL DEFAULT 0,
+    capex_budget REAL NOT NULL DEFAULT 0,
+    capex_expense REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (po_id, department_id, fiscal_year, project_id)
+);
+
+CREATE TABLE IF NOT EXISTS summary_rollup_fte(
+    po_id INTEGER NOT NULL DEFAULT 0,
+    department_id INTEGER NOT NULL DEFAULT 0,
+    fiscal_year INTEGER NOT NULL DEFAULT 0,
+    project_id INTEGER NOT NULL DEFAULT 0,
+    category_id INTEGER NOT NULL DEFAULT 0,
+    fte REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (po_id, department_id, fiscal_year, project_id, category_id)
+);
+
+-- Lookups used when IOs / cost elements change and expenses must be re-attributed
+CREATE INDEX IF NOT EXISTS idx_expenses_io_id ON expenses (io_id);
+CREATE INDEX IF NOT EXISTS idx_expenses_cost_element_id ON expenses (cost_element_id);
+
+-- project_forecasts_nonpc
+CREATE TRIGGER IF NOT EXISTS trg_rollup_nonpc_ai AFTER INSERT ON project_forecasts_nonpc
+BEGIN
+    INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, non_personnel_forecast)
+    VALUES (IFNULL(NEW.PO_id, 0), IFNULL(NEW.department_id, 0), IFNULL(NEW.fiscal_year, 0), IFNULL(NEW.project_id, 0), IFNULL(NEW.non_personnel_expense, 0))
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET non_personnel_forecast = non_personnel_forecast + excluded.non_personnel_forecast;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_rollup_nonpc_ad AFTER DELETE ON project_forecasts_nonpc
+BEGIN
+    INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, non_personnel_forecast)
+    VALUES (IFNULL(OLD.PO_id, 0), IFNULL(OLD.department_id, 0), IFNULL(OLD.fiscal_year, 0), IFNULL(OLD.project_id, 0), -(IFNULL(OLD.non_personnel_expense, 0)))
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET non_personnel_forecast = non_personnel_forecast + excluded.non_personnel_forecast;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_rollup_nonpc_au AFTER UPDATE ON project_forecasts_nonpc
+BEGIN
+    INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, non_personnel_forecast)
+    VALUES (IFNULL(OLD.PO_id, 0), IFNULL(OLD.department_id, 0), IFNULL(OLD.fiscal_year, 0), IFNULL(OLD.project_id, 0), -(IFNULL(OLD.non_personnel_expense, 0)))
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET non_personnel_forecast = non_personnel_forecast + excluded.non_personnel_forecast;
+    INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, non_personnel_forecast)
+    VALUES (IFNULL(NEW.PO_id, 0), IFNULL(NEW.department_id, 0), IFNULL(NEW.fiscal_year, 0), IFNULL(NEW.project_id, 0), IFNULL(NEW.non_personnel_expense, 0))
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET non_personnel_forecast = non_personnel_forecast + excluded.non_personnel_forecast;
+END;
+
+-- budgets
+CREATE TRIGGER IF NOT EXISTS trg_rollup_budgets_ai AFTER INSERT ON budgets
+BEGIN
+    INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, personnel_budget, non_personnel_budget)
+    VALUES (IFNULL(NEW.po_id, 0), IFNULL(NEW.department_id, 0), IFNULL(NEW.fiscal_year, 0), 0, IFNULL(NEW.human_resource_expense, 0), IFNULL(NEW.non_personnel_expense, 0))
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET personnel_budget = personnel_budget + excluded.personnel_budget, non_personnel_budget = non_personnel_budget + excluded.non_personnel_budget;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_rollup_budgets_ad AFTER DELETE ON budgets
+BEGIN
+    INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, personnel_budget, non_personnel_budget)
+    VALUES (IFNULL(OLD.po_id, 0), IFNULL(OLD.department_id, 0), IFNULL(OLD.fiscal_year, 0), 0, -(IFNULL(OLD.human_resource_expense, 0)), -(IFNULL(OLD.non_personnel_expense, 0)))
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET personnel_budget = personnel_budget + excluded.personnel_budget, non_personnel_budget = non_personnel_budget + excluded.non_personnel_budget;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_rollup_budgets_au AFTER UPDATE ON budgets
+BEGIN
+    INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, personnel_budget, non_personnel_budget)
+    VALUES (IFNULL(OLD.po_id, 0), IFNULL(OLD.department_id, 0), IFNULL(OLD.fiscal_year, 0), 0, -(IFNULL(OLD.human_resource_expense, 0)), -(IFNULL(OLD.non_personnel_expense, 0)))
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET personnel_budget = personnel_budget + excluded.personnel_budget, non_personnel_budget = non_personnel_budget + excluded.non_personnel_budget;
+    INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, personnel_budget, non_personnel_budget)
+    VALUES (IFNULL(NEW.po_id, 0), IFNULL(NEW.department_id, 0), IFNULL(NEW.fiscal_year, 0), 0, IFNULL(NEW.human_resource_expense, 0), IFNULL(NEW.non_personnel_expense, 0))
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET personnel_budget = personnel_budget + excluded.personnel_budget, non_personnel_budget = non_personnel_budget + excluded.non_personnel_budget;
+END;
+
+-- fundings
+CREATE TRIGGER IF NOT EXISTS trg_rollup_fundings_ai AFTER INSERT ON fundings
+BEGIN
+    INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, funding)
+    VALUES (IFNULL(NEW.po_id, 0), IFNULL(NEW.department_id, 0), IFNULL(NEW.fiscal_year, 0), 0, IFNULL(NEW.funding, 0))
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET funding = funding + excluded.funding;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_rollup_fundings_ad AFTER DELETE ON fundings
+BEGIN
+    INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, funding)
+    VALUES (IFNULL(OLD.po_id, 0), IFNULL(OLD.department_id, 0), IFNULL(OLD.fiscal_year, 0), 0, -(IFNULL(OLD.funding, 0)))
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET funding = funding + excluded.funding;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_rollup_fundings_au AFTER UPDATE ON fundings
+BEGIN
+    INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, funding)
+    VALUES (IFNULL(OLD.po_id, 0), IFNULL(OLD.department_id, 0), IFNULL(OLD.fiscal_year, 0), 0, -(IFNULL(OLD.funding, 0)))
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET funding = funding + excluded.funding;
+    INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, funding)
+    VALUES (IFNULL(NEW.po_id, 0), IFNULL(NEW.department_id, 0), IFNULL(NEW.fiscal_year, 0), 0, IFNULL(NEW.funding, 0))
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET funding = funding + excluded.funding;
+END;
+
+-- expenses
+CREATE TRIGGER IF NOT EXISTS trg_rollup_expenses_ai AFTER INSERT ON expenses
+BEGIN
+    INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, actual_expense, personnel_expense)
+    VALUES (0, IFNULL(NEW.department_id, 0), IFNULL(NEW.fiscal_year, 0), IFNULL((SELECT project_id FROM IOs WHERE id = NEW.io_id), 0), IFNULL(NEW.expense_value, 0), CASE WHEN CAST((SELECT co_id FROM cost_elements WHERE id = NEW.cost_element_id) AS TEXT) LIKE '94%' THEN IFNULL(NEW.expense_value, 0) ELSE 0 END)
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET actual_expense = actual_expense + excluded.actual_expense, personnel_expense = personnel_expense + excluded.personnel_expense;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_rollup_expenses_ad AFTER DELETE ON expenses
+BEGIN
+    INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, actual_expense, personnel_expense)
+    VALUES (0, IFNULL(OLD.department_id, 0), IFNULL(OLD.fiscal_year, 0), IFNULL((SELECT project_id FROM IOs WHERE id = OLD.io_id), 0), -(IFNULL(OLD.expense_value, 0)), -(CASE WHEN CAST((SELECT co_id FROM cost_elements WHERE id = OLD.cost_element_id) AS TEXT) LIKE '94%' THEN IFNULL(OLD.expense_value, 0) ELSE 0 END))
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET actual_expense = actual_expense + excluded.actual_expense, personnel_expense = personnel_expense + excluded.personnel_expense;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_rollup_expenses_au AFTER UPDATE ON expenses
+BEGIN
+    INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, actual_expense, personnel_expense)
+    VALUES (0, IFNULL(OLD.department_id, 0), IFNULL(OLD.fiscal_year, 0), IFNULL((SELECT project_id FROM IOs WHERE id = OLD.io_id), 0), -(IFNULL(OLD.expense_value, 0)), -(CASE WHEN CAST((SELECT co_id FROM cost_elements WHERE id = OLD.cost_element_id) AS TEXT) LIKE '94%' THEN IFNULL(OLD.expense_value, 0) ELSE 0 END))
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET actual_expense = actual_expense + excluded.actual_expense, personnel_expense = personnel_expense + excluded.personnel_expense;
+    INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, actual_expense, personnel_expense)
+    VALUES (0, IFNULL(NEW.department_id, 0), IFNULL(NEW.fiscal_year, 0), IFNULL((SELECT project_id FROM IOs WHERE id = NEW.io_id), 0), IFNULL(NEW.expense_value, 0), CASE WHEN CAST((SELECT co_id FROM cost_elements WHERE id = NEW.cost_element_id) AS TEXT) LIKE '94%' THEN IFNULL(NEW.expense_value, 0) ELSE 0 END)
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET actual_expense = actual_expense + excluded.actual_expense, personnel_expense = personnel_expense + excluded.personnel_expense;
+END;
+
+-- capex_forecasts
+CREATE TRIGGER IF NOT EXISTS trg_rollup_capex_forecasts_ai AFTER INSERT ON capex_forecasts
+BEGIN
+    INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, capex_forecast)
+    VALUES (IFNULL(NEW.po_id, 0), IFNULL(NEW.department_id, 0), IFNULL(NEW.cap_year, 0), IFNULL(NEW.project_id, 0), IFNULL(NEW.capex_forecast, 0))
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET capex_forecast = capex_forecast + excluded.capex_forecast;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_rollup_capex_forecasts_ad AFTER DELETE ON capex_forecasts
+BEGIN
+    INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, capex_forecast)
+    VALUES (IFNULL(OLD.po_id, 0), IFNULL(OLD.department_id, 0), IFNULL(OLD.cap_year, 0), IFNULL(OLD.project_id, 0), -(IFNULL(OLD.capex_forecast, 0)))
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET capex_forecast = capex_forecast + excluded.capex_forecast;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_rollup_capex_forecasts_au AFTER UPDATE ON capex_forecasts
+BEGIN
+    INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, capex_forecast)
+    VALUES (IFNULL(OLD.po_id, 0), IFNULL(OLD.department_id, 0), IFNULL(OLD.cap_year, 0), IFNULL(OLD.project_id, 0), -(IFNULL(OLD.capex_forecast, 0)))
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET capex_forecast = capex_forecast + excluded.capex_forecast;
+    INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, capex_forecast)
+    VALUES (IFNULL(NEW.po_id, 0), IFNULL(NEW.department_id, 0), IFNULL(NEW.cap_year, 0), IFNULL(NEW.project_id, 0), IFNULL(NEW.capex_forecast, 0))
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET capex_forecast = capex_forecast + excluded.capex_forecast;
+END;
+
+-- capex_budgets
+CREATE TRIGGER IF NOT EXISTS trg_rollup_capex_budgets_ai AFTER INSERT ON capex_budgets
+BEGIN
+    INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, capex_budget)
+    VALUES (IFNULL(NEW.po_id, 0), IFNULL(NEW.department_id, 0), IFNULL(NEW.cap_year, 0), IFNULL(NEW.project_id, 0), IFNULL(NEW.budget, 0))
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET capex_budget = capex_budget + excluded.capex_budget;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_rollup_capex_budgets_ad AFTER DELETE ON capex_budgets
+BEGIN
+    INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, capex_budget)
+    VALUES (IFNULL(OLD.po_id, 0), IFNULL(OLD.department_id, 0), IFNULL(OLD.cap_year, 0), IFNULL(OLD.project_id, 0), -(IFNULL(OLD.budget, 0)))
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET capex_budget = capex_budget + excluded.capex_budget;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_rollup_capex_budgets_au AFTER UPDATE ON capex_budgets
+BEGIN
+    INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, capex_budget)
+    VALUES (IFNULL(OLD.po_id, 0), IFNULL(OLD.department_id, 0), IFNULL(OLD.cap_year, 0), IFNULL(OLD.project_id, 0), -(IFNULL(OLD.budget, 0)))
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET capex_budget = capex_budget + excluded.capex_budget;
+    INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, capex_budget)
+    VALUES (IFNULL(NEW.po_id, 0), IFNULL(NEW.department_id, 0), IFNULL(NEW.cap_year, 0), IFNULL(NEW.project_id, 0), IFNULL(NEW.budget, 0))
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET capex_budget = capex_budget + excluded.capex_budget;
+END;
+
+-- capex_expenses
+CREATE TRIGGER IF NOT EXISTS trg_rollup_capex_expenses_ai AFTER INSERT ON capex_expenses
+BEGIN
+    INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, capex_expense)
+    VALUES (IFNULL(NEW.po_id, 0), IFNULL(NEW.department_id, 0), IFNULL(NEW.cap_year, 0), IFNULL(NEW.project_id, 0), IFNULL(NEW.expense, 0))
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET capex_expense = capex_expense + excluded.capex_expense;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_rollup_capex_expenses_ad AFTER DELETE ON capex_expenses
+BEGIN
+    INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, capex_expense)
+    VALUES (IFNULL(OLD.po_id, 0), IFNULL(OLD.department_id, 0), IFNULL(OLD.cap_year, 0), IFNULL(OLD.project_id, 0), -(IFNULL(OLD.expense, 0)))
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET capex_expense = capex_expense + excluded.capex_expense;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_rollup_capex_expenses_au AFTER UPDATE ON capex_expenses
+BEGIN
+    INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, capex_expense)
+    VALUES (IFNULL(OLD.po_id, 0), IFNULL(OLD.department_id, 0), IFNULL(OLD.cap_year, 0), IFNULL(OLD.project_id, 0), -(IFNULL(OLD.expense, 0)))
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET capex_expense = capex_expense + excluded.capex_expense;
+    INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, capex_expense)
+    VALUES (IFNULL(NEW.po_id, 0), IFNULL(NEW.department_id, 0), IFNULL(NEW.cap_year, 0), IFNULL(NEW.project_id, 0), IFNULL(NEW.expense, 0))
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET capex_expense = capex_expense + excluded.capex_expense;
+END;
+
+-- project_forecasts_pc
+CREATE TRIGGER IF NOT EXISTS trg_rollup_pc_ai AFTER INSERT ON project_forecasts_pc
+BEGIN
+    INSERT INTO summary_rollup_fte (po_id, department_id, fiscal_year, project_id, category_id, fte)
+    VALUES (IFNULL(NEW.PO_id, 0), IFNULL(NEW.department_id, 0), IFNULL(NEW.fiscal_year, 0), IFNULL(NEW.project_id, 0), IFNULL(NEW.human_resource_category_id, 0), IFNULL(NEW.human_resource_fte, 0))
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id, category_id) DO UPDATE SET fte = fte + excluded.fte;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_rollup_pc_ad AFTER DELETE ON project_forecasts_pc
+BEGIN
+    INSERT INTO summary_rollup_fte (po_id, department_id, fiscal_year, project_id, category_id, fte)
+    VALUES (IFNULL(OLD.PO_id, 0), IFNULL(OLD.department_id, 0), IFNULL(OLD.fiscal_year, 0), IFNULL(OLD.project_id, 0), IFNULL(OLD.human_resource_category_id, 0), -(IFNULL(OLD.human_resource_fte, 0)))
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id, category_id) DO UPDATE SET fte = fte + excluded.fte;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_rollup_pc_au AFTER UPDATE ON project_forecasts_pc
+BEGIN
+    INSERT INTO summary_rollup_fte (po_id, department_id, fiscal_year, project_id, category_id, fte)
+    VALUES (IFNULL(OLD.PO_id, 0), IFNULL(OLD.department_id, 0), IFNULL(OLD.fiscal_year, 0), IFNULL(OLD.project_id, 0), IFNULL(OLD.human_resource_category_id, 0), -(IFNULL(OLD.human_resource_fte, 0)))
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id, category_id) DO UPDATE SET fte = fte + excluded.fte;
+    INSERT INTO summary_rollup_fte (po_id, department_id, fiscal_year, project_id, category_id, fte)
+    VALUES (IFNULL(NEW.PO_id, 0), IFNULL(NEW.department_id, 0), IFNULL(NEW.fiscal_year, 0), IFNULL(NEW.project_id, 0), IFNULL(NEW.human_resource_category_id, 0), IFNULL(NEW.human_resource_fte, 0))
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id, category_id) DO UPDATE SET fte = fte + excluded.fte;
+END;
+
+-- IOs: expenses follow their IO's project
+CREATE TRIGGER IF NOT EXISTS trg_rollup_ios_ai AFTER INSERT ON IOs
+BEGIN
+    INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, actual_expense, personnel_expense)
+    SELECT 0, IFNULL(e.department_id, 0), IFNULL(e.fiscal_year, 0), 0, -TOTAL(e.expense_value), -TOTAL(CASE WHEN CAST((SELECT co_id FROM cost_elements WHERE id = e.cost_element_id) AS TEXT) LIKE '94%' THEN e.expense_value ELSE 0 END)
+    FROM expenses e WHERE e.io_id = NEW.id
+    GROUP BY 2, 3, 4
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET actual_expense = actual_expense + excluded.actual_expense, personnel_expense = personnel_expense + excluded.personnel_expense;
+    INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, actual_expense, personnel_expense)
+    SELECT 0, IFNULL(e.department_id, 0), IFNULL(e.fiscal_year, 0), IFNULL(NEW.project_id, 0), TOTAL(e.expense_value), TOTAL(CASE WHEN CAST((SELECT co_id FROM cost_elements WHERE id = e.cost_element_id) AS TEXT) LIKE '94%' THEN e.expense_value ELSE 0 END)
+    FROM expenses e WHERE e.io_id = NEW.id
+    GROUP BY 2, 3, 4
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET actual_expense = actual_expense + excluded.actual_expense, personnel_expense = personnel_expense + excluded.personnel_expense;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_rollup_ios_ad AFTER DELETE ON IOs
+BEGIN
+    INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, actual_expense, personnel_expense)
+    SELECT 0, IFNULL(e.department_id, 0), IFNULL(e.fiscal_year, 0), IFNULL(OLD.project_id, 0), -TOTAL(e.expense_value), -TOTAL(CASE WHEN CAST((SELECT co_id FROM cost_elements WHERE id = e.cost_element_id) AS TEXT) LIKE '94%' THEN e.expense_value ELSE 0 END)
+    FROM expenses e WHERE e.io_id = OLD.id
+    GROUP BY 2, 3, 4
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET actual_expense = actual_expense + excluded.actual_expense, personnel_expense = personnel_expense + excluded.personnel_expense;
+    INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, actual_expense, personnel_expense)
+    SELECT 0, IFNULL(e.department_id, 0), IFNULL(e.fiscal_year, 0), 0, TOTAL(e.expense_value), TOTAL(CASE WHEN CAST((SELECT co_id FROM cost_elements WHERE id = e.cost_element_id) AS TEXT) LIKE '94%' THEN e.expense_value ELSE 0 END)
+    FROM expenses e WHERE e.io_id = OLD.id
+    GROUP BY 2, 3, 4
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET actual_expense = actual_expense + excluded.actual_expense, personnel_expense = personnel_expense + excluded.personnel_expense;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_rollup_ios_au AFTER UPDATE OF id, project_id ON IOs
+BEGIN
+    INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, actual_expense, personnel_expense)
+    SELECT 0, IFNULL(e.department_id, 0), IFNULL(e.fiscal_year, 0), IFNULL(OLD.project_id, 0), -TOTAL(e.expense_value), -TOTAL(CASE WHEN CAST((SELECT co_id FROM cost_elements WHERE id = e.cost_element_id) AS TEXT) LIKE '94%' THEN e.expense_value ELSE 0 END)
+    FROM expenses e WHERE e.io_id = OLD.id
+    GROUP BY 2, 3, 4
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET actual_expense = actual_expense + excluded.actual_expense, personnel_expense = personnel_expense + excluded.personnel_expense;
+    INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, actual_expense, personnel_expense)
+    SELECT 0, IFNULL(e.department_id, 0), IFNULL(e.fiscal_year, 0), 0, TOTAL(e.expense_value), TOTAL(CASE WHEN CAST((SELECT co_id FROM cost_elements WHERE id = e.cost_element_id) AS TEXT) LIKE '94%' THEN e.expense_value ELSE 0 END)
+    FROM expenses e WHERE e.io_id = OLD.id
+    GROUP BY 2, 3, 4
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET actual_expense = actual_expense + excluded.actual_expense, personnel_expense = personnel_expense + excluded.personnel_expense;
+    INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, actual_expense, personnel_expense)
+    SELECT 0, IFNULL(e.department_id, 0), IFNULL(e.fiscal_year, 0), 0, -TOTAL(e.expense_value), -TOTAL(CASE WHEN CAST((SELECT co_id FROM cost_elements WHERE id = e.cost_element_id) AS TEXT) LIKE '94%' THEN e.expense_value ELSE 0 END)
+    FROM expenses e WHERE e.io_id = NEW.id
+    GROUP BY 2, 3, 4
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET actual_expense = actual_expense + excluded.actual_expense, personnel_expense = personnel_expense + excluded.personnel_expense;
+    INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, actual_expense, personnel_expense)
+    SELECT 0, IFNULL(e.department_id, 0), IFNULL(e.fiscal_year, 0), IFNULL(NEW.project_id, 0), TOTAL(e.expense_value), TOTAL(CASE WHEN CAST((SELECT co_id FROM cost_elements WHERE id = e.cost_element_id) AS TEXT) LIKE '94%' THEN e.expense_value ELSE 0 END)
+    FROM expenses e WHERE e.io_id = NEW.id
+    GROUP BY 2, 3, 4
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET actual_expense = actual_expense + excluded.actual_expense, personnel_expense = personnel_expense + excluded.personnel_expense;
+END;
+
+-- cost_elements: the personnel split depends on the cost element code (prefix 94)
+CREATE TRIGGER IF NOT EXISTS trg_rollup_cost_elements_ai AFTER INSERT ON cost_elements
+BEGIN
+    INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, personnel_expense)
+    SELECT 0, IFNULL(e.department_id, 0), IFNULL(e.fiscal_year, 0), IFNULL((SELECT project_id FROM IOs WHERE id = e.io_id), 0), TOTAL(CASE WHEN CAST(NEW.co_id AS TEXT) LIKE '94%' THEN e.expense_value ELSE 0 END)
+    FROM expenses e WHERE e.cost_element_id = NEW.id
+    GROUP BY 2, 3, 4
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET personnel_expense = personnel_expense + excluded.personnel_expense;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_rollup_cost_elements_ad AFTER DELETE ON cost_elements
+BEGIN
+    INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, personnel_expense)
+    SELECT 0, IFNULL(e.department_id, 0), IFNULL(e.fiscal_year, 0), IFNULL((SELECT project_id FROM IOs WHERE id = e.io_id), 0), -TOTAL(CASE WHEN CAST(OLD.co_id AS TEXT) LIKE '94%' THEN e.expense_value ELSE 0 END)
+    FROM expenses e WHERE e.cost_element_id = OLD.id
+    GROUP BY 2, 3, 4
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET personnel_expense = personnel_expense + excluded.personnel_expense;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_rollup_cost_elements_au AFTER UPDATE OF id, co_id ON cost_elements
+BEGIN
+    INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, personnel_expense)
+    SELECT 0, IFNULL(e.department_id, 0), IFNULL(e.fiscal_year, 0), IFNULL((SELECT project_id FROM IOs WHERE id = e.io_id), 0), -TOTAL(CASE WHEN CAST(OLD.co_id AS TEXT) LIKE '94%' THEN e.expense_value ELSE 0 END)
+    FROM expenses e WHERE e.cost_element_id = OLD.id
+    GROUP BY 2, 3, 4
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET personnel_expense = personnel_expense + excluded.personnel_expense;
+    INSERT INTO summary_rollup (po_id, department_id, fiscal_year, project_id, personnel_expense)
+    SELECT 0, IFNULL(e.department_id, 0), IFNULL(e.fiscal_year, 0), IFNULL((SELECT project_id FROM IOs WHERE id = e.io_id), 0), TOTAL(CASE WHEN CAST(NEW.co_id AS TEXT) LIKE '94%' THEN e.expense_value ELSE 0 END)
+    FROM expenses e WHERE e.cost_element_id = NEW.id
+    GROUP BY 2, 3, 4
+    ON CONFLICT(po_id, department_id, fiscal_year, project_id) DO UPDATE SET personnel_expense = personnel_expense + excluded.personnel_expense;
+END;
@@ -30,5 +30,24 @@ def test_endpoint():
     print("PASS: /api/hr_cost hierarchical lookup returns expected cost")
 
 
+def test_fallback_levels():
+    setup()
+    db = connect_local()
+    cursor, cnxn = db.connect_to_db()
+    cursor.execute("INSERT INTO human_resource_categories (name) VALUES (?)", ("Analyst",))
+    cat_id = cursor.lastrowid
+    # Only a (category, year) rate exists; a later row for the same key supersedes it
+    cursor.execute("INSERT INTO human_resource_cost (category_id, year, cost) VALUES (?, ?, ?)", (cat_id, 2025, 50.0))
+    cursor.execute("INSERT INTO human_resource_cost (category_id, year, cost) VALUES (?, ?, ?)", (cat_id, 2025, 60.0))
+    cnxn.commit()
+    client = app.test_client()
+    data = client.get("/api/hr_cost?category=Analyst&year=2025&po=PO1&department=Dept1").get_json()
+    assert data and float(data.get("cost")) == 60.0, data
+    data = client.get("/api/hr_cost?category=Analyst&year=2025&po=PO1&department=Dept1&strict=1").get_json()
+    assert data.get("cost") is None, data
+    print("PASS: /api/hr_cost falls back to (category, year) and honours strict mode")
+
+
 if __name__ == "__main__":
     test_endpoint()
+    test_fallback_levels()
@@ -0,0 +1,51 @@
+import hashlib
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+
+PROBE = "import app_local; print(app_local.app.secret_key)"
+
+
+def secret_key(env_value):
+    env = {k: v for k, v in os.environ.items() if k != 'FLASK_SECRET_KEY'}
+    if env_value is not None:
+        env['FLASK_SECRET_KEY'] = env_value
+    proc = subprocess.run([sys.executable, '-c', PROBE], env=env, capture_output=True, text=True, check=True)
+    return proc.stdout.strip().splitlines()[-1], proc.stderr
+
+
+def test_secret_key_from_environment():
+    key, _ = secret_key('stable-key')
+    assert key == 'stable-key'
+    first, warning = secret_key(None)
+    second, _ = secret_key(None)
+    assert first != second and 'FLASK_SECRET_KEY' in warning
+    print("PASS: the session key comes from FLASK_SECRET_KEY, with a warned random fallback")
+
+
+def test_import_leaves_the_database_alone():
+    path = os.path.join(tempfile.mkdtemp(), "app.db")
+    shutil.copyfile("my_local_database.db", path)
+    with open(path, 'rb') as f:
+        before = hashlib.sha1(f.read()).hexdigest()
+    env = dict(os.environ, LOCAL_DB_PATH=path)
+    subprocess.run([sys.executable, '-c', PROBE], env=env, capture_output=True, check=True)
+    with open(path, 'rb') as f:
+        assert hashlib.sha1(f.read()).hexdigest() == before
+    assert not os.path.exists(path + '-wal')
+
+    # the explicit startup step adds the change counters
+    subprocess.run([sys.executable, '-m', 'flask', '--app', 'app_local', 'prepare-db'],
+                   env=env, capture_output=True, check=True)
+    db = sqlite3.connect(path)
+    assert db.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'table_versions'").fetchone()[0] == 1
+    db.close()
+    print("PASS: importing the app leaves the database alone; prepare-db migrates it")
+
+
+if __name__ == "__main__":
+    test_secret_key_from_environment()
+    test_import_leaves_the_database_alone()
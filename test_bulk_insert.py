@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+from backend.bulk_insert import bulk_insert
+from backend.connect_local import connect_local, initialize_database
+
+
+def test_typed_batches():
+    db = connect_local()
+    cursor, cnxn = db.connect_to_db()
+    initialize_database(cursor, cnxn, initial_values=False)
+    cursor.executemany("INSERT INTO departments (id, name) VALUES (?, ?)", [(1, 'D1'), (3, 'D3')])
+    cnxn.commit()
+    df = pd.DataFrame({
+        'department_id': pd.array([1, None, 3], dtype='Int64'),
+        'fiscal_year': np.array([2024, 2025, 2025], dtype='int64'),
+        'expense_value': [1.5, np.nan, 3.0],
+        'name': ['a', None, np.int64(7)],
+    })
+    df.loc[1, 'expense_value'] = 2.0  # expense_value is NOT NULL
+    inserted = bulk_insert(cursor, cnxn, 'expenses', df, batch_size=2)
+    assert inserted == 3, inserted
+    rows = cursor.execute("SELECT department_id, fiscal_year, expense_value, name FROM expenses ORDER BY id").fetchall()
+    assert [tuple(r) for r in rows] == [(1, 2024, 1.5, 'a'), (None, 2025, 2.0, None), (3, 2025, 3.0, '7')], rows
+    assert not cnxn.in_transaction
+
+    # commit=False leaves the transaction to the caller
+    bulk_insert(cursor, cnxn, 'expenses', df.iloc[:1], commit=False)
+    assert cnxn.in_transaction
+    cnxn.rollback()
+    assert cursor.execute("SELECT COUNT(*) FROM expenses").fetchone()[0] == 3
+    print("PASS: bulk_insert writes typed tuples in committed batches")
+
+
+if __name__ == "__main__":
+    test_typed_batches()
@@ -0,0 +1,80 @@
+import gzip
+import json
+from app_local import app
+from backend.connect_local import connect_local, initialize_database
+from backend.request_metrics import reset_metrics, render_metrics
+
+
+def setup(projects=40):
+    cursor, cnxn = connect_local().connect_to_db()
+    initialize_database(cursor, cnxn, initial_values=False)
+    cursor.execute("INSERT INTO POs (id, name) VALUES (1, 'PO1')")
+    cursor.execute("INSERT INTO departments (id, name, po_id) VALUES (1, 'Dept1', 1)")
+    cursor.executemany("INSERT INTO projects (id, name, department_id) VALUES (?, ?, 1)",
+                       [(i, f"Project {i:03d}") for i in range(1, projects + 1)])
+    cursor.executemany("INSERT INTO IOs (IO_num, project_id) VALUES (?, ?)",
+                       [(1000000 + i, i) for i in range(1, projects + 1)])
+    cnxn.commit()
+    return cursor, cnxn
+
+
+def test_unchanged_listing_is_not_modified():
+    cursor, cnxn = setup()
+    client = app.test_client()
+    first = client.get('/modify_io/list')
+    etag = first.headers['ETag']
+    assert first.status_code == 200 and etag.startswith('W/"')
+    assert 'no-cache' in first.headers['Cache-Control'] and 'private' in first.headers['Cache-Control']
+
+    reset_metrics()
+    again = client.get('/modify_io/list', headers={'If-None-Match': etag})
+    assert again.status_code == 304 and again.data == b'' and again.headers['ETag'] == etag
+    # answered from the counters alone: the view (and its table reads) never ran
+    assert 'http_request_sql_statements_sum{endpoint="io_routes.list_ios"} 1' in render_metrics()
+
+    # another query string, or a write to a source table, gives another ETag
+    assert client.get('/modify_io/list?x=1').headers['ETag'] != etag
+    cursor.execute("UPDATE IOs SET IO_num = 2000001 WHERE project_id = 1")
+    cnxn.commit()
+    changed = client.get('/modify_io/list', headers={'If-None-Match': etag})
+    assert changed.status_code == 200 and changed.headers['ETag'] != etag
+    # a table the listing does not read leaves it valid
+    cursor.execute("INSERT INTO cost_elements (co_id, name) VALUES (9400001, 'Salaries')")
+    cnxn.commit()
+    assert client.get('/modify_io/list', headers={'If-None-Match': changed.headers['ETag']}).status_code == 304
+    print("PASS: unchanged listings are answered 304 until a source table changes")
+
+
+def test_session_selection_is_part_of_the_etag():
+    setup()
+    client = app.test_client()
+    client.post('/manual_input/po_selection', json={'po': 'PO1'})
+    first = client.get('/manual_input/departments')
+    assert first.status_code == 200 and first.get_json()['departments']
+    assert client.get('/manual_input/departments', headers={'If-None-Match': first.headers['ETag']}).status_code == 304
+    client.post('/manual_input/po_selection', json={'po': 'All'})
+    other = client.get('/manual_input/departments', headers={'If-None-Match': first.headers['ETag']})
+    assert other.status_code == 200 and other.get_json() == {'departments': []}
+    print("PASS: a different session selection is not answered from the old ETag")
+
+
+def test_large_json_is_compressed():
+    setup(projects=200)
+    client = app.test_client()
+    plain = client.get('/modify_io/list')
+    assert 'Content-Encoding' not in plain.headers and 'Accept-Encoding' in plain.headers['Vary']
+    packed = client.get('/modify_io/list', headers={'Accept-Encoding': 'gzip, deflate'})
+    assert packed.headers['Content-Encoding'] == 'gzip'
+    assert int(packed.headers['Content-Length']) == len(packed.data) < len(plain.data)
+    assert json.loads(gzip.decompress(packed.data)) == plain.get_json()
+    assert packed.headers['ETag'] == plain.headers['ETag']
+    # small bodies are sent as they are
+    small = client.get('/manual_input/ios?project=Project%20001', headers={'Accept-Encoding': 'gzip'})
+    assert small.status_code == 200 and 'Content-Encoding' not in small.headers
+    print("PASS: large JSON bodies are gzip-compressed for clients accepting it")
+
+
+if __name__ == "__main__":
+    test_unchanged_listing_is_not_modified()
+    test_session_selection_is_part_of_the_etag()
+    test_large_json_is_compressed()
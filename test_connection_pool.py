@@ -0,0 +1,85 @@
+import os
+import tempfile
+import threading
+from app_local import app
+from backend.connect_local import connect_local, get_pool, close_connection
+
+
+def scratch_db():
+    # a throwaway database, so the tracked my_local_database.db is not switched to WAL
+    return connect_local(os.path.join(tempfile.mkdtemp(), "pool.db"))
+
+
+def test_connections_are_reused():
+    db = scratch_db()
+    pool = get_pool(db.df_path)
+    pool.release()
+    before = pool.stats()
+
+    cursor, cnxn = db.connect_to_db()
+    engine, cursor2, cnxn2 = db.connect_to_db(engine=True)
+    # Same thread -> same underlying connection, one shared engine
+    assert cnxn is cnxn2
+    assert engine is db.connect_to_db(engine=True)[0]
+    close_connection(cursor, cnxn)
+    pool.release()
+
+    cursor, cnxn = db.connect_to_db()
+    cursor.execute("SELECT 1")
+    assert cursor.fetchone()[0] == 1
+    pool.release()
+
+    after = pool.stats()
+    assert after['reused'] > before['reused'], after
+    assert after['in_use'] == before['in_use'], after
+
+
+def test_threads_get_distinct_connections():
+    db = scratch_db()
+    seen = []
+
+    def worker():
+        cursor, cnxn = db.connect_to_db()
+        cursor.execute("SELECT 1")
+        seen.append(cnxn._raw)
+        get_pool(db.df_path).release()
+
+    barrier_threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in barrier_threads:
+        t.start()
+    for t in barrier_threads:
+        t.join()
+    assert len(seen) == 4
+
+
+def test_pragma_profile_applied():
+    db = scratch_db()
+    cursor, cnxn = db.connect_to_db()
+    cursor.execute("PRAGMA journal_mode")
+    assert cursor.fetchone()[0].lower() == 'wal'
+    cursor.execute("PRAGMA busy_timeout")
+    assert cursor.fetchone()[0] == 5000
+    engine = db.connect_to_db(engine=True)[0]
+    with engine.connect() as c:
+        assert c.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+    get_pool(db.df_path).release()
+
+
+def test_request_teardown_releases_connection():
+    client = app.test_client()
+    pool = get_pool(connect_local().df_path)
+    pool.release()
+    in_use = pool.stats()['in_use']
+    resp = client.get("/api/hr_cost?category=Nope&year=2025")
+    assert resp.status_code == 200
+    assert pool.stats()['in_use'] == in_use
+    stats = client.get("/pool_stats").get_json()
+    assert stats, stats
+
+
+if __name__ == "__main__":
+    test_connections_are_reused()
+    test_threads_get_distinct_connections()
+    test_pragma_profile_applied()
+    test_request_teardown_releases_connection()
+    print("PASS: connection pool reuses connections and releases them on teardown")
@@ -0,0 +1,54 @@
+import sqlite3
+from app_local import app
+from backend.connect_local import DEFAULT_DB_PATH, connect_local, initialize_database
+from backend.dimension_cache import get_dimension, get_dimension_cache_stats
+
+
+def setup():
+    db = connect_local()
+    cursor, cnxn = db.connect_to_db()
+    initialize_database(cursor, cnxn, initial_values=False)
+    cursor.execute("INSERT INTO POs (name) VALUES (?)", ("PO1",))
+    po_id = cursor.lastrowid
+    cnxn.commit()
+    return po_id
+
+
+def test_hits_and_route_invalidation():
+    po_id = setup()
+    before = get_dimension_cache_stats()
+    assert get_dimension('pos').name_to_id.get('PO1') == po_id
+    assert get_dimension('POs').id_for(' po1 ') == po_id  # case/whitespace-insensitive fallback
+    after = get_dimension_cache_stats()
+    assert after['misses'] == before['misses'] + 1, after
+    assert after['hits'] == before['hits'] + 1, after
+
+    client = app.test_client()
+    resp = client.post("/modify_po/change_po", data={"po_id": str(po_id), "PO": "PO Renamed"})
+    assert resp.status_code == 302, resp.status_code
+    entry = get_dimension('pos')
+    assert entry.id_to_name.get(po_id) == "PO Renamed", entry.id_to_name
+    assert 'PO1' not in entry.name_to_id
+
+    stats = client.get("/dimension_cache_stats").get_json()
+    assert stats['invalidations'] > before['invalidations'], stats
+    print("PASS: dimension cache serves hits and is invalidated by the PO write path")
+
+
+def test_write_from_another_process_is_seen():
+    po_id = setup()
+    assert get_dimension('pos').id_to_name.get(po_id) == "PO1"
+    # another worker renames the PO: no invalidate_dimensions() call reaches this process
+    other = sqlite3.connect(DEFAULT_DB_PATH)
+    other.execute("UPDATE POs SET name = ? WHERE id = ?", ("PO Elsewhere", po_id))
+    other.commit()
+    other.close()
+    before = get_dimension_cache_stats()
+    assert get_dimension('pos').id_to_name.get(po_id) == "PO Elsewhere"
+    assert get_dimension_cache_stats()['stale'] == before['stale'] + 1
+    print("PASS: dimension cache reloads a table whose table_versions counter moved")
+
+
+if __name__ == "__main__":
+    test_hits_and_route_invalidation()
+    test_write_from_another_process_is_seen()
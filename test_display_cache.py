@@ -0,0 +1,69 @@
+import sqlite3
+import pandas as pd
+from backend.connect_local import connect_local, initialize_database
+from backend.dimension_cache import invalidate_dimensions
+from backend.display_cache import display_cache, clear_display_cache, get_display_cache_stats
+from backend.table_versions import table_versions
+import backend.create_display_table as display
+
+
+def setup():
+    cursor, cnxn = connect_local().connect_to_db()
+    initialize_database(cursor, cnxn, initial_values=False)
+    cursor.execute("INSERT INTO POs (id, name) VALUES (1, 'PO1')")
+    cursor.execute("INSERT INTO departments (id, name, po_id) VALUES (1, 'Dept1', 1)")
+    cnxn.commit()
+    invalidate_dimensions()
+    clear_display_cache()
+    return cursor, cnxn
+
+
+def test_served_until_source_table_changes():
+    cursor, cnxn = setup()
+    before = get_display_cache_stats()
+    first = display.get_departments_display()
+    first.loc[0, 'name_departments'] = 'changed by caller'
+    second = display.get_departments_display()
+    after = get_display_cache_stats()
+    assert after['hits'] - before['hits'] == 1, after
+    assert second.loc[0, 'name_departments'] == 'Dept1', second
+
+    # a write from any connection bumps the counter through the triggers
+    other = sqlite3.connect(connect_local().df_path)
+    other.execute("INSERT INTO departments (name, po_id) VALUES ('Dept2', 1)")
+    other.commit()
+    other.close()
+    invalidate_dimensions('departments')
+    assert len(display.get_departments_display()) == 2
+    assert get_display_cache_stats()['stale'] - after['stale'] == 1
+
+    # writes to unrelated tables keep the entry
+    version = table_versions(cursor, ['departments'])
+    cursor.execute("INSERT INTO project_categories (category) VALUES ('Cat A')")
+    cnxn.commit()
+    assert table_versions(cursor, ['departments']) == version
+    hits = get_display_cache_stats()['hits']
+    display.get_departments_display()
+    assert get_display_cache_stats()['hits'] == hits + 1
+    print("PASS: display tables are cached until one of their source tables changes")
+
+
+def test_lru_eviction_respects_memory_cap():
+    cache = display_cache(max_bytes=10_000)
+    frame = pd.DataFrame({'a': range(500)})  # ~4 KB
+    cache.store(('a',), (1,), frame)
+    cache.store(('b',), (1,), frame)
+    cache.lookup(('a',), (1,))
+    cache.store(('c',), (1,), frame)
+    stats = cache.stats()
+    assert stats['bytes'] <= 10_000 and stats['evictions'] == 1, stats
+    assert cache.lookup(('a',), (1,)) is not None
+    assert cache.lookup(('b',), (1,)) is None
+    cache.store(('big',), (1,), pd.DataFrame({'a': range(5000)}))
+    assert cache.lookup(('big',), (1,)) is None
+    print("PASS: display cache evicts least recently used entries past its memory cap")
+
+
+if __name__ == "__main__":
+    test_served_until_source_table_changes()
+    test_lru_eviction_respects_memory_cap()
@@ -0,0 +1,53 @@
+import io
+import pandas as pd
+from backend.connect_local import connect_local, initialize_database
+from backend.upload_expenses import upload_expenses_stream
+
+SOURCE = "processed_data/expenses/expenses_.csv"
+
+
+def setup():
+    db = connect_local()
+    cursor, cnxn = db.connect_to_db()
+    initialize_database(cursor, cnxn, initial_values=False)
+    cursor.executemany("INSERT INTO departments (name) VALUES (?)", [(f"DEPT_0{i}",) for i in range(1, 10)])
+    cnxn.commit()
+    return cursor, cnxn
+
+
+def test_streamed_upload_dedupes_across_chunks():
+    cursor, cnxn = setup()
+    raw = pd.read_csv(SOURCE)
+    # every line appears twice, the repeats far away from the originals
+    doubled = pd.concat([raw, raw.iloc[::-1]], ignore_index=True)
+    buffer = io.StringIO(doubled.to_csv(index=False))
+    result = upload_expenses_stream(buffer, chunksize=7)
+    assert result['rows_read'] == 2 * len(raw), result
+    assert result['rows_inserted'] == len(raw) and result['duplicates'] == len(raw), result
+    assert cursor.execute("SELECT COUNT(*) FROM expenses").fetchone()[0] == len(raw)
+    # new cost elements / CO objects are created once per distinct value
+    assert cursor.execute("SELECT COUNT(*) FROM cost_elements").fetchone()[0] == raw['Cost element'].nunique()
+    assert cursor.execute("SELECT COUNT(*) FROM co_object_names").fetchone()[0] == raw['CO object name'].nunique()
+    total = cursor.execute("SELECT TOTAL(expense_value) FROM expenses").fetchone()[0]
+    assert abs(total - raw['Val.in rep.cur'].sum()) < 1e-6, total
+    print("PASS: streamed expense upload dedupes across chunks")
+
+
+def test_rejected_chunk_rolls_back():
+    cursor, cnxn = setup()
+    calls = []
+
+    def validate(chunk):
+        calls.append(len(chunk))
+        return len(calls) == 3, 'Order'
+
+    result = upload_expenses_stream(SOURCE, chunksize=10, validate=validate)
+    assert result['missing_column'] == 'Order' and result['chunks'] == 3, result
+    assert cursor.execute("SELECT COUNT(*) FROM expenses").fetchone()[0] == 0
+    assert cursor.execute("SELECT COUNT(*) FROM cost_elements").fetchone()[0] == 0
+    print("PASS: rejected chunk leaves the database unchanged")
+
+
+if __name__ == "__main__":
+    test_streamed_upload_dedupes_across_chunks()
+    test_rejected_chunk_rolls_back()
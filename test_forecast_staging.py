@@ -0,0 +1,103 @@
+import io
+import pandas as pd
+from backend.connect_local import connect_local, initialize_database
+from backend.forecast_staging import upload_forecasts_staged
+from backend.summary_rollup import rebuild_rollup
+
+NONPC = pd.DataFrame({
+    'PO': [4500000001, 4500000001, 4500000002, 4500000001],
+    'IO': [1, 2, 3, 1],
+    'Department': ['Dept1', 'Dept1', 'Dept2', 'Dept1'],
+    'Project Category': ['Cat A', 'Cat B', 'Cat A', 'Cat A'],
+    'Project Name': ['Proj1', 'Proj2', 'Proj3', 'Proj1'],
+    'fiscal_year': [2025, 2025, 2025, 2025],
+    'Non-personnel cost': [10.0, 20.0, 30.0, 99.0],
+})
+
+
+def setup():
+    cursor, cnxn = connect_local().connect_to_db()
+    initialize_database(cursor, cnxn, initial_values=False)
+    return cursor, cnxn
+
+
+def test_staged_upload_creates_dimensions():
+    cursor, cnxn = setup()
+    written = upload_forecasts_staged(NONPC, "project_forecasts_nonpc")
+    assert written == 3, written
+    assert cursor.execute("SELECT id, name FROM POs ORDER BY id").fetchall() == [(1, '4500000001'), (2, '4500000002')]
+    assert cursor.execute("SELECT name, po_id FROM departments ORDER BY id").fetchall() == [('Dept1', 1), ('Dept2', 2)]
+    rows = cursor.execute(
+        "SELECT po.name, d.name, c.category, p.name, f.non_personnel_expense FROM project_forecasts_nonpc f "
+        "JOIN POs po ON po.id = f.PO_id JOIN departments d ON d.id = f.department_id "
+        "JOIN project_categories c ON c.id = f.project_category_id JOIN projects p ON p.id = f.project_id ORDER BY f.id"
+    ).fetchall()
+    # the repeated (PO, project, department, year) row keeps its first value
+    assert rows == [('4500000001', 'Dept1', 'Cat A', 'Proj1', 10.0), ('4500000001', 'Dept1', 'Cat B', 'Proj2', 20.0),
+                    ('4500000002', 'Dept2', 'Cat A', 'Proj3', 30.0)], rows
+
+    # uploading the year again replaces it without minting new dimension ids
+    upload_forecasts_staged(NONPC.assign(**{'Non-personnel cost': 5.0}), "project_forecasts_nonpc")
+    assert cursor.execute("SELECT MAX(id) FROM projects").fetchone()[0] == 3
+    assert cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'POs'").fetchone()[0] == 2
+    assert cursor.execute("SELECT COUNT(*), SUM(non_personnel_expense) FROM project_forecasts_nonpc").fetchone() == (3, 15.0)
+    snapshot = cursor.execute("SELECT * FROM summary_rollup ORDER BY 1, 2, 3, 4").fetchall()
+    rebuild_rollup(cursor, cnxn)
+    assert snapshot == cursor.execute("SELECT * FROM summary_rollup ORDER BY 1, 2, 3, 4").fetchall()
+    print("PASS: staged forecast upload resolves dimensions in SQL and replaces the year")
+
+
+def test_staged_pc_upload_from_file():
+    cursor, cnxn = setup()
+    upload_forecasts_staged(NONPC, "project_forecasts_nonpc")
+    pc = NONPC.drop(columns=['Non-personnel cost']).assign(**{'Human resource category': 'Engineer', 'Human resource FTE': 1.5})
+    pc.loc[1, 'Human resource category'] = 'Manager'
+    written = upload_forecasts_staged(io.StringIO(pc.to_csv(index=False)), "project_forecasts_pc", chunksize=2)
+    assert written == 3, written
+    assert cursor.execute("SELECT name FROM human_resource_categories ORDER BY id").fetchall() == [('Engineer',), ('Manager',)]
+    assert cursor.execute("SELECT SUM(human_resource_fte) FROM project_forecasts_pc").fetchone()[0] == 4.5
+    print("PASS: personnel forecasts stage from a chunked CSV")
+
+
+def test_staged_upload_rolls_back():
+    cursor, cnxn = setup()
+    upload_forecasts_staged(NONPC, "project_forecasts_nonpc")
+    bad = NONPC.assign(fiscal_year=2025, PO=4500000009).drop(columns=['Non-personnel cost'])
+    try:
+        upload_forecasts_staged(bad, "project_forecasts_nonpc")
+        assert False, "missing value column must be rejected"
+    except KeyError:
+        pass
+    assert cursor.execute("SELECT COUNT(*) FROM POs").fetchone()[0] == 2
+    assert cursor.execute("SELECT COUNT(*) FROM project_forecasts_nonpc").fetchone()[0] == 3
+    assert cursor.execute("SELECT COUNT(*) FROM sqlite_temp_master WHERE name = 'forecast_staging'").fetchone()[0] == 0
+    print("PASS: a rejected staged upload leaves the tables untouched")
+
+
+def test_project_names_are_per_department():
+    cursor, cnxn = setup()
+    apollo = pd.DataFrame({
+        'PO': [1, 1], 'Department': ['D1', 'D2'], 'Project Category': ['Cat A', 'Cat A'],
+        'Project Name': ['Apollo', 'Apollo'], 'fiscal_year': [2025, 2025], 'Non-personnel cost': [10.0, 20.0],
+    })
+    assert upload_forecasts_staged(apollo, "project_forecasts_nonpc") == 2
+    projects = "SELECT p.id, d.name FROM projects p JOIN departments d ON d.id = p.department_id ORDER BY p.id"
+    assert cursor.execute(projects).fetchall() == [(1, 'D1'), (2, 'D2')]
+
+    # one D2 row writes one forecast row, on D2's project
+    assert upload_forecasts_staged(apollo.iloc[[1]], "project_forecasts_nonpc") == 1
+    rows = "SELECT department_id, project_id, non_personnel_expense FROM project_forecasts_nonpc ORDER BY id"
+    assert cursor.execute(rows).fetchall() == [(2, 2, 20.0)]
+
+    # a new department gets its own Apollo
+    upload_forecasts_staged(apollo.iloc[[1]].assign(Department='D3'), "project_forecasts_nonpc")
+    assert cursor.execute(projects).fetchall() == [(1, 'D1'), (2, 'D2'), (3, 'D3')]
+    assert cursor.execute(rows).fetchall() == [(3, 3, 20.0)]
+    print("PASS: staged uploads resolve and create projects per department")
+
+
+if __name__ == "__main__":
+    test_staged_upload_creates_dimensions()
+    test_staged_pc_upload_from_file()
+    test_staged_upload_rolls_back()
+    test_project_names_are_per_department()
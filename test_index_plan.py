@@ -0,0 +1,28 @@
+from backend.connect_local import connect_local, initialize_database
+from backend.index_plan import HOT_STATEMENTS, check_index_plan, ensure_indexes
+
+
+def test_hot_statements_use_index_plan():
+    db = connect_local()
+    cursor, cnxn = db.connect_to_db()
+    initialize_database(cursor, cnxn, initial_values=False)
+    missing = check_index_plan(cursor)
+    assert not missing, missing
+    print(f"PASS: {len(HOT_STATEMENTS)} hot statements use their planned index")
+
+
+def test_ensure_indexes_repairs_database():
+    db = connect_local()
+    cursor, cnxn = db.connect_to_db()
+    initialize_database(cursor, cnxn, initial_values=False)
+    cursor.execute("DROP INDEX UQ_budgets_key")
+    cursor.execute("DROP INDEX idx_capex_forecasts_project_id")
+    assert set(check_index_plan(cursor)) == {'change_budget', 'delete project capex forecasts'}
+    ensure_indexes(cursor, cnxn)
+    assert not check_index_plan(cursor)
+    print("PASS: ensure_indexes restores missing indexes")
+
+
+if __name__ == "__main__":
+    test_hot_statements_use_index_plan()
+    test_ensure_indexes_repairs_database()
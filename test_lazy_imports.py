@@ -0,0 +1,49 @@
+import json
+import subprocess
+import sys
+
+HEAVY_MODULES = ['pyodbc', 'sqlalchemy', 'plotly', 'backend.generate_data', 'backend.upload_expenses']
+
+
+def loaded_after(statement):
+    """Heavy modules in sys.modules after running `statement` in a fresh interpreter."""
+    probe = f"import json, sys\n{statement}\nprint(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    proc = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def test_backend_modules_load_on_first_use():
+    assert loaded_after("import backend") == []
+    assert loaded_after("from backend import get_pc_display") == []
+    assert loaded_after("from backend.connect_local import connect_local") == []
+    assert loaded_after("from backend import upload_expenses_local") == ['backend.upload_expenses']
+    print("PASS: importing backend loads neither the uploaders nor pyodbc/SQLAlchemy")
+
+
+def test_sqlite_app_starts_without_pyodbc():
+    loaded = loaded_after("import app_local")
+    assert 'pyodbc' not in loaded and 'sqlalchemy' not in loaded and 'backend.generate_data' not in loaded, loaded
+    print("PASS: the SQLite app imports without pyodbc, SQLAlchemy or the data generator")
+
+
+def test_package_namespace():
+    import backend
+    import backend.create_display_table as display
+    import backend.database_util as database_util
+    assert backend.get_pc_display is display.get_pc_display
+    assert backend.clear_table is database_util.clear_table
+    assert backend.select_all_from_table.__module__ == 'backend.connect_local'
+    assert 'get_expenses_display' in dir(backend) and 'upload_fundings_local' in backend.__all__
+    try:
+        backend.no_such_name
+    except AttributeError:
+        pass
+    else:
+        raise AssertionError("unknown names must raise AttributeError")
+    print("PASS: backend resolves the names the star imports used to export")
+
+
+if __name__ == "__main__":
+    test_backend_modules_load_on_first_use()
+    test_sqlite_app_starts_without_pyodbc()
+    test_package_namespace()
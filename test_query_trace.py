@@ -0,0 +1,76 @@
+import os
+import sqlite3
+import tempfile
+from backend.connect_local import connect_local, release_connections
+from backend.query_trace import (
+    normalize_sql, traced_cursor, get_query_stats, reset_query_stats, set_slow_query_threshold, SLOW_QUERY_MS
+)
+
+
+def scratch_db():
+    path = os.path.join(tempfile.mkdtemp(), "trace.db")
+    cursor, cnxn = connect_local(path).connect_to_db()
+    cursor.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+    cursor.executemany("INSERT INTO items (name) VALUES (?)", [(f"item {i}",) for i in range(20)])
+    cnxn.commit()
+    return cursor, cnxn
+
+
+def statement(stats, prefix):
+    return next(s for s in stats['statements'] if s['sql'].startswith(prefix))
+
+
+def test_normalize_sql():
+    assert normalize_sql("SELECT *  FROM t\n WHERE id IN (?, ?,?) AND name = 'a''b' AND n > 10 -- note") == \
+        "SELECT * FROM t WHERE id IN (?...) AND name = ? AND n > ?"
+    assert normalize_sql("SELECT x FROM table_2 WHERE DEPT_01 = 1.5") == "SELECT x FROM table_2 WHERE DEPT_01 = ?"
+    print("PASS: statements are normalized to their shape")
+
+
+def test_statements_are_aggregated_per_shape():
+    cursor, cnxn = scratch_db()
+    reset_query_stats()
+    for i in (1, 2, 3):
+        cursor.execute(f"SELECT name FROM items WHERE id = {i}")
+        cursor.fetchall()
+    release_connections()
+    entry = statement(get_query_stats(), "SELECT name FROM items WHERE id = ?")
+    assert entry['calls'] == 3 and entry['rows'] == 3, entry
+    print("PASS: statement calls, latency and rows are aggregated per shape")
+
+
+def test_slow_statements_are_logged_with_plan():
+    cursor, cnxn = scratch_db()
+    reset_query_stats()
+    set_slow_query_threshold(0)
+    try:
+        cursor.execute("SELECT name FROM items WHERE id = ?", (4,)).fetchone()
+    finally:
+        set_slow_query_threshold(SLOW_QUERY_MS)
+        release_connections()
+    slow = get_query_stats()['slow']
+    assert slow and slow[0]['sql'] == "SELECT name FROM items WHERE id = ?", slow
+    assert any('items' in line for line in slow[0]['plan']), slow[0]
+    print("PASS: slow statements are logged once with their query plan")
+
+
+def test_proxy_cursor_traces_other_drivers():
+    # any DB-API cursor can be wrapped (pyodbc's cannot be subclassed)
+    raw = sqlite3.connect(":memory:")
+    reset_query_stats()
+    cursor = traced_cursor(raw.cursor())
+    cursor.execute("CREATE TABLE t (v INTEGER)")
+    cursor.executemany("INSERT INTO t VALUES (?)", [(1,), (2,)])
+    assert cursor.execute("SELECT v FROM t ORDER BY v").fetchall() == [(1,), (2,)]
+    assert cursor.description[0][0] == 'v'
+    stats = get_query_stats()
+    assert statement(stats, "SELECT v FROM t")['rows'] == 2
+    assert statement(stats, "INSERT INTO t")['calls'] == 1
+    print("PASS: the proxy cursor traces statements of drivers that cannot be subclassed")
+
+
+if __name__ == "__main__":
+    test_normalize_sql()
+    test_statements_are_aggregated_per_shape()
+    test_slow_statements_are_logged_with_plan()
+    test_proxy_cursor_traces_other_drivers()
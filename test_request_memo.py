@@ -0,0 +1,66 @@
+from app_local import app
+from backend.connect_local import connect_local, initialize_database
+from backend.request_memo import request_memoized, open_request_memo, close_request_memo
+from backend.dimension_cache import get_dimension, invalidate_dimensions
+import backend.create_display_table as display
+
+calls = []
+
+
+@request_memoized
+def build_departments():
+    calls.append(1)
+    return display.get_departments_display()
+
+
+def setup():
+    cursor, cnxn = connect_local().connect_to_db()
+    initialize_database(cursor, cnxn, initial_values=False)
+    cursor.execute("INSERT INTO POs (id, name) VALUES (1, 'PO1')")
+    cursor.execute("INSERT INTO departments (id, name, po_id) VALUES (1, 'Dept1', 1)")
+    cnxn.commit()
+    invalidate_dimensions()
+    return cursor, cnxn
+
+
+def test_builder_runs_once_per_request():
+    cursor, cnxn = setup()
+    calls.clear()
+    open_request_memo()
+    try:
+        first = build_departments()
+        first.loc[0, 'name_departments'] = 'changed by caller'
+        second = build_departments()
+        assert len(calls) == 1, calls
+        assert second.loc[0, 'name_departments'] == 'Dept1', second
+
+        # a write on the request's connection makes the memo stale
+        cursor.execute("INSERT INTO departments (name, po_id) VALUES ('Dept2', 1)")
+        cnxn.commit()
+        invalidate_dimensions('departments')
+        assert len(build_departments()) == 2
+        assert len(calls) == 2, calls
+    finally:
+        close_request_memo()
+    build_departments()
+    build_departments()
+    assert len(calls) == 4, calls
+    print("PASS: display builders are computed once per request and refreshed after writes")
+
+
+def test_dimension_snapshot_pinned_per_request():
+    cursor, cnxn = setup()
+    with app.test_request_context('/data_summary'):
+        app.preprocess_request()
+        entry = get_dimension('departments')
+        # another thread invalidating the process cache does not change this render
+        from backend.dimension_cache import _cache
+        _cache.invalidate('departments')
+        assert get_dimension('departments') is entry
+    assert app.test_client().get('/data_summary').status_code == 200
+    print("PASS: dimension snapshots are shared by every builder within one request")
+
+
+if __name__ == "__main__":
+    test_builder_runs_once_per_request()
+    test_dimension_snapshot_pinned_per_request()
@@ -0,0 +1,47 @@
+import os
+import re
+import tempfile
+from app_local import app
+from backend.request_metrics import reset_metrics, set_profiling, PROFILE_SLOW_MS
+
+
+def sample(text, metric, **labels):
+    selector = ','.join(f'{k}="{v}"' for k, v in labels.items())
+    match = re.search(rf'^{metric}{{{re.escape(selector)}}} (\S+)$', text, re.M)
+    return float(match.group(1)) if match else None
+
+
+def test_metrics_endpoint_reports_requests():
+    reset_metrics()
+    client = app.test_client()
+    assert client.get('/project_summary').status_code == 200
+    assert client.get('/select?table_name=projects').status_code == 200
+    response = client.get('/metrics')
+    assert response.status_code == 200 and response.mimetype == 'text/plain'
+    text = response.data.decode()
+    labels = {'endpoint': 'project_summary.project_summary', 'method': 'GET', 'status': '200'}
+    assert sample(text, 'http_request_duration_seconds_count', **labels) == 1
+    assert sample(text, 'http_request_duration_seconds_bucket', **labels, le='+Inf') == 1
+    assert sample(text, 'http_request_sql_statements_sum', endpoint='select_data.select') > 0
+    assert sample(text, 'http_request_sql_rows_fetched_count', endpoint='select_data.select') == 1
+    assert 'display_builder_duration_seconds_count{builder="summary_departments"' in text
+    print("PASS: /metrics reports latency, SQL statements, rows and builder timings")
+
+
+def test_slow_requests_are_profiled():
+    directory = tempfile.mkdtemp()
+    set_profiling(directory, slow_ms=0)
+    try:
+        assert app.test_client().get('/project_summary').status_code == 200
+    finally:
+        set_profiling(None, slow_ms=PROFILE_SLOW_MS)
+    dumps = sorted(os.listdir(directory))
+    assert len(dumps) == 2 and dumps[0].endswith('.prof') and dumps[1].endswith('.txt'), dumps
+    with open(os.path.join(directory, dumps[1])) as report:
+        assert report.readline().startswith('project_summary.project_summary:')
+    print("PASS: opt-in cProfile dumps are written for slow requests")
+
+
+if __name__ == "__main__":
+    test_metrics_endpoint_reports_requests()
+    test_slow_requests_are_profiled()
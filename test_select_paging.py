@@ -0,0 +1,69 @@
+from app_local import app
+from app_local.select_data import load_table_page
+from backend.connect_local import connect_local, initialize_database
+
+
+def setup():
+    db = connect_local()
+    cursor, cnxn = db.connect_to_db()
+    initialize_database(cursor, cnxn, initial_values=False)
+    cursor.execute("INSERT INTO departments (id, name) VALUES (1, 'Dept1')")
+    cursor.executemany("INSERT INTO IOs (id, IO_num) VALUES (?, ?)", [(1, 1001), (2, 1002)])
+    cursor.executemany("INSERT INTO co_object_names (id, name) VALUES (?, ?)", [(i, f"CO{i}") for i in range(1, 121)])
+    cursor.executemany(
+        "INSERT INTO expenses (department_id, fiscal_year, io_id, co_object_id, expense_value, name) VALUES (?, ?, ?, ?, ?, ?)",
+        [(1, 2025, 1 + i % 2, i + 1, float(i), f"row{i}") for i in range(120)],
+    )
+    cnxn.commit()
+    return cursor, cnxn
+
+
+def test_paging_in_sql():
+    cursor, cnxn = setup()
+    df, page, total_pages = load_table_page(cursor, cnxn, 'expenses', 3, 50)
+    assert (page, total_pages) == (3, 3), (page, total_pages)
+    assert list(df['Expenditure']) == [float(i) for i in range(100, 120)]
+    assert set(df['IO']) == {1001, 1002} and set(df['Department']) == {'Dept1'}
+    # CO object names are looked up for the page's ids (the raw co_element_name column shares the label)
+    assert list(df.loc[:, df.columns == 'CO Object Name'].iloc[:, -1]) == [f"CO{i}" for i in range(101, 121)]
+
+    # keyset seek from the last id of page 1 returns page 2
+    first, _, _ = load_table_page(cursor, cnxn, 'expenses', 1, 50)
+    second, _, _ = load_table_page(cursor, cnxn, 'expenses', 2, 50)
+    seek, _, _ = load_table_page(cursor, cnxn, 'expenses', 2, 50, after=int(first['id'].iloc[-1]))
+    assert list(seek['id']) == list(second['id'])
+
+    top, _, _ = load_table_page(cursor, cnxn, 'expenses', 1, 5, sort='expense_value', descending=True)
+    assert list(top['Expenditure']) == [119.0, 118.0, 117.0, 116.0, 115.0]
+
+    client = app.test_client()
+    assert client.get("/select?table_name=expenses&page=2&sort=expense_value&order=desc").status_code == 200
+    assert client.get("/select?table_name=no_such_table").status_code == 200
+    print("PASS: /select pages, sorts and counts in SQL")
+
+
+def test_personnel_cost_uses_rate_fallback():
+    cursor, cnxn = setup()
+    cursor.executemany("INSERT INTO POs (id, name) VALUES (?, ?)", [(1, 'PO1'), (2, 'PO2')])
+    cursor.execute("INSERT INTO departments (id, name) VALUES (2, 'Dept2')")
+    cursor.execute("INSERT INTO human_resource_categories (id, name) VALUES (1, 'Engineer')")
+    cursor.executemany(
+        "INSERT INTO human_resource_cost (category_id, year, po_id, department_id, cost) VALUES (?, ?, ?, ?, ?)",
+        [(1, 2025, None, None, 10.0), (1, 2025, 1, 1, 30.0), (1, 2025, None, 2, 20.0)],
+    )
+    cursor.executemany(
+        "INSERT INTO project_forecasts_pc (PO_id, department_id, fiscal_year, human_resource_category_id, human_resource_fte) "
+        "VALUES (?, ?, ?, ?, ?)",
+        [(1, 1, 2025, 1, 2.0), (2, 2, 2025, 1, 2.0), (2, 1, 2025, 1, 2.0), (1, 1, 2024, 1, 2.0)],
+    )
+    cnxn.commit()
+    df, _, _ = load_table_page(cursor, cnxn, 'project_forecasts_pc', 1, 50)
+    # exact (po, dept) rate, department rate, department fallback for another PO, no rate
+    assert list(df['Personnel Cost'].fillna(-1)) == [60.0, 40.0, 60.0, -1], list(df['Personnel Cost'])
+    assert list(df['Staff Category']) == ['Engineer'] * 4 and 'human_resource_category_id' not in df.columns
+    print("PASS: /select resolves Personnel Cost through the shared rate fallback")
+
+
+if __name__ == "__main__":
+    test_paging_in_sql()
+    test_personnel_cost_uses_rate_fallback()
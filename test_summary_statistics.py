@@ -0,0 +1,141 @@
+from app_local import app
+from backend.connect_local import connect_local, initialize_database
+from backend.summary_rollup import rebuild_rollup
+from backend.summary_statistics import compute_statistics, cached_statistics, get_statistics_cache_stats
+from backend.summary_frames import department_options, project_options
+from backend.dimension_cache import invalidate_dimensions
+from concurrent.futures import ThreadPoolExecutor
+
+
+def setup():
+    db = connect_local()
+    cursor, cnxn = db.connect_to_db()
+    initialize_database(cursor, cnxn, initial_values=False)
+    cursor.executemany("INSERT INTO POs (id, name) VALUES (?, ?)", [(1, "PO1"), (2, "PO2")])
+    cursor.executemany("INSERT INTO departments (id, name, po_id) VALUES (?, ?, ?)", [(1, "Dept1", 1), (2, "Dept2", 2)])
+    cursor.execute("INSERT INTO human_resource_categories (id, name) VALUES (1, 'Engineer')")
+    cursor.execute("INSERT INTO human_resource_cost (category_id, year, cost) VALUES (1, 2025, 100.0)")
+    cursor.executemany(
+        "INSERT INTO project_forecasts_pc (PO_id, department_id, fiscal_year, human_resource_category_id, human_resource_fte) VALUES (?, ?, ?, ?, ?)",
+        [(1, 1, 2025, 1, 2.0), (2, 2, 2025, 1, 3.0), (1, 1, None, 1, 5.0)],
+    )
+    cursor.executemany(
+        "INSERT INTO project_forecasts_nonpc (PO_id, department_id, fiscal_year, non_personnel_expense) VALUES (?, ?, ?, ?)",
+        [(1, 1, 2025, 10.0), (2, 2, 2025, 20.0)],
+    )
+    cursor.execute("INSERT INTO cost_elements (id, co_id, name) VALUES (1, 9400001, 'Salaries')")
+    # expenses carry no PO; they are attributed through departments.po_id
+    cursor.executemany(
+        "INSERT INTO expenses (department_id, fiscal_year, cost_element_id, expense_value) VALUES (?, ?, ?, ?)",
+        [(1, 2025, 1, 7.0), (1, 2025, None, 3.0), (2, 2025, 1, 50.0)],
+    )
+    cnxn.commit()
+
+
+def test_filtered_statistics():
+    setup()
+    client = app.test_client()
+    client.post("/data_summary/po_selection", json={"po": "PO1"})
+    client.post("/data_summary/department_selection", json={"department": "All"})
+    client.post("/data_summary/fiscal_year_selection", json={"fiscal_year": "2025"})
+    data = client.get("/data_summary/get_statistics").get_json()
+    assert data['personnel_forecast'] == 200.0, data
+    assert data['non_personnel_forecast'] == 10.0, data
+    assert data['Total Expense'] == 10.0, data
+    assert data['Personnel Expense'] == 7.0, data
+    assert data['Non-personnel Expense'] == 3.0, data
+
+    client.post("/data_summary/po_selection", json={"po": "All"})
+    client.post("/data_summary/fiscal_year_selection", json={"fiscal_year": "All"})
+    data = client.get("/data_summary/get_statistics").get_json()
+    assert data['total_forecast'] == 530.0, data
+    print("PASS: /data_summary/get_statistics aggregates with PO/year filters")
+
+
+def test_rollup_follows_writes():
+    setup()
+    db = connect_local()
+    cursor, cnxn = db.connect_to_db()
+    cursor.execute("INSERT INTO projects (id, name) VALUES (1, 'Proj1')")
+    cursor.execute("INSERT INTO IOs (id, IO_num, project_id) VALUES (1, 100, 1)")
+    cursor.execute("UPDATE expenses SET io_id = 1 WHERE expense_value = 7.0")
+    cursor.execute("UPDATE project_forecasts_nonpc SET project_id = 1, non_personnel_expense = 15.0 WHERE PO_id = 1")
+    cursor.execute("DELETE FROM project_forecasts_nonpc WHERE PO_id = 2")
+    cnxn.commit()
+
+    stats = compute_statistics(project='Proj1', cursor=cursor, cnxn=cnxn)
+    assert stats['non_personnel_forecast'] == 15.0, stats
+    assert stats['Total Expense'] == 7.0 and stats['Personnel Expense'] == 7.0, stats
+
+    # the trigger-maintained totals equal a full recompute
+    snapshot = cursor.execute("SELECT * FROM summary_rollup WHERE non_personnel_forecast != 0 OR actual_expense != 0 ORDER BY 1, 2, 3, 4").fetchall()
+    rebuild_rollup(cursor, cnxn)
+    rebuilt = cursor.execute("SELECT * FROM summary_rollup WHERE non_personnel_forecast != 0 OR actual_expense != 0 ORDER BY 1, 2, 3, 4").fetchall()
+    assert [tuple(r) for r in snapshot] == [tuple(r) for r in rebuilt], (snapshot, rebuilt)
+    print("PASS: summary rollup is maintained incrementally and filters by project")
+
+
+def test_filters_are_per_session():
+    setup()
+    alice, bob = app.test_client(), app.test_client()
+    alice.post("/data_summary/po_selection", json={"po": "PO1"})
+    bob.post("/data_summary/po_selection", json={"po": "PO2"})
+    alice.post("/data_summary/fiscal_year_selection", json={"fiscal_year": "2025"})
+    assert alice.get("/data_summary/get_statistics").get_json()['non_personnel_forecast'] == 10.0
+    assert bob.get("/data_summary/get_statistics").get_json()['non_personnel_forecast'] == 20.0
+    # explicit query parameters win over the session
+    data = bob.get("/data_summary/get_statistics?po=All&fiscal_year=All").get_json()
+    assert data['non_personnel_forecast'] == 30.0, data
+
+    keys = [(po, year) for po in ("PO1", "PO2", "All") for year in ("2025", "All")] * 10
+    expected = {k: compute_statistics(k[0], None, k[1]) for k in set(keys)}
+
+    def fetch(key):
+        client = app.test_client()
+        return key, client.get(f"/data_summary/get_statistics?po={key[0]}&fiscal_year={key[1]}").get_json()
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        for key, data in pool.map(fetch, keys):
+            assert data == expected[key], (key, data, expected[key])
+    print("PASS: statistics filters are kept per session and cached per filter key")
+
+
+def test_statistics_cache_follows_writes():
+    setup()
+    cursor, cnxn = connect_local().connect_to_db()
+    first = cached_statistics("PO1", None, "2025", cursor=cursor, cnxn=cnxn)
+    hits = get_statistics_cache_stats()['hits']
+    assert cached_statistics("PO1", None, "2025", cursor=cursor, cnxn=cnxn) == first
+    assert get_statistics_cache_stats()['hits'] == hits + 1
+    cursor.execute("UPDATE project_forecasts_nonpc SET non_personnel_expense = 12.5 WHERE PO_id = 1")
+    cnxn.commit()
+    assert cached_statistics("PO1", None, "2025", cursor=cursor, cnxn=cnxn)['non_personnel_forecast'] == 12.5
+    print("PASS: cached statistics are recomputed after a write")
+
+
+def test_dropdown_options_filter_on_ids():
+    setup()
+    cursor, cnxn = connect_local().connect_to_db()
+    cursor.executemany("INSERT INTO projects (name, department_id) VALUES (?, ?)",
+                       [("Alpha", 1), ("Beta", 2), ("Delta", 2), ("Gamma", None)])
+    cnxn.commit()
+    invalidate_dimensions()
+    assert [d['name'] for d in department_options()] == ["Dept1", "Dept2"]
+    assert department_options("PO2") == [{'id': 2, 'name': "Dept2", 'po_name': "PO2"}]
+    assert department_options("nope") == []
+    assert [p['name'] for p in project_options()] == ["Alpha", "Beta", "Delta", "Gamma"]
+    assert [p['name'] for p in project_options("PO2")] == ["Beta", "Delta"]
+    assert [p['name'] for p in project_options("All", "Dept1")] == ["Alpha"]
+    client = app.test_client()
+    client.post("/data_summary/po_selection", json={"po": "PO1"})
+    page = client.get("/project_summary").get_data(as_text=True)
+    assert 'value="Alpha"' in page and 'value="Beta"' not in page and 'value="Dept2"' not in page
+    print("PASS: summary dropdowns are narrowed by PO and department ids")
+
+
+if __name__ == "__main__":
+    test_filtered_statistics()
+    test_rollup_follows_writes()
+    test_filters_are_per_session()
+    test_statistics_cache_follows_writes()
+    test_dropdown_options_filter_on_ids()
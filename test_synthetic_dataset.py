@@ -0,0 +1,47 @@
+from backend.generate_data import synthetic_dataset, BASE_VOLUME
+
+# Keys the uploaders de-duplicate / upsert on, in upload column names
+UPLOAD_KEYS = {
+    'project_forecasts_nonpc': ['PO', 'Department', 'Project Name', 'fiscal_year'],
+    'project_forecasts_pc': ['PO', 'Department', 'Project Name', 'fiscal_year', 'Human resource category'],
+    'budgets': ['PO', 'Department', 'fiscal_year'],
+    'fundings': ['PO', 'Department', 'fiscal_year', 'funding_from', 'funding_for'],
+    'expenses': ['Department', 'fiscal_year', 'from_period', 'Order', 'Cost element'],
+    'capex_forecasts': ['PO', 'Department', 'Project name', 'cap_year'],
+    'capex_budgets': ['PO', 'Department', 'for_project', 'fiscal_year'],
+}
+
+
+def test_volumes_scale():
+    data = synthetic_dataset(10)
+    assert len(data['project_forecasts_nonpc']) == BASE_VOLUME['project_forecasts_nonpc'] * 10
+    assert len(data['project_forecasts_pc']) == len(data['project_forecasts_nonpc']) * data['staff_cost']['Human resource category'].nunique()
+    assert len(data['expenses']) == BASE_VOLUME['expenses'] * 10
+    # budgets are capped by the (department, year) key space
+    assert len(data['budgets']) == len(data['departments']) * BASE_VOLUME['years']
+    assert data['departments']['PO'].nunique() == round(BASE_VOLUME['pos'] * 10 ** 0.5)
+    custom = synthetic_dataset(pos=2, departments=4, projects=20, years=2, rows={'expenses': 7})
+    assert len(custom['expenses']) == 7 and custom['budgets']['fiscal_year'].nunique() == 2
+    assert custom['departments']['PO'].nunique() == 2
+    print("PASS: synthetic dataset scales rows and dimensions")
+
+
+def test_keys_are_unique_and_consistent():
+    data = synthetic_dataset(3, seed=7)
+    for table, keys in UPLOAD_KEYS.items():
+        assert not data[table].duplicated(subset=keys).any(), table
+    dept_po = dict(zip(data['departments']['Department'], data['departments']['PO']))
+    forecasted = set(data['project_forecasts_nonpc']['Project Name'])
+    for table, project in [('fundings', 'funding_for'), ('capex_forecasts', 'Project name'),
+                           ('capex_budgets', 'for_project'), ('capex_expenses', 'Project Name')]:
+        frame = data[table]
+        assert (frame['Department'].map(dept_po) == frame['PO']).all(), table
+        assert set(frame[project]) <= forecasted, table
+    assert set(data['expenses']['Order']) <= set(data['ios']['IO'])
+    assert synthetic_dataset(3, seed=7)['expenses'].equals(data['expenses'])
+    print("PASS: synthetic rows respect the unique keys and reference forecasted projects")
+
+
+if __name__ == "__main__":
+    test_volumes_scale()
+    test_keys_are_unique_and_consistent()
@@ -0,0 +1,38 @@
+import sqlite3
+from backend.connect_local import select_typed, typed_frame
+from backend.table_values import table_dtypes
+
+
+def test_select_typed_projects_and_types_columns():
+    db = sqlite3.connect(':memory:')
+    db.execute("CREATE TABLE expenses (id INTEGER PRIMARY KEY, fiscal_year INTEGER, io_id INTEGER, "
+               "expense_value REAL, name TEXT, co_element_name TEXT)")
+    db.executemany("INSERT INTO expenses (fiscal_year, io_id, expense_value, name, co_element_name) VALUES (?,?,?,?,?)",
+                   [(2025, None, 10.5, 'a', 'x'), (None, 7, 3, None, 'y')])
+    df = select_typed(db.cursor(), 'expenses', ['id', 'fiscal_year', 'io_id', 'expense_value', 'name'])
+    assert list(df.columns) == ['id', 'fiscal_year', 'io_id', 'expense_value', 'name']
+    assert {c: str(t) for c, t in df.dtypes.items()} == {
+        'id': 'Int64', 'fiscal_year': 'Int64', 'io_id': 'Int64', 'expense_value': 'float64', 'name': 'object'}
+    assert df['fiscal_year'].tolist()[0] == 2025 and df['fiscal_year'].isna().tolist() == [False, True]
+    assert df['name'].tolist() == ['a', None]
+    db.execute("DELETE FROM expenses")
+    empty = select_typed(db.cursor(), 'EXPENSES', ['io_id', 'expense_value'])
+    assert empty.empty and str(empty['io_id'].dtype) == 'Int64' and str(empty['expense_value'].dtype) == 'float64'
+    print("PASS: select_typed reads only the requested columns, typed by table_dtypes")
+
+
+def test_typed_frame_coerces_like_to_numeric():
+    rows = [(1, '2.5', 3.0, 'text'), (None, 'n/a', 4.5, 12), (2 ** 60, None, None, None)]
+    df = typed_frame(rows, ['big', 'amount', 'year', 'label'], {'big': 'Int64', 'amount': 'float64', 'year': 'Int64'})
+    assert str(df['big'].dtype) == 'Int64' and df['big'].tolist()[2] == 2 ** 60
+    assert df['amount'].tolist()[0] == 2.5 and df['amount'].isna().tolist() == [False, True, True]
+    # fractions in an integer column are kept rather than truncated
+    assert str(df['year'].dtype) == 'float64' and df['year'].tolist()[1] == 4.5
+    assert df['label'].dtype == object and df['label'].tolist() == ['text', 12, None]
+    assert set(table_dtypes['expenses']) >= {'expense_value', 'io_id', 'cost_element_id'}
+    print("PASS: typed_frame coerces unparseable values to missing")
+
+
+if __name__ == "__main__":
+    test_select_typed_projects_and_types_columns()
+    test_typed_frame_coerces_like_to_numeric()
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import pandas as pd
+from backend.connect_local import connect_local, initialize_database
+from backend.upload_jobs import submit_upload_job, wait_for_upload_job, list_upload_jobs
+from app_local.upload_file import run_upload_job
+
+SOURCE = "processed_data/expenses/expenses_.csv"
+
+
+def setup():
+    cursor, cnxn = connect_local().connect_to_db()
+    initialize_database(cursor, cnxn, initial_values=False)
+    cursor.executemany("INSERT INTO departments (name) VALUES (?)", [(f"DEPT_{i:02d}",) for i in range(1, 16)])
+    cnxn.commit()
+    return cursor, cnxn
+
+
+def spool(df):
+    fd, path = tempfile.mkstemp(suffix='.csv')
+    with os.fdopen(fd, 'w') as out:
+        df.to_csv(out, index=False)
+    return path
+
+
+def test_expense_job_reports_progress():
+    cursor, cnxn = setup()
+    raw = pd.read_csv(SOURCE)
+    # every IO of the file but one is known: its lines are inserted without an io_id
+    orders = raw['Order'].drop_duplicates().tolist()
+    cursor.executemany("INSERT INTO IOs (IO_num) VALUES (?)", [(int(o),) for o in orders[1:]])
+    cnxn.commit()
+    unresolved = int((raw['Order'] == orders[0]).sum())
+    path = spool(raw)
+    job_id = submit_upload_job('expenses', 'expenses_.csv', run_upload_job, 'expenses', path, 'expenses_.csv')
+    job = wait_for_upload_job(job_id)
+    assert job['status'] == 'succeeded', job
+    assert job['rows_parsed'] == len(raw) and job['rows_inserted'] == len(raw), job
+    assert job['rows_resolved'] == len(raw) - unresolved and job['error_rows'] == [], job
+    assert cursor.execute("SELECT COUNT(*) FROM expenses").fetchone()[0] == len(raw)
+    assert not os.path.exists(path)
+    assert list_upload_jobs(1)[0]['id'] == job_id
+    print("PASS: expense upload job succeeds with row counters")
+
+
+def test_failed_job_lists_offending_rows():
+    cursor, cnxn = setup()
+    raw = pd.read_csv(SOURCE)
+    raw.loc[3, 'Department'] = 'NO_SUCH_DEPT'
+    path = spool(raw)
+    job_id = submit_upload_job('expenses', 'bad.csv', run_upload_job, 'expenses', path, 'bad.csv')
+    job = wait_for_upload_job(job_id)
+    assert job['status'] == 'failed' and 'Department' in job['message'], job
+    assert job['rows_parsed'] == len(raw) and job['rows_inserted'] == 0, job
+    assert job['error_rows'] == [{'line': 5, 'column': 'Department', 'value': 'NO_SUCH_DEPT'}], job
+    assert cursor.execute("SELECT COUNT(*) FROM expenses").fetchone()[0] == 0
+    print("PASS: failed upload job reports the rows that caused it")
+
+
+def test_unresolved_reference_aborts_upload():
+    cursor, cnxn = setup()  # departments only: the POs of the file are unknown
+    path = spool(pd.read_csv("processed_data/budgets/budgets_.csv"))
+    job_id = submit_upload_job('budgets', 'budgets_.csv', run_upload_job, 'budgets', path, 'budgets_.csv')
+    job = wait_for_upload_job(job_id)
+    assert job['status'] == 'failed' and 'PO' in job['message'] and job['error_rows'], job
+    assert job['rows_inserted'] == 0, job
+    assert cursor.execute("SELECT COUNT(*) FROM budgets").fetchone()[0] == 0
+    print("PASS: an upload with unresolved references is rejected before anything is written")
+
+
+if __name__ == "__main__":
+    test_expense_job_reports_progress()
+    test_failed_job_lists_offending_rows()
+    test_unresolved_reference_aborts_upload()
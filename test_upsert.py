@@ -0,0 +1,108 @@
+import pandas as pd
+from backend.connect_local import connect_local, initialize_database
+from backend.bulk_insert import bulk_upsert
+from backend.index_plan import ensure_indexes, migrate_duplicates
+from backend.upload_budgets import upload_budgets_local
+
+
+def setup():
+    db = connect_local()
+    cursor, cnxn = db.connect_to_db()
+    initialize_database(cursor, cnxn, initial_values=False)
+    cursor.execute("INSERT INTO POs (id, name) VALUES (1, 'PO1')")
+    cursor.executemany("INSERT INTO departments (id, name, po_id) VALUES (?, ?, 1)", [(1, 'Dept1'), (2, 'Dept2')])
+    cnxn.commit()
+    return cursor, cnxn
+
+
+def budgets(rows):
+    return pd.DataFrame(rows, columns=['po_id', 'department_id', 'fiscal_year', 'human_resource_expense', 'non_personnel_expense'])
+
+
+def test_upsert_on_natural_key():
+    cursor, cnxn = setup()
+    assert bulk_upsert(cursor, cnxn, 'budgets', budgets([(1, 1, 2025, 10.0, 1.0), (1, 2, 2025, 20.0, 2.0)])) == 2
+    # existing key updated in place, new key inserted, repeated key in the upload: measures summed
+    written = bulk_upsert(cursor, cnxn, 'budgets', budgets([(1, 1, 2025, 11.0, 1.0), (1, 1, 2026, 5.0, 5.0), (1, 1, 2026, 6.0, 6.0)]))
+    assert written == 2, written
+    rows = cursor.execute("SELECT department_id, fiscal_year, human_resource_expense FROM budgets ORDER BY id").fetchall()
+    assert [tuple(r) for r in rows] == [(1, 2025, 11.0), (2, 2025, 20.0), (1, 2026, 11.0)], rows
+
+    # update=False only adds keys that are not there yet
+    assert bulk_upsert(cursor, cnxn, 'budgets', budgets([(1, 2, 2025, 99.0, 9.0), (1, 2, 2027, 7.0, 7.0)]), update=False) == 1
+    assert cursor.execute("SELECT human_resource_expense FROM budgets WHERE department_id = 2 AND fiscal_year = 2025").fetchone()[0] == 20.0
+    # dimension names are unique as well
+    assert bulk_upsert(cursor, cnxn, 'pos', pd.DataFrame({'name': ['PO1', 'PO2', 'PO2']}), update=False) == 1
+    assert cursor.execute("SELECT COUNT(*) FROM POs").fetchone()[0] == 2
+    # a table without a natural key is rejected by name
+    try:
+        bulk_upsert(cursor, cnxn, 'expenses', pd.DataFrame({'name': ['row']}))
+        assert False, "expenses has no natural key"
+    except ValueError as e:
+        assert 'expenses' in str(e)
+    print("PASS: uploads upsert on the natural key")
+
+
+def test_repeated_keys_in_an_upload_are_summed():
+    cursor, cnxn = setup()
+    raw = pd.read_csv("processed_data/budgets/budgets_.csv")
+    assert raw.duplicated(subset=['PO', 'Department', 'fiscal_year']).any()
+    cursor.execute("DELETE FROM departments")
+    cursor.execute("DELETE FROM POs")
+    cursor.executemany("INSERT INTO POs (name) VALUES (?)", [(str(po),) for po in raw['PO'].unique()])
+    cursor.executemany(
+        "INSERT INTO departments (name, po_id) SELECT ?, id FROM POs WHERE name = ?",
+        raw[['Department', 'PO']].astype(str).drop_duplicates('Department').itertuples(index=False, name=None)
+    )
+    cnxn.commit()
+    upload_budgets_local(raw.copy())
+    stored = cursor.execute("SELECT COUNT(*), TOTAL(human_resource_expense) + TOTAL(non_personnel_expense) FROM budgets").fetchone()
+    expected = raw['Human Resources Budget'].sum() + raw['Non-Human Resources Budget'].sum()
+    assert stored[0] == len(raw.drop_duplicates(subset=['PO', 'Department', 'fiscal_year'])), stored
+    assert abs(stored[1] - expected) < 1e-6, (stored, expected)
+    print("PASS: budget rows repeating a key are summed, not dropped")
+
+
+def test_duplicates_are_merged_only_on_request():
+    cursor, cnxn = setup()
+    # a database written before the unique keys existed
+    cursor.execute("DROP INDEX UQ_POs_name")
+    cursor.execute("DROP INDEX UQ_budgets_key")
+    cursor.execute("INSERT INTO POs (id, name) VALUES (2, 'PO1')")
+    cursor.executemany(
+        "INSERT INTO budgets (po_id, department_id, fiscal_year, human_resource_expense, non_personnel_expense) VALUES (?, 1, 2025, ?, 1)",
+        [(1, 10.0), (2, 12.0)],
+    )
+    cnxn.commit()
+    # startup leaves the data alone and reports the tables it could not key
+    assert ensure_indexes(cursor, cnxn) == ['POs']
+    assert cursor.execute("SELECT COUNT(*) FROM POs").fetchone()[0] == 2
+    assert cursor.execute("SELECT COUNT(*) FROM budgets").fetchone()[0] == 2
+    # uploads into the table left without its unique index still go through
+    assert bulk_upsert(cursor, cnxn, 'pos', pd.DataFrame({'name': ['PO1', 'PO3']}), update=False) == 1
+    assert cursor.execute("SELECT COUNT(*) FROM POs WHERE name = 'PO3'").fetchone()[0] == 1
+    cursor.execute("DELETE FROM POs WHERE name = 'PO3'")
+    cnxn.commit()
+
+    # the explicit migration merges the PO, then the budgets it made duplicates, summing them
+    assert migrate_duplicates(cursor, cnxn) == {'POs': 1, 'budgets': 1}
+    assert cursor.execute("SELECT id FROM POs").fetchall() == [(1,)]
+    rows = cursor.execute("SELECT po_id, human_resource_expense, non_personnel_expense FROM budgets").fetchall()
+    assert [tuple(r) for r in rows] == [(1, 22.0, 2.0)], rows
+    assert ensure_indexes(cursor, cnxn) == []
+    print("PASS: duplicates are kept on startup and summed by the opt-in migration")
+
+
+def test_project_names_repeat_across_departments():
+    cursor, cnxn = setup()
+    projects = pd.DataFrame({'name': ['Apollo', 'Apollo', 'Apollo'], 'department_id': [1, 2, 1]})
+    assert bulk_upsert(cursor, cnxn, 'projects', projects, update=False) == 2
+    assert cursor.execute("SELECT name, department_id FROM projects ORDER BY id").fetchall() == [('Apollo', 1), ('Apollo', 2)]
+    print("PASS: projects are unique per name and department")
+
+
+if __name__ == "__main__":
+    test_upsert_on_natural_key()
+    test_repeated_keys_in_an_upload_are_summed()
+    test_duplicates_are_merged_only_on_request()
+    test_project_names_repeat_across_departments()
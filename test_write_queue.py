@@ -0,0 +1,193 @@
+import os
+import tempfile
+import threading
+from backend.connect_local import connect_local, release_connections, clear_table_by_year
+from backend.dimension_cache import get_dimension, invalidate_dimensions
+from backend.write_queue import write_queue, write_timeout, run_transaction
+
+
+def scratch_queue():
+    path = os.path.join(tempfile.mkdtemp(), "writes.db")
+    cursor, cnxn = connect_local(path).connect_to_db()
+    cursor.execute("CREATE TABLE counters (name TEXT PRIMARY KEY, value INTEGER)")
+    cursor.execute("INSERT INTO counters VALUES ('hits', 0)")
+    cnxn.commit()
+    release_connections()
+    return write_queue(path), path
+
+
+def value(path, name='hits'):
+    cursor, cnxn = connect_local(path).connect_to_db()
+    try:
+        return cursor.execute("SELECT value FROM counters WHERE name = ?", (name,)).fetchone()[0]
+    finally:
+        release_connections()
+
+
+def increment(cursor, cnxn):
+    # read-modify-write: loses updates unless writers are serialized
+    current = cursor.execute("SELECT value FROM counters WHERE name = 'hits'").fetchone()[0]
+    cursor.execute("UPDATE counters SET value = ? WHERE name = 'hits'", (current + 1,))
+    cnxn.commit()
+    return current + 1
+
+
+def test_concurrent_writes_are_serialized_and_grouped():
+    writer, path = scratch_queue()
+    threads = [threading.Thread(target=lambda: [writer.run(increment) for _ in range(25)]) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert value(path) == 200
+    stats = writer.stats()
+    assert stats['writes'] == 200 and stats['failed'] == 0, stats
+    assert stats['batches'] < 200 and stats['largest_batch'] > 1, stats
+    print("PASS: concurrent writes are serialized without lost updates and group committed")
+
+
+def test_failed_write_is_rolled_back_alone():
+    writer, path = scratch_queue()
+
+    def failing(cursor, cnxn):
+        increment(cursor, cnxn)  # its commit() is deferred to the batch
+        raise ValueError("bad row")
+
+    futures = [writer.submit(increment), writer.submit(failing), writer.submit(increment)]
+    assert isinstance(futures[1].exception(timeout=10), ValueError)
+    assert [futures[0].result(), futures[2].result()] == [1, 2]
+    assert value(path) == 2
+    assert writer.stats()['failed'] == 1
+    print("PASS: a failing write is rolled back alone and its error reaches the caller")
+
+
+def test_clear_by_year_inside_a_write():
+    writer, path = scratch_queue()
+    cursor, cnxn = connect_local(path).connect_to_db()
+    cursor.execute("CREATE TABLE budgets (fiscal_year INTEGER, value REAL)")
+    cursor.executemany("INSERT INTO budgets VALUES (?, ?)", [(2025, 1.0), (2026, 2.0)])
+    cnxn.commit()
+    release_connections()
+
+    def replace_year(cursor, cnxn, fail=False):
+        clear_table_by_year(cursor, cnxn, "budgets", 2025)
+        cursor.execute("INSERT INTO budgets VALUES (2025, 10.0)")
+        cnxn.commit()
+        if fail:
+            raise ValueError("bad row")
+
+    def script(cursor, cnxn):
+        cnxn.executescript("DELETE FROM budgets")
+
+    writer.run(replace_year)
+    try:
+        writer.run(replace_year, fail=True)
+    except ValueError:
+        pass
+    try:
+        writer.run(script)
+    except Exception as e:
+        assert 'savepoint' in str(e), e
+    else:
+        raise AssertionError("executescript must be refused inside a write")
+    cursor, cnxn = connect_local(path).connect_to_db()
+    try:
+        assert sorted(cursor.execute("SELECT fiscal_year, value FROM budgets").fetchall()) == [(2025, 10.0), (2026, 2.0)]
+    finally:
+        release_connections()
+    assert writer.stats()['failed'] == 2
+    print("PASS: clearing a year inside a write keeps the savepoint; a failing write undoes its clear")
+
+
+def test_queued_write_times_out():
+    writer, path = scratch_queue()
+    started, release = threading.Event(), threading.Event()
+
+    def blocking(cursor, cnxn):
+        started.set()
+        release.wait(10)
+
+    busy = writer.submit(blocking)
+    assert started.wait(10)
+    try:
+        writer.run(increment, timeout=0.2)
+    except write_timeout:
+        pass
+    else:
+        raise AssertionError("a write stuck behind another must time out")
+    release.set()
+    busy.result(10)
+    assert writer.run(increment) == 1  # the timed out write was withdrawn, never ran
+    assert writer.stats()['timeouts'] == 1
+    print("PASS: a write that cannot start in time is withdrawn with write_timeout")
+
+
+def test_run_transaction_is_all_or_nothing():
+    writer, path = scratch_queue()
+
+    def two_increments(cursor, cnxn, fail=False):
+        increment(cursor, cnxn)
+        increment(cursor, cnxn)
+        if fail:
+            raise ValueError("bad row")
+
+    try:
+        run_transaction(two_increments, fail=True, db_path=path)
+    except ValueError:
+        pass
+    assert value(path) == 0
+    run_transaction(two_increments, db_path=path)
+    release_connections()
+    assert value(path) == 2
+    print("PASS: run_transaction commits once at the end and rolls back as a whole")
+
+
+def test_dimension_invalidation_waits_for_the_commit():
+    writer, path = scratch_queue()
+    cursor, cnxn = connect_local(path).connect_to_db()
+    cursor.execute("CREATE TABLE projects (id INTEGER PRIMARY KEY, name TEXT)")
+    cnxn.commit()
+
+    def add_project(cursor, cnxn, name, invalidated, resume):
+        cursor.execute("INSERT INTO projects (name) VALUES (?)", (name,))
+        cnxn.commit()
+        invalidate_dimensions('projects')
+        invalidated.set()
+        resume.wait(5)
+
+    def check(name, start):
+        invalidated, resume = threading.Event(), threading.Event()
+        wait = start(name, invalidated, resume)
+        assert invalidated.wait(5)
+        # between the write's invalidation and its COMMIT a reader caches the old snapshot
+        assert name not in get_dimension('projects', cursor, cnxn).name_to_id
+        resume.set()
+        wait()
+        assert name in get_dimension('projects', cursor, cnxn).name_to_id, name
+
+    def queued(name, invalidated, resume):
+        future = writer.submit(add_project, name, invalidated, resume)
+        return lambda: future.result(5)
+
+    def transaction(name, invalidated, resume):
+        def job():
+            run_transaction(add_project, name, invalidated, resume, db_path=path)
+            release_connections()
+        thread = threading.Thread(target=job)
+        thread.start()
+        return thread.join
+
+    invalidate_dimensions('projects')
+    check('QUEUED', queued)
+    check('JOB', transaction)
+    release_connections()
+    print("PASS: dimension invalidations inside a write run after its COMMIT")
+
+
+if __name__ == "__main__":
+    test_concurrent_writes_are_serialized_and_grouped()
+    test_failed_write_is_rolled_back_alone()
+    test_clear_by_year_inside_a_write()
+    test_queued_write_times_out()
+    test_run_transaction_is_all_or_nothing()
+    test_dimension_invalidation_waits_for_the_commit()